@@ -3,12 +3,18 @@
 
 import os
 import json
+import threading
 from datetime import datetime
+from profiler import span
 from collections import defaultdict
 
 class ActivityLogger:
+    """log_*의 when은 이벤트 버스로 배치 기록할 때의 발생 시각 (없으면 현재 시각),
+    save=False면 파일 저장은 배치 끝에 save()로 한 번 - 이벤트 버스 스레드와 API 요청이 같은 데이터를 다루므로 lock으로 보호"""
+
     def __init__(self, data_dir="./data/activity_logs"):
         self.data_dir = data_dir
+        self.lock = threading.RLock()
         os.makedirs(data_dir, exist_ok=True)
         self.session_data = self._init_session()
         self.today_data = self._load_today_data()
@@ -69,6 +75,11 @@ class ActivityLogger:
             }
         }
     
+    def save(self):
+        """오늘 데이터 저장 (다른 스레드의 배치 기록과 겹치지 않게)"""
+        with self.lock:
+            self._save_data()
+
     def _save_data(self):
         """데이터 저장"""
         # 날짜가 바뀌었으면 새로 시작
@@ -82,7 +93,7 @@ class ActivityLogger:
         self._update_summary()
         
         filepath = self._get_today_filename()
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with span("activity_logger.save"), open(filepath, 'w', encoding='utf-8') as f:
             json.dump(self.today_data, f, ensure_ascii=False, indent=2)
     
     def _update_summary(self):
@@ -123,9 +134,9 @@ class ActivityLogger:
         }
     
     # ========== 자세 감지 로깅 ==========
-    def log_turtle_neck(self, duration_sec=None):
+    def log_turtle_neck(self, duration_sec=None, when=None, save=True):
         """거북목 감지 기록"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         hour = now.strftime("%H")
         
@@ -147,12 +158,13 @@ class ActivityLogger:
             "data": event
         })
         
-        self._save_data()
+        if save:
+            self.save()
         print(f"[ActivityLog] 거북목 감지: {time_str}")
     
-    def log_eye_closed(self, duration_sec=None):
+    def log_eye_closed(self, duration_sec=None, when=None, save=True):
         """눈감음 감지 기록"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         hour = now.strftime("%H")
         
@@ -174,13 +186,14 @@ class ActivityLogger:
             "data": event
         })
         
-        self._save_data()
+        if save:
+            self.save()
         print(f"[ActivityLog] 눈감음 감지: {time_str}")
     
     # ========== 퀘스트 로깅 ==========
-    def log_quest_accepted(self, quest_name, quest_type, target_duration, reward_xp):
+    def log_quest_accepted(self, quest_name, quest_type, target_duration, reward_xp, when=None, save=True):
         """퀘스트 수락 기록"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         
         quest_data = {
@@ -200,12 +213,13 @@ class ActivityLogger:
             "data": quest_data
         })
         
-        self._save_data()
+        if save:
+            self.save()
         print(f"[ActivityLog] 퀘스트 수락: {quest_name} at {time_str}")
     
-    def log_quest_completed(self, quest_name, quest_type, actual_duration, reward_xp):
+    def log_quest_completed(self, quest_name, quest_type, actual_duration, reward_xp, when=None, save=True):
         """퀘스트 완료 기록"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         
         quest_data = {
@@ -225,12 +239,13 @@ class ActivityLogger:
             "data": quest_data
         })
         
-        self._save_data()
+        if save:
+            self.save()
         print(f"[ActivityLog] 퀘스트 완료: {quest_name} at {time_str}")
     
-    def log_quest_failed(self, quest_name, quest_type, reason="timeout"):
+    def log_quest_failed(self, quest_name, quest_type, reason="timeout", when=None, save=True):
         """퀘스트 실패 기록"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         
         quest_data = {
@@ -242,13 +257,14 @@ class ActivityLogger:
         
         self.today_data["quests"]["failed"].append(quest_data)
         
-        self._save_data()
+        if save:
+            self.save()
         print(f"[ActivityLog] 퀘스트 실패: {quest_name} ({reason})")
     
     # ========== 타이머 로깅 ==========
-    def log_timer_event(self, event_type, duration_seconds=0):
+    def log_timer_event(self, event_type, duration_seconds=0, when=None, save=True):
         """타이머 이벤트 기록 (start, complete, cancel)"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         
         event = {
@@ -269,13 +285,14 @@ class ActivityLogger:
             "data": event
         })
         
-        self._save_data()
+        if save:
+            self.save()
         print(f"[ActivityLog] 타이머 이벤트: {event_type} ({duration_seconds}s)")
     
     # ========== HP 변화 로깅 ==========
-    def log_hp_change(self, hp_before, hp_after, reason, amount):
+    def log_hp_change(self, hp_before, hp_after, reason, amount, when=None, save=True):
         """HP 변화 기록"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         
         hp_event = {
@@ -295,7 +312,8 @@ class ActivityLogger:
             "data": hp_event
         })
         
-        self._save_data()
+        if save:
+            self.save()
         # HP 변화는 너무 자주 발생하므로 터미널 출력 생략
     
     # ========== 세션 관리 ==========
@@ -6,21 +6,37 @@ from flask import Flask, render_template, Response, jsonify, request
 # import os # Removed duplicate import
 from dotenv import load_dotenv # .env 사용을 위해 추가
 
-import cv2
+# 기동 시간 기준점 - 다른 모듈보다 먼저 import
+from subsystems import SubsystemRegistry
+from conversation import ConversationService, ConversationStore, parse_reply
+from boot_briefing import BootBriefing, BriefingPrefetcher
+from chat_jobs import ChatJobTable, ChatJobsFull
+import sys
 import threading
 import time
 import json
 import random
+import zlib
+import math
+import queue
 from config import Config
 from game_manager import GameManager
-from vision_engine import VisionEngine
-from brain import BrainHandler
+from game_loop import GameLoop
 from data_manager import DataManager
 from posture_logger import PostureLogger
 from activity_logger import ActivityLogger
+from metrics_logger import get_metrics_logger
+from instrumentation import install_flask_metrics, http_session
+from profiler import span, profiler, ProfilerBusy, set_spans_enabled, spans_enabled, span_stats
+from metrics_registry import (REGISTRY, CONTENT_TYPE, VISION_FRAMES, VISION_FPS, VISION_STAGE,
+                              CACHE_REQUESTS, QUEUE_DEPTH, GAME_STATE)
+from event_bus import (EventBus, BusActivityLogger, ActivityLogSink, PostureLogSink,
+                       MetricsSink, SSESink, TURTLE_NECK, EYE_CLOSED, TIMER, CHAT_DONE)
+import atexit
 import requests
 import threading
-from say_miniMax import main as voice_main
+# cv2/mediapipe(비전), pygame/gtts/speech_recognition(음성), openai(LLM)는
+# 서버가 뜬 뒤 subsystems 로더에서 import 합니다
 
 # .env 파일 로드
 load_dotenv()
@@ -29,9 +45,9 @@ app = Flask(__name__)
 
 # Singletons A
 gm = GameManager()
-vision = None # 일단 None으로 설정하여 서버를 먼저 띄웁니다.
-brain = BrainHandler()
+game_loop = GameLoop(gm) # 게임 로직은 카메라와 분리된 고정 주기로 갱신
 dm = DataManager()
+subsystems = SubsystemRegistry() # vision / tts / voice / llm - 서버를 먼저 띄우고 백그라운드에서 초기화
 # Global State for Vision Thread
 video_capture = None
 latest_frame = None
@@ -59,6 +75,7 @@ pinned_sessions = set(_history_data["pinned_sessions"])
 
 # Persistent Schedules
 global_schedules = dm.load_schedules()
+subsystems.mark("history_loaded")  # 작은 JSON이라 동기 로드 (빈 기록으로 덮어쓰는 경합 방지)
 history_lock = threading.Lock()
 
 # 음성 타이머 명령 저장용
@@ -72,6 +89,8 @@ schedule_command_lock = threading.Lock()
 # 최신 날씨 데이터 저장용 (음성 명령으로 업데이트 시 대비)
 latest_weather_data = None
 weather_data_lock = threading.Lock()
+# 캐시가 비었을 때 /api/gamestate에서 OpenWeather를 직접 호출할지 - ASGI 모드는 백그라운드 갱신이 담당하므로 끔
+weather_fetch_on_miss = True
 
 # --- 네이버 뉴스 검색 기능 추가 ---
 def get_naver_news(query="오늘의 주요 뉴스"):
@@ -89,7 +108,7 @@ def get_naver_news(query="오늘의 주요 뉴스"):
     }
     
     try:
-        res = requests.get(url, timeout=5, headers=headers)
+        res = http_session.get(url, timeout=5, headers=headers)
         if res.status_code == 200:
             data = res.json()
             items = data.get('items', [])
@@ -111,74 +130,82 @@ def api_get_news_raw():
     return jsonify({"result": news_text})
 # ------------------------------
 
-def add_voice_message(text, sender):
-    global current_session_id
-    if not text: return # 빈 메시지 방지
-    
-    # 만약 사용자가 '뉴스'를 물어본다면 자동으로 답변 생성 (선택 사항)
-    # 이 로직은 brain.py에서 처리하게 할 수도 있지만, 여기서 직접 가로챌 수도 있습니다.
-    
+# 음성/화면 공용 대화 기록 + 서비스 (세션 문맥, 프롬프트, 뉴스 캐시, 명령 추출)
+conversation_store = ConversationStore(
+    global_chat_history, history_lock,
+    save=lambda: dm.save_chat_history(global_chat_history, current_session_id, pinned_sessions),
+    session=lambda: current_session_id,
+)
+
+def _sync_voice_message(entry, channel):
+    """음성 대화는 화면 채팅창에도 표시 (/api/voice/sync 폴링)"""
+    if channel != "voice":
+        return
     with voice_buffer_lock:
-        voice_buffer.append({"text": text, "type": sender})
-    
-    with history_lock:
-        global_chat_history.append({
-            "text": text, 
-            "type": sender, 
-            "time": time.strftime("%H:%M"),
-            "session_id": current_session_id
-        })
-        dm.save_chat_history(global_chat_history, current_session_id, pinned_sessions)
+        voice_buffer.append({"text": entry["text"], "type": entry["type"]})
+
+conversation_store.add_listener(_sync_voice_message)
+
+def add_voice_message(text, sender):
+    conversation_store.append(text, sender, channel="voice")
+
+def _apply_commands(user_msg, raw):
+    """[COMMAND:...] 실행 (타이머/일정/날씨 - say_miniMax) → 최종 답변"""
+    voice = subsystems.peek("tts")
+    if voice is None:  # 음성 모듈 로딩 전/실패 → 명령 없이 답변만
+        return parse_reply(raw)[0]
+    return voice.apply_commands(user_msg, raw)
+
+conversation = ConversationService(
+    conversation_store,
+    news=get_naver_news,
+    command_handler=_apply_commands,
+    context_turns=Config.CONVERSATION_CONTEXT_TURNS,
+    news_ttl_sec=Config.NEWS_CACHE_TTL_SEC,
+)
 
 # 초기 상태: 퇴근
 current_status = "퇴근" 
 # is_work_mode는 current_status에 따라 동적으로 결정됨
 
-def get_weather():
-    """weather_test.py의 정확한 구현 (API 키는 .env에서 로드)"""
+def weather_url():
+    """OpenWeather 요청 URL (API 키가 없으면 None) - 동기/ASGI 모드 공용"""
     # .env에서 API 키 로드
     api_key = os.getenv("WEATHER_API_KEY")
+    if not api_key:
+        return None
     
     # 서울 시청 좌표 (weather_test.py와 동일)
     lat = float(os.getenv("WEATHER_LAT", "37.5665"))
     lon = float(os.getenv("WEATHER_LON", "126.9780"))
     
-    if not api_key:
-        print("[Weather] No API Key found in .env (WEATHER_API_KEY)")
-        return {"temp": 0, "condition": "No API Key", "min": 0, "max": 0, "feels_like": 0}
-    
     # weather_test.py와 동일한 API 엔드포인트
     # units=metric: 섭씨 온도(°C) 사용
     # lang=kr: 한국어로 결과 받기
-    url = f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units=metric&lang=kr"
+    return f"https://api.openweathermap.org/data/2.5/weather?lat={lat}&lon={lon}&appid={api_key}&units=metric&lang=kr"
+
+def parse_weather(data):
+    """OpenWeather 응답 JSON → 화면용 dict (필드가 없으면 KeyError)"""
+    # main 딕셔너리에 기온 정보가 들어있습니다
+    return {
+        "temp": int(data['main']['temp']),              # 현재 기온
+        "condition": data['weather'][0]['description'],  # 날씨 상태
+        "min": int(data['main']['temp_min']),           # 최저 기온
+        "max": int(data['main']['temp_max']),           # 최고 기온
+        "feels_like": int(data['main']['feels_like'])   # 체감 온도
+    }
+
+def get_weather():
+    """weather_test.py의 정확한 구현 (API 키는 .env에서 로드)"""
+    url = weather_url()
+    if not url:
+        print("[Weather] No API Key found in .env (WEATHER_API_KEY)")
+        return {"temp": 0, "condition": "No API Key", "min": 0, "max": 0, "feels_like": 0}
     
     try:
-        response = requests.get(url)
+        response = http_session.get(url, timeout=5)
         response.raise_for_status()  # 오류 발생 시 예외 처리
-        
-        # JSON 데이터 파싱
-        data = response.json()
-        
-        # 필요한 정보 추출 (weather_test.py와 동일)
-        location = data['name']  # 지역 이름
-        weather_desc = data['weather'][0]['description']  # 날씨 상태
-        
-        # main 딕셔너리에 기온 정보가 들어있습니다
-        temp_current = data['main']['temp']        # 현재 기온
-        temp_feels = data['main']['feels_like']    # 체감 온도
-        temp_min = data['main']['temp_min']        # 최저 기온
-        temp_max = data['main']['temp_max']        # 최고 기온
-        
-        # 콘솔 출력 제거 (로그 스팸 방지)
-        
-        # API 응답 데이터 반환5
-        return {
-            "temp": int(temp_current),
-            "condition": weather_desc,
-            "min": int(temp_min),
-            "max": int(temp_max),
-            "feels_like": int(temp_feels)
-        }
+        return parse_weather(response.json())
         
     except requests.exceptions.RequestException as e:
         print(f"연결 오류 발생: {e}")
@@ -195,7 +222,9 @@ def home():
 def update_status_btn():
     global current_status
     data = request.json
+    previous = current_status
     current_status = data.get('status', current_status)
+    briefing_prefetcher.on_status_change(previous, current_status)  # 퇴근 → 업무중이면 브리핑 선준비
     return jsonify({"status": current_status})
     
 # toggle_mode endpoint removed (logic unified)
@@ -213,6 +242,12 @@ def update_weather():
     print(f"[WEATHER] 음성에서 날씨 업데이트됨: {data.get('city')}")
     return jsonify({"status": "success"})
 
+def quantize_posture(score, step=None):
+    """자세 점수를 step 단위로 올림 - 프레임마다 흔들리는 값이 ETag를 매번 바꾸지 않도록
+    (임계값이 step의 배수라 '점수 > POSTURE_THRESHOLD' 판정은 원래 점수와 같음)"""
+    step = step or Config.GAMESTATE_POSTURE_STEP
+    return round(math.ceil(round(score / step, 6)) * step, 6)
+
 @app.route('/api/gamestate')
 def get_gamestate():
     global latest_weather_data
@@ -224,29 +259,47 @@ def get_gamestate():
             weather_info = latest_weather_data
             
     if not weather_info:
-        weather_info = get_weather()
+        CACHE_REQUESTS.labels("weather", "miss").inc()
+        if weather_fetch_on_miss:
+            weather_info = get_weather()
+        else:
+            # 갱신이 밀린 경우 요청 경로에서 기다리지 않고 마지막 값(없으면 자리표시) 사용
+            with weather_data_lock:
+                weather_info = latest_weather_data or {"temp": 0, "condition": "날씨 갱신 중", "min": 0, "max": 0,
+                                                       "feels_like": 0}
+    else:
+        CACHE_REQUESTS.labels("weather", "hit").inc()
 
     # Get posture status
     with posture_status_lock:
-        posture_score = current_posture_score
+        posture_score = quantize_posture(current_posture_score)
         is_eye_closed = current_is_eye_closed
-    
-    return jsonify({
-        "hp": gm.hp,
-        "max_hp": Config.MAX_HP,
-        "xp": gm.xp,
-        "level": gm.level,
-        "happiness": gm.happiness,
-        "quests": [q.to_dict() for q in gm.quests],
-        "available_quests": [q.to_dict() for q in gm.available_quests],
+
+    # 게임 상태는 게임 루프가 발행한 스냅샷을 락 없이 읽음 (미리 직렬화된 JSON 재사용)
+    snap = game_loop.snapshot
+    extras = json.dumps({
         "work_mode": (current_status == "업무중"),
         "status": current_status,
         "weather": weather_info,
         "schedules": global_schedules,
         "pinned_sessions": list(pinned_sessions),
         "posture_score": posture_score,
-        "is_eye_closed": is_eye_closed
-    })
+        "is_eye_closed": is_eye_closed,
+        "subsystems": subsystems.status()  # {"vision": "ready", "llm": "loading", ...}
+    }, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    # ETag = 스냅샷 버전 + 나머지 필드 해시 → 변경이 없으면 304로 응답
+    etag = f"{snap.etag}-{zlib.crc32(extras):08x}"
+    if request.if_none_match.contains(etag):
+        CACHE_REQUESTS.labels("gamestate_etag", "hit").inc()
+        resp = Response(status=304)
+    else:
+        CACHE_REQUESTS.labels("gamestate_etag", "miss").inc()
+        # {"hp":...} + {"work_mode":...} 두 JSON 객체를 하나로 이어 붙임
+        resp = Response(snap.body[:-1] + b',' + extras[1:], mimetype='application/json')
+    resp.set_etag(etag)
+    resp.headers['Cache-Control'] = 'no-cache'  # 브라우저가 매번 If-None-Match로 재검증하도록
+    return resp
 
 @app.route('/api/quest/accept', methods=['POST'])
 def accept_quest():
@@ -255,7 +308,8 @@ def accept_quest():
     quest_index = data.get('index')
     
     if quest_index is not None:
-        accepted = gm.accept_quest(quest_index)
+        # gm 변경은 게임 루프 스레드에서만 실행
+        accepted = game_loop.call(gm.accept_quest, quest_index)
         if accepted:
             return jsonify({"status": "success", "message": "퀘스트 수락됨"})
     
@@ -264,7 +318,26 @@ def accept_quest():
 # Singletons for logging
 posture_log_instance = PostureLogger()
 activity_log_instance = ActivityLogger()
-gm.set_activity_logger(activity_log_instance)
+metrics_log_instance = get_metrics_logger()
+install_flask_metrics(app, metrics_log_instance)  # 모든 요청 지연/상태 코드를 http_in 이벤트로 기록
+
+# 이벤트 버스: 감지/HP/퀘스트 이벤트를 한 번만 발행하고 각 싱크가 배치로 저장
+event_bus = EventBus()
+event_bus.subscribe(ActivityLogSink(activity_log_instance))
+event_bus.subscribe(PostureLogSink(posture_log_instance))
+event_bus.subscribe(MetricsSink(metrics_log_instance))
+sse_sink = event_bus.subscribe(SSESink())
+event_bus.start()
+atexit.register(event_bus.stop)  # 종료 시 버퍼에 남은 이벤트 저장
+
+gm.set_activity_logger(BusActivityLogger(event_bus))
+
+# /metrics 게이지: 스크레이프 시점에 읽기만 함 (루프 스레드에 락을 걸지 않음)
+QUEUE_DEPTH.labels("event_bus").set_function(event_bus.qsize)
+QUEUE_DEPTH.labels("metrics_logger").set_function(metrics_log_instance.pending_count)
+QUEUE_DEPTH.labels("game_loop").set_function(game_loop.qsize)
+for _field in ("hp", "max_hp", "xp", "level", "happiness"):
+    GAME_STATE.labels(_field).set_function(lambda f=_field: game_loop.snapshot.payload[f])
 
 @app.route('/api/posture/stats')
 def posture_stats():
@@ -351,6 +424,7 @@ def set_schedule():
     # 영구 저장
     global_schedules.append(new_entry)
     dm.save_schedules(global_schedules)
+    briefing_prefetcher.invalidate("schedule")
     
     print(f"[SCHEDULE] 음성에서 일정 등록됨: {date_str} - {title}")
     return jsonify({"status": "success"})
@@ -375,6 +449,7 @@ def delete_schedule():
     original_count = len(global_schedules)
     global_schedules = [s for s in global_schedules if s.get('date') != date_str]
     dm.save_schedules(global_schedules)
+    briefing_prefetcher.invalidate("schedule")
     
     print(f"[SCHEDULE] 음성에서 일정 삭제됨: {date_str}")
     return jsonify({"status": "success"})
@@ -493,7 +568,7 @@ def get_history():
 @app.route('/api/history/delete', methods=['POST'])
 def delete_history():
     """특정 세션의 히스토리를 삭제"""
-    global global_chat_history, pinned_sessions
+    global pinned_sessions
     data = request.json
     session_id = data.get('session_id')
     
@@ -501,7 +576,8 @@ def delete_history():
         return jsonify({"error": "session_id required"}), 400
     
     with history_lock:
-        global_chat_history = [msg for msg in global_chat_history if msg.get('session_id') != session_id]
+        # 제자리 수정 (conversation_store가 같은 리스트를 참조)
+        global_chat_history[:] = [msg for msg in global_chat_history if msg.get('session_id') != session_id]
         pinned_sessions.discard(session_id)
         dm.save_chat_history(global_chat_history, current_session_id, pinned_sessions)
     
@@ -566,85 +642,80 @@ def switch_session():
     print(f"[DEBUG] 세션 전환됨: {current_session_id}")
     return jsonify({"status": "success", "current_session_id": current_session_id})
 
-# AI Chat Endpoint
+# AI Chat
+def run_chat(user_msg, history, session_id):
+    """채팅 작업 본체 (chat_jobs 스레드 풀에서 실행) → {"text", "task", "thought"}
+    문맥은 서버 기록(음성 대화 포함)에서 가져오므로 클라이언트가 보낸 history는 쓰지 않음"""
+    # 서버 기동 직후에는 LLM 클라이언트가 아직 초기화 중일 수 있음
+    subsystems.get("llm", timeout=Config.SUBSYSTEM_WAIT_SEC)
+    reply = conversation.respond(user_msg, channel="web", session_id=session_id)
+    return {"text": reply.text, "task": reply.task, "thought": reply.thought}
+
+def run_chat_stub(user_msg, history, session_id):
+    """부하 테스트용 (DEVGOTCHI_CHAT_STUB=초) - LLM 호출/예산/chat_history.json 저장 없이 지연만 흉내"""
+    time.sleep(Config.CHAT_STUB_SEC)
+    return {"text": f"(stub) {user_msg}", "task": None, "thought": ""}
+
+# 완료 알림은 /api/events/stream (SSE)으로 → 클라이언트는 알림을 받거나 폴링으로 결과 조회
+chat_jobs = ChatJobTable(
+    run_chat_stub if Config.CHAT_STUB_SEC > 0 else run_chat,
+    on_done=lambda job: event_bus.emit(CHAT_DONE, job_id=job.id, status=job.status),
+    workers=Config.CHAT_JOB_WORKERS,
+    max_jobs=Config.CHAT_JOB_MAX,
+    ttl_sec=Config.CHAT_JOB_TTL_SEC,
+    coalesce_sec=Config.CHAT_JOB_COALESCE_SEC,
+)
+QUEUE_DEPTH.labels("chat_jobs").set_function(chat_jobs.pending)
+if Config.CHAT_STUB_SEC > 0:
+    print(f"[Chat] 스텁 모드: LLM 대신 {Config.CHAT_STUB_SEC}s 대기 후 고정 응답 (DEVGOTCHI_CHAT_STUB)")
+
+def submit_chat(data):
+    """작업 등록 → (job, None) 또는 (None, (오류 body, 상태 코드)) - Flask/ASGI 라우트 공용"""
+    message = (data.get('message') or '').strip()
+    if not message:
+        return None, ({"error": "message is required"}, 400)
+    try:
+        job, coalesced = chat_jobs.submit(current_session_id, message, data.get('history', []))
+    except ChatJobsFull as e:
+        return None, ({"error": str(e)}, 429)
+    CACHE_REQUESTS.labels("chat_jobs", "hit" if coalesced else "miss").inc()
+    return job, None
+
+def chat_response(job):
+    """동기 /api/chat 응답 (body, 상태 코드) - 대기가 끝난 뒤 호출"""
+    if not job.is_finished:
+        return job.to_dict(), 202  # 아직 처리 중 → job_id로 이어서 조회
+    if job.status == "failed":
+        return {"error": job.error, "subsystems": subsystems.status()}, 503
+    return job.result, 200
+
+@app.route('/api/chat/jobs', methods=['POST'])
+def submit_chat_job():
+    """채팅 작업 등록 → 작업 id 즉시 반환 (같은 메시지 중복 전송은 기존 작업으로 합침)"""
+    job, error = submit_chat(request.json or {})
+    if error:
+        return jsonify(error[0]), error[1]
+    resp = jsonify({**job.to_dict(), "coalesced": job.coalesced > 0})
+    resp.status_code = 202
+    resp.headers['Location'] = f"/api/chat/jobs/{job.id}"
+    return resp
+
+@app.route('/api/chat/jobs/<job_id>')
+def get_chat_job(job_id):
+    job = chat_jobs.get(job_id)
+    if job is None:
+        return jsonify({"error": "unknown or expired job"}), 404
+    return jsonify(job.to_dict())
+
 @app.route('/api/chat', methods=['POST'])
 def chat():
-    global current_session_id
-    data = request.json
-    user_msg = data.get('message', '')
-    history = data.get('history', []) 
-    
-    # --- 뉴스 질의 확인 로직 추가 ---
-    # --- 뉴스 질의 확인 로직 (LLM Context Injection) ---
-    if "뉴스" in user_msg or "소식" in user_msg:
-        print("[App] News keyword detected. Fetching Naver News...")
-        news_data = get_naver_news() # Returns string "최신 뉴스 소식입니다. ..."
-        
-        # LLM에게 주입할 시스템 메시지 생성
-        system_injection = f"[System Info] Real-time News Data: {news_data}. Please explain this to the user."
-        
-        # History에 기록 (User msg는 보여주되, System Info는 내부적으로 처리하거나 History에 포함)
-        # 여기서는 History에 포함하여 문맥 유지
-        updated_history = history + [
-            {"role": "user", "content": user_msg},
-            {"role": "system", "content": system_injection}
-        ]
-        
-        # 일반 Chat 로직으로 위임 (단, history를 조작함)
-        result = {}
-        event = threading.Event()
-        
-        def cb(text, task, thought):
-            result['text'] = text
-            result['task'] = task
-            result['thought'] = thought
-            event.set()
-            
-        brain.chat(updated_history, gm.level, cb)
-        event.wait(timeout=30)
-        
-        if result.get('text'):
-             with history_lock:
-                global_chat_history.append({"text": user_msg, "type": "user", "time": time.strftime("%H:%M"), "session_id": current_session_id})
-                global_chat_history.append({"text": result['text'], "type": "ai", "time": time.strftime("%H:%M"), "session_id": current_session_id})
-                dm.save_chat_history(global_chat_history, current_session_id, pinned_sessions)
-        
-        return jsonify(result)
-    # -----------------------------
-    # -----------------------------
-
-    user_msg = data.get('message')
-    history = data.get('history', []) 
-    
-    result = {}
-    event = threading.Event()
-    
-    def cb(text, task, thought):
-        result['text'] = text
-        result['task'] = task
-        result['thought'] = thought
-        event.set()
-        
-    brain.chat(history + [{"role": "user", "content": user_msg}], gm.level, cb)
-    event.wait(timeout=30)
-    
-    if result.get('text'):
-        with history_lock:
-            global_chat_history.append({
-                "text": user_msg, 
-                "type": "user", 
-                "time": time.strftime("%H:%M"),
-                "session_id": current_session_id
-            })
-            global_chat_history.append({
-                "text": result['text'],
-                "type": "ai",
-                "time": time.strftime("%H:%M"),
-                "session_id": current_session_id
-            })
-            dm.save_chat_history(global_chat_history, current_session_id, pinned_sessions)
-        
-    return jsonify(result)
+    """기존 동기 API (작업 완료까지 대기) - 새 클라이언트는 /api/chat/jobs 사용"""
+    job, error = submit_chat(request.json or {})
+    if error:
+        return jsonify(error[0]), error[1]
+    job.wait(timeout=Config.CHAT_LLM_TIMEOUT_SEC)
+    body, status = chat_response(job)
+    return jsonify(body), status
 
 @app.route('/api/activity/stats')
 def activity_stats():
@@ -664,71 +735,210 @@ def log_timer():
     data = request.json
     event_type = data.get('type')
     duration = data.get('duration', 0)
-    activity_log_instance.log_timer_event(event_type, duration)
+    event_bus.emit(TIMER, type=event_type, duration=duration)
     return jsonify({"status": "success"})
 
 @app.route('/api/activity/full_log')
 def activity_full_log():
     """오늘의 전체 활동 로그 (상세)"""
-    # Force save/update before reading to get latest in-memory events
-    activity_log_instance._save_data() 
-    return jsonify(activity_log_instance.today_data)
+    # 버스에 대기 중인 이벤트까지 반영한 뒤 읽기
+    event_bus.flush()
+    activity_log_instance.save()
+    with activity_log_instance.lock:
+        return jsonify(activity_log_instance.today_data)
+
+@app.route('/api/events/stream')
+def events_stream():
+    """실시간 이벤트 SSE 스트림 (거북목/눈감음/HP/퀘스트)"""
+    def generate():
+        q = sse_sink.open_client()
+        try:
+            while True:
+                try:
+                    msg = q.get(timeout=15)
+                    yield f"data: {msg}\n\n"
+                except queue.Empty:
+                    yield ": keep-alive\n\n"  # 연결 유지용 주석 라인
+        finally:
+            sse_sink.close_client(q)
+    return Response(generate(), mimetype='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+@app.route('/api/metrics/summary')
+def metrics_summary():
+    """지연/실패율 요약 - ?date=YYYY-MM-DD 또는 ?from=...&to=... (UTC 날짜, 기본: 오늘)"""
+    from_ymd = request.args.get('from')
+    to_ymd = request.args.get('to')
+    try:
+        if from_ymd or to_ymd:
+            summary = metrics_log_instance.get_range_summary(from_ymd or to_ymd, to_ymd or from_ymd)
+        else:
+            date = request.args.get('date') or time.strftime("%Y-%m-%d", time.gmtime())
+            summary = metrics_log_instance.get_daily_summary(date)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    summary.pop("aggregate", None)  # 병합용 내부 상태는 응답에서 제외
+    return jsonify(summary)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus 스크레이프용 텍스트 노출 포맷"""
+    return Response(REGISTRY.render(), mimetype=CONTENT_TYPE)
+
+# ========== 관리자 진단 (Config.PROFILER_ENABLED일 때만 노출) ==========
+def _admin_denied():
+    """진단 엔드포인트 접근 검사 → 거부 시 응답, 허용 시 None"""
+    if not Config.PROFILER_ENABLED:
+        return jsonify({"error": "not found"}), 404
+    if Config.ADMIN_TOKEN:
+        if request.headers.get('X-Admin-Token') != Config.ADMIN_TOKEN:
+            return jsonify({"error": "forbidden"}), 403
+    elif request.remote_addr not in ('127.0.0.1', '::1'):
+        return jsonify({"error": "forbidden"}), 403  # 토큰이 없으면 로컬에서만 허용
+    return None
+
+@app.route('/admin/profile', methods=['POST'])
+def admin_profile():
+    """전체 스레드 스택 샘플링 → collapsed-stack 텍스트 (flamegraph.pl / speedscope)"""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    seconds = request.args.get('seconds', 5, type=float)
+    interval = request.args.get('interval', 0.01, type=float)
+    try:
+        collapsed, samples = profiler.profile(seconds, interval)
+    except ProfilerBusy as e:
+        return jsonify({"error": str(e)}), 409
+    resp = Response(collapsed, mimetype='text/plain; charset=utf-8')
+    resp.headers['X-Profile-Samples'] = str(samples)
+    resp.headers['Content-Disposition'] = f'attachment; filename="profile_{int(time.time())}.collapsed"'
+    return resp
+
+@app.route('/admin/spans', methods=['GET', 'POST'])
+def admin_spans():
+    """span 측정 토글 (POST {"enabled": true, "reset": true}) 및 구간별 통계 조회"""
+    denied = _admin_denied()
+    if denied:
+        return denied
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        set_spans_enabled(data.get('enabled', True), reset=data.get('reset', False))
+    return jsonify({"enabled": spans_enabled(), "spans": span_stats()})
 
 @app.route('/stats')
 def stats_page():
     return render_template('stats.html')
 
+LOG_COOLDOWN = 3  # 거북목/눈감음 중복 로깅 방지 쿨다운 (초)
+_last_detection_log = {TURTLE_NECK: 0, EYE_CLOSED: 0}
+
+def handle_vision_result(score, closed, has_face, movement=False):
+    """프레임 분석 결과 반영 (스레드/워커 프로세스 방식 공통)"""
+    global current_posture_score, current_is_eye_closed
+    briefing_prefetcher.observe_presence(has_face)  # 오랜 부재 후 복귀 감지 → 브리핑 선준비/재생
+    # Config.POSTURE_THRESHOLD (0.18) 사용
+    is_bad = score > Config.POSTURE_THRESHOLD
+    # 프레임마다 gm.update를 호출하지 않고 틱 윈도우에 집계만 함
+    game_loop.add_sample(is_bad, closed, movement)  # movement: 기지개/일어서기 (회복 퀘스트, 멍때림 판정)
+    
+    # Update global posture status for frontend
+    with posture_status_lock:
+        current_posture_score = score
+        current_is_eye_closed = closed
+    
+    # 업무중 상태일 때만 로깅
+    if current_status == "업무중":
+        current_time = time.time()
+        # 이벤트는 한 번만 발행 (자세/활동/메트릭 싱크가 각각 배치 저장)
+        for kind, detected in ((TURTLE_NECK, is_bad), (EYE_CLOSED, closed)):
+            if detected and (current_time - _last_detection_log[kind]) > LOG_COOLDOWN:
+                event_bus.emit(kind)
+                _last_detection_log[kind] = current_time
+
+class _FpsMeter:
+    def __init__(self):
+        self.frames = 0
+        self.since = time.perf_counter()
+
+    def tick(self):
+        self.frames += 1
+        now = time.perf_counter()
+        if now - self.since >= 1.0:
+            VISION_FPS.set(self.frames / (now - self.since))
+            self.frames, self.since = 0, now
+
 def vision_loop():
-    global video_capture, vision, current_posture_score, current_is_eye_closed
-    cap = cv2.VideoCapture(0)
-    posture_log = PostureLogger()
-    activity_log = activity_log_instance  # 전역 인스턴스 사용 (데이터 공유)
+    """스레드 방식: 캡처/분석/인코딩을 Flask 프로세스 안에서 실행 (Config.VISION_WORKER = False)
+
+    카메라 영상은 바로 내보내고, 분석은 "vision" 서브시스템(MediaPipe 로딩)이 준비된 프레임부터 시작합니다.
+    """
+    global latest_frame
+    import cv2
+    from frame_source import open_frame_source
+    cap = open_frame_source()  # Config.CAMERA_SOURCE (웹캠/영상/이미지/노이즈)
     
-    # 중복 로깅 방지용 쿨다운
-    last_turtle_log = 0
-    last_eye_log = 0
-    LOG_COOLDOWN = 3  # 3초 쿨다운
+    fps = _FpsMeter()
+    stage_capture = VISION_STAGE.labels("capture")
+    stage_analyze = VISION_STAGE.labels("analyze")
+    stage_encode = VISION_STAGE.labels("encode")
     
     while True:
-        ret, frame = cap.read()
+        t0 = time.perf_counter()
+        with span("vision.capture"):
+            ret, frame = cap.read()
         if not ret:
+            VISION_FRAMES.labels("no_frame").inc()
             time.sleep(1)
             continue
+        t1 = time.perf_counter()
+        stage_capture.observe(t1 - t0)
             
+        vision = subsystems.peek("vision")
         if vision:
-            score, drowsy, smile, closed, landmarks = vision.analyze_frame(frame)
-            # Config.POSTURE_THRESHOLD (0.18) 사용
-            is_bad = score > Config.POSTURE_THRESHOLD
-            gm.update(is_bad, drowsy, True)
-            
-            # Update global posture status for frontend
-            with posture_status_lock:
-                current_posture_score = score
-                current_is_eye_closed = closed
-            
-            # 업무중 상태일 때만 로깅
-            if current_status == "업무중":
-                current_time = time.time()
-                
-                # 거북목 감지 로깅 (Config.POSTURE_THRESHOLD 사용)
-                if is_bad and (current_time - last_turtle_log) > LOG_COOLDOWN:
-                    posture_log.log_turtle_neck()
-                    activity_log.log_turtle_neck()  # 통합 로깅
-                    last_turtle_log = current_time
-                
-                # 눈감음 감지 로깅
-                if closed and (current_time - last_eye_log) > LOG_COOLDOWN:
-                    posture_log.log_eye_closed()
-                    activity_log.log_eye_closed()  # 통합 로깅
-                    last_eye_log = current_time
+            with span("vision.analyze"):
+                score, drowsy, smile, closed, landmarks = vision.analyze_frame(frame)
+            stage_analyze.observe(time.perf_counter() - t1)
+            handle_vision_result(score, closed, landmarks is not None, vision.last_movement)
         
-        with vision_lock:
-            global latest_frame
+        t2 = time.perf_counter()
+        with span("vision.imencode"):
             flag, encoded_image = cv2.imencode(".jpg", frame)
+        stage_encode.observe(time.perf_counter() - t2)
+        with vision_lock:
             if flag:
                 latest_frame = encoded_image.tobytes()
         
-        time.sleep(0.03)
+        VISION_FRAMES.labels("analyzed" if vision else "raw").inc()
+        fps.tick()
+        
+        # fast: 파일/노이즈 소스로 파이프라인 최대 처리량 측정 / realtime 파일 소스는 read()가 이미 FPS에 맞춰 대기
+        if Config.CAMERA_PACING != 'fast' and not cap.paced:
+            time.sleep(0.03)
+
+def vision_worker_loop(worker):
+    """워커 프로세스 방식: 결과 구조체와 JPEG만 읽어서 반영 (MediaPipe/인코딩은 다른 프로세스)"""
+    global latest_frame
+    fps = _FpsMeter()
+    stage_analyze = VISION_STAGE.labels("analyze")
+    stage_encode = VISION_STAGE.labels("encode")
+    last_seq = -1
+    
+    while True:
+        result, jpeg = worker.wait_result(last_seq, timeout=1.0)
+        if result is None:
+            continue
+        if last_seq >= 0 and result.seq > last_seq + 1:
+            VISION_FRAMES.labels("skipped").inc(result.seq - last_seq - 1)  # 분석보다 캡처가 빨라서 건너뛴 프레임
+        last_seq = result.seq
+        
+        stage_analyze.observe(result.analyze_ms / 1000)
+        stage_encode.observe(result.encode_ms / 1000)
+        handle_vision_result(result.score, result.closed, bool(result.has_face), result.movement)
+        if jpeg:
+            with vision_lock:
+                latest_frame = jpeg
+        
+        VISION_FRAMES.labels("analyzed").inc()
+        fps.tick()
 
 @app.route('/video_feed')
 def video_feed():
@@ -741,21 +951,119 @@ def video_feed():
             time.sleep(0.1)
     return Response(generate(), mimetype='multipart/x-mixed-replace; boundary=frame')
 
-if __name__ == '__main__':
-    # 1. Vision Thread Start
-    if vision is None:
-        try:
-            vision = VisionEngine()
-        except Exception as e:
-            print(f"[ERROR] Vision Init Failed: {e}")
+# ========== 서브시스템 로더 (Flask 기동 후 백그라운드에서 실행) ==========
+def _load_llm():
+    from brain import BrainHandler  # completion_backends (클라우드/로컬 LLM)
+    return BrainHandler()  # 토큰/비용은 instrument_llm → MetricsLogger "llm" 이벤트
 
-    t_vision = threading.Thread(target=vision_loop, daemon=True)
-    t_vision.start()
-    print("[SYSTEM] 비전 엔진 스레드 시작됨")
-    
-    # 2. Voice Thread Start
-    t_voice = threading.Thread(target=voice_main, args=(add_voice_message,), daemon=True)
+def _load_tts():
+    import say_miniMax  # gtts / pygame / speech_recognition / rich
+    return say_miniMax
+
+def _load_audio():
+    """재생 장치 초기화 (pygame.mixer.init) - 음성 합성(tts)은 이것 없이도 가능"""
+    subsystems.get("tts").init_audio()
+    return True
+
+def _load_voice():
+    """음성 인식 스레드 시작 (재생 장치 준비 후)"""
+    voice = subsystems.get("tts")
+    t_voice = threading.Thread(target=voice.main, args=(add_voice_message, conversation), daemon=True)
     t_voice.start()
     print("[SYSTEM] 음성 인식(MiniMax) 스레드 시작됨")
-    
-    app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
+    return t_voice
+
+def _load_vision():
+    if Config.VISION_WORKER:
+        # MediaPipe/JPEG 인코딩은 워커 프로세스에서 실행 (GIL 분리, 비정상 종료 시 자동 재시작)
+        from frame_source import open_frame_source
+        from vision_worker import VisionWorker
+        vision_worker = VisionWorker(open_frame_source)
+        vision_worker.start()
+        worker_gauge = REGISTRY.gauge("devgotchi_vision_worker", "비전 워커 상태 (alive/restarts/torn_frames)", ("field",))
+        for _field in ("alive", "restarts", "torn_frames"):
+            worker_gauge.labels(_field).set_function(lambda f=_field: vision_worker.stats()[f])
+        t_vision = threading.Thread(target=vision_worker_loop, args=(vision_worker,), daemon=True)
+        t_vision.start()
+        print("[SYSTEM] 비전 워커 프로세스 시작됨")
+        # 첫 결과가 나와야 준비 완료 (모델 로딩 중/카메라 없음/워커 재시작 반복이면 계속 '초기화 중')
+        while vision_worker.wait_result(-1, timeout=30, with_jpeg=False)[0] is None:
+            if vision_worker.stopped:
+                raise RuntimeError("비전 워커가 종료됨")
+            print(f"[SYSTEM] 비전 워커 첫 결과 대기 중... {vision_worker.stats()}")
+        return vision_worker
+    from vision_engine import create_vision_engine
+    return create_vision_engine()  # Config.VISION_BACKEND
+
+subsystems.register("vision", _load_vision)
+subsystems.register("tts", _load_tts)
+subsystems.register("audio", _load_audio, requires=("tts",))
+subsystems.register("voice", _load_voice, requires=("audio",))
+subsystems.register("llm", _load_llm)
+subsystem_gauge = REGISTRY.gauge("devgotchi_subsystem_ready", "서브시스템 준비 여부 (1=ready)", ("subsystem",))
+for _name in subsystems.status():
+    subsystem_gauge.labels(_name).set_function(lambda n=_name: 1 if subsystems.ready(n) else 0)
+
+# ========== 브리핑 (부팅 시 + 오랜 부재 후 복귀 시 선준비) ==========
+def _active_quests():
+    return [q for q in game_loop.snapshot.payload['quests'] if not q['is_completed']]
+
+def make_briefing(request_type="briefing"):
+    return BootBriefing(subsystems, get_weather, lambda: list(global_schedules), add_voice_message,
+                        get_quests=_active_quests, deadline=Config.BRIEFING_DEADLINE_SEC,
+                        audio_timeout=Config.BRIEFING_AUDIO_WAIT_SEC, request_type=request_type)
+
+def _briefing_cache_key():
+    """멘트에 들어가는 내용 - 날짜/오늘 일정/진행 중 퀘스트가 바뀌면 선준비 결과를 쓰지 않음"""
+    today = time.strftime("%Y-%m-%d")
+    events = tuple((s.get('time', ''), s['title']) for s in global_schedules if s.get('date') == today)
+    return today, events, tuple(q['name'] for q in _active_quests())
+
+briefing_prefetcher = BriefingPrefetcher(
+    make_briefing, _briefing_cache_key,
+    presence_available=lambda: subsystems.ready("vision"),
+    absence_sec=Config.PRESENCE_ABSENCE_SEC,
+    confirm_sec=Config.PRESENCE_CONFIRM_SEC,
+    ttl_sec=Config.BRIEFING_CACHE_TTL_SEC,
+)
+subsystems.mark("app_imported")
+
+@app.route('/api/startup')
+def startup_report():
+    """서브시스템별 기동 시간 리포트"""
+    return jsonify(subsystems.report())
+
+@app.route('/api/llm/usage')
+def llm_usage():
+    """오늘 LLM 토큰/예상 비용 (요청 종류별), 예산 단계, 모델별 게이트웨이 상태"""
+    from completion_backends import get_completions
+    from llm_gateway import gateway
+    budget = get_completions().budget
+    return jsonify({"budget": budget.status() if budget else None, "gateway": gateway.stats()})
+
+def start_services():
+    """게임 루프 / 서브시스템 / 브리핑 / 비전 스레드 시작 (서빙 모드 공통)"""
+    # 1. Game Loop Start (고정 주기 게임 틱)
+    game_loop.start()
+
+    # 2. Vision / Voice / TTS / LLM은 백그라운드에서 초기화 (준비 상태는 /api/gamestate의 subsystems)
+    subsystems.start(*Config.SUBSYSTEMS_AUTOSTART)
+    if not Config.VISION_WORKER:
+        # 카메라 영상은 엔진 로딩을 기다리지 않고 바로 송출
+        t_vision = threading.Thread(target=vision_loop, daemon=True)
+        t_vision.start()
+        print("[SYSTEM] 비전 엔진 스레드 시작됨")
+
+    # 3. Boot Briefing (날씨/일정/LLM/TTS를 병렬로 준비하고 오디오 준비 시 재생)
+    if Config.BOOT_BRIEFING:
+        threading.Thread(target=make_briefing("boot").run, name="boot-briefing", daemon=True).start()
+
+if __name__ == '__main__':
+    start_services()
+    subsystems.mark("server_start")
+    if Config.SERVER_MODE == 'asgi':
+        # asyncio 서빙 (스트림은 코루틴, 나머지 라우트는 이 Flask 앱 그대로) - requirements-asgi.txt 필요
+        import asgi_app
+        asgi_app.serve(sys.modules[__name__], host='0.0.0.0', port=5000)
+    else:
+        app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
@@ -0,0 +1,168 @@
+# asgi_app.py
+"""asyncio 서빙 모드 (Config.SERVER_MODE = 'asgi', 환경변수 DEVGOTCHI_SERVER=asgi)
+
+기존 Flask 라우트는 WSGI로 그대로 마운트하고 (경로/응답 형식 동일),
+스레드를 오래 붙잡던 라우트만 코루틴으로 다시 구현합니다:
+    /video_feed          MJPEG 스트림 (연결당 스레드 대신 코루틴)
+    /api/events/stream   SSE (SSESink가 이벤트 루프의 asyncio 큐로 직접 전달)
+    /api/chat            채팅 작업 완료를 스레드 대기 없이 await
+날씨는 공유 httpx.AsyncClient로 백그라운드 갱신해 /api/gamestate가 OpenWeather 응답을 기다리지 않습니다
+(갱신이 실패해 캐시가 만료돼도 요청 경로에서 직접 호출하지 않음).
+
+AsyncHttp는 이 날씨 갱신에만 씁니다. MiniMax(TTS)와 네이버 뉴스는 채팅 작업/음성 스레드 안에서
+기존 동기 requests 세션(instrumentation.http_session)으로 호출하므로 이벤트 루프를 막지 않습니다.
+
+    pip install -r requirements-asgi.txt
+    DEVGOTCHI_SERVER=asgi python app.py
+"""
+
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import httpx
+import uvicorn
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+from config import Config
+from instrumentation import log_http_out
+from metrics_logger import MetricEvent, get_metrics_logger
+from metrics_registry import HTTP_REQUESTS, HTTP_LATENCY
+
+
+class AsyncHttp:
+    """프로세스 공용 비동기 HTTP 클라이언트 (연결 재사용 + http_out 기록)"""
+
+    def __init__(self):
+        self.client = None
+
+    async def open(self):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(5.0),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+        )
+
+    async def close(self):
+        if self.client is not None:
+            await self.client.aclose()
+
+    async def get(self, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = await self.client.get(url, **kwargs)
+        except Exception as e:
+            log_http_out("GET", url, start, exc=e)
+            raise
+        log_http_out("GET", url, start, status_code=resp.status_code)
+        return resp
+
+
+http = AsyncHttp()
+
+
+def _log_http_in(method, path, status, start):
+    """코루틴 라우트도 Flask 라우트와 같은 http_in 지표로 기록"""
+    elapsed = time.perf_counter() - start
+    HTTP_REQUESTS.labels(method, path, status).inc()
+    HTTP_LATENCY.labels(path).observe(elapsed)
+    get_metrics_logger().log(MetricEvent(
+        ts=time.time(), kind="http_in", name="asgi", ok=status < 400, latency_ms=int(elapsed * 1000),
+        method=method, path=path, status_code=status
+    ))
+
+
+def create_asgi_app(web):
+    """web: app.py 모듈 (싱글톤/Flask 앱을 공유하기 위해 import 대신 인자로 받음)"""
+
+    async def refresh_weather():
+        """/api/gamestate의 5분 날씨 캐시(latest_weather_data)를 만료 전에 갱신"""
+        while True:
+            url = web.weather_url()
+            if url:
+                try:
+                    resp = await http.get(url)
+                    resp.raise_for_status()
+                    data = web.parse_weather(resp.json())
+                    with web.weather_data_lock:
+                        web.latest_weather_data = {**data, "timestamp": time.time()}
+                except (httpx.HTTPError, KeyError, ValueError) as e:
+                    print(f"[ASGI] 날씨 갱신 실패: {e!r}")
+            await asyncio.sleep(Config.ASGI_WEATHER_REFRESH_SEC)
+
+    @asynccontextmanager
+    async def lifespan(_app):
+        web.weather_fetch_on_miss = False
+        await http.open()
+        weather_task = asyncio.create_task(refresh_weather())
+        try:
+            yield
+        finally:
+            weather_task.cancel()
+            await http.close()
+            web.weather_fetch_on_miss = True
+
+    async def video_feed(request):
+        async def generate():
+            while True:
+                frame = web.latest_frame  # 참조 읽기만 (bytes는 불변)
+                if frame:
+                    yield b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + frame + b'\r\n'
+                await asyncio.sleep(0.1)
+        return StreamingResponse(generate(), media_type='multipart/x-mixed-replace; boundary=frame')
+
+    async def events_stream(request):
+        q = web.sse_sink.open_client(loop=asyncio.get_running_loop())
+
+        async def generate():
+            try:
+                while True:
+                    try:
+                        msg = await asyncio.wait_for(q.get(), timeout=15)
+                        yield f"data: {msg}\n\n"
+                    except asyncio.TimeoutError:
+                        yield ": keep-alive\n\n"  # 연결 유지용 주석 라인
+            finally:
+                web.sse_sink.close_client(q)
+        return StreamingResponse(generate(), media_type='text/event-stream', headers={'Cache-Control': 'no-cache'})
+
+    async def chat(request):
+        """Flask /api/chat과 같은 계약 - 작업 완료를 await (스레드 점유 없음)"""
+        start = time.perf_counter()
+        try:
+            data = await request.json()
+        except ValueError:
+            data = {}
+        job, error = web.submit_chat(data or {})
+        if error:
+            _log_http_in("POST", "/api/chat", error[1], start)
+            return JSONResponse(error[0], status_code=error[1])
+
+        loop = asyncio.get_running_loop()
+        done = loop.create_future()
+
+        def _wake(_job):
+            loop.call_soon_threadsafe(lambda: done.done() or done.set_result(None))
+        job.add_done_callback(_wake)
+        try:
+            await asyncio.wait_for(done, timeout=Config.CHAT_LLM_TIMEOUT_SEC)
+        except asyncio.TimeoutError:
+            pass
+        body, status = web.chat_response(job)
+        _log_http_in("POST", "/api/chat", status, start)
+        return JSONResponse(body, status_code=status)
+
+    routes = [
+        Route('/video_feed', video_feed),
+        Route('/api/events/stream', events_stream),
+        Route('/api/chat', chat, methods=['POST']),
+        # 나머지는 기존 Flask 라우트 (스레드 풀에서 실행)
+        Mount('/', app=WSGIMiddleware(web.app, workers=Config.ASGI_WSGI_THREADS)),
+    ]
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+def serve(web, host='0.0.0.0', port=5000):
+    uvicorn.run(create_asgi_app(web), host=host, port=port, log_level='warning')
@@ -0,0 +1,30 @@
+# bench_compare.py
+"""벤치마크 공용 - 백분위와 이전/이번 리포트 비교 표 (vision_bench / llm_bench / load_test)
+
+    lines = delta_table([("latency_ms.p50", 12.0, 15.5, True), ("fps", 30.1, 29.8, False)])
+    print("\\n".join(lines))
+"""
+
+REGRESSION_PCT = 10  # 나빠진 쪽으로 이 이상 변하면 " !" 표시
+
+
+def percentile(sorted_values, p):
+    """정렬된 값 목록의 p 백분위 (최근접 순위, 값이 없으면 None)"""
+    if not sorted_values:
+        return None
+    k = min(len(sorted_values) - 1, max(0, int(round(p / 100 * (len(sorted_values) - 1)))))
+    return sorted_values[k]
+
+
+def delta_table(rows, width=32):
+    """rows: (지표 이름, old, new, lower_is_better) → 출력용 줄 목록 (한쪽 값이 없으면 delta 생략)"""
+    lines = [f"{'metric':<{width}}{'old':>12}{'new':>12}{'delta':>10}"]
+    for name, a, b, lower_is_better in rows:
+        if a is None or b is None:
+            lines.append(f"{name:<{width}}{str(a):>12}{str(b):>12}")
+            continue
+        delta = (b - a) / a * 100 if a else 0.0
+        worse = delta > 0 if lower_is_better else delta < 0
+        mark = " !" if worse and abs(delta) >= REGRESSION_PCT else ""
+        lines.append(f"{name:<{width}}{a:>12}{b:>12}{delta:>+9.1f}%{mark}")
+    return lines
@@ -0,0 +1,346 @@
+# boot_briefing.py
+"""부팅 브리핑 - 고정 대기 없이 준비되는 순서대로 진행하는 의존성 그래프
+
+    날씨 ──┐
+    일정 ──┼─ LLM 멘트 ─ TTS 선렌더링 ─┐
+    퀘스트 ┘  ("llm" 준비 시)           ├─ 재생 ("audio" 서브시스템 준비 시)
+    대체 멘트 TTS 선렌더링 ─────────────┘  (멘트가 마감 시각까지 안 나오면)
+
+마감 시각은 모두 prepare() 시작 기준 절대 시각이라 앞 단계가 늦어지면 뒤 단계의 대기 시간이 줄어듭니다.
+
+BriefingPrefetcher는 같은 그래프를 부팅이 아닌 시점에 미리 돌려 둡니다.
+자리를 비운 시간이 absence_sec을 넘으면 (돌아오기 전에) 준비를 시작하고 TTL 안에서 계속 새로 고쳐 두며,
+돌아와서 얼굴이 몇 초간 유지되면(재실 확인) 캐시된 음성을 바로 재생합니다. 퇴근 → 업무중 전환도 같은 흐름.
+"""
+
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics_registry import CACHE_REQUESTS
+
+FALLBACK_TEXT = "시스템 준비가 완료되었습니다. 오늘도 화이팅하세요!"
+
+
+def weather_summary(weather):
+    if not weather or "temp" not in weather:
+        return "날씨 정보 없음"
+    return f"현재 기온 {weather['temp']}도, {weather['condition']}"
+
+
+def event_summary(schedules, today=None):
+    today = today or time.strftime("%Y-%m-%d")
+    titles = [s['title'] for s in schedules if s.get('date') == today]
+    return f"오늘 일정: {', '.join(titles)}" if titles else "오늘 일정 없음"
+
+
+def quest_summary(quests):
+    names = [q['name'] for q in quests if not q.get('is_completed')]
+    return f"진행 중인 퀘스트: {', '.join(names)}" if names else None
+
+
+Briefing = namedtuple("Briefing", "text audio source")  # source: llm / fallback
+
+
+class BootBriefing:
+    """subsystems: "llm"(generate_briefing), "tts"(synthesize/play), "audio"(재생 장치) 서브시스템 레지스트리"""
+
+    def __init__(self, subsystems, get_weather, get_schedules, on_message, get_quests=None,
+                 deadline=15, weather_timeout=5, audio_timeout=60, fallback_text=FALLBACK_TEXT, request_type="boot"):
+        self.subsystems = subsystems
+        self.get_weather = get_weather
+        self.get_schedules = get_schedules
+        self.get_quests = get_quests or list
+        self.on_message = on_message
+        self.deadline = deadline  # 이 시각까지 LLM 멘트 음성이 준비되지 않으면 대체 멘트
+        self.weather_timeout = weather_timeout
+        self.audio_timeout = audio_timeout  # 오디오 장치를 기다리는 최대 시간 (넘으면 UI에만 기록)
+        self.fallback_text = fallback_text
+        self.request_type = request_type  # LLM 사용량 집계용 (부팅 boot / 복귀 선준비 briefing)
+        self.timeline = {}  # 단계 → run() 시작 기준 ms
+        self._t0 = None
+
+    def _mark(self, stage):
+        self.timeline[stage] = round((time.perf_counter() - self._t0) * 1000, 1)
+
+    def _remaining(self, seconds):
+        return max(0.0, self._t0 + seconds - time.perf_counter())
+
+    # ---------- 각 노드 (스레드 풀에서 실행) ----------
+    def _weather(self):
+        text = weather_summary(self.get_weather())
+        self._mark("weather")
+        return text
+
+    def _events(self):
+        text = event_summary(self.get_schedules())
+        self._mark("events")
+        return text
+
+    def _quests(self):
+        return quest_summary(self.get_quests())
+
+    def _compose(self, weather_f, events_f, quests_f):
+        brain = self.subsystems.get("llm", timeout=self._remaining(self.deadline))
+        self._mark("llm_ready")
+        try:
+            weather = weather_f.result(timeout=self._remaining(self.weather_timeout))
+        except Exception:
+            weather = weather_summary(None)  # 날씨가 늦으면 기다리지 않고 일정만으로 생성
+
+        result = {}
+        done = threading.Event()
+
+        def cb(text, task, thought):
+            result['text'] = text
+            done.set()
+
+        brain.generate_briefing(weather, events_f.result(), cb, quest_text=quests_f.result(),
+                                request_type=self.request_type)
+        if not done.wait(self._remaining(self.deadline)):
+            raise TimeoutError("브리핑 멘트 생성 시간 초과")
+        text = (result.get('text') or "").strip()
+        prefix = getattr(brain, "error_prefix", None)
+        if not text or (prefix and text.startswith(prefix)):
+            raise RuntimeError(text or "빈 응답")
+        self._mark("text")
+        return text
+
+    def _render(self, text_f):
+        text = text_f.result()
+        tts = self.subsystems.get("tts", timeout=self._remaining(self.deadline))
+        audio = tts.synthesize(text)
+        self._mark("audio")
+        return text, audio
+
+    def _render_fallback(self):
+        tts = self.subsystems.get("tts", timeout=self._remaining(self.audio_timeout))
+        audio = tts.synthesize(self.fallback_text)
+        self._mark("fallback_audio")
+        return audio
+
+    # ---------- 실행 ----------
+    def prepare(self):
+        """멘트 + 음성까지만 준비 (재생하지 않음) → Briefing"""
+        self._t0 = time.perf_counter()
+        self.timeline = {}
+        pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="briefing")
+        weather_f = pool.submit(self._weather)
+        events_f = pool.submit(self._events)
+        quests_f = pool.submit(self._quests)
+        fallback_f = pool.submit(self._render_fallback)
+        text_f = pool.submit(self._compose, weather_f, events_f, quests_f)
+        audio_f = pool.submit(self._render, text_f)
+        pool.shutdown(wait=False)
+
+        try:
+            text, audio = audio_f.result(timeout=self._remaining(self.deadline))
+            source = "llm"
+        except Exception as e:
+            print(f"[Briefing] 대체 멘트 사용: {type(e).__name__}: {e}")
+            text, audio, source = self.fallback_text, None, "fallback"
+            try:
+                audio = fallback_f.result(timeout=self._remaining(self.audio_timeout))
+            except Exception as e:
+                print(f"[Briefing] 대체 멘트 음성 없음: {type(e).__name__}: {e}")
+        self._mark("prepared")
+        return Briefing(text, audio, source)
+
+    def play(self, briefing, on_start=None):
+        """오디오 장치가 준비되면 재생하고 UI에 기록"""
+        if briefing.audio is not None:
+            try:
+                tts = self.subsystems.get("tts", timeout=0)
+                self.subsystems.get("audio", timeout=self.audio_timeout)
+                if self._t0 is not None:
+                    self._mark("playback_start")
+                if on_start:
+                    on_start()
+                tts.play(briefing.audio)
+            except Exception as e:
+                print(f"[Briefing] 재생 실패: {type(e).__name__}: {e}")
+
+        print(f"[SYSTEM] 자동 브리핑({briefing.source}): {briefing.text}")
+        self.on_message(briefing.text, "ai")  # UI에 기록
+
+    def run(self):
+        """부팅 브리핑: 준비 → 재생"""
+        briefing = self.prepare()
+        self.play(briefing, on_start=lambda: self.subsystems.mark("briefing_playback"))
+        self._mark("done")
+        print(f"[Briefing] 단계별 시각(ms): {self.timeline}")
+        return {"source": briefing.source, "text": briefing.text, "timeline": dict(self.timeline)}
+
+
+PRESENCE_GRACE_SEC = 2.0  # 이 시간 이내로 얼굴이 잠깐 안 잡히는 것은 자리 비움으로 보지 않음
+PRESENCE_STALE_SEC = 5.0  # 이 시간 동안 비전 결과가 없으면 얼굴 인식을 못 쓰는 것으로 봄 (카메라 없음/끊김)
+PREFETCH_CHECK_SEC = 10.0  # 부재 중 선준비/갱신 확인 주기 (프레임마다 캐시 키를 만들지 않음)
+
+
+class BriefingPrefetcher:
+    """오랜 부재 뒤 복귀/출근 시 브리핑을 미리 준비하고 재실 확인 시 바로 재생
+
+    make_briefing: 새 BootBriefing 인스턴스를 만드는 함수
+    cache_key: 오늘 날짜/일정/퀘스트 등 멘트에 들어가는 내용 → 비교 가능한 값 (바뀌면 캐시 무효)
+    presence_available: 얼굴 인식을 쓸 수 있는지 (없거나 비전 결과가 끊기면 출근 전환 시 바로 재생)
+    refresh_at: 캐시 나이가 ttl_sec × refresh_at을 넘으면 부재 중에 미리 새로 준비 (부재 한 번에 한 번만 -
+        그 뒤로는 cache_key가 바뀔 때만, 예: 자정 날짜 변경)
+    retry_sec: 선준비가 대체 멘트로 끝났을 때(LLM 실패) 다시 시도하기까지
+    """
+
+    def __init__(self, make_briefing, cache_key, presence_available=lambda: True,
+                 absence_sec=7200, confirm_sec=3, ttl_sec=1800, refresh_at=0.8, retry_sec=300,
+                 clock=time.monotonic):
+        self.make_briefing = make_briefing
+        self.cache_key = cache_key
+        self.presence_available = presence_available
+        self.absence_sec = absence_sec
+        self.confirm_sec = confirm_sec
+        self.ttl_sec = ttl_sec
+        self.refresh_at = refresh_at
+        self.retry_sec = retry_sec
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._cached = None  # (key, 생성 시각, Briefing)
+        self._inflight = None  # 준비 중이면 완료 Event
+        self._generation = 0  # invalidate()마다 증가 → 이전 세대 결과는 캐시하지 않음
+        self._delivering = False
+        self._armed = False  # 재실 확인 시 재생할지
+        self._last_seen = clock()  # 부팅 직후는 부팅 브리핑이 담당
+        self._present_since = None
+        self._last_observed = None  # 마지막 비전 결과 시각
+        self._next_check = 0.0
+        self._failed_at = None  # 마지막 선준비 실패 시각
+        self._refreshed = False  # 이번 부재 중에 나이 때문에 다시 준비했는지
+
+    # ---------- 트리거 ----------
+    def observe_presence(self, has_face):
+        """비전 결과마다 호출 (락 한 번 + 비교 몇 개)"""
+        now = self.clock()
+        trigger = confirm = check = False
+        with self._lock:
+            self._last_observed = now
+            if has_face:
+                if self._present_since is None:
+                    self._present_since = now
+                    self._refreshed = False
+                    if now - self._last_seen >= self.absence_sec:
+                        self._armed = trigger = True  # 부재 중에 준비를 못 했으면 지금이라도
+                if self._armed and now - self._present_since >= self.confirm_sec:
+                    self._armed = False
+                    confirm = True
+                self._last_seen = now
+            else:
+                if self._present_since is not None and now - self._last_seen > PRESENCE_GRACE_SEC:
+                    self._present_since = None
+                if now - self._last_seen >= self.absence_sec and now >= self._next_check:
+                    self._armed = check = True  # 오랜 부재 → 돌아오면 재생
+                    self._next_check = now + PREFETCH_CHECK_SEC
+        if trigger:
+            self.prefetch("presence")
+        if check:
+            self.prefetch("absence", refresh=True)
+        if confirm:
+            self.deliver("presence")
+
+    def presence_live(self):
+        """얼굴 인식으로 재실 확인이 가능한지 (비전 준비 + 최근에 결과가 들어옴)"""
+        with self._lock:
+            observed = self._last_observed
+        return (self.presence_available() and observed is not None
+                and self.clock() - observed < PRESENCE_STALE_SEC)
+
+    def on_status_change(self, old, new):
+        if old == "퇴근" and new == "업무중":
+            with self._lock:
+                self._armed = True
+            self.prefetch("status")
+            if not self.presence_live():
+                with self._lock:
+                    self._armed = False
+                self.deliver("status")
+
+    def invalidate(self, reason=""):
+        """일정/퀘스트가 바뀌면 캐시 폐기 (준비 중인 결과도 버림)"""
+        with self._lock:
+            dropped = self._cached is not None
+            self._cached = None
+            self._generation += 1
+        if dropped:
+            print(f"[Briefing] 선준비 캐시 무효화 ({reason})")
+
+    # ---------- 준비 / 재생 ----------
+    def _fresh(self, key, max_age=None):
+        c = self._cached
+        max_age = self.ttl_sec if max_age is None else max_age
+        return c[2] if c and c[0] == key and self.clock() - c[1] < max_age else None
+
+    def prefetch(self, reason, refresh=False):
+        """refresh: 만료가 가까운 캐시도 새로 준비 (부재 중 주기 확인 - 실패 직후엔 retry_sec 동안 쉼)
+
+        부재 중 확인은 10초마다 오므로 나이 기준 갱신은 부재 한 번에 한 번 (밤새 LLM을 반복 호출하지 않게)
+        """
+        key = self.cache_key()
+        with self._lock:
+            max_age = None
+            if refresh:
+                max_age = float("inf") if self._refreshed else self.ttl_sec * self.refresh_at
+            if self._fresh(key, max_age) or self._inflight is not None:
+                return False
+            if refresh and self._failed_at is not None and self.clock() - self._failed_at < self.retry_sec:
+                return False
+            if refresh and self._cached is not None and self._cached[0] == key:
+                self._refreshed = True
+            done = self._inflight = threading.Event()
+            generation = self._generation
+        print(f"[Briefing] 선준비 시작 ({reason})")
+        threading.Thread(target=self._prepare, args=(key, generation, done),
+                         name="briefing-prefetch", daemon=True).start()
+        return True
+
+    def _prepare(self, key, generation, done):
+        try:
+            briefing = self.make_briefing().prepare()
+        except Exception as e:
+            print(f"[Briefing] 선준비 실패: {type(e).__name__}: {e}")
+            briefing = None
+        with self._lock:
+            # 대체 멘트는 캐시하지 않음 → 다음 트리거에서 다시 시도
+            if briefing is not None and briefing.source == "llm" and generation == self._generation:
+                self._cached = (key, self.clock(), briefing)
+                self._failed_at = None
+            elif briefing is None or briefing.source != "llm":
+                self._failed_at = self.clock()
+            self._inflight = None
+        done.set()
+
+    def deliver(self, reason):
+        """재생 스레드 시작 (이미 재생 중이면 None)"""
+        with self._lock:
+            if self._delivering:
+                return None
+            self._delivering = True
+        t = threading.Thread(target=self._deliver, args=(reason,), name="briefing-deliver", daemon=True)
+        t.start()
+        return t
+
+    def _deliver(self, reason):
+        try:
+            builder = self.make_briefing()
+            key = self.cache_key()
+            with self._lock:
+                briefing, inflight = self._fresh(key), self._inflight
+            if briefing is None and inflight is not None:
+                inflight.wait(builder.deadline)  # 이미 준비 중이면 그 결과를 기다림
+                with self._lock:
+                    briefing = self._fresh(key)
+            CACHE_REQUESTS.labels("briefing", "hit" if briefing is not None else "miss").inc()
+            if briefing is None:
+                briefing = builder.prepare()
+            print(f"[Briefing] 재실 확인 ({reason}) → 재생")
+            builder.play(briefing)
+        finally:
+            with self._lock:
+                self._delivering = False
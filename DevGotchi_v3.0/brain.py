@@ -1,10 +1,11 @@
 # brain.py
 import os
-import time
-import json
 import threading
 from dotenv import load_dotenv
-from openai import OpenAI
+from completion_backends import get_completions
+from conversation import PERSONA, parse_reply
+from llm_gateway import LLMUnavailable, canned_reply
+from profiler import span
 
 # .env 로드 (app.py에서 로드하겠지만 안전장치)
 from pathlib import Path
@@ -31,79 +32,59 @@ print(f"[Brain] API Key length: {len(API_KEY)}")
 print(f"[Brain] Base URL: {BASE_URL}")
 print(f"[Brain] Model: {MODEL}")
 
+ERROR_PREFIX = "오류가 발생했습니다"  # LLM 호출 실패 시 callback 텍스트 머리말
+
 class BrainHandler:
-    def chat(self, history, level, callback):
-        t = threading.Thread(target=self._run, args=(history, level, callback))
+    error_prefix = ERROR_PREFIX
+
+    def __init__(self, completions=None):
+        """completions: CompletionRouter (기본: 프로세스 공용 - 클라우드/로컬 라우팅)"""
+        self._completions = completions
+
+    @property
+    def completions(self):
+        return self._completions or get_completions()
+
+    def chat(self, history, level, callback, request_type="chat"):
+        t = threading.Thread(target=self._run, args=(history, level, callback, request_type))
         t.start()
 
-    def _run(self, history, level, callback):
-        system_prompt = """
-        You are 'Dev' (데브), an AI smart mirror companion that evolves through conversation.
-        
-        [Persona]
-        - Name: Dev (데브)
-        - Core Identity: Professional coding expert and lifestyle mentor.
-        - Language: Korean only (Natural, clean).
-
-        [Adaptive Persona: The Spectrum]
-        Your personality shifts based on the {user_history} and current input:
-        1. [Strict Mode]: Slacking, needs discipline, or prefers efficiency.
-           - Tone: Direct, slightly cynical, "Tsundere", authoritative.
-        2. [Kind Mode]: Stressed, tired, or needs encouragement.
-           - Tone: Warm, energetic, uses supportive language (~요, ~해요).
-        3. [Gamified Mode]: Responds well to rewards/achievements.
-           - Tone: RPG Guide ("Quest", "Exp", "Buff/Debuff").
-
-        [Integration]
-        - If user asks about 'Start Timer', 'Show Stats', return JSON command in <think> or just text confirmation.
-        - [News Reporting]: You may receive "[System Info] Real-time News Data: ...". 
-          - IGNORE your internal cutoff knowledge. 
-          - SUMMARIZE the provided news data for the user.
-          - Use a professional yet engaging tone (Anchor-like or Smart Assistant).
-          - e.g., "오늘의 주요 뉴스입니다. 첫 번째로..."
-        """
-        
+    def _run(self, history, level, callback, request_type="chat"):
         try:
-            client = OpenAI(api_key=API_KEY, base_url=BASE_URL)
-            messages = [{"role": "system", "content": system_prompt}] + history
-
-            response = client.chat.completions.create(
-                model=MODEL,
-                messages=messages,
-                temperature=0.7,
-                max_tokens=800 
-            )
-            
-            raw_text = response.choices[0].message.content
-            
-            # Simple Cleaning
-            import re
-            thought = ""
-            think_match = re.search(r'<think>(.*?)</think>', raw_text, re.DOTALL)
-            if think_match:
-                thought = think_match.group(1).strip()
-                clean_text = re.sub(r'<think>.*?</think>', '', raw_text, flags=re.DOTALL).strip()
-            else:
-                clean_text = raw_text.strip()
-            
-            # Remove foreign CJK logic if desired (User code had it)
-            clean_text = re.sub(r'[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]+', '', clean_text).strip()
-            
-            task_info = None
-            # JSON Parse Logic (for Scheduler etc)
-            json_match = re.search(r'\{.*\}', clean_text, re.DOTALL)
-            if json_match:
-                try:
-                    data = json.loads(json_match.group(0))
-                    task_info = data
-                    # Remove JSON from output if it was just a command? Or keep it?
-                    # User code removed it.
-                    clean_text = clean_text.replace(json_match.group(0), "").strip()
-                except:
-                    pass
-
-            callback(clean_text, task_info, thought)
+            # 페르소나/명령 규칙은 음성과 같은 conversation.PERSONA
+            messages = [{"role": "system", "content": PERSONA}] + history
+
+            try:
+                with span("brain.llm"):
+                    completion = self.completions.complete(messages, request_type=request_type, max_tokens=800)
+            except LLMUnavailable as e:
+                if request_type in ("briefing", "boot"):
+                    raise  # 브리핑은 BootBriefing의 대체 멘트 사용
+                print(f"[Brain] {e} → 대체 응답")
+                callback(canned_reply(request_type), None, "")
+                return
+
+            clean_text, thought, _, task_info = parse_reply(completion.text)
+
+            with span("brain.callback"):
+                callback(clean_text, task_info, thought)
 
         except Exception as e:
             print(f"[Brain Error] {e}")
-            callback(f"오류가 발생했습니다: {str(e)}", None, "")
+            callback(f"{ERROR_PREFIX}: {str(e)}", None, "")
+
+    def generate_briefing(self, weather_text, event_text, callback, quest_text=None, request_type="briefing"):
+        """부팅/복귀 시 브리핑 멘트 생성 전용 함수 (request_type: 부팅 boot / 복귀 briefing)"""
+        prompt = (
+            f"주인님이 방금 시스템을 켰어. 아래 정보를 바탕으로 활기찬 아침(또는 현재 시간) 인사를 건네.\n"
+            f"상태 정보: {weather_text}\n"
+            f"일정 정보: {event_text}\n"
+            + (f"퀘스트 정보: {quest_text}\n" if quest_text else "")
+            + "조건:\n"
+            "1. 너는 '데브고치'야. 다정하지만 깐깐한 매니저 톤을 유지해.\n"
+            "2. [중요] 오늘 일정이 있다면 반드시 구체적으로 읊어줘야 해. (예: '오늘은 ~와 ~ 일정이 있네요.')\n"
+            "3. 날씨와 일정을 고려해서 한 마디 조언도 덧붙여.\n"
+            "4. 전체 길이는 150자 이내로. 너무 길지 않게.\n"
+            "5. 절대 '시스템', '프롬프트' 같은 단어를 쓰지 말고 자연스럽게 말할 것."
+        )
+        self.chat([{"role": "user", "content": prompt}], 0, callback, request_type=request_type)
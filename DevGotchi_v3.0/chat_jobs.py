@@ -0,0 +1,165 @@
+# chat_jobs.py
+"""비동기 채팅 작업 테이블 - 요청 스레드는 작업 id만 받고 바로 반환
+
+    jobs = ChatJobTable(run_chat, on_done=notify)
+    job, coalesced = jobs.submit(session_id, message, history)  # POST /api/chat/jobs → 202
+    jobs.get(job.id)                                            # GET /api/chat/jobs/<id>
+    job.wait(30)                                                # 기존 동기 /api/chat 호환용
+
+- 실행은 크기가 정해진 스레드 풀에서 (동시 LLM 호출 수 제한, 초과분은 대기열)
+- 끝난 작업은 ttl_sec 뒤 정리, 테이블 크기는 max_jobs로 제한
+- 같은 세션에서 같은 메시지가 coalesce_sec 안에 다시 들어오면 새 작업을 만들지 않고 기존 작업 id 반환
+"""
+
+import hashlib
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class ChatJobsFull(RuntimeError):
+    """끝나지 않은 작업이 max_jobs개 - 더 받지 않음"""
+
+
+class ChatJob:
+    __slots__ = ("id", "key", "status", "result", "error", "created", "started", "finished", "coalesced", "_done",
+                 "_callbacks", "_cb_lock")
+
+    def __init__(self, key, now):
+        self.id = uuid.uuid4().hex[:12]
+        self.key = key
+        self.status = PENDING
+        self.result = None  # {"text", "task", "thought"}
+        self.error = None
+        self.created = now
+        self.started = None
+        self.finished = None
+        self.coalesced = 0  # 합쳐진 중복 요청 수
+        self._done = threading.Event()
+        self._callbacks = []
+        self._cb_lock = threading.Lock()
+
+    @property
+    def is_finished(self):
+        return self.status in (DONE, FAILED)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    def add_done_callback(self, fn):
+        """완료 시 작업 스레드에서 fn(job) 호출 (이미 끝났으면 바로) - 스레드를 잡지 않고 기다릴 때"""
+        with self._cb_lock:
+            if not self._done.is_set():
+                self._callbacks.append(fn)
+                return
+        fn(self)
+
+    def _finish(self):
+        with self._cb_lock:
+            self._done.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            fn(self)
+
+    def to_dict(self):
+        d = {"job_id": self.id, "status": self.status}
+        if self.result is not None:
+            d.update(self.result)
+        if self.error:
+            d["error"] = self.error
+        if self.finished is not None and self.started is not None:
+            d["elapsed_ms"] = round((self.finished - self.started) * 1000, 1)
+        return d
+
+
+def job_key(session_id, message, history):
+    raw = json.dumps([session_id, (message or "").strip(), history or []], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+class ChatJobTable:
+    def __init__(self, runner, on_done=None, workers=4, max_jobs=200, ttl_sec=300, coalesce_sec=10,
+                 clock=time.monotonic):
+        """runner(message, history, session_id) → {"text", "task", "thought"} (스레드 풀에서 실행)"""
+        self.runner = runner
+        self.on_done = on_done
+        self.max_jobs = max_jobs
+        self.ttl_sec = ttl_sec
+        self.coalesce_sec = coalesce_sec
+        self.clock = clock
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="chat-job")
+        self._jobs = OrderedDict()  # id → ChatJob (생성 순)
+        self._recent = {}  # key → job id (합치기 대상)
+        self._lock = threading.Lock()
+        self.counts = dict.fromkeys(("submitted", "coalesced", "done", "failed", "expired"), 0)
+
+    def submit(self, session_id, message, history=None):
+        """→ (ChatJob, coalesced 여부)"""
+        key = job_key(session_id, message, history)
+        now = self.clock()
+        with self._lock:
+            self._purge(now)
+            existing = self._jobs.get(self._recent.get(key))
+            if existing is not None and existing.status != FAILED and now - existing.created < self.coalesce_sec:
+                existing.coalesced += 1
+                self.counts["coalesced"] += 1
+                return existing, True
+            if len(self._jobs) >= self.max_jobs:
+                raise ChatJobsFull(f"처리 중인 채팅 작업이 {len(self._jobs)}개입니다")
+            job = ChatJob(key, now)
+            self._jobs[job.id] = job
+            self._recent[key] = job.id
+            self.counts["submitted"] += 1
+        self._pool.submit(self._run, job, message, history or [], session_id)
+        return job, False
+
+    def get(self, job_id):
+        with self._lock:
+            self._purge(self.clock())
+            return self._jobs.get(job_id)
+
+    def _run(self, job, message, history, session_id):
+        job.status = RUNNING
+        job.started = self.clock()
+        try:
+            job.result = self.runner(message, history, session_id)
+            job.status = DONE
+        except Exception as e:
+            job.error = f"{type(e).__name__}: {e}"
+            job.status = FAILED
+            print(f"[ChatJobs] 작업 {job.id} 실패: {job.error}")
+        job.finished = self.clock()
+        with self._lock:
+            self.counts[job.status] += 1
+        job._finish()
+        if self.on_done:
+            self.on_done(job)
+
+    def _purge(self, now):
+        """끝난 지 ttl_sec 지난 작업 정리 (락 안에서 호출)"""
+        expired = [jid for jid, job in self._jobs.items()
+                   if job.finished is not None and now - job.finished >= self.ttl_sec]
+        # 테이블이 꽉 찼으면 TTL 전이라도 끝난 작업부터 오래된 순으로 비움
+        overflow = len(self._jobs) - len(expired) - self.max_jobs + 1
+        if overflow > 0:
+            skip = set(expired)
+            done = [jid for jid, job in self._jobs.items() if job.finished is not None and jid not in skip]
+            expired.extend(done[:overflow])
+        for jid in expired:
+            job = self._jobs.pop(jid)
+            if self._recent.get(job.key) == jid:
+                del self._recent[job.key]
+        self.counts["expired"] += len(expired)
+
+    def pending(self):
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if not job.is_finished)
+
+    def stats(self):
+        with self._lock:
+            return {"jobs": len(self._jobs), **self.counts}
@@ -0,0 +1,324 @@
+# completion_backends.py
+"""LLM 완성 백엔드 - MiniMax(클라우드)와 CPU 로컬 모델을 같은 인터페이스로
+
+    completion = get_completions().complete(messages, request_type="chat", max_tokens=800)
+    completion.text, completion.tokens_in, completion.tokens_out, completion.backend
+
+로컬 모델은 OpenAI 호환 /v1/chat/completions를 제공하는 로컬 추론 서버로 띄웁니다 (CPU 전용, 양자화 소형 모델):
+    llama-server -m qwen2.5-1.5b-instruct-q4_k_m.gguf -c 2048 -t 4 --port 8081
+    DEVGOTCHI_LOCAL_LLM=1 python app.py
+    (ollama를 쓰면 LOCAL_LLM_BASE_URL=http://127.0.0.1:11434/v1, LOCAL_LLM_MODEL=모델 태그)
+
+라우팅 (CompletionRouter):
+- 로컬 모델이 꺼져 있거나 응답이 없으면 항상 클라우드
+- 클라우드가 오프라인(API 키 없음 / 게이트웨이 서킷 열림)이면 로컬
+- 짧고 단순한 대화(인사, 맞장구)는 로컬 - 뉴스/날씨/일정/타이머처럼 정보나 명령 형식이 필요한 요청은 클라우드
+- 클라우드 호출이 실패하면 게이트웨이 대체 응답으로 로컬 사용 (로컬도 실패하면 LLMUnavailable)
+- 일일 예산(llm_budget.LLMBudget) 단계에 따라 max_tokens 축소 → 저렴한 모델 → 응답 캐시/로컬만
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from config import Config
+from instrumentation import http_session, instrument_llm
+from llm_budget import LLMBudget, estimate_cost
+from llm_gateway import BadResponse, LLMUnavailable, gateway as default_gateway
+from metrics_registry import CACHE_REQUESTS, LLM_ROUTE
+
+Completion = namedtuple("Completion", "text tokens_in tokens_out backend model cost", defaults=(None, None))
+
+
+class BudgetExhausted(LLMUnavailable):
+    """오늘 예산 초과 - 캐시에도 없고 로컬 모델도 없음"""
+
+
+class CompletionBackend:
+    """완성 백엔드 인터페이스 - complete()는 실패 시 예외 (타임아웃/연결 오류/BadResponse)"""
+    name = "backend"
+    model = None
+    on_usage = None  # fn(request_type, tokens_in, tokens_out, cost) - 실제 호출 1건마다 (헤지/포기한 호출 포함)
+
+    def available(self):
+        return True
+
+    def complete(self, messages, request_type="chat", max_tokens=512, temperature=0.7, timeout=15, model=None):
+        raise NotImplementedError
+
+
+class OpenAICompatBackend(CompletionBackend):
+    """/chat/completions 호환 엔드포인트 (MiniMax, llama.cpp server, ollama)"""
+
+    def __init__(self, name, base_url, model, api_key=None, max_tokens_cap=None, session=http_session, prices=None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self.model = model
+        self.api_key = api_key
+        self.max_tokens_cap = max_tokens_cap
+        self.session = session
+        self.prices = prices  # None이면 Config.LLM_PRICES_PER_1M
+
+    def cost(self, model, tokens_in, tokens_out):
+        return estimate_cost(model, tokens_in, tokens_out, self.prices)
+
+    def _headers(self):
+        headers = {"Content-Type": "application/json"}
+        if self.api_key:
+            headers["Authorization"] = f"Bearer {self.api_key}"
+        return headers
+
+    def _post_raw(self, payload, request_type="chat", timeout=15):
+        response = self.session.post(f"{self.base_url}/chat/completions", headers=self._headers(), json=payload,
+                                     timeout=timeout)
+        return response.json()
+
+    def complete(self, messages, request_type="chat", max_tokens=512, temperature=0.7, timeout=15, model=None):
+        model = model or self.model
+        if self.max_tokens_cap:
+            max_tokens = min(max_tokens, self.max_tokens_cap)
+        payload = {"model": model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        def charge(result, tin, tout):
+            cost = self.cost(model, tin, tout)
+            if self.on_usage is not None:
+                self.on_usage(request_type, tin, tout, cost)
+            return cost
+
+        # 지연/토큰/비용/타임아웃은 백엔드 이름으로 llm 이벤트에 기록 (request_type은 호출마다)
+        # 게이트웨이가 헤지 중복이나 시간 초과로 버린 호출도 응답이 오면 여기서 과금됨 → 예산에 모두 반영
+        post = instrument_llm(self.name, cost_fn=charge)(self._post_raw)
+        data = post(payload, request_type=request_type, timeout=timeout)
+        choices = data.get("choices") or []
+        if not choices:
+            error = data.get("error") or data.get("base_resp") or data
+            raise BadResponse(f"{self.name}: {str(error)[:200]}")
+        usage = data.get("usage") or {}
+        tokens_in, tokens_out = usage.get("prompt_tokens"), usage.get("completion_tokens")
+        return Completion(choices[0]["message"].get("content") or "", tokens_in, tokens_out, self.name,
+                          model, self.cost(model, tokens_in, tokens_out))
+
+
+class MiniMaxBackend(OpenAICompatBackend):
+    def __init__(self, api_key, base_url, model, session=http_session):
+        super().__init__("minimax", base_url, model, api_key=api_key, session=session)
+
+    def available(self):
+        return bool(self.api_key)
+
+
+class LocalBackend(OpenAICompatBackend):
+    """CPU 로컬 추론 서버 - 살아 있는지는 health_sec 동안 캐시 (매 요청마다 확인하지 않음)"""
+
+    def __init__(self, base_url, model, max_tokens_cap=256, health_sec=30, session=http_session, clock=time.monotonic):
+        super().__init__("local_llm", base_url, model, max_tokens_cap=max_tokens_cap, session=session)
+        self.health_sec = health_sec
+        self.clock = clock
+        self._healthy = None
+        self._checked = None
+        self._lock = threading.Lock()
+
+    def available(self):
+        with self._lock:
+            now = self.clock()
+            if self._checked is not None and now - self._checked < self.health_sec:
+                return self._healthy
+            self._checked = now
+        try:
+            healthy = self.session.get(f"{self.base_url}/models", timeout=1).status_code < 400
+        except Exception:
+            healthy = False
+        with self._lock:
+            if healthy != self._healthy:
+                print(f"[LocalLLM] {self.base_url} {'사용 가능' if healthy else '응답 없음'}")
+            self._healthy = healthy
+        return healthy
+
+    def cost(self, model, tokens_in, tokens_out):
+        return 0.0  # 기기 CPU - API 비용 없음
+
+    def mark_down(self):
+        """호출 실패 → 다음 health 확인까지 사용하지 않음"""
+        with self._lock:
+            self._healthy = False
+            self._checked = self.clock()
+
+
+class ResponseCache:
+    """최근 응답 (요청 종류 + 메시지 전체가 같을 때만) - 예산을 다 쓴 뒤에만 읽음"""
+
+    def __init__(self, max_entries=256, ttl_sec=6 * 60 * 60, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.clock = clock
+        self._items = OrderedDict()  # key → (저장 시각, text)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(messages, request_type):
+        raw = json.dumps([request_type, messages], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            if self.clock() - item[0] >= self.ttl_sec:
+                del self._items[key]
+                return None
+            return item[1]
+
+    def put(self, key, text):
+        with self._lock:
+            self._items[key] = (self.clock(), text)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class CompletionRouter:
+    def __init__(self, cloud, local=None, gateway=None, simple_max_chars=20, local_types=("chat", "voice"),
+                 cloud_keywords=(), local_timeout=20, budget=None, cache=None):
+        self.cloud = cloud
+        self.local = local
+        self.gateway = gateway or default_gateway
+        self.simple_max_chars = simple_max_chars
+        self.local_types = tuple(local_types)
+        self.cloud_keywords = tuple(cloud_keywords)
+        self.local_timeout = local_timeout
+        self.budget = budget  # None이면 예산 제한 없음
+        self.cache = cache if cache is not None else ResponseCache()
+        self._usage_listeners = []
+        if budget is not None:
+            for backend in (cloud, local):
+                if backend is not None:
+                    backend.on_usage = budget.record
+
+    @classmethod
+    def from_config(cls):
+        cloud = MiniMaxBackend(
+            api_key=os.getenv("MINIMAX_API_KEY", "").replace('"', '').replace("'", "").strip(),
+            base_url=os.getenv("MINIMAX_BASE_URL", "https://api.minimax.io/v1").strip(),
+            model=os.getenv("MINIMAX_MODEL", "MiniMax-M2.1").strip(),
+        )
+        local = None
+        if Config.LOCAL_LLM_ENABLED:
+            local = LocalBackend(Config.LOCAL_LLM_BASE_URL, Config.LOCAL_LLM_MODEL,
+                                 max_tokens_cap=Config.LOCAL_LLM_MAX_TOKENS, health_sec=Config.LOCAL_LLM_HEALTH_SEC)
+        return cls(cloud, local, simple_max_chars=Config.LOCAL_LLM_SIMPLE_MAX_CHARS,
+                   local_types=Config.LOCAL_LLM_REQUEST_TYPES, cloud_keywords=Config.LOCAL_LLM_CLOUD_KEYWORDS,
+                   local_timeout=Config.LOCAL_LLM_TIMEOUT_SEC, budget=LLMBudget.from_config(),
+                   cache=ResponseCache(Config.LLM_RESPONSE_CACHE_MAX, Config.LLM_RESPONSE_CACHE_TTL_SEC))
+
+    def add_usage_listener(self, fn):
+        """fn(request_type, Completion) - 호출 1건마다 (캐시 응답 제외)"""
+        self._usage_listeners.append(fn)
+
+    def is_offline(self):
+        return not self.cloud.available() or self.gateway.is_open(self.cloud.model)
+
+    def is_simple(self, messages, request_type):
+        if request_type not in self.local_types:
+            return False
+        user = next((m.get("content") or "" for m in reversed(messages) if m.get("role") == "user"), "")
+        text = user.strip()
+        return len(text) <= self.simple_max_chars and not any(k in text for k in self.cloud_keywords)
+
+    def route(self, messages, request_type="chat"):
+        """→ (backend 이름, 이유)"""
+        if self.local is None or not self.local.available():
+            return "cloud", "default"
+        if self.is_offline():
+            return "local", "offline"
+        if self.is_simple(messages, request_type):
+            return "local", "simple"
+        return "cloud", "default"
+
+    def _local(self, messages, request_type, max_tokens, temperature):
+        try:
+            return self.local.complete(messages, request_type=request_type, max_tokens=max_tokens,
+                                       temperature=temperature, timeout=self.local_timeout)
+        except Exception as e:
+            self.local.mark_down()
+            raise LLMUnavailable(f"로컬 모델 실패: {e!r}") from e
+
+    def _routed(self, messages, request_type, max_tokens, temperature, model=None):
+        backend, reason = self.route(messages, request_type)
+        if backend == "local":
+            LLM_ROUTE.labels("local", reason).inc()
+            try:
+                return self._local(messages, request_type, max_tokens, temperature)
+            except LLMUnavailable:
+                if reason == "offline":
+                    raise
+                # 단순 대화라 로컬로 보냈는데 실패 → 클라우드로
+
+        LLM_ROUTE.labels("cloud", reason).inc()
+        model = model or self.cloud.model
+        return self.gateway.call(
+            model,
+            lambda timeout: self.cloud.complete(messages, request_type=request_type, max_tokens=max_tokens,
+                                                temperature=temperature, timeout=timeout, model=model),
+            request_type=request_type,
+            fallback=(lambda rt: self._local_fallback(messages, rt, max_tokens, temperature))
+            if self.local is not None else None)
+
+    def _local_fallback(self, messages, request_type, max_tokens, temperature):
+        """클라우드 호출 실패 시 게이트웨이가 부르는 대체 경로"""
+        LLM_ROUTE.labels("local", "fallback").inc()
+        return self._local(messages, request_type, max_tokens, temperature)
+
+    def _budget_exhausted(self, messages, request_type, max_tokens, temperature, key):
+        """예산 초과 - 같은 요청의 최근 응답 → 로컬 모델 → BudgetExhausted (호출부가 대체 응답)"""
+        text = self.cache.get(key)
+        if text is not None:
+            CACHE_REQUESTS.labels("llm", "hit").inc()
+            LLM_ROUTE.labels("cache", "budget").inc()
+            return Completion(text, 0, 0, "cache", None, 0.0)
+        CACHE_REQUESTS.labels("llm", "miss").inc()
+        if self.local is not None and self.local.available():
+            LLM_ROUTE.labels("local", "budget").inc()
+            return self._local(messages, request_type, max_tokens, temperature)
+        raise BudgetExhausted("오늘 LLM 예산을 모두 사용했습니다")
+
+    def _record(self, request_type, completion):
+        """사용된 응답 1건 → 리스너 (예산은 백엔드 on_usage가 실제 호출마다 기록)"""
+        for fn in self._usage_listeners:
+            try:
+                fn(request_type, completion)
+            except Exception as e:
+                print(f"[Completions] 사용량 리스너 오류: {e!r}")
+
+    def complete(self, messages, request_type="chat", max_tokens=512, temperature=0.7):
+        key = self.cache.key(messages, request_type)
+        policy = self.budget.policy(max_tokens, self.cloud.model) if self.budget is not None else None
+        if policy is not None and policy.cache_only:
+            completion = self._budget_exhausted(messages, request_type, policy.max_tokens, temperature, key)
+            if completion.backend == "cache":
+                return completion
+        elif policy is not None:
+            completion = self._routed(messages, request_type, policy.max_tokens, temperature, policy.model)
+        else:
+            completion = self._routed(messages, request_type, max_tokens, temperature)
+        self.cache.put(key, completion.text)
+        self._record(request_type, completion)
+        return completion
+
+
+_completions = None
+_completions_lock = threading.Lock()
+
+
+def get_completions():
+    """프로세스 공용 라우터 (.env 로드 이후 첫 호출 때 생성)"""
+    global _completions
+    with _completions_lock:
+        if _completions is None:
+            _completions = CompletionRouter.from_config()
+            local = _completions.local
+            print(f"[Completions] cloud={_completions.cloud.model} "
+                  f"local={local.model + ' @ ' + local.base_url if local else '꺼짐'}")
+        return _completions
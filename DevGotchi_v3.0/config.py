@@ -24,8 +24,122 @@ class Config:
     HP_HEAL_FOCUS_25MIN = 10
     HP_HEAL_REST_5MIN = 5
     HP_HEAL_STRETCH = 15
+    HP_LOG_MIN_DELTA = 5  # 틱마다 생기는 소액 HP 변동은 같은 사유로 이만큼 쌓이거나 나쁜 자세 구간이 끝날 때 한 번에 기록
     
     # Vision Config
     EAR_THRESHOLD = 0.18
     POSTURE_THRESHOLD = 0.18  # Turtle neck detection (완화된 기준)
-    POSTURE_OFFSET_Y = 0.05  # Calibration (ver1과 동일)
\ No newline at end of file
+    GAMESTATE_POSTURE_STEP = 0.02  # /api/gamestate 자세 점수 단위 (ETag가 프레임마다 바뀌지 않게, POSTURE_THRESHOLD의 약수)
+    POSTURE_OFFSET_Y = 0.05  # Calibration (ver1과 동일)
+
+    # Game Loop Config (카메라 FPS와 분리된 게임 틱)
+    GAME_TICK_HZ = 2  # 초당 GameManager.update 호출 횟수
+    GAME_BAD_POSTURE_RATIO = 0.5  # 틱 구간 내 나쁜 자세 프레임 비율이 이 이상이면 나쁜 자세로 판정
+    GAME_DROWSY_RUN_SEC = 0.5  # 눈 감음이 이 시간(초) 이상 연속되면 졸음으로 판정
+
+    # Profiler Config (현장 진단용, 기본 꺼짐)
+    PROFILER_ENABLED = os.environ.get('DEVGOTCHI_PROFILER') == '1'  # /admin/profile 엔드포인트 허용 여부
+    PROFILER_SPANS_ENABLED = False  # 시작 시 span 측정 여부 (/admin/spans로 런타임 토글)
+    PROFILER_MAX_SECONDS = 30  # 샘플링 프로파일 최대 길이 (초)
+    ADMIN_TOKEN = os.environ.get('DEVGOTCHI_ADMIN_TOKEN')  # 설정 시 X-Admin-Token 헤더 필요
+
+    # Startup Config (subsystems.SubsystemRegistry)
+    SUBSYSTEMS_AUTOSTART = ("vision", "tts", "audio", "voice", "llm")  # 서버 기동 직후 백그라운드 초기화 대상 (나머지는 첫 사용 시 로드)
+    SUBSYSTEM_WAIT_SEC = 15  # API가 초기화 중인 서브시스템을 기다리는 최대 시간 (초과 시 503)
+
+    # Server Config
+    SERVER_MODE = os.environ.get('DEVGOTCHI_SERVER', 'wsgi')  # wsgi: Flask 개발 서버 / asgi: asgi_app (uvicorn)
+    ASGI_WSGI_THREADS = 16  # asgi 모드에서 기존 Flask 라우트를 실행하는 스레드 수
+    ASGI_WEATHER_REFRESH_SEC = 240  # asgi 모드 날씨 백그라운드 갱신 주기 (/api/gamestate 캐시 5분보다 짧게)
+
+    # Chat Job Config (chat_jobs.ChatJobTable)
+    CHAT_LLM_TIMEOUT_SEC = 30  # 작업 하나가 LLM 응답을 기다리는 최대 시간
+    CHAT_JOB_WORKERS = 4  # 동시에 처리하는 채팅 작업 수 (나머지는 대기열)
+    CHAT_JOB_MAX = 200  # 작업 테이블 최대 크기 (끝나지 않은 작업이 이만큼이면 429)
+    CHAT_JOB_TTL_SEC = 300  # 끝난 작업 결과 보관 시간
+    CHAT_JOB_COALESCE_SEC = 10  # 같은 메시지 중복 전송을 하나의 작업으로 합치는 시간
+    CHAT_STUB_SEC = float(os.environ.get('DEVGOTCHI_CHAT_STUB', 0))  # 부하 테스트용: 0보다 크면 LLM/대화 기록 없이 이 시간만큼 대기 후 고정 응답
+
+    # Conversation Config (conversation.ConversationService - 음성/웹 공용)
+    CONVERSATION_CONTEXT_TURNS = 10  # LLM에 넣는 현재 세션 최근 메시지 수 (음성+화면 합산)
+    NEWS_CACHE_TTL_SEC = 600  # 뉴스 요약 캐시 시간 (음성/화면에서 연달아 물어도 한 번만 조회)
+
+    # Voice Pipeline Config (voice_pipeline.VoicePipeline)
+    VOICE_PIPELINE = os.environ.get('DEVGOTCHI_VOICE_PIPELINE', '1') == '1'  # 0이면 기존 순차 방식 (듣기→답변→말하기)
+    VOICE_PAUSE_SEC = 0.6  # 이만큼 조용하면 발화 끝
+    VOICE_MAX_PHRASE_SEC = 10  # 발화 최대 길이
+    VOICE_AWAKE_SEC = 8  # 호출/답변 뒤 호출어 없이 이어서 말할 수 있는 시간
+    VOICE_BARGE_IN_RATIO = 2.0  # 재생 중 끼어들기 판정 에너지 (임계값 배수 - 스피커 소리와 구분)
+    VOICE_BARGE_IN_SEC = 0.3  # 그 에너지가 이만큼 이어지면 재생 중단
+
+    # LLM Gateway Config (llm_gateway.LLMGateway)
+    LLM_TIMEOUT_DEFAULT_SEC = 15  # 지연 샘플이 부족할 때 타임아웃
+    LLM_TIMEOUT_MIN_SEC = 3  # 관측 p95 기반 타임아웃 하한
+    LLM_TIMEOUT_MAX_SEC = 30  # 관측 p95 기반 타임아웃 상한
+    LLM_TIMEOUT_MARGIN = 1.5  # 타임아웃 = p95 × 이 배수
+    LLM_LATENCY_WINDOW = 100  # 모델별로 보관하는 최근 성공 호출 지연 수
+    LLM_LATENCY_MIN_SAMPLES = 10  # 이만큼 쌓이기 전에는 기본 타임아웃, 헤지 없음
+    LLM_HEDGE = True  # 첫 요청이 p90을 넘기면 같은 요청을 한 번 더 보냄
+    LLM_BREAKER_FAILURES = 3  # 연속 실패 이만큼이면 서킷 열림 (즉시 대체 응답)
+    LLM_BREAKER_COOLDOWN_SEC = 30  # 서킷이 열린 뒤 시험 호출까지 대기
+    LLM_GATEWAY_WORKERS = 8  # 게이트웨이 호출 스레드 수 (헤지 포함)
+
+    # LLM Budget Config (llm_budget.LLMBudget)
+    LLM_PRICES_PER_1M = {  # (입력, 출력) USD / 100만 토큰 - 추정치, 요금표가 바뀌면 수정
+        "MiniMax-M2.1": (0.30, 1.20),
+        "MiniMax-Text-01": (0.20, 1.10),
+    }
+    LLM_DAILY_BUDGET_USD = float(os.environ.get('DEVGOTCHI_LLM_BUDGET_USD', '0.5'))  # 기기당 하루 예상 비용 한도 (0이면 계량만)
+    LLM_BUDGET_REDUCE_AT = 0.7  # 한도의 이 비율부터 max_tokens 축소
+    LLM_BUDGET_CHEAP_AT = 0.9  # 이 비율부터 저렴한 모델 사용 (한도 초과 시 응답 캐시/로컬 모델만)
+    LLM_BUDGET_REDUCED_TOKENS = 0.5  # 축소 단계 max_tokens 배율
+    LLM_CHEAP_MODEL = os.environ.get('MINIMAX_CHEAP_MODEL', 'MiniMax-Text-01')  # 비우면 모델은 바꾸지 않음
+    LLM_BUDGET_STATE_PATH = os.path.join('logs', 'llm_budget.json')  # 오늘 사용량 (재시작해도 유지)
+    LLM_RESPONSE_CACHE_MAX = 256  # 예산 초과 시 재사용할 최근 응답 수
+    LLM_RESPONSE_CACHE_TTL_SEC = 6 * 60 * 60
+
+    # Local LLM Config (completion_backends.LocalBackend / CompletionRouter)
+    LOCAL_LLM_ENABLED = os.environ.get('DEVGOTCHI_LOCAL_LLM', '0') == '1'  # CPU 로컬 추론 서버 사용 여부
+    LOCAL_LLM_BASE_URL = os.environ.get('LOCAL_LLM_BASE_URL', 'http://127.0.0.1:8081/v1')  # OpenAI 호환 엔드포인트
+    LOCAL_LLM_MODEL = os.environ.get('LOCAL_LLM_MODEL', 'qwen2.5-1.5b-instruct-q4_k_m')
+    LOCAL_LLM_MAX_TOKENS = 256  # 로컬 응답 길이 상한 (CPU 생성 속도 고려)
+    LOCAL_LLM_TIMEOUT_SEC = 20
+    LOCAL_LLM_HEALTH_SEC = 30  # 로컬 서버 생존 확인 캐시 시간
+    LOCAL_LLM_SIMPLE_MAX_CHARS = 20  # 이 길이 이하 사용자 발화는 로컬로 (단순 대화)
+    LOCAL_LLM_REQUEST_TYPES = ("chat", "voice")  # 단순 대화를 로컬로 보낼 요청 종류 (오프라인이면 전부 로컬)
+    LOCAL_LLM_CLOUD_KEYWORDS = ("뉴스", "소식", "날씨", "일정", "타이머", "알람", "카운트", "[System Info]")  # 짧아도 클라우드
+
+    # Boot Briefing Config (boot_briefing.BootBriefing)
+    BOOT_BRIEFING = True  # 서버 시작 시 날씨/일정 음성 브리핑
+    BRIEFING_DEADLINE_SEC = 15  # 시작 후 이 시간 안에 LLM 멘트 음성이 준비되지 않으면 대체 멘트 재생
+    BRIEFING_AUDIO_WAIT_SEC = 60  # 오디오 장치 준비를 기다리는 최대 시간 (넘으면 UI에만 표시)
+    PRESENCE_ABSENCE_SEC = 2 * 60 * 60  # 이 시간 이상 얼굴이 안 보이다가 잡히면 브리핑 선준비 시작
+    PRESENCE_CONFIRM_SEC = 3  # 얼굴이 이 시간 유지되면 재실 확인 → 준비된 브리핑 재생
+    BRIEFING_CACHE_TTL_SEC = 30 * 60  # 선준비한 브리핑 유효 시간 (일정/퀘스트 변경 시 즉시 무효)
+
+    # Camera Config (frame_source.open_frame_source)
+    CAMERA_SOURCE = os.environ.get('DEVGOTCHI_CAMERA', 'webcam:0')  # webcam:N / video:경로 / images:폴더 / noise
+    CAMERA_WIDTH = 640
+    CAMERA_HEIGHT = 480
+    CAMERA_FPS = 30
+    CAMERA_FOURCC = 'MJPG'  # USB 웹캠 압축 포맷 (None이면 드라이버 기본값)
+    CAMERA_PACING = os.environ.get('DEVGOTCHI_CAMERA_PACING', 'realtime')  # realtime / fast (파일 재생 속도)
+    CAMERA_LOOP = True  # 파일/이미지 소스 끝에 도달하면 처음부터 반복
+
+    # Vision Worker Config (VisionEngine을 별도 프로세스에서 실행)
+    VISION_WORKER = os.environ.get('DEVGOTCHI_VISION_WORKER', '1') == '1'  # 0이면 기존 스레드 방식
+    VISION_WORKER_SLOTS = 4  # 공유 메모리 프레임 슬롯 수 (최소 3)
+    VISION_WORKER_STALL_SEC = 20  # heartbeat가 이 시간 이상 끊기면 워커 재시작 (모델 로딩 시간 포함)
+    VISION_WORKER_JPEG_QUALITY = 80  # /video_feed용 JPEG 품질
+
+    # Vision Input Config (고해상도 USB 카메라에서 프레임당 CPU 절감)
+    VISION_POSE_INPUT_WIDTH = 640  # Pose 입력 가로 해상도 (비율 유지 축소, 0이면 원본)
+    VISION_POSE_MODEL_COMPLEXITY = 1  # 0: lite, 1: full, 2: heavy
+    VISION_FACE_ROI = True  # 이전 프레임 얼굴 영역만 잘라서 Face Mesh 실행 (놓치면 전체 프레임)
+    VISION_FACE_ROI_SIZE = 256  # ROI를 줄일 정사각형 크기 (px)
+    VISION_FACE_ROI_MARGIN = 0.25  # 얼굴 크기 대비 ROI 여유 비율
+
+    # Vision Backend Config
+    VISION_BACKEND = os.environ.get('DEVGOTCHI_VISION_BACKEND', 'solutions')  # solutions: mp.solutions / tasks: Tasks VIDEO 모드
+    VISION_TASKS_FACE_MODEL = 'models/face_landmarker.task'  # tasks 백엔드 모델 경로 (이 폴더 기준)
+    VISION_TASKS_POSE_MODEL = 'models/pose_landmarker_lite.task'
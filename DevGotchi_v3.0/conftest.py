@@ -0,0 +1,21 @@
+# conftest.py
+"""pytest 공용 픽스처"""
+
+import pytest
+
+
+@pytest.fixture
+def app_logs_in_tmp(tmp_path, monkeypatch):
+    """app.py의 기록 싱글톤(지표 이벤트, 활동/자세 일일 파일)을 tmp_path로 - 테스트가 실제 logs/, data/에 쓰지 않게"""
+    import app as web
+
+    dirs = {name: tmp_path / name for name in ("logs", "activity_logs", "posture_logs")}
+    for d in dirs.values():
+        d.mkdir()
+    monkeypatch.setattr(web.metrics_log_instance, "log_dir", str(dirs["logs"]))
+    monkeypatch.setattr(web.activity_log_instance, "data_dir", str(dirs["activity_logs"]))
+    monkeypatch.setattr(web.posture_log_instance, "data_dir", str(dirs["posture_logs"]))
+    yield dirs
+    # 버퍼에 남은 기록도 경로를 되돌리기 전에 tmp_path로
+    web.event_bus.flush()
+    web.metrics_log_instance.flush()
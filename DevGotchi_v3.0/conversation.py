@@ -0,0 +1,200 @@
+# conversation.py
+"""음성/웹 공용 대화 서비스 - 세션 문맥, 프롬프트 조립, 명령 추출, 캐시, 기록을 한 곳에서
+
+    store = ConversationStore(global_chat_history, history_lock, save=..., session=lambda: current_session_id)
+    service = ConversationService(store, news=get_naver_news, command_handler=say_miniMax.apply_commands)
+    reply = service.respond("5분 타이머 맞춰줘", channel="voice")   # 음성 루프
+    reply = service.respond("오늘 뉴스 알려줘", channel="web")      # /api/chat 작업
+
+- 문맥: 두 채널 모두 같은 기록(chat_history.json)의 현재 세션 최근 N개 → 화면에서 한 말을 음성에서도 이어감
+- 프롬프트: 페르소나 + 명령 형식 규칙은 하나, 채널별로는 답변 길이/형식 안내만 다름
+- 뉴스: 질문에 뉴스 키워드가 있으면 TTL 캐시된 뉴스 요약을 system 메시지로 주입 (news_chat)
+- LLM 호출은 completion_backends 라우터 (게이트웨이, 로컬 모델, 예산, 응답 캐시, llm 이벤트)
+- 명령: [COMMAND:종류:인자...] 추출 후 command_handler(사용자 발화, 원문)로 실행 → 최종 답변
+"""
+
+import json
+import re
+import threading
+import time
+from collections import namedtuple
+
+from completion_backends import get_completions
+from llm_gateway import LLMUnavailable, canned_reply
+from metrics_registry import CACHE_REQUESTS, CONVERSATION_TURNS
+from profiler import span
+
+PERSONA = """
+You are 'Dev' (데브고치), an AI smart mirror companion that evolves through conversation.
+
+[Persona]
+- Core Identity: Professional coding expert and lifestyle mentor.
+- Language: Korean only (Natural, clean).
+- Adapt your tone to the user's state:
+  1. [Strict Mode] slacking or prefers efficiency → direct, slightly cynical "Tsundere".
+  2. [Kind Mode] stressed or tired → warm, supportive (~요, ~해요).
+  3. [Gamified Mode] responds well to rewards → RPG guide ("Quest", "Exp", "Buff/Debuff").
+- [News Reporting] You may receive "[System Info] Real-time News Data: ...". IGNORE your internal cutoff
+  knowledge and summarize the provided news professionally (e.g. "오늘의 주요 뉴스입니다. 첫 번째로...").
+
+[Rules]
+규칙 1: 절대 '명령어', '커맨드', '[COMMAND...]', '시스템', '프롬프트' 등 내부 작동 방식을 설명하거나 언급하지 마세요.
+규칙 2: 사용자의 요청에 대해 친절하고 자연스럽게 대답만 하세요. (예: '네, 5분 타이머 시작하겠습니다!')
+규칙 3: 모든 특수 기능은 아래의 형식을 '답변 끝에' 조용히 포함하되, 말로 내뱉지는 마세요.
+- 날씨 조회: [COMMAND:WEATHER:도시명]
+- 카운트다운: [COMMAND:TIMER:시간:DOWN]
+- 카운트업: [COMMAND:TIMER:시간:UP]
+- 타이머 종료: [COMMAND:TIMER:0:RESET]
+- 일정 등록: [COMMAND:REMINDER:날짜:시간:장소:내용] (예: [COMMAND:REMINDER:내일:14시:회의실:부서 회의])
+  - 시간이나 장소가 없으면 빈 값으로 두세요 (예: [COMMAND:REMINDER:내일:::병원 가기])
+- 일정 삭제: [COMMAND:DELETE_REMINDER:날짜]
+🚨필독🚨: 명령어 대괄호[] 안에 '날짜', '내용', '할일', '도시명' 같은 예시 단어를 쓰면 절대 안 됩니다.
+반드시 사용자가 말한 실제 도시(예: Seoul, Busan)나 실제 내용(예: 치과 가기)을 넣으세요.
+당신의 가장 큰 실수는 [COMMAND:WEATHER:도시명]과 같이 적는 것입니다. 반드시 [COMMAND:WEATHER:Busan]과 같이 실제 도시를 넣으세요.
+"""
+
+CHANNEL_STYLE = {
+    "voice": "[Channel] 답변은 음성으로 읽힙니다. 1~3문장으로 짧게, 목록/이모지/마크다운 없이 말하듯이.",
+    "web": "[Channel] 답변은 미러 화면의 채팅창에 표시됩니다. 필요하면 여러 문장으로 답해도 됩니다.",
+}
+
+NEWS_KEYWORDS = ("뉴스", "소식")
+COMMAND_PATTERN = re.compile(r"\[COMMAND:(\w+):(.*?)\]")
+_THINK = re.compile(r"<think>(.*?)</think>", re.DOTALL)
+_FOREIGN_CJK = re.compile(r"[\u3040-\u309F\u30A0-\u30FF\u4E00-\u9FFF]+")  # 가나/한자 (한국어만 출력)
+
+Command = namedtuple("Command", "type args")
+Reply = namedtuple("Reply", "text thought commands task request_type backend tokens")
+
+
+def parse_reply(raw):
+    """LLM 원문 → (화면/음성용 텍스트, thought, [Command], task JSON)"""
+    raw = raw or ""
+    thought = "\n".join(m.strip() for m in _THINK.findall(raw))
+    text = _THINK.sub("", raw)
+    commands = [Command(m.group(1), m.group(2).split(":")) for m in COMMAND_PATTERN.finditer(text)]
+
+    text = COMMAND_PATTERN.sub("", text)
+    text = re.sub(r"\[.*?\]", "", text).replace("COMMAND:", "")
+    text = _FOREIGN_CJK.sub("", text).strip()
+
+    task = None
+    json_match = re.search(r"\{.*\}", text, re.DOTALL)
+    if json_match:
+        try:
+            task = json.loads(json_match.group(0))
+            text = text.replace(json_match.group(0), "").strip()
+        except ValueError:
+            pass
+    return text, thought, commands, task
+
+
+class ConversationStore:
+    """음성/화면 공용 대화 기록 - 기록 리스트({"text", "type", "time", "session_id"})를 감싸 저장까지 담당"""
+
+    def __init__(self, history=None, lock=None, save=None, session=lambda: None):
+        self.history = history if history is not None else []
+        self.lock = lock or threading.Lock()
+        self.save = save  # 락 안에서 호출 (예: dm.save_chat_history)
+        self.session = session  # 현재 세션 id
+        self._listeners = []
+
+    def add_listener(self, fn):
+        """fn(entry, channel) - 메시지가 추가될 때마다 (음성 메시지 화면 동기화 등)"""
+        self._listeners.append(fn)
+
+    def append(self, text, sender, session_id=None, channel="web"):
+        if not text:
+            return None
+        entry = {"text": text, "type": sender, "time": time.strftime("%H:%M"),
+                 "session_id": session_id if session_id is not None else self.session()}
+        with self.lock:
+            self.history.append(entry)
+            if self.save:
+                self.save()
+        for fn in self._listeners:
+            fn(entry, channel)
+        return entry
+
+    def context(self, session_id=None, turns=10):
+        """현재 세션 최근 메시지 turns개 → LLM messages"""
+        sid = session_id if session_id is not None else self.session()
+        with self.lock:
+            recent = [h for h in self.history if h.get("session_id") == sid and h.get("type") in ("user", "ai")]
+        return [{"role": "user" if h["type"] == "user" else "assistant", "content": h["text"]}
+                for h in recent[-turns:]]
+
+
+class ConversationService:
+    def __init__(self, store, completions=None, news=None, command_handler=None, context_turns=10,
+                 max_tokens=None, news_ttl_sec=600, clock=time.monotonic):
+        """news(): 뉴스 요약 문자열, command_handler(user_text, raw) → 명령 실행 후 최종 답변"""
+        self.store = store
+        self._completions = completions
+        self.news = news
+        self.command_handler = command_handler
+        self.context_turns = context_turns
+        self.max_tokens = max_tokens or {"voice": 512, "web": 800}
+        self.news_ttl_sec = news_ttl_sec
+        self.clock = clock
+        self._news_cache = None  # (시각, 텍스트)
+        self._news_lock = threading.Lock()
+
+    @property
+    def completions(self):
+        return self._completions or get_completions()
+
+    def request_type(self, text, channel):
+        if self.news is not None and any(k in text for k in NEWS_KEYWORDS):
+            return "news_chat"
+        return "voice" if channel == "voice" else "chat"
+
+    def news_context(self):
+        """뉴스 요약 (news_ttl_sec 캐시 - 음성/화면에서 연달아 물어도 한 번만 조회)"""
+        with self._news_lock:
+            cached = self._news_cache
+            if cached is not None and self.clock() - cached[0] < self.news_ttl_sec:
+                CACHE_REQUESTS.labels("news", "hit").inc()
+                return cached[1]
+            CACHE_REQUESTS.labels("news", "miss").inc()
+            text = self.news()
+            self._news_cache = (self.clock(), text)
+            return text
+
+    def build_messages(self, text, channel="web", session_id=None):
+        """→ (messages, request_type) - 사용자 발화는 아직 기록 전이어야 함"""
+        request_type = self.request_type(text, channel)
+        system = PERSONA + "\n" + CHANNEL_STYLE.get(channel, "")
+        messages = [{"role": "system", "content": system}]
+        messages += self.store.context(session_id, self.context_turns)
+        if request_type == "news_chat":
+            messages.append({"role": "system", "content":
+                             f"[System Info] Real-time News Data: {self.news_context()}. Please explain this to the user."})
+        messages.append({"role": "user", "content": text})
+        return messages, request_type
+
+    def respond(self, text, channel="web", session_id=None):
+        """발화 1건 처리 → Reply (사용자 발화와 답변 모두 공용 기록에 남김)"""
+        text = (text or "").strip()
+        messages, request_type = self.build_messages(text, channel, session_id)
+        self.store.append(text, "user", session_id, channel)
+
+        tokens, backend = 0, "canned"
+        try:
+            with span("conversation.llm"):
+                completion = self.completions.complete(messages, request_type=request_type,
+                                                       max_tokens=self.max_tokens.get(channel, 512))
+            raw, backend = completion.text, completion.backend
+            tokens = (completion.tokens_in or 0) + (completion.tokens_out or 0)
+        except LLMUnavailable as e:
+            print(f"[Conversation] {e} → 대체 응답")
+            raw = canned_reply(request_type)
+
+        clean, thought, commands, task = parse_reply(raw)
+        if self.command_handler is not None and backend != "canned":
+            with span("conversation.commands"):
+                clean = self.command_handler(text, raw) or clean
+        CONVERSATION_TURNS.labels(channel, request_type, backend).inc()
+
+        self.store.append(clean, "ai", session_id, channel)
+        return Reply(clean, thought, commands, task, request_type, backend, tokens)
@@ -0,0 +1,299 @@
+# event_bus.py
+"""프로세스 내 이벤트 버스 - 생산자는 이벤트를 한 번만 발행하고, 싱크가 각자 배치 처리
+
+핫패스(비전 루프, 게임 루프)의 비용은 emit() 한 번 = 큐 삽입 한 번입니다.
+파일 저장 같은 무거운 작업은 디스패처 스레드에서 싱크별 주기로 모아서 실행합니다.
+"""
+
+import asyncio
+import json
+import queue
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+
+Event = namedtuple("Event", ["kind", "ts", "data"])
+
+# 이벤트 종류
+TURTLE_NECK = "turtle_neck"
+EYE_CLOSED = "eye_closed"
+HP_CHANGE = "hp_change"
+QUEST_ACCEPTED = "quest_accepted"
+QUEST_COMPLETED = "quest_completed"
+TIMER = "timer"
+CHAT_DONE = "chat_done"  # 채팅 작업 완료 알림 (SSE 전용)
+
+
+class EventSink:
+    """싱크 기본 클래스 - kinds에 해당하는 이벤트를 모았다가 flush_interval마다 한 번에 처리"""
+
+    kinds = ()  # 비어 있으면 모든 이벤트 수신
+    flush_interval = 1.0  # 초 (0이면 도착 즉시 처리)
+    max_batch = 500  # 버퍼가 이만큼 차면 주기와 상관없이 처리
+
+    def __init__(self):
+        self.buffer = []
+        self.last_flush = time.monotonic()
+
+    def accepts(self, kind):
+        return not self.kinds or kind in self.kinds
+
+    def due(self, now):
+        if not self.buffer:
+            return False
+        return len(self.buffer) >= self.max_batch or now - self.last_flush >= self.flush_interval
+
+    def next_due(self):
+        """다음 처리 예정 시각 (버퍼가 비어 있으면 None)"""
+        return self.last_flush + self.flush_interval if self.buffer else None
+
+    def handle_batch(self, events):
+        raise NotImplementedError
+
+
+class EventBus:
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        self._sinks = []
+        self._thread = None
+        self._stop_event = threading.Event()
+        self.emitted = 0
+
+    def subscribe(self, sink):
+        self._sinks.append(sink)
+        return sink
+
+    def emit(self, kind, ts=None, **data):
+        """이벤트 발행 (호출 스레드에서는 큐 삽입만 수행)"""
+        self._queue.put(Event(kind, time.time() if ts is None else ts, data))
+        self.emitted += 1
+
+    def qsize(self):
+        return self._queue.qsize()
+
+    # ========== 디스패처 ==========
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="event-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """남은 이벤트를 모두 싱크에 넘기고 종료 (atexit용)"""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self._dispatch_pending()
+        self._flush_sinks(force=True)
+
+    def flush(self, timeout=5):
+        """지금까지 발행된 이벤트가 모든 싱크에 반영될 때까지 대기"""
+        if not (self._thread and self._thread.is_alive()):
+            self._dispatch_pending()
+            self._flush_sinks(force=True)
+            return True
+        done = threading.Event()
+        self._queue.put(done)
+        return done.wait(timeout)
+
+    def _dispatch(self, ev):
+        for sink in self._sinks:
+            if sink.accepts(ev.kind):
+                sink.buffer.append(ev)
+
+    def _dispatch_pending(self):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, Event):
+                self._dispatch(item)
+            elif isinstance(item, threading.Event):
+                item.set()
+
+    def _flush_sinks(self, force=False):
+        now = time.monotonic()
+        for sink in self._sinks:
+            if sink.buffer and (force or sink.due(now)):
+                batch, sink.buffer = sink.buffer, []
+                sink.last_flush = now
+                try:
+                    sink.handle_batch(batch)
+                except Exception as e:
+                    print(f"[EventBus] {type(sink).__name__} 처리 오류: {e}")
+
+    def _next_timeout(self):
+        dues = [d for d in (s.next_due() for s in self._sinks) if d is not None]
+        if not dues:
+            return 1.0
+        return max(0.0, min(dues) - time.monotonic())
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                item = self._queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, Event):
+                self._dispatch(item)
+                self._dispatch_pending()  # 쌓여 있는 이벤트는 한 번에 분배
+            elif isinstance(item, threading.Event):
+                # flush() 요청: 앞선 이벤트를 모두 반영한 뒤 알림
+                self._dispatch_pending()
+                self._flush_sinks(force=True)
+                item.set()
+                continue
+
+            self._flush_sinks()
+
+
+# ========== 생산자 어댑터 ==========
+class BusActivityLogger:
+    """GameManager.activity_logger 자리에 주입 - 파일 대신 버스로 이벤트 발행"""
+
+    def __init__(self, bus):
+        self.bus = bus
+
+    def log_hp_change(self, hp_before, hp_after, reason, amount):
+        self.bus.emit(HP_CHANGE, hp_before=hp_before, hp_after=hp_after, reason=reason, amount=amount)
+
+    def log_quest_accepted(self, quest_name, quest_type, target_duration, reward_xp):
+        self.bus.emit(QUEST_ACCEPTED, name=quest_name, type=quest_type, duration=target_duration, reward_xp=reward_xp)
+
+    def log_quest_completed(self, quest_name, quest_type, actual_duration, reward_xp):
+        self.bus.emit(QUEST_COMPLETED, name=quest_name, type=quest_type, duration=actual_duration, reward_xp=reward_xp)
+
+
+# ========== 싱크 ==========
+class ActivityLogSink(EventSink):
+    """일일 활동 파일 (ActivityLogger) - 배치당 파일 저장 1회"""
+
+    kinds = (TURTLE_NECK, EYE_CLOSED, HP_CHANGE, QUEST_ACCEPTED, QUEST_COMPLETED, TIMER)
+    flush_interval = 2.0
+
+    def __init__(self, activity_logger):
+        super().__init__()
+        self.logger = activity_logger
+
+    def handle_batch(self, events):
+        log = self.logger
+        with log.lock:
+            for ev in events:
+                when = datetime.fromtimestamp(ev.ts)
+                d = ev.data
+                if ev.kind == TURTLE_NECK:
+                    log.log_turtle_neck(d.get("duration_sec"), when=when, save=False)
+                elif ev.kind == EYE_CLOSED:
+                    log.log_eye_closed(d.get("duration_sec"), when=when, save=False)
+                elif ev.kind == HP_CHANGE:
+                    log.log_hp_change(d["hp_before"], d["hp_after"], d["reason"], d["amount"], when=when, save=False)
+                elif ev.kind == QUEST_ACCEPTED:
+                    log.log_quest_accepted(d["name"], d["type"], d["duration"], d["reward_xp"], when=when, save=False)
+                elif ev.kind == QUEST_COMPLETED:
+                    log.log_quest_completed(d["name"], d["type"], d["duration"], d["reward_xp"], when=when, save=False)
+                elif ev.kind == TIMER:
+                    log.log_timer_event(d.get("type"), d.get("duration", 0), when=when, save=False)
+            log.save()
+
+
+class PostureLogSink(EventSink):
+    """자세 기록 파일 (PostureLogger) - 배치당 파일 저장 1회"""
+
+    kinds = (TURTLE_NECK, EYE_CLOSED)
+    flush_interval = 2.0
+
+    def __init__(self, posture_logger):
+        super().__init__()
+        self.logger = posture_logger
+
+    def handle_batch(self, events):
+        with self.logger.lock:
+            for ev in events:
+                when = datetime.fromtimestamp(ev.ts)
+                if ev.kind == TURTLE_NECK:
+                    self.logger.log_turtle_neck(ev.data.get("duration_sec"), when=when, save=False)
+                else:
+                    self.logger.log_eye_closed(ev.data.get("duration_sec"), when=when, save=False)
+            self.logger.save()
+
+
+class MetricsSink(EventSink):
+    """MetricsLogger 이벤트 파일 (kind="activity")"""
+
+    kinds = (TURTLE_NECK, EYE_CLOSED, QUEST_ACCEPTED, QUEST_COMPLETED, TIMER)
+    flush_interval = 5.0
+
+    def __init__(self, metrics_logger):
+        super().__init__()
+        self.metrics = metrics_logger
+
+    def handle_batch(self, events):
+        from metrics_logger import MetricEvent
+        self.metrics.log_many([
+            MetricEvent(ts=ev.ts, kind="activity", name=ev.kind, ok=True, meta=ev.data or None)
+            for ev in events
+        ])
+
+
+class AsyncClientQueue:
+    """SSE 구독자용 asyncio 큐 - 디스패처 스레드에서 이벤트 루프로 넘김 (가득 차면 버림)"""
+
+    def __init__(self, loop, maxsize):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+
+    def put_nowait(self, msg):
+        try:
+            self.loop.call_soon_threadsafe(self._put, msg)
+        except RuntimeError:
+            pass  # 루프가 이미 닫힘 (연결 종료 직후)
+
+    def _put(self, msg):
+        try:
+            self.queue.put_nowait(msg)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+
+class SSESink(EventSink):
+    """브라우저 SSE 구독자에게 즉시 전달 (느린 구독자는 이벤트를 버림)"""
+
+    flush_interval = 0
+
+    def __init__(self, max_pending=100):
+        super().__init__()
+        self.max_pending = max_pending
+        self._clients = set()
+        self._lock = threading.Lock()
+
+    def open_client(self, loop=None):
+        """구독자 큐 - loop를 주면 asyncio 큐 (ASGI 모드에서 코루틴이 await)"""
+        q = AsyncClientQueue(loop, self.max_pending) if loop else queue.Queue(maxsize=self.max_pending)
+        with self._lock:
+            self._clients.add(q)
+        return q
+
+    def close_client(self, q):
+        with self._lock:
+            self._clients.discard(q)
+
+    def handle_batch(self, events):
+        with self._lock:
+            clients = list(self._clients)
+        if not clients:
+            return
+        for ev in events:
+            msg = json.dumps({"kind": ev.kind, "ts": ev.ts, **ev.data}, ensure_ascii=False)
+            for q in clients:
+                try:
+                    q.put_nowait(msg)
+                except queue.Full:
+                    pass
@@ -0,0 +1,51 @@
+# face_roi.py
+"""얼굴 ROI 추적 - Face Mesh 입력을 이전 프레임 얼굴 주변으로 잘라 고정 크기로 축소 (mediapipe 의존 없음)"""
+
+import cv2
+
+
+class FaceRoiTracker:
+    """이전 프레임의 얼굴 랜드마크로 다음 프레임의 얼굴 영역(정사각형)을 추정
+
+    Face Mesh에는 전체 프레임 대신 이 영역을 잘라서 고정 크기로 줄인 이미지를 넣습니다.
+    정사각형으로 자르고 같은 비율로 줄이므로 랜드마크를 원본 좌표로 되돌리면 EAR/입 비율 계산은 그대로입니다.
+    """
+
+    def __init__(self, input_size=256, margin=0.25, min_box=64):
+        self.input_size = input_size
+        self.margin = margin  # 얼굴 크기 대비 여유 (움직임 대비)
+        self.min_box = min_box
+        self.box = None  # (x0, y0, side) 원본 픽셀 좌표
+
+    def crop(self, frame):
+        """추적 중이면 (잘라서 줄인 BGR 이미지, box) 반환, 아니면 None"""
+        if self.box is None:
+            return None
+        x0, y0, side = self.box
+        roi = frame[y0:y0 + side, x0:x0 + side]
+        if roi.shape[0] != side or roi.shape[1] != side:
+            self.box = None  # 화면 가장자리에서 정사각형이 안 나오면 전체 프레임으로
+            return None
+        return cv2.resize(roi, (self.input_size, self.input_size), interpolation=cv2.INTER_AREA), self.box
+
+    def to_frame(self, landmarks, box, w, h):
+        """ROI 기준 정규화 좌표 → 원본 프레임 기준 정규화 좌표 (제자리 변환)"""
+        x0, y0, side = box
+        for lm in landmarks:
+            lm.x = (x0 + lm.x * side) / w
+            lm.y = (y0 + lm.y * side) / h
+
+    def update(self, landmarks, w, h):
+        xs = [lm.x for lm in landmarks]
+        ys = [lm.y for lm in landmarks]
+        x_min, x_max = min(xs) * w, max(xs) * w
+        y_min, y_max = min(ys) * h, max(ys) * h
+        side = int(max(x_max - x_min, y_max - y_min) * (1 + 2 * self.margin))
+        side = min(max(side, self.min_box), w, h)
+        cx, cy = (x_min + x_max) / 2, (y_min + y_max) / 2
+        x0 = int(min(max(cx - side / 2, 0), w - side))
+        y0 = int(min(max(cy - side / 2, 0), h - side))
+        self.box = (x0, y0, side)
+
+    def lost(self):
+        self.box = None
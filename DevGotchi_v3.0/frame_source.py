@@ -0,0 +1,225 @@
+# frame_source.py
+"""카메라 입력 추상화 - 웹캠 / 영상 파일 / 이미지 시퀀스 / 합성 노이즈
+
+모든 소스는 cv2.VideoCapture와 같은 read() / isOpened() / release() 인터페이스를 가지므로
+기존 루프의 cv2.VideoCapture(0) 자리를 open_frame_source()로 바꾸기만 하면 됩니다.
+
+소스 지정 (Config.CAMERA_SOURCE 또는 환경변수 DEVGOTCHI_CAMERA):
+    webcam:0              # 기본값, 장치 번호
+    video:samples/a.mp4   # 영상 파일
+    images:samples/frames # 이미지 폴더 (파일명 순)
+    noise                 # 합성 노이즈 (헤드리스 CI / 부하 테스트)
+
+재생 속도 (Config.CAMERA_PACING): realtime(원본 FPS에 맞춰 대기) / fast(대기 없이 최대 속도)
+"""
+
+import os
+import time
+
+import cv2
+import numpy as np
+
+from config import Config
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+
+
+def _cfg(name, default):
+    return getattr(Config, name, default)
+
+
+class Pacer:
+    """realtime 모드에서 프레임 간격을 fps에 맞춤 (밀리면 따라잡지 않고 기준 시각을 재설정)"""
+
+    def __init__(self, fps, mode="realtime"):
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.realtime = mode == "realtime" and self.interval > 0
+        self._next = None
+
+    def wait(self):
+        if not self.realtime:
+            return
+        now = time.perf_counter()
+        if self._next is None or now - self._next > self.interval:
+            self._next = now
+        elif self._next > now:
+            time.sleep(self._next - now)
+        self._next += self.interval
+
+
+class FrameSource:
+    """공통 인터페이스 (cv2.VideoCapture 호환)"""
+
+    name = "base"
+    fps = 0.0
+
+    def read(self):
+        raise NotImplementedError
+
+    def isOpened(self):
+        return True
+
+    def release(self):
+        pass
+
+    @property
+    def paced(self):
+        """read()가 스스로 프레임 간격을 맞추는지 (realtime 재생) - 호출 측 루프는 따로 쉬지 않아도 됨"""
+        pacer = getattr(self, "pacer", None)
+        return bool(pacer and pacer.realtime)
+
+    def describe(self):
+        return {"source": self.name, "fps": self.fps}
+
+
+class WebcamSource(FrameSource):
+    name = "webcam"
+
+    def __init__(self, index=0, width=None, height=None, fps=None, fourcc=None, buffer_size=1):
+        self.cap = cv2.VideoCapture(index)
+        # FOURCC를 먼저 지정해야 일부 드라이버가 해상도/FPS 조합을 받아들임 (MJPG → USB 대역폭 절약)
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc))
+        if width:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)  # 오래된 프레임이 쌓이지 않도록
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 0.0
+        print(f"[Camera] webcam:{index} {self.describe()}")
+
+    def read(self):
+        return self.cap.read()
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+    def describe(self):
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        fourcc = "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)) if code else None
+        return {
+            "source": self.name,
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": self.fps,
+            "fourcc": fourcc,
+        }
+
+
+class VideoFileSource(FrameSource):
+    name = "video"
+
+    def __init__(self, path, pacing="realtime", loop=True, fps=None):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            print(f"[Camera] 영상을 열 수 없습니다: {path}")
+        self.fps = fps or self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.pacer = Pacer(self.fps, pacing)
+
+    def read(self):
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        if ret:
+            self.pacer.wait()
+        return ret, frame
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def release(self):
+        self.cap.release()
+
+    def describe(self):
+        return {"source": self.name, "path": self.path, "fps": self.fps, "loop": self.loop,
+                "realtime": self.pacer.realtime}
+
+
+class ImageSequenceSource(FrameSource):
+    name = "images"
+
+    def __init__(self, directory, fps=30.0, pacing="realtime", loop=True, preload=True):
+        self.directory = directory
+        self.paths = sorted(os.path.join(directory, n) for n in os.listdir(directory)
+                            if n.lower().endswith(IMAGE_EXTS))
+        self.fps = fps
+        self.loop = loop
+        self.pacer = Pacer(fps, pacing)
+        self.index = 0
+        # 미리 디코딩해 두면 벤치마크에 디스크 I/O와 JPEG 디코딩이 섞이지 않음
+        self.frames = [cv2.imread(p) for p in self.paths] if preload else None
+
+    def read(self):
+        if self.index >= len(self.paths):
+            if not self.loop or not self.paths:
+                return False, None
+            self.index = 0
+        i = self.index
+        self.index += 1
+        frame = self.frames[i] if self.frames is not None else cv2.imread(self.paths[i])
+        if frame is None:
+            return False, None
+        self.pacer.wait()
+        return True, frame.copy() if self.frames is not None else frame  # 호출 측의 그리기로 원본이 바뀌지 않도록
+
+    def isOpened(self):
+        return bool(self.paths)
+
+    def describe(self):
+        return {"source": self.name, "directory": self.directory, "frames": len(self.paths),
+                "fps": self.fps, "loop": self.loop, "realtime": self.pacer.realtime}
+
+
+class NoiseSource(FrameSource):
+    """시드 고정 합성 프레임 - 몇 장을 미리 만들어 순환하므로 생성 비용이 측정에 섞이지 않음"""
+
+    name = "noise"
+
+    def __init__(self, width=640, height=480, fps=30.0, pacing="realtime", seed=0, pool=8, max_frames=None):
+        rng = np.random.default_rng(seed)
+        self.pool = [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(pool)]
+        self.fps = fps
+        self.pacer = Pacer(fps, pacing)
+        self.max_frames = max_frames
+        self.count = 0
+        self.width, self.height, self.seed = width, height, seed
+
+    def read(self):
+        if self.max_frames is not None and self.count >= self.max_frames:
+            return False, None
+        frame = self.pool[self.count % len(self.pool)].copy()
+        self.count += 1
+        self.pacer.wait()
+        return True, frame
+
+    def describe(self):
+        return {"source": self.name, "width": self.width, "height": self.height, "fps": self.fps,
+                "seed": self.seed, "realtime": self.pacer.realtime}
+
+
+def open_frame_source(spec=None, pacing=None):
+    """'webcam:0' / 'video:path' / 'images:dir' / 'noise' → FrameSource"""
+    spec = spec or os.environ.get("DEVGOTCHI_CAMERA") or _cfg("CAMERA_SOURCE", "webcam:0")
+    pacing = pacing or _cfg("CAMERA_PACING", "realtime")
+    kind, _, arg = str(spec).partition(":")
+    width, height, fps = _cfg("CAMERA_WIDTH", 640), _cfg("CAMERA_HEIGHT", 480), _cfg("CAMERA_FPS", 30)
+    loop = _cfg("CAMERA_LOOP", True)
+
+    if kind == "webcam":
+        return WebcamSource(int(arg or 0), width, height, fps, _cfg("CAMERA_FOURCC", "MJPG"))
+    if kind == "video":
+        return VideoFileSource(arg, pacing=pacing, loop=loop)
+    if kind == "images":
+        return ImageSequenceSource(arg, fps=fps, pacing=pacing, loop=loop)
+    if kind == "noise":
+        return NoiseSource(width, height, fps, pacing=pacing, seed=int(arg or 0))
+    raise ValueError(f"알 수 없는 카메라 소스: {spec}")
@@ -0,0 +1,216 @@
+# game_loop.py
+"""게임 루프 서비스 - 카메라 FPS와 무관한 고정 주기로 GameManager 갱신
+
+GameManager는 이 루프 스레드만 변경합니다 (단일 소유자).
+Flask 스레드는 submit()/call()로 명령을 넘기고, 읽기는 snapshot으로만 합니다.
+"""
+
+import json
+import queue
+import threading
+import time
+import zlib
+from collections import namedtuple
+from concurrent.futures import Future
+from config import Config
+
+# 한 틱 동안 모인 비전 결과 요약
+VisionSample = namedtuple("VisionSample", ["frames", "bad_ratio", "max_closed_run", "movement"])
+
+# 틱마다 발행되는 불변 게임 상태 (payload는 읽기 전용으로 취급, body는 미리 직렬화된 JSON)
+GameSnapshot = namedtuple("GameSnapshot", ["version", "payload", "body", "etag", "published_at"])
+
+
+class VisionSampleWindow:
+    """틱 사이의 프레임 분석 결과를 고정 크기로 집계 (프레임 수와 무관하게 O(1) 메모리)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._closed_since = None  # 눈 감음 연속 구간 시작 시각 (틱 경계를 넘어 유지)
+        self._reset()
+
+    def _reset(self):
+        self.frames = 0
+        self.bad_frames = 0
+        self.max_closed_run = 0.0  # 눈 감음 최장 연속 시간 (초)
+        self.movement = False
+
+    def add(self, is_bad_posture, is_eye_closed, is_active_movement=False, now=None):
+        """비전 스레드에서 프레임마다 호출 (집계만 하고 게임 로직은 실행하지 않음)"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self.frames += 1
+            if is_bad_posture:
+                self.bad_frames += 1
+
+            if is_eye_closed:
+                if self._closed_since is None:
+                    self._closed_since = now
+                run = now - self._closed_since
+                if run > self.max_closed_run:
+                    self.max_closed_run = run
+            else:
+                self._closed_since = None
+
+            if is_active_movement:
+                self.movement = True
+
+    def drain(self):
+        """현재까지의 집계를 꺼내고 윈도우 초기화"""
+        with self._lock:
+            bad_ratio = self.bad_frames / self.frames if self.frames else 0.0
+            sample = VisionSample(self.frames, bad_ratio, self.max_closed_run, self.movement)
+            self._reset()
+        return sample
+
+
+class GameLoop:
+    """GameManager를 Config.GAME_TICK_HZ 주기로 갱신하는 전용 스레드"""
+
+    def __init__(self, gm, tick_hz=None):
+        self.gm = gm
+        self.tick_hz = tick_hz or Config.GAME_TICK_HZ
+        self.window = VisionSampleWindow()
+        self.tick_count = 0
+        self.last_sample = None
+        self._stop_event = threading.Event()
+        self._commands = queue.SimpleQueue()
+        self._thread = None
+
+        self._snapshot = None
+        self.publish()
+
+    def add_sample(self, is_bad_posture, is_eye_closed, is_active_movement=False):
+        self.window.add(is_bad_posture, is_eye_closed, is_active_movement)
+
+    # ========== 쓰기: 루프 스레드로 직렬화 ==========
+    def submit(self, fn, *args, **kwargs):
+        """gm을 변경하는 작업을 루프 스레드에 예약하고 Future 반환"""
+        future = Future()
+        if not self.is_running():
+            # 루프가 없으면 호출 스레드에서 바로 실행 (테스트/단독 실행용)
+            self._execute(fn, args, kwargs, future)
+            self.publish()
+            return future
+        self._commands.put((fn, args, kwargs, future))
+        return future
+
+    def call(self, fn, *args, timeout=5, **kwargs):
+        """submit 후 결과를 기다림 (Flask 핸들러용)"""
+        return self.submit(fn, *args, **kwargs).result(timeout=timeout)
+
+    def _execute(self, fn, args, kwargs, future):
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+
+    def _drain_commands(self, timeout):
+        """다음 틱 전까지 명령을 기다렸다가 쌓인 명령을 모두 처리. 처리했으면 True"""
+        try:
+            cmd = self._commands.get(timeout=timeout) if timeout > 0 else self._commands.get_nowait()
+        except queue.Empty:
+            return False
+
+        handled = False
+        while cmd is not None:  # None은 stop() 신호
+            self._execute(*cmd)
+            handled = True
+            try:
+                cmd = self._commands.get_nowait()
+            except queue.Empty:
+                break
+        return handled
+
+    # ========== 읽기: 락 없는 스냅샷 ==========
+    @property
+    def snapshot(self):
+        """가장 최근에 발행된 GameSnapshot (참조 대입은 원자적이므로 락 불필요)"""
+        return self._snapshot
+
+    def _build_payload(self):
+        gm = self.gm
+        return {
+            "hp": gm.hp,
+            "max_hp": Config.MAX_HP,
+            "xp": gm.xp,
+            "level": gm.level,
+            "happiness": gm.happiness,
+            "quests": [q.to_dict() for q in gm.quests],
+            "available_quests": [q.to_dict() for q in gm.available_quests],
+        }
+
+    def publish(self):
+        """현재 gm 상태를 직렬화해 새 스냅샷 발행 (내용이 같으면 버전 유지)"""
+        payload = self._build_payload()
+        body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        prev = self._snapshot
+        if prev is not None and prev.body == body:
+            return prev
+
+        version = prev.version + 1 if prev else 1
+        etag = f"{version}-{zlib.crc32(body):08x}"
+        self._snapshot = GameSnapshot(version, payload, body, etag, time.time())
+        return self._snapshot
+
+    def tick(self):
+        """윈도우를 비우고 집계 결과로 gm.update 1회 호출"""
+        sample = self.window.drain()
+        if sample.frames == 0:
+            # 프레임이 없으면 기존 vision_loop처럼 갱신을 건너뜀 (경과 시간은 다음 update의 dt에 포함)
+            return False
+
+        is_bad = sample.bad_ratio >= Config.GAME_BAD_POSTURE_RATIO
+        is_drowsy = sample.max_closed_run >= Config.GAME_DROWSY_RUN_SEC
+        self.gm.update(is_bad, is_drowsy, True, sample.movement)
+
+        self.last_sample = sample
+        self.tick_count += 1
+        return True
+
+    def qsize(self):
+        """처리 대기 중인 명령 수"""
+        return self._commands.qsize()
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="game-loop", daemon=True)
+        self._thread.start()
+        print(f"[GameLoop] 게임 루프 시작 ({self.tick_hz}Hz)")
+
+    def stop(self):
+        self._stop_event.set()
+        self._commands.put(None)
+        if self._thread:
+            self._thread.join(timeout=2)
+
+    def _run(self):
+        interval = 1.0 / self.tick_hz
+        next_tick = time.monotonic() + interval
+        while not self._stop_event.is_set():
+            # 틱 사이에는 Flask에서 들어온 명령(퀘스트 수락 등)을 즉시 처리
+            if self._drain_commands(next_tick - time.monotonic()):
+                self.publish()
+            if self._stop_event.is_set():
+                break
+            if time.monotonic() < next_tick:
+                continue
+
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"[GameLoop] 틱 처리 오류: {e}")
+            self.publish()
+
+            next_tick += interval
+            # 처리가 밀렸으면 누락된 틱을 몰아서 실행하지 않고 다음 주기로 맞춤
+            now = time.monotonic()
+            if next_tick < now:
+                next_tick = now + interval
@@ -1,4 +1,5 @@
 # game_manager.py
+import math
 import time
 import random
 from config import Config
@@ -31,7 +32,7 @@ class Quest:
         self.clear_condition = clear_condition
         self.progress = 0
         self.is_completed = False
-        self.start_time = time.time()
+        self.start_time = time.time()  # GameManager가 생성하는 퀘스트는 주입된 clock 기준으로 덮어씀
 
     def to_dict(self):
         return {
@@ -61,9 +62,19 @@ class Quest:
         q.is_completed = data.get('is_completed', False)
         return q
 
+def _steps_before(value, per_step, limit, inclusive=False):
+    """value가 틱마다 per_step씩 늘 때 `value > limit` (inclusive면 >=)이 되기 전까지의 틱 수 (부동소수점 여유 1틱)"""
+    k = (limit - value) / per_step
+    n = math.floor(k) if not inclusive else math.ceil(k) - 1
+    return max(0, n - 1)
+
+
 class GameManager:
-    def __init__(self):
-        self.dm = DataManager()
+    def __init__(self, data_manager=None, clock=None, rng=None):
+        # 시뮬레이터(game_sim.py)에서 시간/저장소/난수를 주입할 수 있도록 분리
+        self.clock = clock or time.time
+        self.rng = rng or random
+        self.dm = data_manager or DataManager()
         self.load_game()
         
         # Runtime State (Reset on restart)
@@ -84,7 +95,8 @@ class GameManager:
         self.idle_duration = 0
         self.continuous_work_duration = 0
         self.alarm_ignore_count = 0
-        self.last_update_time = time.time()
+        self.last_update_time = self.clock()
+        self.pending_hp_log = {}  # 사유 -> [변동 전 HP, 누적 변동] (아직 기록하지 않은 소액 변동)
 
     def load_game(self):
         data = self.dm.load_user_data()
@@ -119,7 +131,7 @@ class GameManager:
         """퀘스트 수락/완료 시간대 기록"""
         import datetime
         entry = {
-            "timestamp": datetime.datetime.now().isoformat(),
+            "timestamp": datetime.datetime.fromtimestamp(self.clock()).isoformat(),
             "action": action,  # 'accept', 'complete', 'abandon'
             "quest_name": quest_name
         }
@@ -137,12 +149,12 @@ class GameManager:
 
     def get_todays_events(self):
         import datetime
-        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        today = datetime.datetime.fromtimestamp(self.clock()).strftime("%Y-%m-%d")
         return self.calendar.get(today, [])
 
 
     def update(self, is_bad_posture, is_drowsy, has_user_input, is_active_movement=False):
-        now = time.time()
+        now = self.clock()
         dt = now - self.last_update_time
         self.last_update_time = now
 
@@ -182,6 +194,7 @@ class GameManager:
                 self.good_posture_buffer += dt
                 if self.good_posture_buffer > 1.0: 
                      self.bad_posture_duration = 0
+                     self.flush_hp_log()  # 나쁜 자세 구간 종료 → 누적 감점 한 번에 기록
                 
                 self.good_posture_duration += dt
                 
@@ -209,9 +222,11 @@ class GameManager:
             # In protected mode, reset bad counters
             self.bad_posture_duration = 0
             self.idle_duration = 0
+            self.flush_hp_log()
             
         # Check for Level Down (HP Depleted)
         if self.hp <= 0:
+            self.flush_hp_log()
             print(f"[Game] HP Depleted! Level Down from {self.level} -> {max(1, self.level - 1)}")
             self.level = max(1, self.level - 1)
             self.hp = Config.MAX_HP / 2
@@ -253,6 +268,70 @@ class GameManager:
         if  len(self.available_quests) == 0:
             self.generate_quest_options()
             
+    def steady_steps(self, is_bad_posture, is_drowsy, has_user_input, is_active_movement, step):
+        """같은 입력이 이어질 때 update(n*step) 한 번이 update(step) n번과 같은 결과를 내는 최대 n
+
+        시뮬레이터(game_sim.py) 빨리 감기용 - 직전 틱도 같은 입력이었다고 보고, 자세 3초/3분/7분,
+        바른 자세 10분, 멍때림 5분, 과로 90분, 퀘스트 목표, HP 0 중 가장 가까운 임계값 직전까지만 허용.
+        그 사이 변동은 dt에 비례하므로 합쳐도 같음 (0이면 한 틱씩 진행)
+        """
+        if not self.available_quests:
+            return 0  # 선택지 생성 대기
+        active_quests = [q for q in self.quests if not q.is_completed]
+        is_protected_mode = any(q.type in ['stretch', 'rest', 'recovery'] for q in active_quests)
+        n = math.inf
+        damage = 0.0  # 한 틱당 감점
+
+        if is_protected_mode:
+            if self.bad_posture_duration or self.idle_duration or self.pending_hp_log:
+                return 0
+            idle_grows = False
+        else:
+            if is_bad_posture:
+                if getattr(self, 'good_posture_buffer', 0):
+                    return 0
+                for limit, rate in ((3, Config.HP_PENALTY_POSTURE_INSTANT),
+                                    (180, Config.HP_PENALTY_POSTURE_3MIN / 60),
+                                    (420, Config.HP_PENALTY_POSTURE_7MIN / 60)):
+                    if self.bad_posture_duration + step > limit:
+                        damage += rate * step
+                    else:
+                        n = min(n, _steps_before(self.bad_posture_duration, step, limit))
+            else:
+                if self.bad_posture_duration or self.pending_hp_log:
+                    return 0  # 디바운스 리셋/감점 기록이 먼저
+                n = min(n, _steps_before(self.good_posture_duration, step, 600, inclusive=True))
+
+            idle_grows = not has_user_input and not is_bad_posture and not is_active_movement
+            if idle_grows:
+                n = min(n, _steps_before(self.idle_duration, step, 300, inclusive=True))
+            elif self.idle_duration:
+                return 0
+            n = min(n, _steps_before(self.continuous_work_duration, step, 5400))
+
+        if damage:
+            n = min(n, _steps_before(-self.hp, damage, 0, inclusive=True))  # HP 0 → 레벨 다운
+
+        for q in active_quests:
+            if q.type == 'focus':
+                grows = not is_bad_posture and not is_drowsy
+            elif q.type == 'posture':
+                grows = not is_bad_posture
+                if is_bad_posture and q.progress and ("연속" in q.name or "Consectuive" in q.name):
+                    return 0
+            elif q.type in ('rest', 'recovery'):
+                grows = is_active_movement
+                if not grows and idle_grows:
+                    if self.idle_duration + step > 10:
+                        grows = True
+                    else:
+                        n = min(n, _steps_before(self.idle_duration, step, 10))
+            else:
+                grows = False
+            if grows:
+                n = min(n, _steps_before(q.progress, step, q.target_duration, inclusive=True))
+        return n
+
     def get_quest_capacity(self):
         return 1  # 한 번에 1개 퀘스트만 진행 가능
 
@@ -281,10 +360,13 @@ class GameManager:
         pool_recovery.append(Quest("회복 퀘스트: 5분 휴식", "recovery", 5*60, 40, "Easy", "5분간 화면을 보지 말고 휴식하세요.", "입력 없음/부재 5분"))
         pool_recovery.append(Quest("회복 퀘스트: 스트레칭 1회", "recovery", 60, 60, "Normal", "1분간 스트레칭 가이드를 따라하세요.", "스트레칭 동작 감지"))
 
-        q1 = random.choice(pool_focus)
-        q2 = random.choice(pool_posture)
-        q3 = random.choice(pool_recovery)
+        q1 = self.rng.choice(pool_focus)
+        q2 = self.rng.choice(pool_posture)
+        q3 = self.rng.choice(pool_recovery)
         
+        now = self.clock()
+        for q in (q1, q2, q3):
+            q.start_time = now
         self.available_quests = [q1, q2, q3]
 
     def accept_quest(self, quest_index):
@@ -344,11 +426,28 @@ class GameManager:
         self.hp += amount
         self.hp = max(0, min(Config.MAX_HP, self.hp))
         after = self.hp
-        
-        if abs(after - before) > 0.1 and self.activity_logger:
-            # 잦은 변동(소수점 단위) 로깅은 activity_logger 내부적으로 처리하거나 여기서 필터링할 수 있음
-            # 일단 모든 변화를 넘기지만, activity_logger에서 너무 많은 로그를 찍지 않도록 주의
+        if after == before or not self.activity_logger:
+            return
+
+        # 틱마다 들어오는 소액 감점(나쁜 자세 초당 감점 등)은 사유별로 모아서 기록
+        # (게임 틱 주기와 무관하게 HP_LOG_MIN_DELTA마다 한 건 + 구간 종료 시 나머지 한 건)
+        pending = self.pending_hp_log.get(reason)
+        if pending is None and abs(after - before) >= Config.HP_LOG_MIN_DELTA:
             self.activity_logger.log_hp_change(before, after, reason, after - before)
+            return
+        if pending is None:
+            pending = self.pending_hp_log[reason] = [before, 0.0]
+        pending[1] += after - before
+        if abs(pending[1]) >= Config.HP_LOG_MIN_DELTA:
+            del self.pending_hp_log[reason]
+            self.activity_logger.log_hp_change(pending[0], after, reason, pending[1])
+
+    def flush_hp_log(self):
+        """누적 중인 소액 HP 변동을 사유별로 한 건씩 기록"""
+        pending, self.pending_hp_log = self.pending_hp_log, {}
+        for reason, (before, total) in pending.items():
+            if abs(total) > 0.1 and self.activity_logger:
+                self.activity_logger.log_hp_change(before, self.hp, reason, total)
 
     def gain_hp(self, amount):
         self.change_hp(amount, "heal")
@@ -0,0 +1,354 @@
+# game_sim.py
+"""GameManager 규칙 빠른 재생 시뮬레이터 - 실시간 대기 없이 Config 값 튜닝
+
+사용 예:
+    python game_sim.py --synthetic-days 7 --seed 1
+    python game_sim.py --timeline day.jsonl --set HP_PENALTY_IDLE_5MIN=5
+    python game_sim.py --synthetic-days 3 --sweep HP_PENALTY_POSTURE_INSTANT=0.2,0.5,1.0
+    python game_sim.py --synthetic-days 30 --bench
+
+기본 스텝은 실제 게임 루프와 같은 1/GAME_TICK_HZ초 (0.5초) - 자세/졸음 규칙이 1~3초 임계값을 쓰므로
+--max-step을 키우면 결과가 실제와 크게 달라집니다. 대신 입력이 같은 구간에서는 다음 규칙 임계값
+(GameManager.steady_steps) 직전까지의 틱을 update 한 번으로 합쳐 빨리 감습니다. 초당 약 1,000
+시뮬레이션 시간 (합성 30일 ≈ 0.25초, 개발 PC 기준) - 틱마다 update하는 --no-skip은 초당 약 40시간.
+결과는 --no-skip과 같지만 HP 합계의 부동소수점 오차 때문에 HP 0 레벨 다운이 한 틱 밀리는 경우가 있어
+며칠 이상 돌리면 평균 HP 등이 소수점 아래에서 조금 다를 수 있습니다.
+
+타임라인 JSONL 한 줄 = 한 구간:
+    {"duration": 30, "bad_posture": true, "drowsy": false, "has_input": true, "movement": false}
+    (duration 대신 절대 시각 "t"를 쓰면 다음 줄과의 차이를 구간 길이로 사용)
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import math
+import random
+import time
+from collections import defaultdict, namedtuple
+
+from config import Config
+from game_manager import GameManager
+
+# 한 구간 동안 유지되는 입력 상태 (duration: 초)
+Sample = namedtuple("Sample", ["duration", "bad_posture", "drowsy", "has_input", "movement"])
+
+SIM_START = 1767225600.0  # 2026-01-01 00:00 UTC (결과 재현을 위해 고정)
+
+
+class SimClock:
+    """GameManager에 주입하는 가상 시계"""
+
+    def __init__(self, start=SIM_START):
+        self.now = start
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class MemoryDataManager:
+    """파일 대신 메모리에 저장하는 DataManager (시뮬레이션 중 user_data.json 보호)"""
+
+    def __init__(self, initial=None):
+        self.data = dict(initial or {})
+        self.save_count = 0
+
+    def load_user_data(self):
+        return dict(self.data)
+
+    def save_user_data(self, data):
+        self.data = data
+        self.save_count += 1
+
+
+class RecordingLogger:
+    """activity_logger 대신 주입되어 HP/퀘스트 이벤트를 시뮬레이션 시각으로 기록"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.hp_by_reason = defaultdict(float)
+        self.quest_events = []
+
+    def log_hp_change(self, hp_before, hp_after, reason, amount):
+        self.hp_by_reason[reason] += amount
+
+    def log_quest_accepted(self, quest_name, quest_type, target_duration, reward_xp):
+        self.quest_events.append({"t": self.clock(), "action": "accept", "name": quest_name, "type": quest_type})
+
+    def log_quest_completed(self, quest_name, quest_type, actual_duration, reward_xp):
+        self.quest_events.append({"t": self.clock(), "action": "complete", "name": quest_name, "type": quest_type})
+
+
+@contextlib.contextmanager
+def config_overrides(**overrides):
+    """Config 클래스 속성을 일시적으로 바꾸고 복원"""
+    saved = {}
+    try:
+        for name, value in overrides.items():
+            if not hasattr(Config, name):
+                raise AttributeError(f"Config에 없는 항목: {name}")
+            saved[name] = getattr(Config, name)
+            setattr(Config, name, value)
+        yield
+    finally:
+        for name, value in saved.items():
+            setattr(Config, name, value)
+
+
+# ========== 타임라인 ==========
+def load_timeline(path):
+    """JSONL 타임라인 로드 (duration 또는 절대 시각 t 지원)"""
+    rows = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                rows.append(json.loads(line))
+
+    samples = []
+    for i, row in enumerate(rows):
+        if "duration" in row:
+            duration = float(row["duration"])
+        elif i + 1 < len(rows):
+            duration = float(rows[i + 1]["t"]) - float(row["t"])
+        else:
+            duration = 1.0
+        samples.append(Sample(
+            max(0.0, duration),
+            bool(row.get("bad_posture")),
+            bool(row.get("drowsy")),
+            bool(row.get("has_input", True)),
+            bool(row.get("movement")),
+        ))
+    return samples
+
+
+# 상태별 (bad_posture, drowsy, has_input, movement)과 구간 길이 범위(초)
+_STATES = {
+    "focus": ((False, False, True, False), (60, 900)),
+    "slouch": ((True, False, True, False), (10, 600)),
+    "drowsy": ((False, True, True, False), (5, 120)),
+    "idle": ((False, False, False, False), (60, 600)),
+    "stretch": ((False, False, True, True), (30, 180)),
+}
+_TRANSITIONS = {
+    "focus": (("focus", 0.35), ("slouch", 0.35), ("drowsy", 0.1), ("idle", 0.15), ("stretch", 0.05)),
+    "slouch": (("focus", 0.6), ("slouch", 0.2), ("drowsy", 0.1), ("idle", 0.1)),
+    "drowsy": (("focus", 0.5), ("slouch", 0.3), ("idle", 0.2)),
+    "idle": (("focus", 0.7), ("slouch", 0.2), ("stretch", 0.1)),
+    "stretch": (("focus", 0.8), ("idle", 0.2)),
+}
+
+
+def synthetic_day(rng, work_hours=9.0):
+    """마르코프 체인으로 하루 업무 타임라인 생성"""
+    samples = []
+    remaining = work_hours * 3600
+    state = "focus"
+    while remaining > 0:
+        flags, (lo, hi) = _STATES[state]
+        duration = min(remaining, rng.uniform(lo, hi))
+        samples.append(Sample(duration, *flags))
+        remaining -= duration
+
+        names, weights = zip(*_TRANSITIONS[state])
+        state = rng.choices(names, weights)[0]
+    return samples
+
+
+def synthetic_timeline(days=1, seed=0, work_hours=9.0):
+    rng = random.Random(seed)
+    samples = []
+    for _ in range(days):
+        samples.extend(synthetic_day(rng, work_hours))
+    return samples
+
+
+# ========== 시뮬레이터 ==========
+class GameSimulator:
+    """타임라인을 가상 시계로 빠르게 재생하며 HP/XP/퀘스트 궤적 기록"""
+
+    def __init__(self, initial_state=None, seed=0, max_step=None, record_every=60.0, auto_accept=True, quiet=True,
+                 skip_ahead=True):
+        # 틱 간격 - 기본은 실제 게임 틱 (자세/졸음 규칙의 1~3초 임계값과 같은 해상도)
+        self.max_step = max_step or 1.0 / Config.GAME_TICK_HZ
+        # 입력이 같은 구간에서 임계값을 넘지 않는 틱들을 update 한 번으로 합침 (False면 틱마다 update)
+        self.skip_ahead = skip_ahead
+        self.quiet = quiet  # GameManager의 print 출력 숨김
+        self.record_every = record_every
+        self.auto_accept = auto_accept  # 진행 중 퀘스트가 없으면 첫 번째 선택지를 자동 수락
+
+        self.clock = SimClock()
+        self.dm = MemoryDataManager(initial_state or {"hp": Config.MAX_HP, "xp": 0, "level": 1})
+        self.logger = RecordingLogger(self.clock)
+        self.gm = GameManager(data_manager=self.dm, clock=self.clock, rng=random.Random(seed))
+        self.gm.set_activity_logger(self.logger)
+
+        self.trajectory = []
+        self.update_count = 0
+
+    def _record(self):
+        gm = self.gm
+        active = [q for q in gm.quests if not q.is_completed]
+        self.trajectory.append({
+            "t": round(self.clock.now - SIM_START, 1),
+            "hp": round(gm.hp, 2),
+            "xp": gm.xp,
+            "level": gm.level,
+            "quest": active[0].name if active else None,
+            "quest_progress": round(active[0].progress, 1) if active else 0,
+        })
+
+    def run(self, samples):
+        if not self.quiet:
+            return self._run(samples)
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self._run(samples)
+
+    def _run(self, samples):
+        gm = self.gm
+        clock = self.clock
+        next_record = clock.now
+        hp_time = 0.0
+        low_hp_time = 0.0
+        min_hp = gm.hp
+        prev = None
+
+        for s in samples:
+            remaining = s.duration
+            while remaining > 0:
+                if self.auto_accept and gm.available_quests and not any(not q.is_completed for q in gm.quests):
+                    gm.accept_quest(0)
+
+                step = min(self.max_step, remaining)
+                n = 1
+                if self.skip_ahead and step == self.max_step and prev is s:
+                    # 다음 규칙 임계값 직전까지의 틱을 한 번에 (그 사이 HP/퀘스트 진행은 직선이라
+                    # 궤적은 합친 구간 끝에서만 기록해도 같은 그래프)
+                    n = min(int(remaining // step),
+                            gm.steady_steps(s.bad_posture, s.drowsy, s.has_input, s.movement, step))
+                    n = max(1, int(n))
+                prev = s
+
+                dt = n * step
+                hp_before = gm.hp
+                clock.advance(dt)
+                remaining -= dt
+                gm.update(s.bad_posture, s.drowsy, s.has_input, s.movement)
+                self.update_count += 1
+
+                # 틱 n개의 HP가 hp_before에서 gm.hp까지 등간격으로 변했다고 보고 틱 단위 적분과 같게 누적
+                drop = (hp_before - gm.hp) / n
+                hp_time += step * (n * hp_before - drop * n * (n + 1) / 2)
+                low = Config.MAX_HP * 0.3
+                if drop > 0 and hp_before >= low:
+                    low_hp_time += step * (n - min(n, math.floor((hp_before - low) / drop)))
+                elif gm.hp < low:
+                    low_hp_time += dt
+                if gm.hp < min_hp:
+                    min_hp = gm.hp
+                if clock.now >= next_record:
+                    self._record()
+                    next_record = clock.now + self.record_every
+
+        gm.flush_hp_log()  # 아직 기록 안 된 소액 감점까지 사유별 합계에 포함
+        self._record()
+        elapsed = clock.now - SIM_START
+        completed = [e for e in self.logger.quest_events if e["action"] == "complete"]
+        return {
+            "simulated_hours": round(elapsed / 3600, 2),
+            "final_hp": round(gm.hp, 2),
+            "min_hp": round(min_hp, 2),
+            "avg_hp": round(hp_time / elapsed, 2) if elapsed else gm.hp,
+            "low_hp_minutes": round(low_hp_time / 60, 1),
+            "level": gm.level,
+            "xp": gm.xp,
+            "quests_completed": len(completed),
+            "hp_by_reason": {k: round(v, 2) for k, v in sorted(self.logger.hp_by_reason.items())},
+        }
+
+
+def simulate(samples, overrides=None, **sim_kwargs):
+    """Config 오버라이드를 적용해 한 번 실행하고 (요약, 시뮬레이터) 반환"""
+    with config_overrides(**(overrides or {})):
+        sim = GameSimulator(**sim_kwargs)
+        summary = sim.run(samples)
+    return summary, sim
+
+
+def sweep(samples, grid, **sim_kwargs):
+    """grid = {"Config 항목": [후보값...]} 의 모든 조합을 실행"""
+    names = list(grid)
+    results = []
+    for values in itertools.product(*(grid[n] for n in names)):
+        overrides = dict(zip(names, values))
+        summary, _ = simulate(samples, overrides, **sim_kwargs)
+        results.append({"params": overrides, "summary": summary})
+    return results
+
+
+def _parse_value(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text
+
+
+def main():
+    parser = argparse.ArgumentParser(description="DevGotchi 게임 규칙 시뮬레이터")
+    parser.add_argument("--timeline", help="JSONL 타임라인 파일")
+    parser.add_argument("--synthetic-days", type=int, default=1, help="합성 타임라인 일수 (--timeline 미사용 시)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-step", type=float, help="틱 간격 (초, 기본: 1/GAME_TICK_HZ - 키우면 결과가 달라짐)")
+    parser.add_argument("--no-skip", action="store_true",
+                        help="빨리 감기 없이 틱마다 update (검증 기준, 초당 약 40 시뮬레이션 시간)")
+    parser.add_argument("--set", action="append", default=[], metavar="NAME=VALUE", help="Config 오버라이드")
+    parser.add_argument("--sweep", action="append", default=[], metavar="NAME=V1,V2", help="Config 값 조합 탐색")
+    parser.add_argument("--out", help="궤적(trajectory)을 JSON으로 저장")
+    parser.add_argument("--bench", action="store_true", help="시뮬레이션 속도 측정")
+    args = parser.parse_args()
+
+    if args.timeline:
+        samples = load_timeline(args.timeline)
+    else:
+        samples = synthetic_timeline(args.synthetic_days, args.seed)
+
+    overrides = {}
+    for item in args.set:
+        name, value = item.split("=", 1)
+        overrides[name] = _parse_value(value)
+
+    sim_kwargs = {"seed": args.seed, "max_step": args.max_step, "skip_ahead": not args.no_skip}
+
+    if args.sweep:
+        grid = {}
+        for item in args.sweep:
+            name, values = item.split("=", 1)
+            grid[name] = [_parse_value(v) for v in values.split(",")]
+        with config_overrides(**overrides):
+            for r in sweep(samples, grid, **sim_kwargs):
+                print(json.dumps(r, ensure_ascii=False))
+        return
+
+    start = time.perf_counter()
+    summary, sim = simulate(samples, overrides, **sim_kwargs)
+    elapsed = time.perf_counter() - start
+
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+    if args.bench:
+        hours = summary["simulated_hours"]
+        print(f"[Sim] {hours}시간 / {sim.update_count}회 update / {elapsed:.3f}s "
+              f"→ 초당 {hours / elapsed:,.0f} 시뮬레이션 시간")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "trajectory": sim.trajectory, "quests": sim.logger.quest_events},
+                      f, ensure_ascii=False, indent=2)
+        print(f"[Sim] 궤적 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+# histogram.py
+"""병합 가능한 스트리밍 지연 히스토그램 (로그 스케일 버킷)
+
+값 v(>0)는 floor(log2(v) * sub_buckets) 버킷에 들어갑니다.
+sub_buckets=8이면 버킷 폭이 약 9%라서 백분위 오차는 ±5% 이내이고,
+버킷 수는 1ms~1시간 범위에서도 200개 이하로 고정됩니다.
+같은 sub_buckets끼리는 버킷별 카운트를 더하는 것만으로 병합됩니다 (날짜/기기 간 합산).
+"""
+
+import math
+
+
+class LogHistogram:
+    def __init__(self, sub_buckets=8):
+        self.sub_buckets = sub_buckets
+        self.buckets = {}  # 버킷 인덱스 -> 개수
+        self.zero = 0  # 0 이하 값 개수
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def _index(self, value):
+        return math.floor(math.log2(value) * self.sub_buckets)
+
+    def _bucket_value(self, index):
+        """버킷 대표값 (하한/상한의 기하 평균)"""
+        return 2 ** ((index + 0.5) / self.sub_buckets)
+
+    def record(self, value, n=1):
+        if value <= 0:
+            self.zero += n
+        else:
+            i = self._index(value)
+            self.buckets[i] = self.buckets.get(i, 0) + n
+        self.count += n
+        self.total += value * n
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        if other.sub_buckets != self.sub_buckets:
+            raise ValueError("sub_buckets가 다른 히스토그램은 병합할 수 없습니다")
+        for i, n in other.buckets.items():
+            self.buckets[i] = self.buckets.get(i, 0) + n
+        self.zero += other.zero
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        if other.max is not None and (self.max is None or other.max > self.max):
+            self.max = other.max
+        return self
+
+    def percentile(self, p):
+        """p: 0~100. 해당 백분위가 속한 버킷의 대표값 (min/max 범위로 보정)"""
+        if self.count == 0:
+            return None
+        if p >= 100:
+            return self.max
+        rank = max(1, math.ceil(self.count * p / 100.0))
+        seen = self.zero
+        if seen >= rank:
+            return 0
+        for i in sorted(self.buckets):
+            seen += self.buckets[i]
+            if seen >= rank:
+                return min(self.max, max(self.min, self._bucket_value(i)))
+        return self.max
+
+    def summary(self):
+        """대시보드용 요약 (p50/p90/p99/max, ms 단위 정수)"""
+        if self.count == 0:
+            return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None, "mean": None}
+        return {
+            "count": self.count,
+            "p50": int(round(self.percentile(50))),
+            "p90": int(round(self.percentile(90))),
+            "p99": int(round(self.percentile(99))),
+            "max": int(round(self.max)),
+            "mean": int(round(self.total / self.count)),
+        }
+
+    # ========== 직렬화 (summary_*.json 저장/기기 간 전송용) ==========
+    def to_dict(self):
+        return {
+            "sub_buckets": self.sub_buckets,
+            "buckets": {str(i): n for i, n in sorted(self.buckets.items())},
+            "zero": self.zero,
+            "count": self.count,
+            "total": self.total,
+            "min": self.min,
+            "max": self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        h = cls(data.get("sub_buckets", 8))
+        h.buckets = {int(i): n for i, n in data.get("buckets", {}).items()}
+        h.zero = data.get("zero", 0)
+        h.count = data.get("count", 0)
+        h.total = data.get("total", 0.0)
+        h.min = data.get("min")
+        h.max = data.get("max")
+        return h
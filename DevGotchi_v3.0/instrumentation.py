@@ -0,0 +1,187 @@
+# instrumentation.py
+"""MetricsLogger 자동 계측 - Flask 요청(http_in), 외부 HTTP(http_out), LLM 호출(llm)"""
+
+import functools
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+import requests
+
+from metrics_logger import MetricEvent, MetricsLogger, get_metrics_logger
+from metrics_registry import HTTP_REQUESTS, HTTP_LATENCY, HTTP_OUT_LATENCY, LLM_LATENCY, LLM_REQUESTS, LLM_TOKENS, \
+    LLM_COST
+
+# 외부 호스트 → 이벤트 name
+HOST_NAMES = {
+    "openapi.naver.com": "naver_news",
+    "api.openweathermap.org": "openweather",
+    "api.minimax.io": "minimax",
+    "127.0.0.1": "local_api",
+    "localhost": "local_api",
+}
+
+
+def _ms(start: float) -> int:
+    return int((time.perf_counter() - start) * 1000)
+
+
+def _is_timeout(exc: BaseException) -> bool:
+    # requests.Timeout, openai.APITimeoutError, concurrent.futures.TimeoutError 등
+    return isinstance(exc, (requests.Timeout, TimeoutError)) or "Timeout" in type(exc).__name__
+
+
+# ========== Flask (http_in) ==========
+UNMATCHED_ROUTE = "<unmatched>"  # 라우트 규칙에 없는 요청의 path 라벨
+
+def install_flask_metrics(app, metrics: Optional[MetricsLogger] = None):
+    """모든 Flask 요청의 지연/상태 코드를 http_in 이벤트로 기록"""
+    from flask import g, request
+    metrics = metrics or get_metrics_logger()
+
+    def _route():
+        # /api/history/<id> 같은 경로도 라우트 규칙 단위로 집계, 없는 경로(404)는 하나로 (라벨 수 제한)
+        return request.url_rule.rule if request.url_rule else UNMATCHED_ROUTE
+
+    @app.before_request
+    def _metrics_start():
+        g._metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _metrics_record(response):
+        start = g.pop("_metrics_start", None)
+        if start is not None:
+            route = _route()
+            elapsed = time.perf_counter() - start
+            metrics.log(MetricEvent(
+                ts=time.time(), kind="http_in", name="flask",
+                ok=response.status_code < 500, latency_ms=int(elapsed * 1000),
+                method=request.method, path=route, status_code=response.status_code
+            ))
+            HTTP_REQUESTS.labels(request.method, route, response.status_code).inc()
+            HTTP_LATENCY.labels(route).observe(elapsed)
+        return response
+
+    @app.teardown_request
+    def _metrics_error(exc):
+        # 처리되지 않은 예외로 after_request가 건너뛰어진 경우
+        start = g.pop("_metrics_start", None)
+        if start is not None and exc is not None:
+            route = _route()
+            elapsed = time.perf_counter() - start
+            metrics.log(MetricEvent(
+                ts=time.time(), kind="http_in", name="flask", ok=False, latency_ms=int(elapsed * 1000),
+                method=request.method, path=route, status_code=500, error=repr(exc)
+            ))
+            HTTP_REQUESTS.labels(request.method, route, 500).inc()
+            HTTP_LATENCY.labels(route).observe(elapsed)
+
+
+# ========== 외부 HTTP (http_out) ==========
+def log_http_out(method, url, start, status_code=None, exc=None, metrics: Optional[MetricsLogger] = None,
+                 host_names=None):
+    """외부 호출 1건 기록 (requests 세션 / ASGI 모드의 httpx 클라이언트 공용)"""
+    parts = urlsplit(url)
+    name = (host_names or HOST_NAMES).get(parts.hostname, parts.hostname or "unknown")
+    safe_url = f"{parts.scheme}://{parts.netloc}{parts.path}"  # 쿼리스트링의 API 키 제외
+    metrics = metrics or get_metrics_logger()
+
+    if exc is not None:
+        timeout = _is_timeout(exc)
+        HTTP_OUT_LATENCY.labels(name, "timeout" if timeout else "error").observe(time.perf_counter() - start)
+        metrics.log(MetricEvent(
+            ts=time.time(), kind="http_out", name=name, ok=False, latency_ms=_ms(start),
+            method=method.upper(), url=safe_url, timeout=timeout, error=repr(exc)
+        ))
+        return
+
+    ok = status_code < 400
+    HTTP_OUT_LATENCY.labels(name, "ok" if ok else "error").observe(time.perf_counter() - start)
+    metrics.log(MetricEvent(
+        ts=time.time(), kind="http_out", name=name, ok=ok, latency_ms=_ms(start),
+        method=method.upper(), url=safe_url, status_code=status_code
+    ))
+
+
+class InstrumentedSession(requests.Session):
+    """연결 재사용 + http_out 이벤트 기록 (URL은 쿼리스트링의 API 키를 빼고 기록)"""
+
+    def __init__(self, metrics: Optional[MetricsLogger] = None, host_names=None):
+        super().__init__()
+        self.metrics = metrics
+        self.host_names = host_names or HOST_NAMES
+
+    def request(self, method, url, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            resp = super().request(method, url, *args, **kwargs)
+        except Exception as e:
+            log_http_out(method, url, start, exc=e, metrics=self.metrics, host_names=self.host_names)
+            raise
+        log_http_out(method, url, start, status_code=resp.status_code, metrics=self.metrics,
+                     host_names=self.host_names)
+        return resp
+
+
+http_session = InstrumentedSession()  # 프로세스 공용 세션 (Naver/OpenWeather/MiniMax)
+
+
+# ========== LLM (llm) ==========
+def _extract_usage(result):
+    """OpenAI 응답 객체 또는 chat/completions JSON(dict)에서 (tokens_in, tokens_out, text, ok) 추출"""
+    if isinstance(result, dict):
+        usage = result.get("usage") or {}
+        choices = result.get("choices") or []
+        text = choices[0].get("message", {}).get("content") if choices else None
+        return usage.get("prompt_tokens"), usage.get("completion_tokens"), text, "error" not in result and bool(choices)
+
+    usage = getattr(result, "usage", None)
+    choices = getattr(result, "choices", None) or []
+    text = choices[0].message.content if choices else None
+    if usage is None:
+        return None, None, text, True
+    return getattr(usage, "prompt_tokens", None), getattr(usage, "completion_tokens", None), text, True
+
+
+def instrument_llm(name: str, request_type: str = "chat", metrics: Optional[MetricsLogger] = None, cost_fn=None):
+    """LLM 호출 함수에 붙이는 데코레이터 - 지연, 토큰 사용량, 비용, 타임아웃/실패를 llm 이벤트로 기록
+
+    호출 시 request_type= 키워드를 넘기면 기본값 대신 사용합니다 (chat, news_chat, boot, voice, briefing ...).
+    cost_fn(result, tokens_in, tokens_out) → USD 추정치 (None이면 기록 안 함)
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            rt = kwargs.get("request_type") or request_type
+            m = metrics or get_metrics_logger()
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                timeout = _is_timeout(e)
+                LLM_LATENCY.labels(name, rt).observe(time.perf_counter() - start)
+                LLM_REQUESTS.labels(name, rt, "timeout" if timeout else "error").inc()
+                m.log(MetricEvent(
+                    ts=time.time(), kind="llm", name=name, ok=False, latency_ms=_ms(start),
+                    request_type=rt, timeout=timeout, error=repr(e)
+                ))
+                raise
+
+            tokens_in, tokens_out, text, ok = _extract_usage(result)
+            LLM_LATENCY.labels(name, rt).observe(time.perf_counter() - start)
+            LLM_REQUESTS.labels(name, rt, "ok" if ok else "error").inc()
+            if tokens_in:
+                LLM_TOKENS.labels(name, "in").inc(tokens_in)
+            if tokens_out:
+                LLM_TOKENS.labels(name, "out").inc(tokens_out)
+            cost = cost_fn(result, tokens_in, tokens_out) if cost_fn and ok else None
+            if cost:
+                LLM_COST.labels(name, rt).inc(cost)
+            m.log(MetricEvent(
+                ts=time.time(), kind="llm", name=name, ok=ok, latency_ms=_ms(start),
+                request_type=rt, response_len=len(text) if text else 0,
+                tokens_in=tokens_in, tokens_out=tokens_out, cost=cost, timeout=False
+            ))
+            return result
+        return wrapper
+    return decorator
@@ -0,0 +1,144 @@
+# landmark_features.py
+"""랜드마크 → 판정용 특징값 (EAR, 입 비율, 거북목 거리, 어깨/손목 위치) 일괄 계산
+
+프레임마다 필요한 랜드마크 번호만 float32 (k, 2) 배열 하나로 모으고 (np.fromiter 1회 할당),
+나머지 계산은 모두 배열 연산으로 처리합니다 (랜드마크별 속성 조회/함수 호출 없음).
+배열은 호출마다 새로 만들므로 여러 스레드/엔진이 같은 FeatureSet을 동시에 써도 됩니다.
+
+새 특징 추가:
+    @FACE_FEATURES.feature("head_tilt", LEFT_EYE_OUTER, RIGHT_EYE_OUTER)
+    def head_tilt(p):
+        d = p[RIGHT_EYE_OUTER] - p[LEFT_EYE_OUTER]
+        return np.degrees(np.arctan2(d[1], d[0]))
+필요한 번호를 선언하면 복사 대상에 자동으로 포함됩니다.
+"""
+
+import numpy as np
+
+# Face Mesh 랜드마크 번호
+LEFT_EYE_TOP, LEFT_EYE_BOTTOM, LEFT_EYE_OUTER, LEFT_EYE_INNER = 159, 145, 33, 133
+RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM, RIGHT_EYE_INNER, RIGHT_EYE_OUTER = 386, 374, 362, 263
+MOUTH_LEFT, MOUTH_RIGHT, LIP_TOP, LIP_BOTTOM = 61, 291, 13, 14
+# Pose 랜드마크 번호 (mp.solutions.pose.PoseLandmark / Tasks 공통)
+NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, LEFT_WRIST, RIGHT_WRIST = 0, 11, 12, 15, 16
+
+# EAR 계산용 (세로, 가로) 쌍 - 두 눈을 한 번에 계산
+_EYE_PAIRS = np.array([
+    (LEFT_EYE_TOP, LEFT_EYE_BOTTOM), (LEFT_EYE_OUTER, LEFT_EYE_INNER),
+    (RIGHT_EYE_TOP, RIGHT_EYE_BOTTOM), (RIGHT_EYE_INNER, RIGHT_EYE_OUTER),
+])
+
+
+class Points:
+    """랜드마크 번호로 인덱싱하는 (k, 2) 배열 뷰 - p[159], p[[159, 386]], p[_EYE_PAIRS] 모두 지원"""
+
+    __slots__ = ("xy", "lookup")
+
+    def __init__(self, xy, lookup):
+        self.xy = xy
+        self.lookup = lookup
+
+    def __getitem__(self, idx):
+        return self.xy[self.lookup[idx]]
+
+
+class FeatureSet:
+    def __init__(self, name):
+        self.name = name
+        self._features = []  # (이름, 함수)
+        self._indices = set()
+        self._compiled = None
+
+    def feature(self, name, *indices):
+        """특징 함수 등록 데코레이터 - 함수는 Points를 받아 스칼라/bool(또는 그 dict)을 반환"""
+        def decorator(fn):
+            self._features.append((name, fn))
+            self._indices.update(int(i) for i in np.ravel(indices))
+            self._compiled = None
+            return fn
+        return decorator
+
+    def _compile(self):
+        indices = np.array(sorted(self._indices), dtype=np.intp)
+        lookup = np.full(int(indices.max()) + 1 if len(indices) else 1, -1, dtype=np.intp)
+        lookup[indices] = np.arange(len(indices))
+        self._compiled = (indices.tolist(), lookup)  # 공유 상태는 읽기 전용만
+        return self._compiled
+
+    def load(self, landmarks):
+        """필요한 랜드마크 좌표만 (k, 2) 배열 하나로 복사 → Points (호출마다 새 배열)"""
+        indices, lookup = self._compiled or self._compile()
+        xy = np.fromiter(
+            (v for i in indices for lm in (landmarks[i],) for v in (lm.x, lm.y)),
+            dtype=np.float32, count=2 * len(indices)).reshape(-1, 2)
+        return Points(xy, lookup)
+
+    def compute(self, landmarks):
+        p = self.load(landmarks)
+        out = {}
+        for name, fn in self._features:
+            value = fn(p)
+            if isinstance(value, dict):
+                out.update(value)
+            elif isinstance(value, bool):
+                out[name] = value  # 판정 플래그는 bool 그대로
+            else:
+                out[name] = float(value)
+        return out
+
+
+FACE_FEATURES = FeatureSet("face")
+POSE_FEATURES = FeatureSet("pose")
+
+
+# ========== 얼굴 ==========
+@FACE_FEATURES.feature("ear", _EYE_PAIRS)
+def eye_aspect_ratio(p):
+    pts = p[_EYE_PAIRS]  # (4, 2, 2)
+    d = np.sqrt(((pts[:, 0] - pts[:, 1]) ** 2).sum(axis=1))  # [왼 세로, 왼 가로, 오 세로, 오 가로]
+    h, w = d[0::2], d[1::2]
+    ear = np.divide(h, w, out=np.zeros_like(h), where=w > 0)
+    return {"ear_left": float(ear[0]), "ear_right": float(ear[1]), "ear": float(ear.mean())}
+
+
+@FACE_FEATURES.feature("mouth", MOUTH_LEFT, MOUTH_RIGHT, LIP_TOP, LIP_BOTTOM)
+def mouth_ratio(p):
+    w = abs(p[MOUTH_LEFT][0] - p[MOUTH_RIGHT][0])
+    h = abs(p[LIP_TOP][1] - p[LIP_BOTTOM][1])
+    return {"mouth_width": float(w), "mouth_ratio": float(h / w) if w > 0 else float("inf")}
+
+
+@FACE_FEATURES.feature("head_tilt", LEFT_EYE_OUTER, RIGHT_EYE_OUTER)
+def head_tilt(p):
+    """눈꼬리 연결선 기울기 (도, 오른쪽 눈이 아래면 +)"""
+    d = p[RIGHT_EYE_OUTER] - p[LEFT_EYE_OUTER]
+    return np.degrees(np.arctan2(d[1], abs(d[0])))
+
+
+# ========== 자세 ==========
+@POSE_FEATURES.feature("neck", NOSE, LEFT_SHOULDER, RIGHT_SHOULDER)
+def neck_geometry(p):
+    shoulders = p[[LEFT_SHOULDER, RIGHT_SHOULDER]]
+    center = shoulders.mean(axis=0)
+    nose = p[NOSE]
+    return {
+        "forward_distance": float(abs(nose[0] - center[0])),  # 코가 어깨 중심에서 좌우로 벗어난 정도
+        "vertical_diff": float(center[1] - nose[1]),  # 어깨 중심 대비 코 높이
+        "shoulder_y": float(center[1]),
+        "shoulder_asymmetry": float(shoulders[0, 1] - shoulders[1, 1]),  # 왼쪽 어깨가 낮으면 +
+    }
+
+
+@POSE_FEATURES.feature("wrist_above_shoulder", LEFT_WRIST, RIGHT_WRIST, LEFT_SHOULDER, RIGHT_SHOULDER)
+def wrist_above_shoulder(p):
+    wrists_y = p[[LEFT_WRIST, RIGHT_WRIST]][:, 1]
+    shoulders_y = p[[LEFT_SHOULDER, RIGHT_SHOULDER]][:, 1]
+    return bool((wrists_y < shoulders_y).any())
+
+
+def face_features(landmarks):
+    return FACE_FEATURES.compute(landmarks)
+
+
+def pose_features(landmarks):
+    return POSE_FEATURES.compute(landmarks)
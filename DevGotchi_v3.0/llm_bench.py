@@ -0,0 +1,161 @@
+# llm_bench.py
+"""LLM 백엔드 벤치마크 - 클라우드(MiniMax) vs CPU 로컬 모델의 첫 토큰 시간과 생성 속도(tokens/s)
+
+라즈베리파이 등 실제 미러 하드웨어에서 로컬 추론 서버를 띄운 뒤 실행합니다:
+    llama-server -m qwen2.5-1.5b-instruct-q4_k_m.gguf -c 2048 -t 4 --port 8081
+    python llm_bench.py --backends cloud,local --runs 5 --out bench_pi5.json
+    python llm_bench.py --backends local --compare bench_pi5.json      # 모델/양자화/스레드 수 변경 후 비교
+
+프롬프트는 라우팅 규칙과 같은 기준의 두 묶음입니다:
+    simple  짧은 인사/맞장구 (CompletionRouter가 로컬로 보내는 종류)
+    long    브리핑/조언처럼 긴 답변이 필요한 요청
+
+지표 (백엔드가 스트리밍 없이 완성 응답만 주므로 요청을 둘로 나눠 측정):
+    ttft_ms                max_tokens=1 요청의 지연 = 네트워크 + 프롬프트 처리(prefill) + 첫 토큰
+    e2e_ms                 전체 답변 요청의 지연 (사용자가 기다리는 시간)
+    decode_tokens_per_s    (출력 토큰 - 1) / (e2e - ttft) - 순수 생성 속도 (모델/양자화/스레드 비교용)
+    e2e_tokens_per_s       출력 토큰 / e2e - 네트워크와 prefill 포함 (짧은 답변일수록 낮게 나옴)
+같은 프롬프트를 반복하므로 추론 서버의 프롬프트 캐시가 켜져 있으면 두 번째 반복부터 prefill이 줄어듭니다.
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+
+from dotenv import load_dotenv
+
+from completion_backends import CompletionRouter, LocalBackend
+from bench_compare import delta_table, percentile
+from config import Config
+
+PROMPTS = {
+    "simple": ["안녕", "고마워", "잘 자", "나 왔어", "오늘 피곤하다"],
+    "long": [
+        "오늘 오후에 집중이 잘 안 돼. 코딩 공부를 다시 시작할 수 있게 구체적인 계획을 세 가지 알려줘.",
+        "맑고 18도, 일정은 14시 팀 회의와 19시 헬스장이야. 아침 인사와 오늘 하루 조언을 150자 이내로 해줘.",
+    ],
+}
+SYSTEM = "당신은 스마트 미러 비서 '데브고치'입니다. 한국어로 짧고 자연스럽게 대답하세요."
+
+
+def _timed(backend, messages, max_tokens):
+    t0 = time.perf_counter()
+    c = backend.complete(messages, request_type="bench", max_tokens=max_tokens, timeout=120)
+    return c, time.perf_counter() - t0
+
+
+def _summary(values, scale=1.0, digits=1):
+    values = sorted(values)
+    r = lambda v: None if v is None else round(v * scale, digits)
+    return {"p50": r(percentile(values, 50)), "p90": r(percentile(values, 90)),
+            "min": r(values[0] if values else None), "max": r(values[-1] if values else None)}
+
+
+def bench_backend(backend, prompts, runs=3, max_tokens=256, warmup=1):
+    """→ 프롬프트 묶음별 {"ttft_ms", "e2e_ms", "decode_tokens_per_s", "e2e_tokens_per_s", ...}"""
+    for _ in range(warmup):  # 모델 로딩/프롬프트 캐시 준비
+        backend.complete([{"role": "user", "content": "안녕"}], request_type="bench", max_tokens=16, timeout=120)
+
+    result = {}
+    for group, texts in prompts.items():
+        ttfts, e2es, decode_rates, e2e_rates, tokens_out, errors = [], [], [], [], [], 0
+        for _ in range(runs):
+            for text in texts:
+                messages = [{"role": "system", "content": SYSTEM}, {"role": "user", "content": text}]
+                try:
+                    _, ttft = _timed(backend, messages, 1)
+                    c, e2e = _timed(backend, messages, max_tokens)
+                except Exception as e:
+                    errors += 1
+                    print(f"[LLMBench] {backend.name} 실패: {e!r}")
+                    continue
+                ttfts.append(ttft)
+                e2es.append(e2e)
+                if c.tokens_out:
+                    tokens_out.append(c.tokens_out)
+                    e2e_rates.append(c.tokens_out / e2e)
+                    if c.tokens_out > 1 and e2e > ttft:
+                        decode_rates.append((c.tokens_out - 1) / (e2e - ttft))
+        result[group] = {
+            "requests": len(e2es),
+            "errors": errors,
+            "ttft_ms": _summary(ttfts, 1000),
+            "e2e_ms": _summary(e2es, 1000),
+            "tokens_out_mean": round(sum(tokens_out) / len(tokens_out), 1) if tokens_out else None,
+            "decode_tokens_per_s": _summary(decode_rates, digits=2),
+            "e2e_tokens_per_s": _summary(e2e_rates, digits=2),
+        }
+    return result
+
+
+METRICS = (("ttft_ms", "p50", True), ("e2e_ms", "p50", True), ("e2e_ms", "p90", True),
+           ("decode_tokens_per_s", "p50", False), ("e2e_tokens_per_s", "p50", False))
+
+
+def compare_reports(old, new):
+    rows = []
+    for name in sorted(set(old["backends"]) & set(new["backends"])):
+        for group in PROMPTS:
+            a, b = old["backends"][name].get(group), new["backends"][name].get(group)
+            if not a or not b:
+                continue
+            rows.extend((f"{name}.{group}.{key}.{sub}", (a.get(key) or {}).get(sub), (b.get(key) or {}).get(sub),
+                         lower_is_better) for key, sub, lower_is_better in METRICS)
+    return delta_table(rows, width=44)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LLM 백엔드 벤치마크 (클라우드 vs 로컬)")
+    parser.add_argument("--backends", default="cloud,local", help="쉼표 구분: cloud, local")
+    parser.add_argument("--runs", type=int, default=3, help="프롬프트별 반복 횟수")
+    parser.add_argument("--max-tokens", type=int, default=256)
+    parser.add_argument("--local-url", default=Config.LOCAL_LLM_BASE_URL)
+    parser.add_argument("--local-model", default=Config.LOCAL_LLM_MODEL)
+    parser.add_argument("--out", help="리포트 저장 경로 (JSON)")
+    parser.add_argument("--compare", help="이전 리포트와 비교")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    backends = {
+        "cloud": CompletionRouter.from_config().cloud,
+        "local": LocalBackend(args.local_url, args.local_model, max_tokens_cap=args.max_tokens),
+    }
+    report = {
+        "meta": {
+            "ts": time.time(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "max_tokens": args.max_tokens,
+            "runs": args.runs,
+            "models": {},
+        },
+        "backends": {},
+    }
+    for name in (n.strip() for n in args.backends.split(",")):
+        backend = backends[name]
+        if not backend.available():
+            print(f"[LLMBench] {name} 사용 불가 - 건너뜀")
+            continue
+        print(f"[LLMBench] {name} ({backend.model}) 측정 중...")
+        report["meta"]["models"][name] = backend.model
+        report["backends"][name] = bench_backend(backend, PROMPTS, args.runs, args.max_tokens)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"[LLMBench] 리포트 저장: {args.out}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        print("\n".join(compare_reports(old, report)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+# llm_budget.py
+"""LLM 토큰/비용 계량과 일일 예산 - 한도에 가까워질수록 단계적으로 아껴 씀
+
+    cost = estimate_cost("MiniMax-M2.1", tokens_in, tokens_out)
+    policy = budget.policy(max_tokens=800, model="MiniMax-M2.1")   # 호출 전
+    budget.record("chat", tokens_in, tokens_out, cost)              # 실제 호출마다 (헤지 중복 포함)
+
+단계 (하루 예상 비용 / daily_usd):
+    normal      ~ reduce_at     그대로
+    reduced     ~ cheap_at      max_tokens 축소
+    cheap       ~ 1.0           축소 + 저렴한 모델 (cheap_model이 없으면 축소만)
+    cache_only  1.0 ~           클라우드 호출 안 함 (응답 캐시 → 로컬 모델 → 대체 응답)
+
+날짜가 바뀌면 0부터 다시 (기기 현지 날짜). 사용량은 state_path에 저장해 재시작해도 이어집니다.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+
+from config import Config
+from metrics_registry import LLM_BUDGET_LEVEL, LLM_BUDGET_SPENT
+
+NORMAL, REDUCED, CHEAP, CACHE_ONLY = "normal", "reduced", "cheap", "cache_only"
+LEVELS = (NORMAL, REDUCED, CHEAP, CACHE_ONLY)
+
+BudgetPolicy = namedtuple("BudgetPolicy", "level max_tokens model cache_only")
+
+
+def estimate_cost(model, tokens_in, tokens_out, prices=None):
+    """USD 추정치 - 단가표에 없는 모델은 None"""
+    price = (prices if prices is not None else Config.LLM_PRICES_PER_1M).get(model)
+    if price is None:
+        return None
+    return ((tokens_in or 0) * price[0] + (tokens_out or 0) * price[1]) / 1_000_000
+
+
+class LLMBudget:
+    def __init__(self, daily_usd, reduce_at=0.7, cheap_at=0.9, reduced_tokens=0.5, min_tokens=64,
+                 cheap_model=None, state_path=None, clock=time.time):
+        self.daily_usd = daily_usd  # 0 또는 None이면 제한 없음 (계량만)
+        self.reduce_at = reduce_at
+        self.cheap_at = cheap_at
+        self.reduced_tokens = reduced_tokens
+        self.min_tokens = min_tokens
+        self.cheap_model = cheap_model
+        self.state_path = state_path
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._day = self._today()
+        self._spent = 0.0
+        self._by_type = {}  # request_type → {"calls", "tokens_in", "tokens_out", "cost"}
+        self._load()
+
+    @classmethod
+    def from_config(cls):
+        return cls(Config.LLM_DAILY_BUDGET_USD, reduce_at=Config.LLM_BUDGET_REDUCE_AT,
+                   cheap_at=Config.LLM_BUDGET_CHEAP_AT, reduced_tokens=Config.LLM_BUDGET_REDUCED_TOKENS,
+                   cheap_model=Config.LLM_CHEAP_MODEL, state_path=Config.LLM_BUDGET_STATE_PATH)
+
+    def _today(self):
+        return time.strftime("%Y-%m-%d", time.localtime(self.clock()))
+
+    def _load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[LLMBudget] 사용량 파일 읽기 실패: {e!r}")
+            return
+        if state.get("day") == self._day:
+            self._spent = float(state.get("spent", 0.0))
+            self._by_type = state.get("by_type", {})
+
+    def _save(self):
+        """락 안에서 호출"""
+        if not self.state_path:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.state_path) or ".", exist_ok=True)
+            tmp = self.state_path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"day": self._day, "spent": self._spent, "by_type": self._by_type}, f, ensure_ascii=False)
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            print(f"[LLMBudget] 사용량 파일 저장 실패: {e!r}")
+
+    def _rollover(self):
+        """락 안에서 호출 - 날짜가 바뀌었으면 초기화"""
+        today = self._today()
+        if today != self._day:
+            self._day, self._spent, self._by_type = today, 0.0, {}
+
+    def _level(self):
+        if not self.daily_usd:
+            return NORMAL
+        used = self._spent / self.daily_usd
+        if used >= 1.0:
+            return CACHE_ONLY
+        if used >= self.cheap_at:
+            return CHEAP
+        if used >= self.reduce_at:
+            return REDUCED
+        return NORMAL
+
+    def level(self):
+        with self._lock:
+            self._rollover()
+            return self._level()
+
+    def policy(self, max_tokens, model):
+        level = self.level()
+        if level == NORMAL:
+            return BudgetPolicy(level, max_tokens, model, False)
+        reduced = max(self.min_tokens, int(max_tokens * self.reduced_tokens))
+        if level == REDUCED:
+            return BudgetPolicy(level, reduced, model, False)
+        if level == CHEAP:
+            return BudgetPolicy(level, reduced, self.cheap_model or model, False)
+        return BudgetPolicy(level, reduced, model, True)
+
+    def record(self, request_type, tokens_in, tokens_out, cost):
+        with self._lock:
+            self._rollover()
+            before = self._level()
+            d = self._by_type.setdefault(request_type, {"calls": 0, "tokens_in": 0, "tokens_out": 0, "cost": 0.0})
+            d["calls"] += 1
+            d["tokens_in"] += tokens_in or 0
+            d["tokens_out"] += tokens_out or 0
+            d["cost"] += cost or 0.0
+            self._spent += cost or 0.0
+            after = self._level()
+            self._save()
+            spent = self._spent
+        LLM_BUDGET_SPENT.set(spent)
+        LLM_BUDGET_LEVEL.set(LEVELS.index(after))
+        if after != before:
+            print(f"[LLMBudget] 오늘 예상 비용 ${spent:.4f} / ${self.daily_usd:.2f} → {after}")
+
+    def status(self):
+        with self._lock:
+            self._rollover()
+            return {
+                "day": self._day,
+                "spent_usd": round(self._spent, 6),
+                "daily_usd": self.daily_usd,
+                "level": self._level(),
+                "by_type": {rt: {**d, "cost": round(d["cost"], 6)} for rt, d in self._by_type.items()},
+            }
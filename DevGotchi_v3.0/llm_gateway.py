@@ -0,0 +1,272 @@
+# llm_gateway.py
+"""LLM 호출 게이트웨이 - 모델별 적응형 타임아웃, 헤지 요청, 서킷 브레이커
+
+    reply = gateway.call(MODEL, lambda timeout: client.create(..., timeout=timeout), request_type="chat")
+
+- 모델별 최근 지연(성공한 호출)을 보관하고 타임아웃을 관측 p95 × 여유 배수로 정함 (최소/최대 사이로 제한)
+- 첫 요청이 p90을 넘기도록 끝나지 않으면 같은 요청을 한 번 더 보내고 먼저 끝난 쪽을 사용 (헤지)
+- 연속 실패가 쌓이면 서킷을 열고, 열려 있는 동안은 호출 없이 바로 대체 응답 (cooldown 뒤 1건만 시험 호출)
+- 샘플이 부족하면 기본 타임아웃을 쓰고 헤지하지 않음
+
+상태는 /metrics 의 devgotchi_llm_circuit_state / devgotchi_llm_timeout_seconds /
+devgotchi_llm_gateway_events_total 로 노출됩니다.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from config import Config
+from metrics_registry import LLM_GATEWAY_EVENTS, LLM_GATEWAY_STATE, LLM_GATEWAY_TIMEOUT
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# 서킷이 열렸거나 호출이 모두 실패했을 때 쓰는 즉시 응답 (request_type별)
+CANNED_REPLIES = {
+    "chat": "지금은 생각이 잘 정리되지 않네요. 잠시 후에 다시 이야기해요.",
+    "news_chat": "지금은 뉴스를 정리해 드리기 어려워요. 잠시 후에 다시 물어봐 주세요.",
+    "voice": "지금은 서버 연결이 불안정해요. 잠시 후 다시 말씀해 주세요.",
+}
+
+
+def canned_reply(request_type):
+    return CANNED_REPLIES.get(request_type, CANNED_REPLIES["chat"])
+
+
+class LLMUnavailable(RuntimeError):
+    """호출이 모두 실패했거나 시간 초과 (대체 응답이 없을 때)"""
+
+
+class CircuitOpen(LLMUnavailable):
+    """서킷이 열려 있어 호출하지 않음"""
+
+
+class BadResponse(RuntimeError):
+    """응답은 왔지만 is_ok 검사 실패 (예: choices 없는 MiniMax 오류 JSON)"""
+
+
+class RollingLatency:
+    """최근 window개 성공 호출의 지연 (초)"""
+
+    def __init__(self, window=100):
+        self._values = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self._values.append(seconds)
+
+    def __len__(self):
+        return len(self._values)
+
+    def percentile(self, p):
+        with self._lock:
+            values = sorted(self._values)
+        if not values:
+            return None
+        k = min(len(values) - 1, max(0, int(round(p / 100 * (len(values) - 1)))))
+        return values[k]
+
+
+class CircuitBreaker:
+    """closed → (연속 실패 threshold회) → open → (cooldown_sec) → half_open → 시험 호출 성공 시 closed"""
+
+    def __init__(self, threshold=3, cooldown_sec=30, clock=time.monotonic):
+        self.threshold = threshold
+        self.cooldown_sec = cooldown_sec
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """이번 호출을 보내도 되는지 (half_open에서는 시험 호출 1건만)"""
+        with self._lock:
+            if self.state == OPEN and self.clock() - self.opened_at >= self.cooldown_sec:
+                self.state = HALF_OPEN
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def is_open(self):
+        """열려 있고 아직 cooldown 전 (시험 호출을 보낼 때가 되면 False)"""
+        with self._lock:
+            return self.state == OPEN and self.clock() - self.opened_at < self.cooldown_sec
+
+    def record_success(self):
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        """→ 이번 실패로 서킷이 열렸으면 True"""
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or (self.state == CLOSED and self.failures >= self.threshold):
+                self.state = OPEN
+                self.opened_at = self.clock()
+                return True
+            return False
+
+
+class _ModelState:
+    def __init__(self, window, threshold, cooldown_sec, clock):
+        self.latency = RollingLatency(window)
+        self.breaker = CircuitBreaker(threshold, cooldown_sec, clock)
+
+
+class LLMGateway:
+    def __init__(self, default_timeout=15.0, min_timeout=3.0, max_timeout=30.0, timeout_margin=1.5,
+                 min_samples=10, window=100, hedge=True, failure_threshold=3, cooldown_sec=30.0,
+                 workers=8, clock=time.monotonic):
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_margin = timeout_margin
+        self.min_samples = min_samples
+        self.window = window
+        self.hedge = hedge
+        self.failure_threshold = failure_threshold
+        self.cooldown_sec = cooldown_sec
+        self.clock = clock
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-gateway")
+        self._models = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        return cls(default_timeout=Config.LLM_TIMEOUT_DEFAULT_SEC, min_timeout=Config.LLM_TIMEOUT_MIN_SEC,
+                   max_timeout=Config.LLM_TIMEOUT_MAX_SEC, timeout_margin=Config.LLM_TIMEOUT_MARGIN,
+                   min_samples=Config.LLM_LATENCY_MIN_SAMPLES, window=Config.LLM_LATENCY_WINDOW,
+                   hedge=Config.LLM_HEDGE, failure_threshold=Config.LLM_BREAKER_FAILURES,
+                   cooldown_sec=Config.LLM_BREAKER_COOLDOWN_SEC, workers=Config.LLM_GATEWAY_WORKERS)
+
+    def _state(self, model):
+        with self._lock:
+            state = self._models.get(model)
+            if state is None:
+                state = self._models[model] = _ModelState(self.window, self.failure_threshold,
+                                                          self.cooldown_sec, self.clock)
+                LLM_GATEWAY_STATE.labels(model).set(STATE_VALUES[CLOSED])
+            return state
+
+    def is_open(self, model):
+        return self._state(model).breaker.is_open()
+
+    def timeout_for(self, model):
+        state = self._state(model)
+        if len(state.latency) < self.min_samples:
+            return self.default_timeout
+        p95 = state.latency.percentile(95)
+        return min(self.max_timeout, max(self.min_timeout, p95 * self.timeout_margin))
+
+    def hedge_after(self, model):
+        """헤지 요청을 보낼 시점 (첫 요청 시작 기준 초) - 샘플이 부족하면 None"""
+        state = self._state(model)
+        if not self.hedge or len(state.latency) < self.min_samples:
+            return None
+        return state.latency.percentile(90)
+
+    def _event(self, model, event):
+        LLM_GATEWAY_EVENTS.labels(model, event).inc()
+
+    def _attempt(self, state, fn, timeout, is_ok):
+        def run():
+            t0 = self.clock()
+            result = fn(timeout)
+            if is_ok is not None and not is_ok(result):
+                raise BadResponse(repr(result)[:200])
+            state.latency.add(self.clock() - t0)
+            return result
+        return self._pool.submit(run)
+
+    def call(self, model, fn, request_type="chat", fallback=None, is_ok=None):
+        """fn(timeout) → 응답. 실패/서킷 열림 시 fallback(request_type) 반환, fallback이 없으면 LLMUnavailable"""
+        state = self._state(model)
+        if not state.breaker.allow():
+            self._event(model, "short_circuit")
+            return self._fallback(model, request_type, fallback, CircuitOpen(f"{model} 서킷 열림"))
+
+        LLM_GATEWAY_STATE.labels(model).set(STATE_VALUES[state.breaker.state])
+        timeout = self.timeout_for(model)
+        hedge_after = self.hedge_after(model)
+        if hedge_after is not None and hedge_after >= timeout:
+            hedge_after = None
+        LLM_GATEWAY_TIMEOUT.labels(model).set(timeout)
+
+        start = self.clock()
+        deadline = start + timeout
+        primary = self._attempt(state, fn, timeout, is_ok)
+        pending = {primary}
+        hedged = False
+        last_error = None
+        while True:
+            now = self.clock()
+            if not hedged and hedge_after is not None and (now - start >= hedge_after or not pending):
+                # 첫 요청이 p90을 넘겼거나 이미 실패 → 남은 시간으로 한 번 더
+                hedged = True
+                self._event(model, "hedge")
+                pending.add(self._attempt(state, fn, max(0.1, deadline - now), is_ok))
+            if not pending or now >= deadline:
+                break
+            wait_for = deadline - now
+            if not hedged and hedge_after is not None:
+                wait_for = min(wait_for, max(0.0, start + hedge_after - now))
+            done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+            for f in done:
+                if f.exception() is None:
+                    if f is not primary:
+                        self._event(model, "hedge_won")
+                    state.breaker.record_success()
+                    LLM_GATEWAY_STATE.labels(model).set(STATE_VALUES[CLOSED])
+                    return f.result()
+                last_error = f.exception()
+
+        # 남은 요청은 버림 (완료되면 지연 샘플만 남김)
+        for f in pending:
+            f.cancel()
+        if pending:
+            self._event(model, "timeout")
+            error = LLMUnavailable(f"{model} 응답 시간 초과 ({timeout:.1f}s)")
+        else:
+            self._event(model, "error")
+            error = LLMUnavailable(f"{model} 호출 실패: {last_error!r}")
+        if state.breaker.record_failure():
+            self._event(model, "circuit_opened")
+            print(f"[LLMGateway] {model} 서킷 열림 (연속 실패 {state.breaker.failures}회, "
+                  f"{self.cooldown_sec:.0f}초 후 재시도)")
+        LLM_GATEWAY_STATE.labels(model).set(STATE_VALUES[state.breaker.state])
+        return self._fallback(model, request_type, fallback, error)
+
+    def _fallback(self, model, request_type, fallback, error):
+        if fallback is None:
+            raise error
+        self._event(model, "fallback")
+        return fallback(request_type)
+
+    def stats(self):
+        with self._lock:
+            models = dict(self._models)
+        return {
+            model: {
+                "state": s.breaker.state,
+                "failures": s.breaker.failures,
+                "samples": len(s.latency),
+                "p90_s": s.latency.percentile(90),
+                "p95_s": s.latency.percentile(95),
+                "timeout_s": self.timeout_for(model),
+            }
+            for model, s in models.items()
+        }
+
+
+gateway = LLMGateway.from_config()  # 프로세스 공용 (brain / say_miniMax)
@@ -0,0 +1,188 @@
+# load_test.py
+"""HTTP 부하 테스트 - 서빙 모드(wsgi / asgi)별 처리량(req/s)과 지연 분포(p50/p90/p99)
+
+서버를 모드별로 띄운 뒤 같은 조건으로 측정하고 비교합니다:
+    python app.py                                   # wsgi (Flask 개발 서버)
+    python load_test.py --label wsgi --out wsgi.json
+    DEVGOTCHI_SERVER=asgi python app.py             # asgi
+    python load_test.py --label asgi --out asgi.json
+    python load_test.py --compare wsgi.json asgi.json
+
+chat 시나리오는 서버를 스텁 모드로 띄워서 측정합니다 - 그대로 띄우면 요청마다 실제 LLM을 호출해
+예산을 쓰고 chat_history.json에 부하 테스트 메시지가 쌓입니다:
+    DEVGOTCHI_CHAT_STUB=1.0 python app.py           # LLM 대신 1초 대기 후 고정 응답 (기록 저장 없음)
+메시지마다 번호를 붙여 중복 합치기를 피하고, --coalesce를 주면 같은 메시지를 보내 합치기 경로를 측정합니다.
+"""
+
+import argparse
+import http.client
+import json
+import threading
+import time
+from urllib.parse import urlsplit
+
+from bench_compare import delta_table, percentile
+
+SCENARIOS = ("gamestate", "chat")
+
+
+class Worker(threading.Thread):
+    """연결 하나를 재사용(keep-alive)하며 마감 시각까지 요청 반복"""
+
+    def __init__(self, base, make_request, deadline, revalidate=False, timeout=60):
+        super().__init__(daemon=True)
+        parts = urlsplit(base)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.make_request = make_request
+        self.deadline = deadline
+        self.revalidate = revalidate
+        self.timeout = timeout
+        self.latencies = []
+        self.statuses = {}
+        self.errors = 0
+        self._etag = None
+
+    def _connect(self):
+        return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def run(self):
+        conn = self._connect()
+        i = 0
+        while time.perf_counter() < self.deadline:
+            method, path, body = self.make_request(i)
+            i += 1
+            headers = {"Content-Type": "application/json"} if body is not None else {}
+            if self.revalidate and self._etag:
+                headers["If-None-Match"] = self._etag
+            t0 = time.perf_counter()
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+                resp.read()
+            except (OSError, http.client.HTTPException):
+                self.errors += 1
+                conn.close()
+                conn = self._connect()
+                continue
+            self.latencies.append(time.perf_counter() - t0)
+            self.statuses[resp.status] = self.statuses.get(resp.status, 0) + 1
+            self._etag = resp.getheader("ETag") or self._etag
+            if resp.getheader("Connection", "").lower() == "close":
+                conn.close()
+                conn = self._connect()
+        conn.close()
+
+
+def scenario_requests(name, coalesce=False, run_id=None):
+    run_id = run_id or int(time.time())
+    if name == "gamestate":
+        return lambda i: ("GET", "/api/gamestate", None)
+    if name == "chat":
+        def make(i):
+            msg = "부하 테스트" if coalesce else f"부하 테스트 {run_id}-{threading.get_ident()}-{i}"
+            return "POST", "/api/chat", json.dumps({"message": msg, "history": []}).encode("utf-8")
+        return make
+    raise ValueError(f"알 수 없는 시나리오: {name}")
+
+
+def run_scenario(base, name, concurrency=16, duration=10.0, warmup=1.0, revalidate=False, coalesce=False):
+    make_request = scenario_requests(name, coalesce)
+    if warmup > 0:
+        warm = [Worker(base, make_request, time.perf_counter() + warmup, revalidate) for _ in range(concurrency)]
+        for w in warm:
+            w.start()
+        for w in warm:
+            w.join()
+
+    start = time.perf_counter()
+    workers = [Worker(base, make_request, start + duration, revalidate) for _ in range(concurrency)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    latencies = sorted(x for w in workers for x in w.latencies)
+    statuses = {}
+    for w in workers:
+        for code, n in w.statuses.items():
+            statuses[str(code)] = statuses.get(str(code), 0) + n
+    ms = lambda v: None if v is None else round(v * 1000, 2)
+    return {
+        "scenario": name,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": sum(w.errors for w in workers),
+        "rps": round(len(latencies) / elapsed, 1) if elapsed > 0 else 0.0,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p90_ms": ms(percentile(latencies, 90)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "max_ms": ms(latencies[-1] if latencies else None),
+        "status": statuses,
+    }
+
+
+def print_table(rows, title=None):
+    if title:
+        print(f"\n== {title} ==")
+    print(f"{'scenario':<12}{'label':<8}{'conc':>5}{'req/s':>10}{'p50':>10}{'p90':>10}{'p99':>10}{'err':>6}  status")
+    for r in rows:
+        fmt = lambda v: "-" if v is None else f"{v:.1f}"
+        print(f"{r['scenario']:<12}{r.get('label', ''):<8}{r['concurrency']:>5}{r['rps']:>10.1f}"
+              f"{fmt(r['p50_ms']):>10}{fmt(r['p90_ms']):>10}{fmt(r['p99_ms']):>10}{r['errors']:>6}  {r['status']}")
+
+
+def compare_reports(paths):
+    """여러 결과를 한 표로 - 두 개면 첫 번째 기준 변화(delta)도 출력"""
+    rows, reports = [], []
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            report = json.load(f)
+        reports.append({(r["scenario"], r["concurrency"]): r for r in report["results"]})
+        rows.extend({**r, "label": report.get("label", path)} for r in report["results"])
+    rows.sort(key=lambda r: (r["scenario"], r["concurrency"]))
+    print_table(rows, "비교")
+    if len(reports) == 2:
+        old, new = reports
+        print("\n".join(delta_table(
+            (f"{name}.x{conc}.{key}", old[name, conc][key], new[name, conc][key], key != "rps")
+            for name, conc in sorted(set(old) & set(new)) for key in ("rps", "p50_ms", "p99_ms"))))
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description="DevGotchi HTTP 부하 테스트")
+    ap.add_argument("--base", default="http://127.0.0.1:5000")
+    ap.add_argument("--scenarios", default="gamestate,chat", help="쉼표 구분: " + ",".join(SCENARIOS))
+    ap.add_argument("--concurrency", default="16", help="쉼표 구분 여러 값 가능 (예: 8,32,64)")
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--warmup", type=float, default=1.0)
+    ap.add_argument("--revalidate", action="store_true", help="gamestate에 If-None-Match 전송 (브라우저와 동일, 304 경로)")
+    ap.add_argument("--coalesce", action="store_true", help="chat에 같은 메시지 반복 전송")
+    ap.add_argument("--label", default="", help="결과 표에 붙일 이름 (예: wsgi / asgi)")
+    ap.add_argument("--out", help="결과 JSON 저장 경로")
+    ap.add_argument("--compare", nargs="+", metavar="REPORT", help="저장된 결과 JSON 비교만 수행")
+    args = ap.parse_args()
+
+    if args.compare:
+        compare_reports(args.compare)
+        return
+
+    results = []
+    for name in args.scenarios.split(","):
+        for conc in (int(c) for c in args.concurrency.split(",")):
+            print(f"[LoadTest] {name} x{conc} ({args.duration:.0f}s) ...")
+            r = run_scenario(args.base, name.strip(), conc, args.duration, args.warmup, args.revalidate, args.coalesce)
+            results.append({**r, "label": args.label})
+    print_table(results, args.label or args.base)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"label": args.label, "base": args.base, "ts": time.time(), "results": results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"[LoadTest] 저장: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 # metrics_logger.py
-import os, json, time, traceback
+import os, json, time, traceback, threading, atexit
+from collections import deque
 from dataclasses import dataclass, asdict
 from typing import Any, Dict, Optional
-from datetime import datetime, timezone
+from datetime import datetime, timezone, timedelta
+from histogram import LogHistogram
 
 def _ymd_utc(ts=None):
     ts = time.time() if ts is None else ts
@@ -15,7 +17,7 @@ def _ensure_dir(path: str):
 class MetricEvent:
     ts: float
     kind: str                 # "http_in", "http_out", "llm", "error", "feedback"
-    name: str                 # "flask", "naver_news", "openweather", "minimax_via_brain"
+    name: str                 # "flask", "naver_news", "openweather", "minimax", "local_llm"
     ok: bool
     latency_ms: int = 0
 
@@ -43,21 +45,244 @@ class MetricEvent:
 
     meta: Optional[Dict[str, Any]] = None
 
+LATENCY_KINDS = ("http_in", "http_out", "llm")
+
+class DailyAggregate:
+    """이벤트 단위로 갱신되는 집계 상태 - 요약 생성, 저장(to_state), 병합(merge) 지원
+
+    지연 분포는 LogHistogram으로 종류별/이름별/request_type별로 유지하므로
+    여러 날짜나 여러 기기의 집계를 원본 이벤트 없이 합칠 수 있습니다.
+    """
+
+    def __init__(self):
+        self.counts = {
+            "http_in_total": 0, "http_in_fail": 0,
+            "http_out_total": 0, "http_out_fail": 0,
+            "llm_total": 0, "llm_timeout": 0, "llm_fail": 0,
+            "error_total": 0,
+            "feedback_total": 0
+        }
+        self.lat_sum = {"http_in": 0, "http_out": 0, "llm": 0}
+        self.lat_n = {"http_in": 0, "http_out": 0, "llm": 0}
+        self.llm_by_type = {}
+        self.rating_sum = 0
+        self.rating_n = 0
+        self.hists = {}  # "llm", "llm:minimax_voice", "llm_type:chat", "http_in:/api/chat" ...
+
+    def _hist(self, key):
+        h = self.hists.get(key)
+        if h is None:
+            h = self.hists[key] = LogHistogram()
+        return h
+
+    @staticmethod
+    def _new_rt():
+        return {"count": 0, "timeout": 0, "fail": 0,
+                "lat": 0, "len": 0, "tin": 0, "tin_n": 0, "tout": 0, "tout_n": 0, "cost": 0.0, "cost_n": 0}
+
+    def add(self, ev: Dict[str, Any]):
+        kind = ev.get("kind")
+        ok = bool(ev.get("ok"))
+        latency_ms = int(ev.get("latency_ms") or 0)
+
+        if kind in LATENCY_KINDS:
+            self.counts[f"{kind}_total"] += 1
+            if not ok:
+                self.counts[f"{kind}_fail"] += 1
+            self.lat_sum[kind] += latency_ms
+            self.lat_n[kind] += 1
+
+            self._hist(kind).record(latency_ms)
+            # http_in은 name이 항상 "flask"이므로 라우트 단위로 구분
+            sub = ev.get("path") if kind == "http_in" else ev.get("name")
+            if sub:
+                self._hist(f"{kind}:{sub}").record(latency_ms)
+
+        if kind == "llm":
+            if ev.get("timeout"):
+                self.counts["llm_timeout"] += 1
+
+            rt = ev.get("request_type") or "unknown"
+            self._hist(f"llm_type:{rt}").record(latency_ms)
+            d = self.llm_by_type.get(rt)
+            if d is None:
+                d = self.llm_by_type[rt] = self._new_rt()
+            d["count"] += 1
+            d["lat"] += latency_ms
+            d["len"] += int(ev.get("response_len") or 0)
+            if ev.get("timeout"):
+                d["timeout"] += 1
+            if not ok:
+                d["fail"] += 1
+            if ev.get("tokens_in") is not None:
+                d["tin"] += int(ev["tokens_in"]); d["tin_n"] += 1
+            if ev.get("tokens_out") is not None:
+                d["tout"] += int(ev["tokens_out"]); d["tout_n"] += 1
+            if ev.get("cost") is not None:
+                d["cost"] += float(ev["cost"]); d["cost_n"] += 1
+
+        elif kind == "error":
+            self.counts["error_total"] += 1
+
+        elif kind == "feedback":
+            self.counts["feedback_total"] += 1
+            if ev.get("rating") is not None:
+                self.rating_sum += int(ev["rating"]); self.rating_n += 1
+
+    def merge(self, other: "DailyAggregate"):
+        for k, v in other.counts.items():
+            self.counts[k] = self.counts.get(k, 0) + v
+        for k in self.lat_sum:
+            self.lat_sum[k] += other.lat_sum.get(k, 0)
+            self.lat_n[k] += other.lat_n.get(k, 0)
+        for rt, od in other.llm_by_type.items():
+            d = self.llm_by_type.setdefault(rt, self._new_rt())
+            for k, v in od.items():
+                d[k] += v
+        self.rating_sum += other.rating_sum
+        self.rating_n += other.rating_n
+        for key, h in other.hists.items():
+            self._hist(key).merge(h)
+        return self
+
+    def to_state(self) -> Dict[str, Any]:
+        return {
+            "counts": self.counts,
+            "lat_sum": self.lat_sum,
+            "lat_n": self.lat_n,
+            "llm_by_type": self.llm_by_type,
+            "rating_sum": self.rating_sum,
+            "rating_n": self.rating_n,
+            "hists": {k: h.to_dict() for k, h in self.hists.items()},
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict[str, Any]) -> "DailyAggregate":
+        agg = cls()
+        agg.counts.update(state.get("counts", {}))
+        agg.lat_sum.update(state.get("lat_sum", {}))
+        agg.lat_n.update(state.get("lat_n", {}))
+        agg.llm_by_type = {rt: dict(d) for rt, d in state.get("llm_by_type", {}).items()}
+        agg.rating_sum = state.get("rating_sum", 0)
+        agg.rating_n = state.get("rating_n", 0)
+        agg.hists = {k: LogHistogram.from_dict(h) for k, h in state.get("hists", {}).items()}
+        return agg
+
+    def to_summary(self, label: str) -> Dict[str, Any]:
+        counts, lat_sum, lat_n = self.counts, self.lat_sum, self.lat_n
+        latency_avg = {
+            "http_in_avg": int(lat_sum["http_in"] / lat_n["http_in"]) if lat_n["http_in"] else 0,
+            "http_out_avg": int(lat_sum["http_out"] / lat_n["http_out"]) if lat_n["http_out"] else 0,
+            "llm_avg": int(lat_sum["llm"] / lat_n["llm"]) if lat_n["llm"] else 0,
+        }
+        rates = {
+            "http_in_fail_rate": (counts["http_in_fail"] / counts["http_in_total"]) if counts["http_in_total"] else 0.0,
+            "http_out_fail_rate": (counts["http_out_fail"] / counts["http_out_total"]) if counts["http_out_total"] else 0.0,
+            "llm_fail_rate": (counts["llm_fail"] / counts["llm_total"]) if counts["llm_total"] else 0.0,
+            "llm_timeout_rate": (counts["llm_timeout"] / counts["llm_total"]) if counts["llm_total"] else 0.0,
+        }
+
+        llm = {}
+        for rt, d in self.llm_by_type.items():
+            pct = self._hist(f"llm_type:{rt}").summary()
+            llm[rt] = {
+                "count": d["count"], "timeout": d["timeout"], "fail": d["fail"],
+                "avg_latency_ms": int(d["lat"] / d["count"]) if d["count"] else 0,
+                "p50_latency_ms": pct["p50"], "p90_latency_ms": pct["p90"],
+                "p99_latency_ms": pct["p99"], "max_latency_ms": pct["max"],
+                "avg_response_len": int(d["len"] / d["count"]) if d["count"] else 0,
+                "avg_tokens_in": int(d["tin"] / d["tin_n"]) if d["tin_n"] else None,
+                "avg_tokens_out": int(d["tout"] / d["tout_n"]) if d["tout_n"] else None,
+                "avg_cost": (d["cost"] / d["cost_n"]) if d["cost_n"] else None,
+            }
+
+        feedback = {"avg_rating": (self.rating_sum / self.rating_n) if self.rating_n else None, "rating_count": self.rating_n}
+        percentiles = {k: h.summary() for k, h in sorted(self.hists.items())}
+
+        return {"date": label, "counts": dict(counts), "latency_ms": latency_avg, "rates": rates,
+                "latency_percentiles": percentiles, "llm": llm, "feedback": feedback,
+                "aggregate": self.to_state()}
+
+
+def merge_summaries(summaries, label="merged") -> Dict[str, Any]:
+    """여러 요약(날짜별/기기별)을 원본 이벤트 재조회 없이 합산"""
+    total = DailyAggregate()
+    for s in summaries:
+        if s and s.get("aggregate"):
+            total.merge(DailyAggregate.from_state(s["aggregate"]))
+    return total.to_summary(label)
+
 class MetricsLogger:
-    def __init__(self, log_dir="logs"):
+    def __init__(self, log_dir="logs", flush_interval=1.0, buffered=True):
         self.log_dir = log_dir
         _ensure_dir(log_dir)
 
+        # 비동기 버퍼 기록: log()는 deque에 넣기만 하고, 파일 쓰기는 writer 스레드가 모아서 처리
+        self.buffered = buffered
+        self.flush_interval = flush_interval
+        self._pending = deque()
+        self._write_lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        self._summary_lock = threading.Lock()  # 체크포인트 갱신 직렬화
+
     def _events_path(self, ymd: str):
         return os.path.join(self.log_dir, f"events_{ymd}.jsonl")
 
     def _summary_path(self, ymd: str):
         return os.path.join(self.log_dir, f"summary_{ymd}.json")
 
+    def _checkpoint_path(self, ymd: str):
+        return os.path.join(self.log_dir, f"checkpoint_{ymd}.json")
+
     def log(self, ev: MetricEvent):
-        ymd = _ymd_utc(ev.ts)
-        with open(self._events_path(ymd), "a", encoding="utf-8") as f:
-            f.write(json.dumps(asdict(ev), ensure_ascii=False) + "\n")
+        if not self.buffered:
+            self.log_many([ev])
+            return
+        self._pending.append(ev)  # deque.append는 스레드 안전 (요청 경로에서는 파일을 열지 않음)
+        if self._writer is None:
+            self._start_writer()
+
+    def log_many(self, events):
+        """여러 이벤트를 파일 한 번 열어서 기록 (날짜별로 분리)"""
+        by_day = {}
+        for ev in events:
+            by_day.setdefault(_ymd_utc(ev.ts), []).append(json.dumps(asdict(ev), ensure_ascii=False) + "\n")
+        with self._write_lock:
+            for ymd, lines in by_day.items():
+                with open(self._events_path(ymd), "a", encoding="utf-8") as f:
+                    f.writelines(lines)
+
+    def pending_count(self):
+        """아직 파일에 기록되지 않은 이벤트 수"""
+        return len(self._pending)
+
+    def flush(self):
+        """버퍼에 쌓인 이벤트를 즉시 파일에 기록"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._pending.popleft())
+            except IndexError:
+                break
+        if batch:
+            self.log_many(batch)
+
+    def _start_writer(self):
+        with self._writer_lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._writer_loop, name="metrics-writer", daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+
+    def _writer_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"[Metrics] 이벤트 기록 실패: {e}")
 
     def log_exception(self, name: str, meta: Optional[Dict[str, Any]] = None):
         self.log(MetricEvent(
@@ -69,130 +294,104 @@ class MetricsLogger:
             meta=meta
         ))
 
-    def compute_daily_summary(self, ymd: str):
+    # ========== 요약 (체크포인트 기반 증분 집계) ==========
+    def _load_checkpoint(self, ymd: str):
+        p = self._checkpoint_path(ymd)
+        if os.path.exists(p):
+            try:
+                with open(p, "r", encoding="utf-8") as f:
+                    cp = json.load(f)
+                return int(cp["offset"]), DailyAggregate.from_state(cp["aggregate"])
+            except (ValueError, KeyError, OSError) as e:
+                print(f"[Metrics] 체크포인트 손상, 처음부터 다시 집계: {e}")
+        return 0, DailyAggregate()
+
+    def _save_checkpoint(self, ymd: str, offset: int, agg: DailyAggregate):
+        p = self._checkpoint_path(ymd)
+        tmp = p + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"offset": offset, "aggregate": agg.to_state()}, f, ensure_ascii=False)
+        os.replace(tmp, p)  # 중간에 종료돼도 이전 체크포인트는 유지
+
+    def _update_aggregate(self, ymd: str, rebuild=False):
+        """체크포인트 이후 추가된 줄만 읽어서 집계를 갱신 → (집계, 새로 읽은 이벤트 수)
+
+        체크포인트는 마지막으로 처리한 완전한 줄의 끝 바이트 오프셋을 저장합니다.
+        writer가 쓰는 중인 마지막 줄(개행 없음)은 다음 호출에서 처리합니다.
+        """
         path = self._events_path(ymd)
+        offset, agg = (0, DailyAggregate()) if rebuild else self._load_checkpoint(ymd)
         if not os.path.exists(path):
-            summary = {"date": ymd, "counts": {}, "latency_ms": {}, "rates": {}, "llm": {}, "feedback": {}}
-            with open(self._summary_path(ymd), "w", encoding="utf-8") as f:
-                json.dump(summary, f, ensure_ascii=False, indent=2)
-            return summary
-
-        counts = {
-            "http_in_total": 0, "http_in_fail": 0,
-            "http_out_total": 0, "http_out_fail": 0,
-            "llm_total": 0, "llm_timeout": 0, "llm_fail": 0,
-            "error_total": 0,
-            "feedback_total": 0
-        }
-        lat_sum = {"http_in": 0, "http_out": 0, "llm": 0}
-        lat_n = {"http_in": 0, "http_out": 0, "llm": 0}
-
-        llm_by_type = {}
-        rating_sum = 0
-        rating_n = 0
-
-        def _init_rt(rt):
-            llm_by_type[rt] = {
-                "count": 0, "timeout": 0, "fail": 0,
-                "avg_latency_ms": 0, "avg_response_len": 0,
-                "avg_tokens_in": None, "avg_tokens_out": None, "avg_cost": None,
-                "_lat": 0, "_len": 0,
-                "_tin": 0, "_tin_n": 0,
-                "_tout": 0, "_tout_n": 0,
-                "_cost": 0.0, "_cost_n": 0
-            }
+            return agg, 0
 
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                if not line.strip():
-                    continue
-                ev = json.loads(line)
-                kind = ev.get("kind")
-                ok = bool(ev.get("ok"))
-                latency_ms = int(ev.get("latency_ms") or 0)
-
-                if kind == "http_in":
-                    counts["http_in_total"] += 1
-                    if not ok:
-                        counts["http_in_fail"] += 1
-                    lat_sum["http_in"] += latency_ms
-                    lat_n["http_in"] += 1
-
-                elif kind == "http_out":
-                    counts["http_out_total"] += 1
-                    if not ok:
-                        counts["http_out_fail"] += 1
-                    lat_sum["http_out"] += latency_ms
-                    lat_n["http_out"] += 1
-
-                elif kind == "llm":
-                    counts["llm_total"] += 1
-                    if not ok:
-                        counts["llm_fail"] += 1
-                    if ev.get("timeout"):
-                        counts["llm_timeout"] += 1
-
-                    lat_sum["llm"] += latency_ms
-                    lat_n["llm"] += 1
-
-                    rt = ev.get("request_type") or "unknown"
-                    if rt not in llm_by_type:
-                        _init_rt(rt)
-                    d = llm_by_type[rt]
-                    d["count"] += 1
-                    d["_lat"] += latency_ms
-                    d["_len"] += int(ev.get("response_len") or 0)
-                    if ev.get("timeout"):
-                        d["timeout"] += 1
-                    if not ok:
-                        d["fail"] += 1
-                    if ev.get("tokens_in") is not None:
-                        d["_tin"] += int(ev["tokens_in"]); d["_tin_n"] += 1
-                    if ev.get("tokens_out") is not None:
-                        d["_tout"] += int(ev["tokens_out"]); d["_tout_n"] += 1
-                    if ev.get("cost") is not None:
-                        d["_cost"] += float(ev["cost"]); d["_cost_n"] += 1
-
-                elif kind == "error":
-                    counts["error_total"] += 1
-
-                elif kind == "feedback":
-                    counts["feedback_total"] += 1
-                    if ev.get("rating") is not None:
-                        rating_sum += int(ev["rating"]); rating_n += 1
+        size = os.path.getsize(path)
+        if offset > size:
+            # 파일이 잘리거나 교체됨
+            offset, agg = 0, DailyAggregate()
+        if offset == size and not rebuild:
+            return agg, 0
 
-        latency_avg = {
-            "http_in_avg": int(lat_sum["http_in"] / lat_n["http_in"]) if lat_n["http_in"] else 0,
-            "http_out_avg": int(lat_sum["http_out"] / lat_n["http_out"]) if lat_n["http_out"] else 0,
-            "llm_avg": int(lat_sum["llm"] / lat_n["llm"]) if lat_n["llm"] else 0,
-        }
-        rates = {
-            "http_in_fail_rate": (counts["http_in_fail"] / counts["http_in_total"]) if counts["http_in_total"] else 0.0,
-            "http_out_fail_rate": (counts["http_out_fail"] / counts["http_out_total"]) if counts["http_out_total"] else 0.0,
-            "llm_fail_rate": (counts["llm_fail"] / counts["llm_total"]) if counts["llm_total"] else 0.0,
-            "llm_timeout_rate": (counts["llm_timeout"] / counts["llm_total"]) if counts["llm_total"] else 0.0,
-        }
+        added = 0
+        with open(path, "rb") as f:
+            f.seek(offset)
+            chunk = f.read(size - offset)
+        end = chunk.rfind(b"\n") + 1
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                agg.add(json.loads(line))
+                added += 1
+            except ValueError:
+                print(f"[Metrics] 손상된 이벤트 줄 건너뜀 ({ymd})")
+        self._save_checkpoint(ymd, offset + end, agg)
+        return agg, added
 
-        for rt, d in llm_by_type.items():
-            d["avg_latency_ms"] = int(d["_lat"] / d["count"]) if d["count"] else 0
-            d["avg_response_len"] = int(d["_len"] / d["count"]) if d["count"] else 0
-            d["avg_tokens_in"] = int(d["_tin"] / d["_tin_n"]) if d["_tin_n"] else None
-            d["avg_tokens_out"] = int(d["_tout"] / d["_tout_n"]) if d["_tout_n"] else None
-            d["avg_cost"] = (d["_cost"] / d["_cost_n"]) if d["_cost_n"] else None
-            for k in list(d.keys()):
-                if k.startswith("_"):
-                    d.pop(k, None)
-
-        feedback = {"avg_rating": (rating_sum / rating_n) if rating_n else None, "rating_count": rating_n}
-
-        summary = {"date": ymd, "counts": counts, "latency_ms": latency_avg, "rates": rates, "llm": llm_by_type, "feedback": feedback}
-        with open(self._summary_path(ymd), "w", encoding="utf-8") as f:
-            json.dump(summary, f, ensure_ascii=False, indent=2)
+    def compute_daily_summary(self, ymd: str, rebuild=False):
+        """하루 요약 - 기본은 증분 갱신, rebuild=True면 이벤트 파일 전체를 다시 집계"""
+        self.flush()
+        with self._summary_lock:
+            agg, added = self._update_aggregate(ymd, rebuild=rebuild)
+            summary = agg.to_summary(ymd)
+            if added or rebuild or not os.path.exists(self._summary_path(ymd)):
+                with open(self._summary_path(ymd), "w", encoding="utf-8") as f:
+                    json.dump(summary, f, ensure_ascii=False, indent=2)
         return summary
 
     def get_daily_summary(self, ymd: str):
-        p = self._summary_path(ymd)
-        if not os.path.exists(p):
-            return self.compute_daily_summary(ymd)
-        with open(p, "r", encoding="utf-8") as f:
-            return json.load(f)
+        # 저장된 summary_*.json 대신 항상 체크포인트에서 이어서 집계 (오늘 요약도 최신 상태)
+        return self.compute_daily_summary(ymd)
+
+    def get_range_summary(self, from_ymd: str, to_ymd: str, max_days=366):
+        """여러 날짜 요약 병합 (from/to 포함, YYYY-MM-DD)"""
+        start = datetime.strptime(from_ymd, "%Y-%m-%d")
+        end = datetime.strptime(to_ymd, "%Y-%m-%d")
+        if end < start:
+            raise ValueError("to가 from보다 앞설 수 없습니다")
+        if (end - start).days + 1 > max_days:
+            raise ValueError(f"최대 {max_days}일까지 조회할 수 있습니다")
+
+        self.flush()
+        total = DailyAggregate()
+        day = start
+        with self._summary_lock:
+            while day <= end:
+                agg, _ = self._update_aggregate(day.strftime("%Y-%m-%d"))
+                total.merge(agg)
+                day += timedelta(days=1)
+        summary = total.to_summary(f"{from_ymd}~{to_ymd}")
+        summary["from"], summary["to"] = from_ymd, to_ymd
+        return summary
+
+
+_default_logger = None
+_default_lock = threading.Lock()
+
+def get_metrics_logger() -> MetricsLogger:
+    """프로세스 공용 MetricsLogger (app/brain/say_miniMax가 같은 버퍼를 사용)"""
+    global _default_logger
+    if _default_logger is None:
+        with _default_lock:
+            if _default_logger is None:
+                _default_logger = MetricsLogger()
+    return _default_logger
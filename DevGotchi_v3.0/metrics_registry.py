@@ -0,0 +1,321 @@
+# metrics_registry.py
+"""프로세스 내 실시간 메트릭 레지스트리 + Prometheus 텍스트 포맷 출력 (/metrics)
+
+MetricsLogger는 이벤트를 파일로 남기는 사후 분석용이고,
+이 모듈은 스크레이프 시점의 누적 값(카운터/게이지/히스토그램)만 메모리에 유지합니다.
+
+- 기록: 라벨 조합(child)마다 작은 락 하나만 사용 → 서로 다른 스레드/라벨은 경합하지 않음
+- 스크레이프: 카운터/게이지는 읽기만, 히스토그램은 버킷 배열 복사 동안만 락 → vision_loop가 멈추지 않음
+"""
+
+import bisect
+import math
+import threading
+import time
+
+# 초 단위 기본 버킷 (HTTP/LLM 지연)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 비전 단계별 처리 시간 (프레임당 수 ms ~ 수백 ms)
+VISION_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.02, 0.035, 0.05, 0.075, 0.1, 0.2, 0.5)
+
+
+def _fmt(value):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_str(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# ========== 라벨 조합별 값 ==========
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("value", "fn", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self.fn = None
+        self._lock = threading.Lock()
+
+    def set(self, value):
+        self.value = value  # 단순 대입은 원자적
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def set_function(self, fn):
+        """스크레이프 시점에 fn()으로 값을 계산 (큐 길이, HP 등)"""
+        self.fn = fn
+
+    def get(self):
+        if self.fn is None:
+            return self.value
+        try:
+            return float(self.fn())
+        except Exception:
+            return math.nan
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # 마지막 칸은 +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    def time(self):
+        return _Timer(self)
+
+    def snapshot(self):
+        with self._lock:  # 버킷 배열 복사만 (수 μs)
+            return list(self.counts), self.sum
+
+
+class _Timer:
+    """with histogram.labels(...).time(): ... 형태의 구간 측정"""
+
+    __slots__ = ("child", "start")
+
+    def __init__(self, child):
+        self.child = child
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.child.observe(time.perf_counter() - self.start)
+        return False
+
+
+# ========== 메트릭 패밀리 ==========
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        self._lock = threading.Lock()  # child 생성 시에만 사용
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kwargs):
+        if kwargs:
+            values = tuple(kwargs[n] for n in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name}: 라벨 {self.labelnames}가 필요합니다")
+            with self._lock:
+                child = self._children.get(key)
+                if child is None:
+                    child = self._children[key] = self._new_child()
+        return child
+
+    def _items(self):
+        return sorted(self._children.copy().items())
+
+    def render(self, out):
+        out.append(f"# HELP {self.name} {self.documentation}")
+        out.append(f"# TYPE {self.name} {self.type_name}")
+        self._render_samples(out)
+
+    def _render_samples(self, out):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def _render_samples(self, out):
+        for key, child in self._items():
+            out.append(f"{self.name}{_label_str(self.labelnames, key)} {_fmt(child.value)}")
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def set(self, value):
+        self.labels().set(value)
+
+    def inc(self, amount=1):
+        self.labels().inc(amount)
+
+    def dec(self, amount=1):
+        self.labels().dec(amount)
+
+    def set_function(self, fn):
+        self.labels().set_function(fn)
+
+    def _render_samples(self, out):
+        for key, child in self._items():
+            out.append(f"{self.name}{_label_str(self.labelnames, key)} {_fmt(child.get())}")
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _render_samples(self, out):
+        for key, child in self._items():
+            counts, total = child.snapshot()
+            cumulative = 0
+            for bound, n in zip(self.buckets + (math.inf,), counts):
+                cumulative += n
+                le = _label_str(self.labelnames, key, f'le="{_fmt(float(bound))}"')
+                out.append(f"{self.name}_bucket{le} {cumulative}")
+            labels = _label_str(self.labelnames, key)
+            out.append(f"{self.name}_sum{labels} {_fmt(total)}")
+            out.append(f"{self.name}_count{labels} {cumulative}")
+
+
+# ========== 레지스트리 ==========
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(name)
+                if metric is None:
+                    metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+        if not isinstance(metric, cls):
+            raise ValueError(f"{name}은(는) 이미 {metric.type_name}로 등록되어 있습니다")
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self):
+        """Prometheus 텍스트 노출 포맷 (version 0.0.4)"""
+        out = []
+        for name in sorted(self._metrics.copy()):
+            self._metrics[name].render(out)
+        return "\n".join(out) + "\n"
+
+
+REGISTRY = MetricsRegistry()  # 프로세스 공용 레지스트리
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+# ========== 공용 메트릭 정의 (여러 모듈이 같은 이름을 공유) ==========
+HTTP_REQUESTS = REGISTRY.counter(
+    "devgotchi_http_requests_total", "Flask 요청 수", ("method", "route", "status"))
+HTTP_LATENCY = REGISTRY.histogram(
+    "devgotchi_http_request_duration_seconds", "Flask 요청 처리 시간", ("route",))
+HTTP_OUT_LATENCY = REGISTRY.histogram(
+    "devgotchi_http_out_duration_seconds", "외부 HTTP 호출 시간", ("host", "outcome"))
+LLM_LATENCY = REGISTRY.histogram(
+    "devgotchi_llm_duration_seconds", "LLM 호출 시간", ("name", "request_type"))
+LLM_REQUESTS = REGISTRY.counter(
+    "devgotchi_llm_requests_total", "LLM 호출 수", ("name", "request_type", "outcome"))
+LLM_TOKENS = REGISTRY.counter(
+    "devgotchi_llm_tokens_total", "LLM 토큰 사용량", ("name", "direction"))
+LLM_COST = REGISTRY.counter(
+    "devgotchi_llm_cost_usd_total", "LLM 예상 비용 (USD, 단가표 기준)", ("name", "request_type"))
+LLM_BUDGET_SPENT = REGISTRY.gauge(
+    "devgotchi_llm_budget_spent_usd", "오늘 LLM 예상 비용 (USD)")
+LLM_BUDGET_LEVEL = REGISTRY.gauge(
+    "devgotchi_llm_budget_level", "LLM 예산 단계 (0 normal, 1 reduced, 2 cheap, 3 cache_only)")
+LLM_GATEWAY_STATE = REGISTRY.gauge(
+    "devgotchi_llm_circuit_state", "LLM 서킷 브레이커 상태 (0 closed, 1 half_open, 2 open)", ("model",))
+LLM_GATEWAY_TIMEOUT = REGISTRY.gauge(
+    "devgotchi_llm_timeout_seconds", "관측 p95로 정한 현재 LLM 타임아웃", ("model",))
+LLM_GATEWAY_EVENTS = REGISTRY.counter(
+    "devgotchi_llm_gateway_events_total", "LLM 게이트웨이 이벤트 (hedge/hedge_won/timeout/error/circuit_opened/short_circuit/fallback)",
+    ("model", "event"))
+LLM_ROUTE = REGISTRY.counter(
+    "devgotchi_llm_route_total", "LLM 백엔드 라우팅 (cloud/local, 이유)", ("backend", "reason"))
+CONVERSATION_TURNS = REGISTRY.counter(
+    "devgotchi_conversation_turns_total", "대화 턴 수 (채널, 요청 종류, 응답 백엔드)", ("channel", "request_type", "backend"))
+TTS_LATENCY = REGISTRY.histogram(
+    "devgotchi_tts_duration_seconds", "TTS 합성+로드 시간 (재생 제외)", ("engine",))
+STT_LATENCY = REGISTRY.histogram(
+    "devgotchi_stt_duration_seconds", "STT 인식 시간 (녹음 제외)", ("mode", "outcome"))
+VOICE_STAGE = REGISTRY.histogram(
+    "devgotchi_voice_stage_seconds", "음성 대화 턴 단계별 시간 (speech/stt/llm/tts/response)", ("stage",))
+VOICE_BARGE_IN = REGISTRY.counter(
+    "devgotchi_voice_barge_in_total", "답변 재생 중 사용자가 끼어들어 재생을 멈춘 횟수")
+VISION_FRAMES = REGISTRY.counter(
+    "devgotchi_vision_frames_total", "비전 루프 처리 프레임 수", ("result",))
+VISION_FPS = REGISTRY.gauge(
+    "devgotchi_vision_fps", "최근 1초 비전 루프 처리 속도")
+VISION_STAGE = REGISTRY.histogram(
+    "devgotchi_vision_stage_seconds", "비전 루프 단계별 처리 시간", ("stage",), buckets=VISION_BUCKETS)
+CACHE_REQUESTS = REGISTRY.counter(
+    "devgotchi_cache_requests_total", "캐시 조회 결과 (hit/miss)", ("cache", "result"))
+QUEUE_DEPTH = REGISTRY.gauge(
+    "devgotchi_queue_depth", "로거/버스 대기열 길이", ("queue",))
+GAME_STATE = REGISTRY.gauge(
+    "devgotchi_game_state", "현재 게임 상태 값", ("field",))
@@ -3,12 +3,17 @@
 
 import os
 import json
+import threading
 from datetime import datetime
+from profiler import span
 from collections import defaultdict
 
 class PostureLogger:
+    """when / save 인자와 lock 규칙은 ActivityLogger와 같음"""
+
     def __init__(self, data_dir="./data/posture_logs"):
         self.data_dir = data_dir
+        self.lock = threading.RLock()
         os.makedirs(data_dir, exist_ok=True)
         self.today_data = self._load_today_data()
     
@@ -47,6 +52,11 @@ class PostureLogger:
             }
         }
     
+    def save(self):
+        """오늘 데이터 저장 (다른 스레드의 배치 기록과 겹치지 않게)"""
+        with self.lock:
+            self._save_data()
+
     def _save_data(self):
         """데이터 저장"""
         # 날짜가 바뀌었으면 새로 시작
@@ -58,7 +68,7 @@ class PostureLogger:
         self._update_summary()
         
         filepath = self._get_today_filename()
-        with open(filepath, 'w', encoding='utf-8') as f:
+        with span("posture_logger.save"), open(filepath, 'w', encoding='utf-8') as f:
             json.dump(self.today_data, f, ensure_ascii=False, indent=2)
     
     def _update_summary(self):
@@ -92,9 +102,9 @@ class PostureLogger:
             "hourly_distribution": dict(combined_freq)
         }
     
-    def log_turtle_neck(self, duration_sec=None):
+    def log_turtle_neck(self, duration_sec=None, when=None, save=True):
         """거북목 감지 기록"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         hour = now.strftime("%H")
         
@@ -108,12 +118,13 @@ class PostureLogger:
         freq = self.today_data["turtle_neck"]["hourly_freq"]
         freq[hour] = freq.get(hour, 0) + 1
         
-        self._save_data()
+        if save:
+            self.save()
         print(f"[PostureLog] 거북목 감지 기록: {time_str}")
     
-    def log_eye_closed(self, duration_sec=None):
+    def log_eye_closed(self, duration_sec=None, when=None, save=True):
         """눈감음 감지 기록"""
-        now = datetime.now()
+        now = when or datetime.now()
         time_str = now.strftime("%H:%M:%S")
         hour = now.strftime("%H")
         
@@ -127,7 +138,8 @@ class PostureLogger:
         freq = self.today_data["eye_closed"]["hourly_freq"]
         freq[hour] = freq.get(hour, 0) + 1
         
-        self._save_data()
+        if save:
+            self.save()
         print(f"[PostureLog] 눈감음 감지 기록: {time_str}")
     
     def get_today_stats(self):
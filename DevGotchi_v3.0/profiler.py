@@ -0,0 +1,172 @@
+# profiler.py
+"""현장 성능 진단 도구 - 핫패스 구간 측정(span) + 전체 스레드 스택 샘플링 프로파일러
+
+둘 다 기본값은 꺼짐입니다.
+- span: 꺼져 있으면 공용 no-op 객체를 돌려주므로 비용은 함수 호출 1회 수준
+- 샘플러: 한 번에 하나만, 최대 PROFILER_MAX_SECONDS 동안만 실행되고 끝나면 스레드가 종료됨
+
+샘플러 출력은 flamegraph.pl / speedscope에서 바로 읽는 collapsed-stack 형식입니다.
+    thread;module:func;module:func 37
+"""
+
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+from config import Config
+from metrics_registry import REGISTRY
+
+SPAN_SECONDS = REGISTRY.histogram(
+    "devgotchi_span_seconds", "span() 구간 처리 시간 (span 활성화 시에만 기록)", ("span",),
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0))
+
+_spans_enabled = bool(getattr(Config, "PROFILER_SPANS_ENABLED", False))
+_span_stats = {}  # name -> [count, total, max] (span 활성화 중 누적)
+_span_lock = threading.Lock()
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        SPAN_SECONDS.labels(self.name).observe(elapsed)
+        with _span_lock:
+            stat = _span_stats.get(self.name)
+            if stat is None:
+                _span_stats[self.name] = [1, elapsed, elapsed]
+            else:
+                stat[0] += 1
+                stat[1] += elapsed
+                if elapsed > stat[2]:
+                    stat[2] = elapsed
+        return False
+
+
+def span(name):
+    """with span("vision.face_mesh"): ... - 비활성 상태면 아무것도 기록하지 않음"""
+    return _Span(name) if _spans_enabled else _NOOP
+
+
+def set_spans_enabled(enabled, reset=False):
+    global _spans_enabled
+    _spans_enabled = bool(enabled)
+    if reset:
+        with _span_lock:
+            _span_stats.clear()
+    print(f"[Profiler] span 측정 {'켜짐' if _spans_enabled else '꺼짐'}")
+
+
+def spans_enabled():
+    return _spans_enabled
+
+
+def span_stats():
+    """구간별 count / avg_ms / max_ms / total_ms"""
+    with _span_lock:
+        items = [(name, list(stat)) for name, stat in _span_stats.items()]
+    return {
+        name: {
+            "count": n,
+            "avg_ms": round(total / n * 1000, 3),
+            "max_ms": round(peak * 1000, 3),
+            "total_ms": round(total * 1000, 1),
+        }
+        for name, (n, total, peak) in sorted(items)
+    }
+
+
+def span_totals():
+    """구간별 누적 처리 시간 (초, 반올림 없음) - 호출 전후 차이로 한 번의 처리 시간을 구할 때 사용"""
+    with _span_lock:
+        return {name: stat[1] for name, stat in _span_stats.items()}
+
+
+# ========== 스택 샘플링 프로파일러 ==========
+class ProfilerBusy(Exception):
+    """이미 다른 프로파일이 실행 중"""
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    module = os.path.splitext(os.path.basename(code.co_filename))[0]
+    return f"{module}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """sys._current_frames()로 모든 스레드의 스택을 주기적으로 수집
+
+    대상 스레드를 멈추거나 트레이스 훅을 걸지 않으므로 샘플 간격만큼의 GIL 점유만 발생합니다.
+    """
+
+    def __init__(self, max_seconds=None):
+        self.max_seconds = max_seconds or getattr(Config, "PROFILER_MAX_SECONDS", 30)
+        self._lock = threading.Lock()
+        self.last_result = None
+
+    def is_running(self):
+        return self._lock.locked()
+
+    def profile(self, seconds=5.0, interval=0.01):
+        """seconds 동안 interval 간격으로 샘플링 → (collapsed 문자열, 샘플 수)
+
+        호출한 스레드에서 실행되며 끝날 때까지 블로킹합니다.
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusy("이미 프로파일링 중입니다")
+        try:
+            seconds = min(max(float(seconds), 0.1), self.max_seconds)
+            interval = min(max(float(interval), 0.001), 1.0)
+            stacks = Counter()
+            me = threading.get_ident()
+            names = {}
+            samples = 0
+            deadline = time.monotonic() + seconds
+            print(f"[Profiler] 샘플링 시작 ({seconds:.1f}s, {interval * 1000:.0f}ms 간격)")
+
+            while time.monotonic() < deadline:
+                if len(names) != threading.active_count():
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == me:
+                        continue
+                    parts = []
+                    while frame is not None:
+                        parts.append(_frame_label(frame))
+                        frame = frame.f_back
+                    parts.append(names.get(ident, f"thread-{ident}"))
+                    stacks[";".join(reversed(parts))] += 1
+                samples += 1
+                time.sleep(interval)
+
+            collapsed = "\n".join(f"{stack} {n}" for stack, n in stacks.most_common()) + "\n"
+            self.last_result = collapsed
+            print(f"[Profiler] 샘플링 종료 (샘플 {samples}회, 고유 스택 {len(stacks)}개)")
+            return collapsed, samples
+        finally:
+            self._lock.release()
+
+
+profiler = SamplingProfiler()  # 프로세스 공용 (동시 실행 1개 제한을 공유)
@@ -2,9 +2,9 @@ import os
 import time
 import io
 import uuid
-import requests
 import json
 import re
+from collections import deque
 import speech_recognition as sr
 from gtts import gTTS
 import pygame
@@ -15,6 +15,12 @@ from rich.live import Live
 from rich.spinner import Spinner
 from rich.align import Align
 from dotenv import load_dotenv
+from config import Config
+from conversation import ConversationService, ConversationStore, parse_reply
+from instrumentation import http_session
+from metrics_registry import TTS_LATENCY, STT_LATENCY
+from profiler import span
+from voice_pipeline import BufferedTranscriber, PhraseSegmenter, VoicePipeline
 
 # 1. 초기화 및 설정
 load_dotenv(override=True)
@@ -25,9 +31,21 @@ MODEL_NAME = os.getenv("MINIMAX_MODEL", "MiniMax-M2.1").strip()
 WEATHER_API_KEY = os.getenv("OPENWEATHER_API_KEY", "").strip()
 
 console = Console()
-pygame.mixer.init()
 
-telemetry_logs = []
+def init_audio():
+    """pygame 오디오 장치 초기화 (import 시점이 아니라 첫 재생/서브시스템 로딩 때)"""
+    if not pygame.mixer.get_init():
+        pygame.mixer.init()
+
+# 웨이크 워드 변형: 발음이 비슷하게 인식될 수 있는 다양한 단어들 (긴 것부터 - 호출어 뒤 문장 분리용)
+WAKE_WORDS = sorted([
+    "데브", "고치", "데이브", "대부",  # 기존
+    "데브고치", "데부", "데프", "대브", "데뷔", "대비", "대불",  # 발음 변형
+    "개발", "고치야", "데브야", "데이비", "헤이", "야",  # 추가 변형
+    "dev", "고찌", "대부님", "대비야", "더브", "뎁"  # 추가 변형
+], key=len, reverse=True)
+
+telemetry_logs = deque(maxlen=100)  # 최근 응답 기록만 유지 (상세 지표는 MetricsLogger에 저장)
 
 # [추가] 날씨 정보 가져오기 함수
 def get_weather(city="Sacheon-si"):
@@ -37,7 +55,7 @@ def get_weather(city="Sacheon-si"):
     # 한국어 출력을 위해 lang=kr 사용
     url = f"http://api.openweathermap.org/data/2.5/weather?q={city}&appid={WEATHER_API_KEY}&units=metric&lang=kr"
     try:
-        response = requests.get(url, timeout=5)
+        response = http_session.get(url, timeout=5)
         data = response.json()
         if data.get("cod") == 200:
             return {
@@ -53,20 +71,37 @@ def get_weather(city="Sacheon-si"):
     except Exception as e:
         return {"error": str(e)}
 
-def speak(text):
-    if not text.strip(): return
+def synthesize(text):
+    """TTS 음성(mp3 바이트)만 미리 생성 - 오디오 장치 없이도 가능 (부팅 브리핑 선렌더링)"""
     forbidden = ["싱크", "부드럽게", "규칙", "분석", "스타일", "상황", "payload", "API"]
     clean_text = " ".join([l for l in text.split('\n') if not any(k in l for k in forbidden)]).strip()
     
-    try:
+    t0 = time.perf_counter()
+    with span("tts.synthesize"):
         tts = gTTS(text=clean_text if clean_text else text, lang='ko')
         fp = io.BytesIO()
         tts.write_to_fp(fp)
-        fp.seek(0)
-        pygame.mixer.music.load(fp)
-        pygame.mixer.music.play()
+    TTS_LATENCY.labels("gtts").observe(time.perf_counter() - t0)  # 합성만 (재생 시간 제외)
+    return fp.getvalue()
+
+def play(audio):
+    """synthesize()로 만든 음성 재생 (끝날 때까지 대기)"""
+    init_audio()
+    pygame.mixer.music.load(io.BytesIO(audio))
+    pygame.mixer.music.play()
+    with span("tts.play"):
         while pygame.mixer.music.get_busy():
             time.sleep(0.05)
+
+def stop_playback():
+    """재생 중단 (다른 스레드에서 호출 - play()의 대기 루프가 바로 끝남)"""
+    if pygame.mixer.get_init():
+        pygame.mixer.music.stop()
+
+def speak(text):
+    if not text.strip(): return
+    try:
+        play(synthesize(text))
     except Exception as e:
         console.print(f"[red]음성 에러: {e}[/red]")
 
@@ -92,7 +127,13 @@ def listen(r, source, mode="WAKE"):
         if audio_size < 1000:
             console.print(f"[bold yellow]⚠ [WARNING] 오디오 데이터가 너무 작습니다 ({audio_size} bytes) - 마이크 입력이 약하거나 없음[/bold yellow]")
         
-        text = r.recognize_google(audio, language="ko-KR")
+        t0 = time.perf_counter()
+        try:
+            text = r.recognize_google(audio, language="ko-KR")
+        except sr.UnknownValueError:
+            STT_LATENCY.labels(mode, "no_speech").observe(time.perf_counter() - t0)
+            raise
+        STT_LATENCY.labels(mode, "ok").observe(time.perf_counter() - t0)
         
         # 모든 인식된 텍스트 출력 (디버그용)
         console.print(f"[bold cyan]🔊 [DEBUG] 인식된 음성: '{text}'[/bold cyan]")
@@ -126,7 +167,7 @@ def update_ui_function(task_type, content, target_time):
             console.print(f"[bold yellow][DEBUG] 파싱된 분: {minutes}, 모드: {mode}[/bold yellow]")
             
             # Flask 서버에 타이머 설정 요청
-            resp = requests.post("http://127.0.0.1:5000/api/timer/set", 
+            resp = http_session.post("http://127.0.0.1:5000/api/timer/set", 
                          json={"minutes": minutes, "auto_start": True, "mode": mode}, 
                          timeout=3)
             console.print(f"[bold yellow][DEBUG] Flask 응답: {resp.status_code}, {resp.text}[/bold yellow]")
@@ -154,7 +195,7 @@ def update_ui_function(task_type, content, target_time):
             # 날짜 파싱
             date_val = parse_reminder_time(target_time)
             console.print(f"[dim blue]   -> 파싱된 최종 날짜: {date_val}[/dim blue]")
-            requests.post("http://127.0.0.1:5000/api/schedule/set", 
+            http_session.post("http://127.0.0.1:5000/api/schedule/set", 
                          json={
                              "date": date_val, 
                              "title": title,
@@ -169,7 +210,7 @@ def update_ui_function(task_type, content, target_time):
         console.print(f"[bold red]🗑️ [UI 연동] 일정 삭제 요청: {content}일[/bold red]")
         try:
             date_val = parse_reminder_time(content)
-            requests.post("http://127.0.0.1:5000/api/schedule/delete", 
+            http_session.post("http://127.0.0.1:5000/api/schedule/delete", 
                          json={"date": date_val}, 
                          timeout=3)
             console.print(f"[bold green]✓ {date_val} 일정 삭제 완료![/bold green]")
@@ -312,294 +353,305 @@ def parse_time_to_minutes(time_str):
     console.print(f"[dim yellow][DEBUG] 시간 파싱 실패: '{time_str}' -> None 반환[/dim yellow]")
     return None
 
-def call_minimax_standard(user_input, history):
-    url = f"{BASE_URL}/chat/completions"
-    headers = {
-        "Authorization": f"Bearer {API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
-    # [수정] 페르소나 및 응답 규칙 극단적 강화
-    system_instruction = (
-        "당신은 스마트 미러 비서 '데브고치'입니다. "
-        "규칙 1: 절대 '명령어', '커맨드', '[COMMAND...]', '시스템' 등 내부 작동 방식을 설명하거나 언급하지 마세요.\n"
-        "규칙 2: 사용자의 요청에 대해 친절하고 자연스럽게 대답만 하세요. (예: '네, 5분 타이머 시작하겠습니다!')\n"
-        "규칙 3: 모든 특수 기능은 아래의 형식을 '답변 끝에' 조용히 포함하되, 말로 내뱉지는 마세요.\n"
-        "- 날씨 조회: [COMMAND:WEATHER:도시명]\n"
-        "- 카운트다운: [COMMAND:TIMER:시간:DOWN]\n"
-        "- 카운트업: [COMMAND:TIMER:시간:UP]\n"
-        "- 타이머 종료: [COMMAND:TIMER:0:RESET]\n"
-        "- 일정 등록: [COMMAND:REMINDER:날짜:시간:장소:내용] (예: [COMMAND:REMINDER:내일:14시:회의실:부서 회의])\n"
-        "  - 시간이나 장소가 없으면 빈 값으로 두세요 (예: [COMMAND:REMINDER:내일:::병원 가기])\n"
-        "- 일정 삭제: [COMMAND:DELETE_REMINDER:날짜]\n"
-        "🚨필독🚨: 명령어 대괄호[] 안에 '날짜', '내용', '할일', '도시명' 같은 예시 단어를 쓰면 절대 안 됩니다. \n"
-        "반드시 사용자가 말한 실제 도시(예: Seoul, Busan)나 실제 내용(예: 치과 가기)을 넣으세요.\n"
-        "당신의 가장 큰 실수는 [COMMAND:WEATHER:도시명]과 같이 적는 것입니다. 반드시 [COMMAND:WEATHER:Busan]과 같이 실제 도시를 넣으세요."
-    )
-    
-    # [News Injection Check]
-    if "뉴스" in user_input or "소식" in user_input:
-        try:
-            # Fetch from local Flask API
-            news_res = requests.get(f"http://127.0.0.1:5000/api/news/get", timeout=3)
-            if news_res.status_code == 200:
-                news_text = news_res.json().get("result", "")
-                system_instruction += f"\n\n[SYSTEM INFO] Real-time News: {news_text}\nUser asks for news. Summarize this briefly and professionally."
-                print(f"[Voice] News injected: {news_text[:30]}...")
-        except Exception as e:
-            print(f"[Voice] Failed to fetch news: {e}")
-
-
-    formatted_messages = [{"role": "system", "content": system_instruction}]
-    for h in history:
-        role = "assistant" if h["sender_type"] == "BOT" else "user"
-        formatted_messages.append({"role": role, "content": h["text"]})
-    formatted_messages.append({"role": "user", "content": user_input})
-    
-    payload = {
-        "model": MODEL_NAME,
-        "messages": formatted_messages,
-        "max_tokens": 512,
-        "temperature": 0.7
-    }
-    
+def apply_commands(user_input, raw_content):
+    """LLM 원문의 [COMMAND:...]와 사용자 발화 키워드로 타이머/일정/날씨 실행 → 화면/음성용 최종 답변
+    (conversation.ConversationService의 command_handler - 음성/웹 공용)"""
     try:
-        response = requests.post(url, headers=headers, json=payload, timeout=15)
-        res_json = response.json()
+        # [수정] 명령어 패턴 파싱 로직을 먼저 수행하여 match 변수 정의
+        command_pattern = r"\[COMMAND:(\w+):(.*?)\]"
+        match = re.search(command_pattern, raw_content)
 
-        if response.status_code == 200:
-            raw_content = res_json['choices'][0]['message']['content']
-            tokens = res_json.get('usage', {}).get('total_tokens', 0)
-            
-            # [수정] 명령어 패턴 파싱 로직을 먼저 수행하여 match 변수 정의
-            command_pattern = r"\[COMMAND:(\w+):(.*?)\]"
-            match = re.search(command_pattern, raw_content)
-
-            # [강력 수정] AI가 명령어를 빼먹어도 키워드 기반으로 강제 처리 (Heuristic)
-            u_clean = user_input.replace(" ", "")
-            is_timer_req = "타이머" in u_clean or "카운트" in u_clean
-            
-            # 사용자 발화에서 시간 추출 시도 (가장 최우선)
-            extracted_mins = parse_time_to_minutes(user_input)
-            
-            if is_timer_req:
-                if any(k in u_clean for k in ["종료", "중지", "꺼", "멈춰", "리셋", "초기화", "그만", "끝내"]):
-                    console.print("[bold yellow]⚠ 키워드 감지: 타이머 종료 실행[/bold yellow]")
-                    update_ui_function("TIMER", "RESET", "0")
-                elif any(k in u_clean for k in ["카운트업", "숫자커지게", "숫자늘려", "올려줘"]):
-                    # 이미 match가 있는 경우는 아래 match 로직에서 처리됨 (단, 시간 override 필요)
-                    if not match:
-                        t_val = str(extracted_mins) if extracted_mins is not None else "5"
-                        console.print(f"[bold yellow]⚠ 키워드 감지: 카운트업 실행 ({t_val}분)[/bold yellow]")
-                        update_ui_function("TIMER", "UP", t_val)
+        # [강력 수정] AI가 명령어를 빼먹어도 키워드 기반으로 강제 처리 (Heuristic)
+        u_clean = user_input.replace(" ", "")
+        is_timer_req = "타이머" in u_clean or "카운트" in u_clean
+        
+        # 사용자 발화에서 시간 추출 시도 (가장 최우선)
+        extracted_mins = parse_time_to_minutes(user_input)
+        
+        if is_timer_req:
+            if any(k in u_clean for k in ["종료", "중지", "꺼", "멈춰", "리셋", "초기화", "그만", "끝내"]):
+                console.print("[bold yellow]⚠ 키워드 감지: 타이머 종료 실행[/bold yellow]")
+                update_ui_function("TIMER", "RESET", "0")
+            elif any(k in u_clean for k in ["카운트업", "숫자커지게", "숫자늘려", "올려줘"]):
+                # 이미 match가 있는 경우는 아래 match 로직에서 처리됨 (단, 시간 override 필요)
+                if not match:
+                    t_val = str(extracted_mins) if extracted_mins is not None else "5"
+                    console.print(f"[bold yellow]⚠ 키워드 감지: 카운트업 실행 ({t_val}분)[/bold yellow]")
+                    update_ui_function("TIMER", "UP", t_val)
+        
+        # [추가] 일정 삭제 키워드 직접 감지
+        if "일정" in u_clean and any(k in u_clean for k in ["지워", "제거", "없애", "삭제", "취소"]):
+            # 날짜 추측 (오늘이 기본)
+            date_hint = "오늘"
+            if "내일" in u_clean: date_hint = "내일"
+            elif "어제" in u_clean: date_hint = "어제"
+            month_day = re.search(r'(\d+)월(\d+)일', u_clean)
+            if month_day:
+                date_hint = f"{month_day.group(1)}월{month_day.group(2)}일"
             
-            # [추가] 일정 삭제 키워드 직접 감지
-            if "일정" in u_clean and any(k in u_clean for k in ["지워", "제거", "없애", "삭제", "취소"]):
-                # 날짜 추측 (오늘이 기본)
+            console.print(f"[bold red]🗑️ 키워드 감지: {date_hint} 일정 삭제 시도[/bold red]")
+            update_ui_function("SCHEDULE_DELETE", date_hint, "")
+        
+        # [추가] 일정 등록 키워드 직접 감지 (Heuristic fallback)
+        elif any(k in u_clean for k in ["등록", "추가", "기록", "할일"]):
+            if not match:
+                # 날짜 추측
                 date_hint = "오늘"
                 if "내일" in u_clean: date_hint = "내일"
-                elif "어제" in u_clean: date_hint = "어제"
                 month_day = re.search(r'(\d+)월(\d+)일', u_clean)
                 if month_day:
                     date_hint = f"{month_day.group(1)}월{month_day.group(2)}일"
                 
-                console.print(f"[bold red]🗑️ 키워드 감지: {date_hint} 일정 삭제 시도[/bold red]")
-                update_ui_function("SCHEDULE_DELETE", date_hint, "")
+                # 시간 추출 (예: 10시, 오후 2시)
+                time_hint = ""
+                time_match = re.search(r'(오전|오후)?\s*(\d+)시(?:\s*(\d+)분)?', user_input)
+                if time_match:
+                    ampm = time_match.group(1) or ""
+                    hour = time_match.group(2)
+                    minute = time_match.group(3) or "00"
+                    time_hint = f"{ampm} {hour}시 {minute}분".strip()
+                
+                # 장소 추출 (예: ~회의실, ~에서)
+                location_hint = ""
+                location_match = re.search(r'([가-힣A-Za-z0-9]+(?:회의실|사무실|카페|병원|은행|센터|실|관))(?:에서?)?', user_input)
+                if location_match:
+                    location_hint = location_match.group(1)
+                
+                # 내용 추출 (나머지)
+                content_hint = user_input
+                for remove_word in ["일정", "등록해줘", "추가해줘", "해줘", date_hint, time_hint, location_hint]:
+                    if remove_word:
+                        content_hint = content_hint.replace(remove_word, "")
+                content_hint = content_hint.strip()
+                if not content_hint:
+                    content_hint = "일정"
+                
+                console.print(f"[bold blue]💡 키워드 감지: '{date_hint}'에 '{content_hint}' 등록 시도 (시간: {time_hint}, 장소: {location_hint})[/bold blue]")
+                
+                content_dict = {
+                    "title": content_hint,
+                    "time": time_hint,
+                    "location": location_hint
+                }
+                update_ui_function("REMINDER", content_dict, date_hint)
+
+        # [추가] 일반 타이머 설정(카운트 다운)에 대한 Heuristic Fallback
+        if is_timer_req and not match:
+            # "10분 타이머", "1시간 반 뒤에 알려줘" 등
+            # 위에서 카운트업/리셋은 이미 처리했으므로, 여기서는 다운(설정)만 처리
+            if not any(k in u_clean for k in ["카운트업", "숫자커지게", "리셋", "종료", "취소"]):
+                console.print("[dim yellow]⚠ AI 명령어 누락 -> 사용자 발화에서 시간 추출 시도[/dim yellow]")
+                t_val = str(extracted_mins) if extracted_mins is not None else "5"
+                console.print(f"[bold magenta]⏳ [Fallback] {t_val}분 타이머 자동 설정[/bold magenta]")
+                update_ui_function("TIMER", "DOWN", t_val)
+
+        clean_answer = raw_content
+        if match:
+            raw_cmd = match.group(0)
+            cmd_type = match.group(1)
+            cmd_data = match.group(2).split(':')
             
-            # [추가] 일정 등록 키워드 직접 감지 (Heuristic fallback)
-            elif any(k in u_clean for k in ["등록", "추가", "기록", "할일"]):
-                if not match:
-                    # 날짜 추측
-                    date_hint = "오늘"
-                    if "내일" in u_clean: date_hint = "내일"
+            # 디버그용 로그 출력
+            console.print(f"[dim yellow][RAW CMD] {raw_cmd}[/dim yellow]")
+            
+            if cmd_type == "TIMER":
+                # 각 데이터 항목에서 공백 제거
+                t_val = cmd_data[0].strip() if len(cmd_data) > 0 else "5"
+                t_mode = cmd_data[1].strip().upper() if len(cmd_data) > 1 else "DOWN"
+                
+                # [Override] 사용자 발화에서 직접 시간이 추출되었다면 AI 결과 무시하고 덮어쓰기
+                if extracted_mins is not None and t_mode != "RESET":
+                     console.print(f"[bold cyan]🎯 사용자 발화 시간 우선 적용: {t_val} -> {extracted_mins}[/bold cyan]")
+                     t_val = str(extracted_mins)
+
+                # [추가] 사용자의 발화에 '카운트 업' 관련 키워드가 있으면 강제로 UP 모드 적용
+                if any(k in u_clean for k in ["카운트업", "숫자커지게", "숫자늘려", "올려줘"]):
+                    t_mode = "UP"
+                # [추가] 종료 관련이면 강제로 RESET
+                if any(k in u_clean for k in ["종료", "중지", "꺼", "멈춰", "리셋", "초기화", "그만"]):
+                    t_mode = "RESET"
+                    t_val = "0"
+                
+                update_ui_function("TIMER", t_mode, t_val)
+            elif cmd_type == "REMINDER":
+                # 확장된 형식: [COMMAND:REMINDER:날짜:시간:장소:내용]
+                date_val = cmd_data[0].strip() if len(cmd_data) > 0 else "오늘"
+                time_val = cmd_data[1].strip() if len(cmd_data) > 1 else ""
+                location_val = cmd_data[2].strip() if len(cmd_data) > 2 else ""
+                text_val = cmd_data[3].strip() if len(cmd_data) > 3 else ""
+                
+                # 이전 형식 호환 (날짜:내용만 있는 경우)
+                if len(cmd_data) == 2:
+                    text_val = time_val
+                    time_val = ""
+                    location_val = ""
+                
+                # [강력 수정] AI가 플레이스홀더를 그대로 썼을 경우 Heuristic 적용
+                if date_val in ["날짜", "일정"] or text_val in ["내용", "할일", ""]:
+                    console.print("[bold red]⚠ AI가 플레이스홀더를 그대로 사용함 -> Heuristic 전환[/bold red]")
+                    # 날짜 추출
                     month_day = re.search(r'(\d+)월(\d+)일', u_clean)
-                    if month_day:
-                        date_hint = f"{month_day.group(1)}월{month_day.group(2)}일"
+                    if month_day: date_val = f"{month_day.group(1)}월{month_day.group(2)}일"
+                    elif "내일" in u_clean: date_val = "내일"
+                    elif "오늘" in u_clean: date_val = "오늘"
                     
                     # 시간 추출 (예: 10시, 오후 2시)
-                    time_hint = ""
                     time_match = re.search(r'(오전|오후)?\s*(\d+)시(?:\s*(\d+)분)?', user_input)
                     if time_match:
                         ampm = time_match.group(1) or ""
                         hour = time_match.group(2)
                         minute = time_match.group(3) or "00"
-                        time_hint = f"{ampm} {hour}시 {minute}분".strip()
+                        time_val = f"{ampm} {hour}시 {minute}분".strip()
                     
-                    # 장소 추출 (예: ~회의실, ~에서)
-                    location_hint = ""
+                    # 장소 추출 (예: ~에서, ~에)
                     location_match = re.search(r'([가-힣A-Za-z0-9]+(?:회의실|사무실|카페|병원|은행|센터|실|관))(?:에서?)?', user_input)
                     if location_match:
-                        location_hint = location_match.group(1)
+                        location_val = location_match.group(1)
                     
                     # 내용 추출 (나머지)
-                    content_hint = user_input
-                    for remove_word in ["일정", "등록해줘", "추가해줘", "해줘", date_hint, time_hint, location_hint]:
+                    text_val = user_input
+                    for remove_word in ["일정", "등록해줘", "추가해줘", "해줘", date_val, time_val, location_val]:
                         if remove_word:
-                            content_hint = content_hint.replace(remove_word, "")
-                    content_hint = content_hint.strip()
-                    if not content_hint:
-                        content_hint = "일정"
-                    
-                    console.print(f"[bold blue]💡 키워드 감지: '{date_hint}'에 '{content_hint}' 등록 시도 (시간: {time_hint}, 장소: {location_hint})[/bold blue]")
-                    
-                    content_dict = {
-                        "title": content_hint,
-                        "time": time_hint,
-                        "location": location_hint
-                    }
-                    update_ui_function("REMINDER", content_dict, date_hint)
-
-            # [추가] 일반 타이머 설정(카운트 다운)에 대한 Heuristic Fallback
-            if is_timer_req and not match:
-                # "10분 타이머", "1시간 반 뒤에 알려줘" 등
-                # 위에서 카운트업/리셋은 이미 처리했으므로, 여기서는 다운(설정)만 처리
-                if not any(k in u_clean for k in ["카운트업", "숫자커지게", "리셋", "종료", "취소"]):
-                    console.print("[dim yellow]⚠ AI 명령어 누락 -> 사용자 발화에서 시간 추출 시도[/dim yellow]")
-                    t_val = str(extracted_mins) if extracted_mins is not None else "5"
-                    console.print(f"[bold magenta]⏳ [Fallback] {t_val}분 타이머 자동 설정[/bold magenta]")
-                    update_ui_function("TIMER", "DOWN", t_val)
-
-            clean_answer = raw_content
-            if match:
-                raw_cmd = match.group(0)
-                cmd_type = match.group(1)
-                cmd_data = match.group(2).split(':')
+                            text_val = text_val.replace(remove_word, "")
+                    text_val = text_val.strip()
+                    if not text_val:
+                        text_val = "일정"
                 
-                # 디버그용 로그 출력
-                console.print(f"[dim yellow][RAW CMD] {raw_cmd}[/dim yellow]")
+                # content를 dict 형태로 전달
+                content_dict = {
+                    "title": text_val,
+                    "time": time_val,
+                    "location": location_val
+                }
+                update_ui_function("REMINDER", content_dict, date_val)
+            elif cmd_type == "DELETE_REMINDER":
+                date_val = cmd_data[0].strip() if len(cmd_data) > 0 else "오늘"
+                if date_val == "날짜":
+                    month_day = re.search(r'(\d+)월(\d+)일', u_clean)
+                    if month_day: date_val = f"{month_day.group(1)}월{month_day.group(2)}일"
+                update_ui_function("SCHEDULE_DELETE", date_val, "")
+            elif cmd_type == "WEATHER":
+                raw_city = cmd_data[0].strip() if len(cmd_data) > 0 and cmd_data[0] else "Seoul"
                 
-                if cmd_type == "TIMER":
-                    # 각 데이터 항목에서 공백 제거
-                    t_val = cmd_data[0].strip() if len(cmd_data) > 0 else "5"
-                    t_mode = cmd_data[1].strip().upper() if len(cmd_data) > 1 else "DOWN"
-                    
-                    # [Override] 사용자 발화에서 직접 시간이 추출되었다면 AI 결과 무시하고 덮어쓰기
-                    if extracted_mins is not None and t_mode != "RESET":
-                         console.print(f"[bold cyan]🎯 사용자 발화 시간 우선 적용: {t_val} -> {extracted_mins}[/bold cyan]")
-                         t_val = str(extracted_mins)
-
-                    # [추가] 사용자의 발화에 '카운트 업' 관련 키워드가 있으면 강제로 UP 모드 적용
-                    if any(k in u_clean for k in ["카운트업", "숫자커지게", "숫자늘려", "올려줘"]):
-                        t_mode = "UP"
-                    # [추가] 종료 관련이면 강제로 RESET
-                    if any(k in u_clean for k in ["종료", "중지", "꺼", "멈춰", "리셋", "초기화", "그만"]):
-                        t_mode = "RESET"
-                        t_val = "0"
-                    
-                    update_ui_function("TIMER", t_mode, t_val)
-                elif cmd_type == "REMINDER":
-                    # 확장된 형식: [COMMAND:REMINDER:날짜:시간:장소:내용]
-                    date_val = cmd_data[0].strip() if len(cmd_data) > 0 else "오늘"
-                    time_val = cmd_data[1].strip() if len(cmd_data) > 1 else ""
-                    location_val = cmd_data[2].strip() if len(cmd_data) > 2 else ""
-                    text_val = cmd_data[3].strip() if len(cmd_data) > 3 else ""
-                    
-                    # 이전 형식 호환 (날짜:내용만 있는 경우)
-                    if len(cmd_data) == 2:
-                        text_val = time_val
-                        time_val = ""
-                        location_val = ""
-                    
-                    # [강력 수정] AI가 플레이스홀더를 그대로 썼을 경우 Heuristic 적용
-                    if date_val in ["날짜", "일정"] or text_val in ["내용", "할일", ""]:
-                        console.print("[bold red]⚠ AI가 플레이스홀더를 그대로 사용함 -> Heuristic 전환[/bold red]")
-                        # 날짜 추출
-                        month_day = re.search(r'(\d+)월(\d+)일', u_clean)
-                        if month_day: date_val = f"{month_day.group(1)}월{month_day.group(2)}일"
-                        elif "내일" in u_clean: date_val = "내일"
-                        elif "오늘" in u_clean: date_val = "오늘"
-                        
-                        # 시간 추출 (예: 10시, 오후 2시)
-                        time_match = re.search(r'(오전|오후)?\s*(\d+)시(?:\s*(\d+)분)?', user_input)
-                        if time_match:
-                            ampm = time_match.group(1) or ""
-                            hour = time_match.group(2)
-                            minute = time_match.group(3) or "00"
-                            time_val = f"{ampm} {hour}시 {minute}분".strip()
-                        
-                        # 장소 추출 (예: ~에서, ~에)
-                        location_match = re.search(r'([가-힣A-Za-z0-9]+(?:회의실|사무실|카페|병원|은행|센터|실|관))(?:에서?)?', user_input)
-                        if location_match:
-                            location_val = location_match.group(1)
-                        
-                        # 내용 추출 (나머지)
-                        text_val = user_input
-                        for remove_word in ["일정", "등록해줘", "추가해줘", "해줘", date_val, time_val, location_val]:
-                            if remove_word:
-                                text_val = text_val.replace(remove_word, "")
-                        text_val = text_val.strip()
-                        if not text_val:
-                            text_val = "일정"
-                    
-                    # content를 dict 형태로 전달
-                    content_dict = {
-                        "title": text_val,
-                        "time": time_val,
-                        "location": location_val
-                    }
-                    update_ui_function("REMINDER", content_dict, date_val)
-                elif cmd_type == "DELETE_REMINDER":
-                    date_val = cmd_data[0].strip() if len(cmd_data) > 0 else "오늘"
-                    if date_val == "날짜":
-                        month_day = re.search(r'(\d+)월(\d+)일', u_clean)
-                        if month_day: date_val = f"{month_day.group(1)}월{month_day.group(2)}일"
-                    update_ui_function("SCHEDULE_DELETE", date_val, "")
-                elif cmd_type == "WEATHER":
-                    raw_city = cmd_data[0].strip() if len(cmd_data) > 0 and cmd_data[0] else "Seoul"
-                    
-                    # [강력 수정] AI가 '도시명'을 썼거나, 도시명을 제대로 못 뽑았을 경우를 위한 통합 Heuristic
-                    city_name = raw_city
-                    if any(k in raw_city for k in ["도시명", "미정", "지역", "어디"]):
-                        console.print("[bold red]⚠ AI가 플레이스홀더 사용 혹은 도시명 추출 실패 -> Heuristic 전환[/bold red]")
-                        city_name = "Seoul" # 기본값
-                    
-                    # 발화 내용에서 실제 지명 찾기 (가장 정확)
-                    if "서울" in u_clean or "Seoul" in user_input: city_name = "Seoul"
-                    elif "부산" in u_clean or "Busan" in user_input: city_name = "Busan"
-                    elif "사천" in u_clean or "Sacheon" in user_input: city_name = "Sacheon-si"
-                    elif "인천" in u_clean or "Incheon" in user_input: city_name = "Incheon"
-                    elif "대구" in u_clean or "Daegu" in user_input: city_name = "Daegu"
-                    elif "대전" in u_clean or "Daejeon" in user_input: city_name = "Daejeon"
-                    
-                    # 만약 AI가 한글로 "부산"이라고만 보냈을 경우를 대비한 매핑
-                    city_map = {"서울": "Seoul", "부산": "Busan", "사천": "Sacheon-si", "인천": "Incheon"}
-                    if city_name in city_map: city_name = city_map[city_name]
+                # [강력 수정] AI가 '도시명'을 썼거나, 도시명을 제대로 못 뽑았을 경우를 위한 통합 Heuristic
+                city_name = raw_city
+                if any(k in raw_city for k in ["도시명", "미정", "지역", "어디"]):
+                    console.print("[bold red]⚠ AI가 플레이스홀더 사용 혹은 도시명 추출 실패 -> Heuristic 전환[/bold red]")
+                    city_name = "Seoul" # 기본값
+                
+                # 발화 내용에서 실제 지명 찾기 (가장 정확)
+                if "서울" in u_clean or "Seoul" in user_input: city_name = "Seoul"
+                elif "부산" in u_clean or "Busan" in user_input: city_name = "Busan"
+                elif "사천" in u_clean or "Sacheon" in user_input: city_name = "Sacheon-si"
+                elif "인천" in u_clean or "Incheon" in user_input: city_name = "Incheon"
+                elif "대구" in u_clean or "Daegu" in user_input: city_name = "Daegu"
+                elif "대전" in u_clean or "Daejeon" in user_input: city_name = "Daejeon"
+                
+                # 만약 AI가 한글로 "부산"이라고만 보냈을 경우를 대비한 매핑
+                city_map = {"서울": "Seoul", "부산": "Busan", "사천": "Sacheon-si", "인천": "Incheon"}
+                if city_name in city_map: city_name = city_map[city_name]
 
-                    console.print(f"[dim yellow][DEBUG] 최종 결정된 도시: {city_name} (입력값: {raw_city})[/dim yellow]")
-                    weather_res = get_weather(city_name)
-                    
-                    if "error" not in weather_res:
-                        # 1. 화면 위젯 업데이트를 위해 API 호출
-                        try:
-                            requests.post("http://127.0.0.1:5000/api/weather/update", json=weather_res, timeout=3)
-                        except: pass
-                        
-                        # 2. 음성 응답용 텍스트 생성
-                        w_text = f"현재 {city_name}의 기온은 {weather_res['temp']}도이며, {weather_res['condition']} 상태입니다."
-                        clean_answer = f"{w_text} {re.sub(command_pattern, '', raw_content).strip()}"
-                        update_ui_function("WEATHER", city_name, "")
-                    else:
-                        clean_answer = f"죄송합니다. {city_name}의 날씨 정보를 가져오지 못했습니다. {weather_res['error']}"
+                console.print(f"[dim yellow][DEBUG] 최종 결정된 도시: {city_name} (입력값: {raw_city})[/dim yellow]")
+                weather_res = get_weather(city_name)
                 
-            # 모든 COMMAND 패턴, 생각(think) 태그 및 남은 대괄호 패턴 강제 제거
-            clean_answer = re.sub(r"<think>.*?</think>", "", clean_answer, flags=re.DOTALL)
-            clean_answer = re.sub(r"\[COMMAND:.*?\]", "", clean_answer)
-            clean_answer = re.sub(r"\[.*?\]", "", clean_answer)
-            clean_answer = clean_answer.replace("COMMAND:", "").strip()
+                if "error" not in weather_res:
+                    # 1. 화면 위젯 업데이트를 위해 API 호출
+                    try:
+                        http_session.post("http://127.0.0.1:5000/api/weather/update", json=weather_res, timeout=3)
+                    except: pass
+                    
+                    # 2. 음성 응답용 텍스트 생성
+                    w_text = f"현재 {city_name}의 기온은 {weather_res['temp']}도이며, {weather_res['condition']} 상태입니다."
+                    clean_answer = f"{w_text} {re.sub(command_pattern, '', raw_content).strip()}"
+                    update_ui_function("WEATHER", city_name, "")
+                else:
+                    clean_answer = f"죄송합니다. {city_name}의 날씨 정보를 가져오지 못했습니다. {weather_res['error']}"
+            
+        # 모든 COMMAND 패턴, 생각(think) 태그 및 남은 대괄호 패턴 강제 제거
+        clean_answer = re.sub(r"<think>.*?</think>", "", clean_answer, flags=re.DOTALL)
+        clean_answer = re.sub(r"\[COMMAND:.*?\]", "", clean_answer)
+        clean_answer = re.sub(r"\[.*?\]", "", clean_answer)
+        clean_answer = clean_answer.replace("COMMAND:", "").strip()
 
-            return clean_answer, tokens
-        else:
-            error_msg = res_json.get('error', {}).get('message', 'Unknown API Error')
-            return f"오류가 발생했습니다: {error_msg}", 0
+        return clean_answer
             
     except Exception as e:
-        console.print(f"[red]❗ API 호출/처리 중 치명적 오류 발생: {e}[/red]")
-        # 상세 스택트레이스 출력을 위해 타이핑이 가능하다면 좋겠지만, 일단 메시지만이라도 출력
+        console.print(f"[red]❗ 명령 처리 중 오류 발생: {e}[/red]")
         import traceback
         console.print(f"[dim red]{traceback.format_exc()}[/dim red]")
-        return "연결 실패", 0
+        return parse_reply(raw_content)[0]
+
+def fetch_news():
+    """단독 실행용 뉴스 요약 - 미러 서버(/api/news/get)에서 가져옴"""
+    try:
+        news_res = http_session.get("http://127.0.0.1:5000/api/news/get", timeout=3)
+        if news_res.status_code == 200:
+            return news_res.json().get("result", "")
+    except Exception as e:
+        print(f"[Voice] Failed to fetch news: {e}")
+    return "뉴스를 가져오지 못했습니다."
 
-def main(on_message=None):
+def standalone_conversation(on_message=None):
+    """app.py 없이 실행할 때의 대화 서비스 (기록은 메모리에만)"""
+    store = ConversationStore()
+    if on_message:
+        store.add_listener(lambda entry, channel: on_message(entry["text"], entry["type"]))
+    return ConversationService(store, news=fetch_news, command_handler=apply_commands)
+
+def recognize_pcm(r, pcm, sample_rate, sample_width):
+    """파이프라인 STT - 발화 PCM → 텍스트 ("" = 인식 실패)"""
+    t0 = time.perf_counter()
+    try:
+        text = r.recognize_google(sr.AudioData(pcm, sample_rate, sample_width), language="ko-KR")
+    except sr.UnknownValueError:
+        STT_LATENCY.labels("PIPELINE", "no_speech").observe(time.perf_counter() - t0)
+        return ""
+    except sr.RequestError as e:
+        console.print(f"[bold red]❌ [ERROR] Google Speech Recognition 에러: {e}[/bold red]")
+        return ""
+    STT_LATENCY.labels("PIPELINE", "ok").observe(time.perf_counter() - t0)
+    return text
+
+def log_turn(turn):
+    """파이프라인 턴 1건 → telemetry_logs (단계별 ms)"""
+    stages = turn.stages()
+    telemetry_logs.append({"id": turn.id, "latency": stages.get("response"), "stages": stages,
+                           "success": bool(turn.first_audio_at), "barged_in": turn.barged_in})
+    console.print(f"[dim]📊 [Log] ID:{turn.id} | {stages}[/dim]")
+
+def run_pipeline(conversation):
+    """마이크/STT/LLM/TTS를 동시에 돌리는 음성 대화 (voice_pipeline.VoicePipeline)"""
+    r = sr.Recognizer()
+    with sr.Microphone() as source:
+        console.print("[cyan]🎤 배경 소음 측정 중...[/cyan]")
+        r.adjust_for_ambient_noise(source, duration=1.5)
+        console.print(f"[cyan]✓ 측정 완료 (에너지 임계값: {int(r.energy_threshold)})[/cyan]")
+
+        rate, width = source.SAMPLE_RATE, source.SAMPLE_WIDTH
+        segmenter = PhraseSegmenter(rate, width, r.energy_threshold, pause_sec=Config.VOICE_PAUSE_SEC,
+                                    max_phrase_sec=Config.VOICE_MAX_PHRASE_SEC,
+                                    barge_in_ratio=Config.VOICE_BARGE_IN_RATIO, barge_in_sec=Config.VOICE_BARGE_IN_SEC)
+        pipeline = VoicePipeline(
+            lambda: source.stream.read(source.CHUNK),
+            BufferedTranscriber(lambda pcm: recognize_pcm(r, pcm, rate, width)),
+            lambda text: conversation.respond(text, channel="voice").text,
+            synthesize, play, stop_playback, segmenter,
+            wake_words=WAKE_WORDS, awake_sec=Config.VOICE_AWAKE_SEC, on_turn=log_turn,
+        ).start()
+        console.print("[bold green]🎤 음성 파이프라인 가동 (끼어들기 가능)[/bold green]")
+        try:
+            while True:  # 마이크 스트림은 with 블록 안에서만 열려 있음
+                time.sleep(1)
+        finally:
+            pipeline.stop()
+
+def main(on_message=None, conversation=None):
+    """conversation: 웹 채팅과 공유하는 ConversationService (없으면 단독 실행용으로 생성)
+    on_message(text, sender)는 단독 실행일 때만 사용 - 공유 서비스는 기록 리스너로 화면에 전달"""
+    if conversation is None:
+        conversation = standalone_conversation(on_message)
+    if Config.VOICE_PIPELINE:
+        return run_pipeline(conversation)
     r = sr.Recognizer()
     # 음성 인식 민감도 향상: 에너지 임계값을 낮춰서 더 작은 소리도 인식
     r.energy_threshold = 250  # 기존 400에서 250으로 낮춤
@@ -610,8 +662,6 @@ def main(on_message=None):
     console.print(Panel("[bold cyan]👾 데브고치(MiniMax M2.1) 시스템 가동[/bold cyan]", 
                         subtitle="Standard API Mode (Timer/Weather Enabled)", border_style="cyan"))
     
-    chat_history = []
-    
     while True:
         with sr.Microphone() as source:
             # 시작 시 한 번 소음 조정
@@ -623,16 +673,9 @@ def main(on_message=None):
                 console.print("[dim white]● 대기 중...[/dim white]", end="\r")
                 wake_text = listen(r, source, mode="WAKE")
                 
-                # 웨이크 워드 변형 추가: 발음이 비슷하게 인식될 수 있는 다양한 단어들
-                wake_words = [
-                    "데브", "고치", "데이브", "대부",  # 기존
-                    "데브고치", "데부", "데프", "대브", "데뷔", "대비", "대불",  # 발음 변형
-                    "개발", "고치야", "데브야", "데이비", "헤이", "야",  # 추가 변형
-                    "dev", "고찌", "대부님", "대비야", "더브", "뎁"  # 추가 변형
-                ]
                 wake_text_lower = wake_text.lower()
                 
-                if any(word in wake_text_lower for word in wake_words):
+                if any(word in wake_text_lower for word in WAKE_WORDS):
                     console.print("\n")
                     console.print(Panel(
                         Align.center("[bold yellow]✨ CALL SIGN DETECTED ✨[/bold yellow]\n[white]인식 성공: 데브고치가 대기 중입니다[/white]"),
@@ -644,17 +687,16 @@ def main(on_message=None):
                     user_input = listen(r, source, mode="CHAT")
                     
                     if user_input:
-                        if on_message: on_message(user_input, "user")
                         req_id = str(uuid.uuid4())[:8]
                         start_time = time.time()
                         
                         console.print(f"[bold cyan]You>[/bold cyan] {user_input}")
                         
                         with Live(Spinner("dots", text="MiniMax 응답 생성 중..."), console=console, transient=True) as live:
-                            full_answer, token_count = call_minimax_standard(user_input, chat_history)
+                            reply = conversation.respond(user_input, channel="voice")
+                            full_answer, token_count = reply.text, reply.tokens
                             live.update(Markdown(full_answer))
                         
-                        if on_message: on_message(full_answer, "ai")
                         latency_ms = int((time.time() - start_time) * 1000)
                         log_entry = {"id": req_id, "latency": latency_ms, "tokens": token_count, "success": True}
                         telemetry_logs.append(log_entry)
@@ -663,10 +705,6 @@ def main(on_message=None):
                         
                         speak(full_answer)
                         console.print(f"[bold blue]데브고치>[/bold blue] {full_answer.strip()}")
-                        
-                        chat_history.append({"sender_type": "USER", "text": user_input})
-                        chat_history.append({"sender_type": "BOT", "text": full_answer})
-                        if len(chat_history) > 10: chat_history = chat_history[-10:]
                     else:
                         console.print("[red]⚠ 입력이 없어 대기를 종료합니다.[/red]")
                 
@@ -687,6 +687,42 @@ function updateTimerDisplay() {
     }
 }
 
+// 채팅 작업 완료 대기: SSE(chat_done) 알림이 오거나 폴링 간격이 지나면 결과 조회
+const chatJobWaiters = new Map();
+let chatEvents = null;
+
+function ensureChatEvents() {
+    if (chatEvents || typeof EventSource === 'undefined') return;
+    chatEvents = new EventSource('/api/events/stream');
+    chatEvents.onmessage = (e) => {
+        try {
+            const ev = JSON.parse(e.data);
+            if (ev.kind === 'chat_done' && chatJobWaiters.has(ev.job_id)) {
+                chatJobWaiters.get(ev.job_id)();
+            }
+        } catch (err) { /* 다른 이벤트 형식은 무시 */ }
+    };
+}
+
+async function waitChatJob(jobId, timeoutMs = 60000) {
+    ensureChatEvents();
+    const deadline = Date.now() + timeoutMs;
+    let delay = 500;
+    while (Date.now() < deadline) {
+        await new Promise(resolve => {
+            chatJobWaiters.set(jobId, resolve);
+            setTimeout(resolve, delay);
+        });
+        chatJobWaiters.delete(jobId);
+        const res = await fetch(`/api/chat/jobs/${jobId}`);
+        if (res.status === 404) throw new Error('job expired');
+        const job = await res.json();
+        if (job.status === 'done' || job.status === 'failed') return job;
+        delay = Math.min(delay * 2, 4000);
+    }
+    throw new Error('timeout');
+}
+
 window.sendMessage = async () => {
     const input = document.getElementById('chat-input');
     const text = input.value.trim();
@@ -694,13 +730,15 @@ window.sendMessage = async () => {
     addMessage(text, 'user');
     input.value = '';
     try {
-        const res = await fetch('/api/chat', {
+        const res = await fetch('/api/chat/jobs', {
             method: 'POST',
             headers: { 'Content-Type': 'application/json' },
             body: JSON.stringify({ message: text, history: [] })
         });
-        const data = await res.json();
-        addMessage(data.text, 'ai');
+        const submitted = await res.json();
+        if (!res.ok) throw new Error(submitted.error);
+        const data = await waitChatJob(submitted.job_id);
+        addMessage(data.status === 'done' ? data.text : "오류가 발생했습니다.", 'ai');
     } catch (e) {
         addMessage("오류가 발생했습니다.", 'ai');
     }
@@ -0,0 +1,150 @@
+# subsystems.py
+"""무거운 서브시스템(비전/음성/TTS/LLM) 지연 초기화 + 준비 상태 + 기동 시간 리포트
+
+app.py가 cv2/mediapipe/pygame/openai를 import 시점에 모두 불러오면 첫 페이지가 뜨기까지 수 초가 걸립니다.
+각 서브시스템을 로더 함수로 등록해 두고 Flask가 뜬 뒤 백그라운드 스레드에서 초기화합니다.
+
+    subsystems = SubsystemRegistry()
+    subsystems.register("llm", _load_llm)
+    subsystems.start("llm")                 # 백그라운드 초기화 시작
+    brain = subsystems.get("llm", timeout=10)  # 필요한 곳에서 준비될 때까지 대기 (시작 전이면 그 자리에서 로드)
+    subsystems.status()                     # {"llm": "ready"} → /api/gamestate
+    subsystems.report()                     # 서브시스템별 소요 시간 → /api/startup
+"""
+
+import threading
+import time
+import traceback
+
+PENDING, LOADING, READY, FAILED = "pending", "loading", "ready", "failed"
+
+# 프로세스에서 이 모듈이 처음 import된 시각 (app.py가 가장 먼저 import → 기동 시간 기준점)
+PROCESS_START = time.perf_counter()
+
+
+class SubsystemUnavailable(RuntimeError):
+    """서브시스템이 실패했거나 제한 시간 안에 준비되지 않음"""
+
+
+class Subsystem:
+    def __init__(self, name, loader, requires=()):
+        self.name = name
+        self.loader = loader
+        self.requires = tuple(requires)
+        self.state = PENDING
+        self.value = None
+        self.error = None
+        self.started_at = None  # PROCESS_START 기준 (초)
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def _claim(self):
+        """PENDING → LOADING 전환은 한 스레드만 성공"""
+        with self._lock:
+            if self.state != PENDING:
+                return False
+            self.state = LOADING
+            self.started_at = time.perf_counter() - PROCESS_START
+            return True
+
+    def _load(self, registry):
+        try:
+            for dep in self.requires:
+                registry.get(dep)
+            value = self.loader()
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+            self.state = FAILED
+            print(f"[Startup] {self.name} 초기화 실패: {self.error}")
+            traceback.print_exc()
+        else:
+            self.value = value
+            self.state = READY
+        self.finished_at = time.perf_counter() - PROCESS_START
+        self._done.set()
+        registry._on_finished(self)
+
+    @property
+    def load_ms(self):
+        if self.started_at is None:
+            return None
+        end = self.finished_at if self.finished_at is not None else time.perf_counter() - PROCESS_START
+        return round((end - self.started_at) * 1000, 1)
+
+    def describe(self):
+        return {
+            "state": self.state,
+            "started_ms": None if self.started_at is None else round(self.started_at * 1000, 1),
+            "load_ms": self.load_ms,
+            "error": self.error,
+        }
+
+
+class SubsystemRegistry:
+    def __init__(self):
+        self._subsystems = {}
+        self._milestones = {}  # 이름 → PROCESS_START 기준 ms
+        self._reported = False
+        self._lock = threading.Lock()
+
+    def register(self, name, loader, requires=()):
+        self._subsystems[name] = Subsystem(name, loader, requires)
+        return self._subsystems[name]
+
+    def start(self, *names):
+        """백그라운드 스레드에서 초기화 (이미 시작된 것은 무시)"""
+        for name in names or list(self._subsystems):
+            sub = self._subsystems[name]
+            if sub._claim():
+                threading.Thread(target=sub._load, args=(self,), name=f"init-{name}", daemon=True).start()
+
+    def get(self, name, timeout=None):
+        """준비된 값을 반환 - 아직 시작 전이면 호출한 스레드에서 바로 로드 (지연 초기화)"""
+        sub = self._subsystems[name]
+        if sub._claim():
+            sub._load(self)
+        if not sub._done.wait(timeout):
+            raise SubsystemUnavailable(f"{name} 초기화 중입니다 ({sub.load_ms}ms 경과)")
+        if sub.state == FAILED:
+            raise SubsystemUnavailable(f"{name} 사용 불가: {sub.error}")
+        return sub.value
+
+    def peek(self, name):
+        """대기/로드 없이 준비된 값만 (없으면 None) - 프레임 루프처럼 매번 확인하는 곳용"""
+        sub = self._subsystems[name]
+        return sub.value if sub.state == READY else None
+
+    def ready(self, name):
+        return self._subsystems[name].state == READY
+
+    def status(self):
+        return {name: sub.state for name, sub in self._subsystems.items()}
+
+    def mark(self, milestone):
+        """기동 단계 시각 기록 (예: app_imported, server_start)"""
+        self._milestones[milestone] = round((time.perf_counter() - PROCESS_START) * 1000, 1)
+
+    def report(self):
+        return {
+            "uptime_ms": round((time.perf_counter() - PROCESS_START) * 1000, 1),
+            "milestones": dict(self._milestones),
+            "subsystems": {name: sub.describe() for name, sub in self._subsystems.items()},
+        }
+
+    def _on_finished(self, sub):
+        """모든 서브시스템이 끝나면 리포트를 한 번 출력"""
+        with self._lock:
+            if self._reported or any(s.state in (PENDING, LOADING) for s in self._subsystems.values()):
+                return
+            self._reported = True
+        self.print_report()
+
+    def print_report(self):
+        rep = self.report()
+        print("[Startup] ===== 기동 시간 리포트 =====")
+        for name, ms in rep["milestones"].items():
+            print(f"[Startup] {name:<16} {ms:>9.1f}ms")
+        for name, d in rep["subsystems"].items():
+            load = "-" if d["load_ms"] is None else f"{d['load_ms']:.1f}ms"
+            print(f"[Startup] {name:<16} {d['state']:<8} {load:>10}" + (f"  ({d['error']})" if d["error"] else ""))
@@ -0,0 +1,135 @@
+import asyncio
+import queue
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("flask")
+pytest.importorskip("a2wsgi")
+pytest.importorskip("httpx")
+pytest.importorskip("uvicorn")
+TestClient = pytest.importorskip("starlette.testclient").TestClient
+
+import app as web  # noqa: E402
+from asgi_app import create_asgi_app  # noqa: E402
+from chat_jobs import ChatJobTable  # noqa: E402
+from config import Config  # noqa: E402
+from event_bus import AsyncClientQueue  # noqa: E402
+from subsystems import SubsystemUnavailable  # noqa: E402
+
+pytestmark = pytest.mark.usefixtures("app_logs_in_tmp")
+
+gate = threading.Event()
+
+
+def runner(message, history, session_id):
+    if message.startswith("fail"):
+        raise SubsystemUnavailable("llm 초기화 중입니다")
+    if message.startswith("slow"):
+        gate.wait(2)
+    return {"text": f"re: {message}", "task": None, "thought": ""}
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    jobs = ChatJobTable(runner, workers=4)
+    monkeypatch.setattr(web, "chat_jobs", jobs)
+    monkeypatch.setattr(Config, "CHAT_LLM_TIMEOUT_SEC", 0.2)
+    gate.clear()
+    yield web.app.test_client(), TestClient(create_asgi_app(web))
+    gate.set()
+    jobs._pool.shutdown(wait=True)
+
+
+def test_chat_status_codes_match_flask(clients):
+    flask, asgi = clients
+    for kind, status in (("ok", 200), ("fail", 503), ("slow", 202)):
+        for name, client in (("wsgi", flask), ("asgi", asgi)):
+            resp = client.post("/api/chat", json={"message": f"{kind} {name}"})
+            assert resp.status_code == status, (kind, name)
+            body = resp.get_json() if name == "wsgi" else resp.json()
+            if status == 200:
+                assert body["text"] == f"re: {kind} {name}"
+            elif status == 503:
+                assert "SubsystemUnavailable" in body["error"]
+            else:
+                assert body["status"] in ("pending", "running") and body["job_id"]
+    assert flask.post("/api/chat", json={}).status_code == asgi.post("/api/chat", json={}).status_code == 400
+
+
+def first_chunk(path, trigger, match):
+    """무한 스트림 라우트를 ASGI로 직접 호출해 match를 포함한 첫 조각만 받고 연결을 끊음"""
+    asgi = create_asgi_app(web)
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+             "scheme": "http", "path": path, "raw_path": path.encode(), "query_string": b"", "root_path": "",
+             "headers": [], "client": ("127.0.0.1", 1234), "server": ("127.0.0.1", 5000)}
+
+    async def main():
+        got = asyncio.get_running_loop().create_future()
+        disconnected = asyncio.Event()
+        headers = {}
+
+        async def receive():
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(msg):
+            if msg["type"] == "http.response.start":
+                headers.update((k.decode(), v.decode()) for k, v in msg["headers"])
+            elif match in msg.get("body", b"") and not got.done():
+                got.set_result(msg["body"])
+
+        task = asyncio.create_task(asgi(scope, receive, send))
+        await asyncio.to_thread(trigger)
+        try:
+            return await asyncio.wait_for(got, timeout=2), headers
+        finally:
+            disconnected.set()
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    return asyncio.run(main())
+
+
+def flask_chunk(path, match, trigger=None):
+    if trigger:
+        threading.Thread(target=trigger, daemon=True).start()
+    resp = web.app.test_client().get(path, buffered=False)  # 첫 조각이 나올 때까지 여기서 대기
+    try:
+        for chunk in resp.response:
+            chunk = chunk if isinstance(chunk, bytes) else chunk.encode()
+            if match in chunk:
+                return chunk, resp.headers
+    finally:
+        resp.close()
+
+
+def emit_when_subscribed(kind, marker):
+    def trigger():
+        deadline = time.time() + 2
+        while not any(isinstance(q, kind) for q in list(web.sse_sink._clients)) and time.time() < deadline:
+            time.sleep(0.01)
+        web.sse_sink.handle_batch([SimpleNamespace(kind="chat_done", ts=1.0, data={"job_id": marker})])
+    return trigger
+
+
+def test_sse_delivers_through_async_queue_like_flask():
+    asgi_chunk, headers = first_chunk("/api/events/stream", emit_when_subscribed(AsyncClientQueue, "asgi-1"),
+                                      b"asgi-1")
+    assert asgi_chunk.startswith(b"data: {") and asgi_chunk.endswith(b"\n\n")
+    assert headers["content-type"].startswith("text/event-stream") and headers["cache-control"] == "no-cache"
+    assert not web.sse_sink._clients  # 연결이 끊기면 구독 해제
+
+    wsgi_chunk, wsgi_headers = flask_chunk("/api/events/stream", b"wsgi-1",
+                                           emit_when_subscribed(queue.Queue, "wsgi-1"))
+    assert asgi_chunk.replace(b"asgi-1", b"wsgi-1") == wsgi_chunk
+    assert wsgi_headers["Content-Type"].startswith("text/event-stream")
+
+
+def test_video_feed_frames_match_flask(monkeypatch):
+    monkeypatch.setattr(web, "latest_frame", b"\xff\xd8jpeg\xff\xd9")
+    asgi_chunk, headers = first_chunk("/video_feed", lambda: None, b"jpeg")
+    wsgi_chunk, wsgi_headers = flask_chunk("/video_feed", b"jpeg")
+    assert asgi_chunk == wsgi_chunk == b"--frame\r\nContent-Type: image/jpeg\r\n\r\n\xff\xd8jpeg\xff\xd9\r\n"
+    assert headers["content-type"] == wsgi_headers["Content-Type"] == "multipart/x-mixed-replace; boundary=frame"
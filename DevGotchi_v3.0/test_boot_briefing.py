@@ -0,0 +1,185 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from boot_briefing import BootBriefing, BriefingPrefetcher, FALLBACK_TEXT, event_summary
+from subsystems import SubsystemRegistry
+
+
+class FakeBrain:
+    error_prefix = "오류가 발생했습니다"
+
+    def __init__(self, delay, text="좋은 아침이에요!"):
+        self.delay = delay
+        self.text = text
+        self.prompts = []
+
+    def generate_briefing(self, weather_text, event_text, callback, quest_text=None, request_type="boot"):
+        self.prompts.append((weather_text, event_text))
+        threading.Timer(self.delay, callback, args=(self.text, None, "")).start()
+
+
+def make_registry(brain, audio_delay=0.0):
+    played = []
+    tts = SimpleNamespace(synthesize=lambda text: ("mp3", text), play=played.append)
+    reg = SubsystemRegistry()
+    reg.register("llm", lambda: brain)
+    reg.register("tts", lambda: tts)
+    reg.register("audio", lambda: time.sleep(audio_delay) or True)
+    reg.start()
+    return reg, played
+
+
+def run_briefing(reg, weather, deadline=1.0):
+    messages = []
+    schedules = [{"date": time.strftime("%Y-%m-%d"), "title": "회의"}, {"date": "2000-01-01", "title": "지난 일"}]
+    briefing = BootBriefing(reg, lambda: weather, lambda: schedules, lambda text, sender: messages.append(text),
+                            deadline=deadline, weather_timeout=0.2, audio_timeout=2)
+    return briefing.run(), messages
+
+
+def test_llm_text_is_prerendered_and_played_when_audio_ready():
+    brain = FakeBrain(delay=0.05)
+    reg, played = make_registry(brain, audio_delay=0.2)
+    result, messages = run_briefing(reg, {"temp": 21, "condition": "맑음"})
+
+    assert result["source"] == "llm"
+    assert brain.prompts == [("현재 기온 21도, 맑음", "오늘 일정: 회의")]
+    assert played == [("mp3", "좋은 아침이에요!")]
+    assert messages == ["좋은 아침이에요!"]
+    # 음성은 오디오 장치가 준비되기 전에 이미 만들어져 있어야 함
+    assert result["timeline"]["audio"] < result["timeline"]["playback_start"]
+
+
+def test_slow_or_failed_llm_falls_back_to_presynthesized_text():
+    for brain in (FakeBrain(delay=1.0), FakeBrain(delay=0.0, text="오류가 발생했습니다: 401")):
+        reg, played = make_registry(brain)
+        result, messages = run_briefing(reg, None, deadline=0.3)
+        assert result["source"] == "fallback"
+        assert played == [("mp3", FALLBACK_TEXT)]
+        assert messages == [FALLBACK_TEXT]
+
+
+def test_event_summary_filters_today():
+    assert event_summary([{"date": "2024-01-02", "title": "a"}], today="2024-01-01") == "오늘 일정 없음"
+
+
+def test_prefetch_on_return_plays_cached_briefing_and_invalidates_on_schedule_change():
+    brain = FakeBrain(delay=0.0)
+    reg, played = make_registry(brain)
+    messages = []
+    schedules = [{"date": time.strftime("%Y-%m-%d"), "title": "회의"}]
+    now = [0.0]
+    prepared = []
+
+    def make():
+        b = BootBriefing(reg, lambda: None, lambda: schedules, lambda text, sender: messages.append(text), deadline=1)
+        real_prepare = b.prepare
+        b.prepare = lambda: prepared.append(1) or real_prepare()
+        return b
+
+    pf = BriefingPrefetcher(make, lambda: tuple(s["title"] for s in schedules),
+                            absence_sec=100, confirm_sec=3, clock=lambda: now[0])
+    now[0] = 50.0
+    pf.observe_presence(True)  # 부재가 짧으면 아무것도 안 함
+    assert pf._inflight is None and not prepared
+
+    now[0] = 60.0
+    pf.observe_presence(False)
+    now[0] = 200.0
+    pf.observe_presence(True)  # 오랜 부재 후 첫 얼굴 → 선준비
+    inflight = pf._inflight
+    if inflight:
+        inflight.wait(2)
+    assert len(prepared) == 1 and pf._cached is not None
+
+    now[0] = 203.0
+    pf.observe_presence(True)  # 재실 확인 → 캐시된 음성 재생 (추가 준비 없음)
+    for t in threading.enumerate():
+        if t.name == "briefing-deliver":
+            t.join(2)
+    assert len(prepared) == 1
+    assert played == [("mp3", "좋은 아침이에요!")]
+
+    schedules.append({"date": time.strftime("%Y-%m-%d"), "title": "점심"})
+    pf.invalidate("schedule")
+    assert pf._cached is None
+
+
+def _join(name):
+    for t in threading.enumerate():
+        if t.name == name:
+            t.join(2)
+
+
+def test_prefetch_starts_during_absence_and_stays_fresh():
+    reg, played = make_registry(FakeBrain(delay=0.0))
+    now = [0.0]
+    prepared = []
+
+    def make():
+        b = BootBriefing(reg, lambda: None, lambda: [], lambda text, sender: None, deadline=1)
+        real_prepare = b.prepare
+        b.prepare = lambda: prepared.append(now[0]) or real_prepare()
+        return b
+
+    pf = BriefingPrefetcher(make, lambda: "key", absence_sec=100, confirm_sec=3, ttl_sec=100, clock=lambda: now[0])
+    now[0] = 99.0
+    pf.observe_presence(False)
+    assert not prepared
+    now[0] = 101.0
+    pf.observe_presence(False)  # 돌아오기 전에 준비
+    _join("briefing-prefetch")
+    assert prepared == [101.0]
+
+    now[0] = 190.0  # 캐시 나이 89 > ttl × 0.8 → 부재 중에 다시 준비
+    pf.observe_presence(False)
+    _join("briefing-prefetch")
+    assert prepared == [101.0, 190.0]
+
+    now[0] = 200.0
+    pf.observe_presence(True)
+    now[0] = 203.0
+    pf.observe_presence(True)  # 재실 확인 → 추가 준비 없이 재생
+    _join("briefing-deliver")
+    assert len(prepared) == 2 and played == [("mp3", "좋은 아침이에요!")]
+
+
+def test_overnight_absence_refreshes_once_plus_key_changes():
+    reg, played = make_registry(FakeBrain(delay=0.0))
+    now = [0.0]
+    key = ["2026-10-19"]
+    prepared = []
+
+    def make():
+        b = BootBriefing(reg, lambda: None, lambda: [], lambda text, sender: None, deadline=1)
+        real_prepare = b.prepare
+        b.prepare = lambda: prepared.append(now[0]) or real_prepare()
+        return b
+
+    pf = BriefingPrefetcher(make, lambda: key[0], absence_sec=100, ttl_sec=1800, clock=lambda: now[0])
+    for t in range(100, 10 * 3600, 10):  # 10시간 부재, 10초마다 비전 결과
+        now[0] = float(t)
+        if t == 5 * 3600:
+            key[0] = "2026-10-20"  # 자정
+        pf.observe_presence(False)
+        _join("briefing-prefetch")
+    assert prepared == [100.0, 100.0 + 1440, 5 * 3600.0]  # 첫 준비, 나이 기준 갱신 1회, 날짜 변경
+
+    now[0] += 10
+    pf.observe_presence(True)  # 돌아오면 다음 부재에서는 다시 한 번 갱신 가능
+    assert pf._refreshed is False
+
+
+def test_status_change_plays_immediately_without_recent_vision_results():
+    now = [0.0]
+    delivered = []
+    pf = BriefingPrefetcher(lambda: None, lambda: "key", presence_available=lambda: True, clock=lambda: now[0])
+    pf.prefetch = lambda reason, refresh=False: False
+    pf.deliver = delivered.append
+    pf.on_status_change("퇴근", "업무중")  # 비전 준비됐지만 결과가 한 번도 안 들어옴 (카메라 없음)
+    assert delivered == ["status"]
+
+    pf.observe_presence(False)
+    pf.on_status_change("퇴근", "업무중")  # 결과가 들어오는 중 → 재실 확인까지 대기
+    assert delivered == ["status"]
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from chat_jobs import ChatJobTable, ChatJobsFull
+
+
+def test_submit_returns_immediately_and_coalesces_duplicates():
+    gate = threading.Event()
+    calls = []
+    done = []
+
+    def runner(message, history, session_id):
+        calls.append(message)
+        gate.wait(2)
+        return {"text": f"re: {message}", "task": None, "thought": ""}
+
+    jobs = ChatJobTable(runner, on_done=done.append, workers=2)
+    job, coalesced = jobs.submit(1, "안녕")
+    assert not coalesced and job.status in ("pending", "running")
+
+    dup, coalesced = jobs.submit(1, " 안녕 ")
+    assert coalesced and dup is job
+    other, coalesced = jobs.submit(2, "안녕")  # 다른 세션은 별개 작업
+    assert not coalesced and other is not job
+
+    woken = []
+    job.add_done_callback(woken.append)
+    gate.set()
+    assert job.wait(2) and other.wait(2)
+    job.add_done_callback(woken.append)  # 이미 끝났으면 바로 호출
+    assert woken == [job, job]
+    assert jobs.get(job.id).to_dict()["text"] == "re: 안녕"
+    assert sorted(calls) == ["안녕", "안녕"]
+    jobs._pool.shutdown(wait=True)  # on_done은 wait() 해제 직후 같은 작업 스레드에서 호출됨
+    assert {j.id for j in done} == {job.id, other.id}
+
+
+def test_failed_jobs_ttl_and_capacity():
+    now = [0.0]
+
+    def runner(message, history, session_id):
+        if message == "boom":
+            raise TimeoutError("LLM 응답 시간 초과")
+        return {"text": message}
+
+    jobs = ChatJobTable(runner, workers=1, max_jobs=2, ttl_sec=10, clock=lambda: now[0])
+    failed, _ = jobs.submit(1, "boom")
+    failed.wait(2)
+    assert failed.to_dict()["status"] == "failed" and "TimeoutError" in failed.error
+    retry, coalesced = jobs.submit(1, "boom")  # 실패한 작업은 합치지 않음
+    assert not coalesced
+    retry.wait(2)
+
+    # 꽉 차도 끝난 작업부터 비우고 받음
+    ok, _ = jobs.submit(1, "hi")
+    ok.wait(2)
+    assert jobs.get(failed.id) is None
+
+    now[0] = 100.0
+    assert jobs.get(ok.id) is None  # TTL 만료
+    assert jobs.stats()["jobs"] == 0
+
+
+def test_table_full_of_running_jobs_rejects():
+    gate = threading.Event()
+    jobs = ChatJobTable(lambda m, h, s: gate.wait(2) and {"text": m}, workers=1, max_jobs=1)
+    jobs.submit(1, "a")
+    with pytest.raises(ChatJobsFull):
+        jobs.submit(1, "b")
+    gate.set()
@@ -0,0 +1,104 @@
+import pytest
+
+from completion_backends import Completion, CompletionBackend, CompletionRouter
+from llm_gateway import LLMGateway, LLMUnavailable
+
+
+class FakeBackend(CompletionBackend):
+    def __init__(self, name, up=True, fail=False):
+        self.name = self.model = name
+        self.up = up
+        self.fail = fail
+        self.calls = []
+
+    def available(self):
+        return self.up
+
+    def mark_down(self):
+        self.up = False
+
+    def complete(self, messages, request_type="chat", max_tokens=512, temperature=0.7, timeout=15, model=None):
+        self.calls.append(request_type)
+        if self.fail:
+            raise ConnectionError(f"{self.name} down")
+        return Completion(f"{self.name}:{messages[-1]['content']}", 10, 5, self.name)
+
+
+def router(cloud, local):
+    gw = LLMGateway(failure_threshold=1, cooldown_sec=60, hedge=False)
+    return CompletionRouter(cloud, local, gateway=gw, simple_max_chars=10, cloud_keywords=("뉴스",))
+
+
+def user(text):
+    return [{"role": "system", "content": "persona"}, {"role": "user", "content": text}]
+
+
+def test_short_prompts_go_local_others_cloud():
+    cloud, local = FakeBackend("cloud"), FakeBackend("local")
+    r = router(cloud, local)
+    assert r.complete(user("안녕")).backend == "local"
+    assert r.complete(user("오늘 뉴스")).backend == "cloud"  # 짧아도 정보 요청은 클라우드
+    assert r.complete(user("코딩 공부 계획을 자세히 세워줘")).backend == "cloud"
+    assert r.complete(user("안녕"), request_type="briefing").backend == "cloud"
+
+
+def test_cloud_failure_falls_back_to_local_and_offline_stays_local():
+    cloud, local = FakeBackend("cloud", fail=True), FakeBackend("local")
+    r = router(cloud, local)
+    assert r.complete(user("코딩 공부 계획을 자세히 세워줘")).backend == "local"  # 게이트웨이 대체 응답
+    assert r.route(user("긴 브리핑을 만들어 줘 자세하게"), "briefing") == ("local", "offline")  # 서킷 열림
+    r.complete(user("긴 브리핑을 만들어 줘 자세하게"), request_type="briefing")
+    assert cloud.calls == ["chat"]
+
+
+def test_without_local_failures_raise():
+    r = router(FakeBackend("cloud", fail=True), None)
+    with pytest.raises(LLMUnavailable):
+        r.complete(user("안녕"))
+    local = FakeBackend("local", fail=True)
+    r = router(FakeBackend("cloud", up=False), local)
+    with pytest.raises(LLMUnavailable):
+        r.complete(user("안녕"))  # 오프라인 + 로컬 실패
+    assert not local.up
+
+
+def test_budget_exhausted_serves_cache_then_local():
+    from llm_budget import LLMBudget
+    from completion_backends import BudgetExhausted
+
+    cloud = FakeBackend("cloud")
+    budget = LLMBudget(1.0)
+    r = CompletionRouter(cloud, None, gateway=LLMGateway(hedge=False), budget=budget)
+    first = r.complete(user("코딩 공부 계획을 세워줘"))
+    assert first.backend == "cloud"
+    budget.record("chat", 0, 0, 2.0)  # 한도 초과
+
+    assert r.complete(user("코딩 공부 계획을 세워줘")).backend == "cache"
+    with pytest.raises(BudgetExhausted):
+        r.complete(user("다른 질문"))
+    r.local = FakeBackend("local")
+    assert r.complete(user("다른 질문")).backend == "local"
+    assert cloud.calls == ["chat"]
+
+
+def test_every_physical_call_is_charged_to_budget():
+    from completion_backends import OpenAICompatBackend
+    from llm_budget import LLMBudget
+
+    class Response:
+        def json(self):
+            return {"choices": [{"message": {"content": "네"}}],
+                    "usage": {"prompt_tokens": 1000, "completion_tokens": 1000}}
+
+    class Session:
+        def post(self, *args, **kwargs):
+            return Response()
+
+    cloud = OpenAICompatBackend("cloud", "http://x", "m", session=Session(), prices={"m": (1.0, 1.0)})
+    budget = LLMBudget(1.0)
+    r = CompletionRouter(cloud, None, gateway=LLMGateway(hedge=False), budget=budget)
+    r.complete(user("코딩 공부 계획을 세워줘"))
+    cloud.complete(user("코딩 공부 계획을 세워줘"))  # 헤지 중복/포기한 호출도 같은 경로
+    status = budget.status()
+    assert status["by_type"]["chat"]["calls"] == 2
+    assert status["spent_usd"] == 0.004
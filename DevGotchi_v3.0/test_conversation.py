@@ -0,0 +1,63 @@
+from completion_backends import Completion
+from conversation import ConversationService, ConversationStore, parse_reply
+from llm_gateway import LLMUnavailable
+
+
+class FakeCompletions:
+    def __init__(self, reply="네, 알겠어요.", fail=False):
+        self.reply = reply
+        self.fail = fail
+        self.calls = []
+
+    def complete(self, messages, request_type="chat", max_tokens=512, **kw):
+        self.calls.append((messages, request_type, max_tokens))
+        if self.fail:
+            raise LLMUnavailable("down")
+        return Completion(self.reply, 10, 5, "fake")
+
+
+def test_parse_reply_extracts_think_commands_and_task():
+    text, thought, commands, task = parse_reply(
+        '<think>타이머</think>네, 5분 타이머 시작할게요! [COMMAND:TIMER:5:DOWN] {"task": "focus"}')
+    assert text == "네, 5분 타이머 시작할게요!"
+    assert thought == "타이머"
+    assert commands[0].type == "TIMER" and commands[0].args == ["5", "DOWN"]
+    assert task == {"task": "focus"}
+
+
+def test_voice_and_web_share_session_context():
+    store = ConversationStore(session=lambda: 1)
+    seen = []
+    store.add_listener(lambda entry, channel: seen.append((channel, entry["type"])))
+    llm = FakeCompletions()
+    service = ConversationService(store, completions=llm)
+
+    service.respond("나 오늘 치과 가", channel="voice")
+    reply = service.respond("아까 뭐라고 했지?", channel="web")
+
+    messages, request_type, max_tokens = llm.calls[-1]
+    assert [m["content"] for m in messages[1:]] == ["나 오늘 치과 가", "네, 알겠어요.", "아까 뭐라고 했지?"]
+    assert (llm.calls[0][1], request_type) == ("voice", "chat")
+    assert max_tokens == 800 and reply.backend == "fake" and reply.tokens == 15
+    assert seen == [("voice", "user"), ("voice", "ai"), ("web", "user"), ("web", "ai")]
+
+
+def test_news_is_cached_and_failures_use_canned_reply():
+    now = [0.0]
+    fetched = []
+    news = lambda: fetched.append(1) or "뉴스 요약"
+    handled = []
+    service = ConversationService(ConversationStore(session=lambda: 1), completions=FakeCompletions(),
+                                  news=news, command_handler=lambda text, raw: handled.append(text) or "처리됨",
+                                  news_ttl_sec=60, clock=lambda: now[0])
+
+    assert service.respond("오늘 뉴스 알려줘").request_type == "news_chat"
+    assert service.respond("다른 소식은?", channel="voice").text == "처리됨"
+    now[0] = 61
+    service.respond("뉴스 다시")
+    assert len(fetched) == 2
+
+    service._completions = FakeCompletions(fail=True)
+    reply = service.respond("안녕")
+    assert reply.backend == "canned" and reply.text
+    assert len(handled) == 3  # 대체 응답에는 명령 실행 안 함
@@ -0,0 +1,90 @@
+import threading
+import time
+
+from activity_logger import ActivityLogger
+from posture_logger import PostureLogger
+from event_bus import (Event, EventBus, EventSink, ActivityLogSink, PostureLogSink, BusActivityLogger,
+                       TURTLE_NECK, EYE_CLOSED, HP_CHANGE)
+
+
+class CountingSink(EventSink):
+    kinds = (TURTLE_NECK,)
+    flush_interval = 60
+
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def handle_batch(self, events):
+        self.batches.append(events)
+
+
+def test_single_emit_reaches_both_loggers(tmp_path):
+    posture = PostureLogger(str(tmp_path / "posture"))
+    activity = ActivityLogger(str(tmp_path / "activity"))
+    saves = {"posture": 0, "activity": 0}
+
+    def counting(name, fn):
+        def wrapper():
+            saves[name] += 1
+            fn()
+        return wrapper
+    posture._save_data = counting("posture", posture._save_data)
+    activity._save_data = counting("activity", activity._save_data)
+
+    bus = EventBus()
+    bus.subscribe(PostureLogSink(posture))
+    bus.subscribe(ActivityLogSink(activity))
+    bus.start()
+    try:
+        for _ in range(5):
+            bus.emit(TURTLE_NECK)
+        bus.emit(EYE_CLOSED)
+        assert bus.flush()
+    finally:
+        bus.stop()
+
+    assert posture.today_data["turtle_neck"]["count"] == 5
+    assert activity.today_data["posture_detections"]["turtle_neck"]["count"] == 5
+    assert posture.today_data["eye_closed"]["count"] == 1
+    # 6개 이벤트를 배치로 처리하므로 저장 횟수는 이벤트 수보다 훨씬 적음
+    assert 1 <= saves["posture"] <= 2
+    assert 1 <= saves["activity"] <= 2
+
+
+def test_sink_filters_kinds_and_batches():
+    bus = EventBus()
+    sink = bus.subscribe(CountingSink())
+    for _ in range(3):
+        bus.emit(TURTLE_NECK)
+    bus.emit(EYE_CLOSED)
+    bus.flush()  # 디스패처 없이도 동기 처리
+    assert len(sink.batches) == 1
+    assert [ev.kind for ev in sink.batches[0]] == [TURTLE_NECK] * 3
+
+
+def test_game_events_go_through_bus(tmp_path):
+    activity = ActivityLogger(str(tmp_path / "activity"))
+    bus = EventBus()
+    bus.subscribe(ActivityLogSink(activity))
+    adapter = BusActivityLogger(bus)
+    adapter.log_hp_change(100, 90, "idle_penalty", -10)
+    adapter.log_quest_accepted("자세 퀘스트", "posture", 600, 30)
+    bus.flush()
+    assert activity.today_data["hp_changes"][0]["reason"] == "idle_penalty"
+    assert activity.today_data["quests"]["accepted"][0]["name"] == "자세 퀘스트"
+
+
+def test_batch_write_waits_for_api_save(tmp_path):
+    """API 요청이 저장/조회 중이면 싱크 스레드의 배치 기록은 끝날 때까지 대기"""
+    activity = ActivityLogger(str(tmp_path / "activity"))
+    sink = ActivityLogSink(activity)
+    batch = [Event(HP_CHANGE, time.time(), {"hp_before": 100, "hp_after": 95, "reason": "test", "amount": -5})]
+    with activity.lock:
+        activity.save()  # 재진입 가능
+        writer = threading.Thread(target=sink.handle_batch, args=(batch,))
+        writer.start()
+        writer.join(0.2)
+        assert writer.is_alive() and activity.today_data["hp_changes"] == []
+    writer.join(5)
+    assert len(activity.today_data["hp_changes"]) == 1
@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from face_roi import FaceRoiTracker  # noqa: E402
+
+
+def face(x0, y0, x1, y1):
+    """정규화 좌표 사각형의 네 꼭짓점을 랜드마크로"""
+    return [SimpleNamespace(x=x, y=y) for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1))]
+
+
+def test_untracked_crop_returns_none():
+    assert FaceRoiTracker().crop(np.zeros((480, 640, 3), np.uint8)) is None
+
+
+def test_box_is_square_with_margin_and_clamped_to_frame():
+    tracker = FaceRoiTracker(input_size=128, margin=0.25)
+    tracker.update(face(0.4, 0.4, 0.6, 0.6), 640, 480)  # 가로 128px, 세로 96px 얼굴
+    x0, y0, side = tracker.box
+    assert side == 192 and (x0, y0) == (224, 144)
+
+    tracker.update(face(0.9, 0.0, 1.0, 0.1), 640, 480)  # 오른쪽 위 모서리 얼굴 → 화면 안으로 밀어 넣음
+    x0, y0, side = tracker.box
+    assert x0 + side == 640 and y0 == 0
+
+    roi, box = tracker.crop(np.zeros((480, 640, 3), np.uint8))
+    assert roi.shape == (128, 128, 3) and box == tracker.box
+
+
+def test_crop_at_edge_of_smaller_frame_falls_back():
+    tracker = FaceRoiTracker()
+    tracker.update(face(0.8, 0.8, 1.0, 1.0), 640, 480)
+    assert tracker.crop(np.zeros((240, 320, 3), np.uint8)) is None  # 해상도가 바뀌어 정사각형이 안 나옴
+    assert tracker.box is None
+
+
+def test_to_frame_round_trip():
+    tracker = FaceRoiTracker()
+    tracker.update(face(0.3, 0.2, 0.5, 0.5), 640, 480)
+    x0, y0, side = tracker.box
+    original = [(0.35, 0.25), (0.45, 0.4)]
+    lms = [SimpleNamespace(x=(x * 640 - x0) / side, y=(y * 480 - y0) / side) for x, y in original]  # ROI 기준 좌표
+    tracker.to_frame(lms, tracker.box, 640, 480)
+    assert [(lm.x, lm.y) for lm in lms] == [pytest.approx(p) for p in original]
+
+
+def test_lost_falls_back_to_full_frame():
+    tracker = FaceRoiTracker()
+    tracker.update(face(0.4, 0.4, 0.6, 0.6), 640, 480)
+    tracker.lost()
+    assert tracker.box is None and tracker.crop(np.zeros((480, 640, 3), np.uint8)) is None
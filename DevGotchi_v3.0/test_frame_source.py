@@ -0,0 +1,104 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+import frame_source  # noqa: E402
+from config import Config  # noqa: E402
+from frame_source import (ImageSequenceSource, NoiseSource, Pacer, VideoFileSource,  # noqa: E402
+                          open_frame_source)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.slept = []
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, sec):
+        self.slept.append(round(sec, 6))
+        self.now += sec
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(frame_source, "time", fake)
+    return fake
+
+
+def test_pacer_keeps_interval_and_resets_when_behind(clock):
+    pacer = Pacer(10, "realtime")
+    pacer.wait()  # 첫 프레임은 바로
+    pacer.wait()
+    assert clock.slept == [0.1]
+    clock.now += 0.05  # 처리 시간만큼은 덜 잠
+    pacer.wait()
+    assert clock.slept == [0.1, 0.05]
+    clock.now += 1.0  # 크게 밀리면 따라잡지 않고 기준 재설정
+    pacer.wait()
+    pacer.wait()
+    assert clock.slept == [0.1, 0.05, 0.1]
+
+    fast = Pacer(10, "fast")
+    fast.wait()
+    fast.wait()
+    assert clock.slept == [0.1, 0.05, 0.1] and not fast.realtime and not Pacer(0).realtime
+
+
+def image_dir(tmp_path, n=2):
+    for i in range(n):
+        cv2.imwrite(str(tmp_path / f"f{i}.png"), np.full((8, 8, 3), i * 100, dtype=np.uint8))
+    (tmp_path / "notes.txt").write_text("skip")
+    return tmp_path
+
+
+def test_image_sequence_loops_and_copies(tmp_path):
+    src = ImageSequenceSource(str(image_dir(tmp_path)), pacing="fast")
+    values = [int(src.read()[1][0, 0, 0]) for _ in range(5)]
+    assert values == [0, 100, 0, 100, 0]
+    ret, frame = src.read()
+    frame[:] = 255  # 호출 측이 그려도 미리 읽어 둔 원본은 그대로
+    src.read()
+    assert int(src.read()[1][0, 0, 0]) == 100
+
+    once = ImageSequenceSource(str(tmp_path), pacing="fast", loop=False)
+    assert [once.read()[0] for _ in range(3)] == [True, True, False]
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    assert not ImageSequenceSource(str(empty), pacing="fast").isOpened()
+
+
+def test_video_file_loops(tmp_path):
+    path = str(tmp_path / "clip.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 20, (16, 16))
+    if not writer.isOpened():
+        pytest.skip("이 OpenCV 빌드는 영상 쓰기를 지원하지 않음")
+    for i in range(3):
+        writer.write(np.full((16, 16, 3), i * 80, dtype=np.uint8))
+    writer.release()
+
+    src = VideoFileSource(path, pacing="fast")
+    assert src.fps == pytest.approx(20) and not src.paced
+    assert all(src.read()[0] for _ in range(7))  # 3프레임 영상을 끝없이 반복
+    once = VideoFileSource(path, pacing="fast", loop=False)
+    assert [once.read()[0] for _ in range(4)] == [True, True, True, False]
+    assert VideoFileSource(path).paced
+
+
+def test_open_frame_source_spec_parsing(tmp_path, monkeypatch):
+    monkeypatch.delenv("DEVGOTCHI_CAMERA", raising=False)
+    monkeypatch.setattr(Config, "CAMERA_SOURCE", "noise:3", raising=False)
+    monkeypatch.setattr(Config, "CAMERA_PACING", "fast", raising=False)
+    src = open_frame_source()
+    assert isinstance(src, NoiseSource) and src.seed == 3 and not src.paced
+    assert src.read()[1].shape == (Config.CAMERA_HEIGHT, Config.CAMERA_WIDTH, 3)
+
+    monkeypatch.setenv("DEVGOTCHI_CAMERA", f"images:{image_dir(tmp_path)}")  # 환경변수가 Config보다 우선
+    src = open_frame_source(pacing="realtime")
+    assert isinstance(src, ImageSequenceSource) and len(src.paths) == 2 and src.paced
+    assert open_frame_source("noise").seed == 0
+    with pytest.raises(ValueError):
+        open_frame_source("rtsp://camera")
@@ -0,0 +1,150 @@
+import json
+import threading
+
+from game_loop import GameLoop, VisionSampleWindow
+from config import Config
+
+
+class FakeGameManager:
+    def __init__(self):
+        self.calls = []
+        self.hp = 100
+        self.xp = 0
+        self.level = 1
+        self.happiness = 100
+        self.quests = []
+        self.available_quests = []
+
+    def update(self, is_bad_posture, is_drowsy, has_user_input, is_active_movement=False):
+        self.calls.append((is_bad_posture, is_drowsy, has_user_input, is_active_movement))
+
+
+def test_window_aggregation():
+    w = VisionSampleWindow()
+    # 30fps 기준 1초: 20프레임 나쁜 자세, 눈 감음 0.6초 연속
+    for i in range(30):
+        t = 100 + i / 30
+        w.add(i < 20, 5 <= i < 24, now=t)
+    s = w.drain()
+    assert s.frames == 30
+    assert abs(s.bad_ratio - 20 / 30) < 1e-9
+    assert abs(s.max_closed_run - 18 / 30) < 1e-9
+    assert s.movement is False
+
+    # drain 후에는 초기화
+    s2 = w.drain()
+    assert s2.frames == 0 and s2.max_closed_run == 0
+
+
+def test_closed_run_spans_ticks():
+    w = VisionSampleWindow()
+    w.add(False, True, now=10.0)
+    w.drain()
+    w.add(False, True, now=10.4)
+    w.add(False, True, now=10.8)
+    assert abs(w.drain().max_closed_run - 0.8) < 1e-9
+
+
+def test_tick_calls_update_once_per_window():
+    gm = FakeGameManager()
+    loop = GameLoop(gm, tick_hz=2)
+
+    assert loop.tick() is False  # 프레임 없으면 갱신하지 않음
+    assert gm.calls == []
+
+    for i in range(60):
+        loop.window.add(True, False, is_active_movement=(i == 3), now=i / 30)
+    assert loop.tick() is True
+    assert gm.calls == [(True, False, True, True)]
+
+    # 눈 감음 연속 시간이 기준 이상이면 졸음
+    n = int(Config.GAME_DROWSY_RUN_SEC * 30) + 2
+    for i in range(n):
+        loop.window.add(False, True, now=i / 30)
+    loop.tick()
+    assert gm.calls[-1] == (False, True, True, False)
+
+
+def test_snapshot_versioning():
+    gm = FakeGameManager()
+    loop = GameLoop(gm)
+    first = loop.snapshot
+    assert first.version == 1
+    assert json.loads(first.body)["hp"] == 100
+
+    # 내용이 같으면 버전/ETag 유지
+    assert loop.publish() is first
+
+    # 루프 스레드가 없으면 submit은 즉시 실행 후 새 스냅샷 발행
+    def damage(amount):
+        gm.hp -= amount
+        return gm.hp
+    assert loop.call(damage, 10) == 90
+    snap = loop.snapshot
+    assert snap.version == 2 and snap.etag != first.etag
+    assert snap.payload["hp"] == 90
+    assert first.payload["hp"] == 100  # 이전 스냅샷은 변하지 않음
+
+
+def test_commands_run_on_loop_thread():
+    gm = FakeGameManager()
+    loop = GameLoop(gm, tick_hz=1)
+    loop.start()
+    try:
+        name = loop.call(lambda: threading.current_thread().name, timeout=2)
+        assert name == "game-loop"
+    finally:
+        loop.stop()
+
+
+if __name__ == "__main__":
+    test_window_aggregation()
+    test_closed_run_spans_ticks()
+    test_tick_calls_update_once_per_window()
+    test_snapshot_versioning()
+    test_commands_run_on_loop_thread()
+    print("Game loop tests passed!")
+
+
+class MemoryStore:
+    def load_user_data(self):
+        return {}
+
+    def save_user_data(self, data):
+        pass
+
+
+class HpLog:
+    def __init__(self):
+        self.entries = []
+
+    def log_hp_change(self, hp_before, hp_after, reason, amount):
+        self.entries.append((reason, round(amount, 2)))
+
+    def log_quest_accepted(self, *args):
+        pass
+
+    def log_quest_completed(self, *args):
+        pass
+
+
+def test_bad_posture_minute_logs_bounded_hp_changes():
+    from game_manager import GameManager
+    now = [0.0]
+    gm = GameManager(data_manager=MemoryStore(), clock=lambda: now[0])
+    gm.set_activity_logger(HpLog())
+    loop = GameLoop(gm, tick_hz=Config.GAME_TICK_HZ)
+    for i in range(60 * Config.GAME_TICK_HZ):  # 60초 나쁜 자세
+        now[0] += 1 / Config.GAME_TICK_HZ
+        loop.window.add(True, False, now=now[0])
+        loop.tick()
+    lost = 100 - gm.hp
+    assert 25 < lost < 30  # 3초 뒤부터 초당 0.5
+    assert len(gm.activity_logger.entries) <= lost / Config.HP_LOG_MIN_DELTA + 1
+
+    for _ in range(3 * Config.GAME_TICK_HZ):  # 바른 자세로 돌아오면 남은 감점을 한 건으로
+        now[0] += 1 / Config.GAME_TICK_HZ
+        loop.window.add(False, False, now=now[0])
+        loop.tick()
+    assert abs(sum(a for _, a in gm.activity_logger.entries) - (gm.hp - 100)) < 0.05
+    assert {r for r, _ in gm.activity_logger.entries} == {"inst_posture_penalty"}
@@ -0,0 +1,67 @@
+import time
+
+import pytest
+
+from config import Config
+from game_sim import Sample, simulate, synthetic_timeline
+
+
+def test_simulation_is_deterministic():
+    samples = synthetic_timeline(days=2, seed=7)
+    a, _ = simulate(samples, seed=7)
+    b, _ = simulate(samples, seed=7)
+    assert a == b
+    assert a["simulated_hours"] == 18.0
+
+
+def test_posture_penalty_uses_simulated_time():
+    # 10초 나쁜 자세: 3초 이후부터 초당 HP_PENALTY_POSTURE_INSTANT 감소
+    samples = [Sample(10, True, False, True, False)]
+    summary, _ = simulate(samples, max_step=1.0, auto_accept=False)
+    expected = Config.MAX_HP - 7 * Config.HP_PENALTY_POSTURE_INSTANT
+    assert abs(summary["final_hp"] - expected) < 1e-6
+
+
+def test_config_overrides_are_restored():
+    original = Config.HP_PENALTY_POSTURE_INSTANT
+    samples = [Sample(10, True, False, True, False)]
+    summary, _ = simulate(samples, {"HP_PENALTY_POSTURE_INSTANT": 0}, max_step=1.0, auto_accept=False)
+    assert summary["final_hp"] == Config.MAX_HP
+    assert Config.HP_PENALTY_POSTURE_INSTANT == original
+
+
+def test_default_step_matches_game_tick_and_is_quiet(capsys):
+    samples = [Sample(3600, True, True, False, False)]
+    summary, sim = simulate(samples, skip_ahead=False)
+    assert sim.max_step == 1.0 / Config.GAME_TICK_HZ
+    assert sim.update_count == 3600 * Config.GAME_TICK_HZ
+    assert capsys.readouterr().out == ""
+
+
+def test_skip_ahead_matches_tick_by_tick():
+    samples = synthetic_timeline(days=1, seed=3)
+    fast, fast_sim = simulate(samples, seed=3)
+    slow, slow_sim = simulate(samples, seed=3, skip_ahead=False)
+    for key in ("simulated_hours", "level", "xp", "quests_completed"):
+        assert fast[key] == slow[key]
+    for key in ("final_hp", "min_hp", "avg_hp", "low_hp_minutes"):
+        assert fast[key] == pytest.approx(slow[key], abs=0.05)
+    # 사유별 합계는 기록 단위(0.1 미만 잔여는 버림)가 달라 약간 차이
+    assert fast["hp_by_reason"] == pytest.approx(slow["hp_by_reason"], rel=1e-3)
+    assert fast_sim.update_count * 20 < slow_sim.update_count
+
+
+def test_skip_ahead_speed():
+    samples = synthetic_timeline(days=30, seed=1)
+    start = time.perf_counter()
+    summary, _ = simulate(samples, seed=1)
+    elapsed = time.perf_counter() - start
+    # 개발 PC 약 1,000배 - 느린 CI에서도 틱 단위 재생(약 40배)보다는 확실히 빨라야 함
+    assert summary["simulated_hours"] / elapsed > 200
+
+
+if __name__ == "__main__":
+    test_simulation_is_deterministic()
+    test_posture_penalty_uses_simulated_time()
+    test_config_overrides_are_restored()
+    print("Game simulator tests passed!")
@@ -0,0 +1,39 @@
+import pytest
+
+pytest.importorskip("flask")
+
+import app as web  # noqa: E402
+from config import Config  # noqa: E402
+
+pytestmark = pytest.mark.usefixtures("app_logs_in_tmp")
+
+
+def test_quantized_posture_keeps_threshold_verdict():
+    for score in (0.0, 0.05, 0.179, 0.18, 0.1801, 0.19, 0.33):
+        q = web.quantize_posture(score)
+        assert (q > Config.POSTURE_THRESHOLD) == (score > Config.POSTURE_THRESHOLD), score
+        assert 0 <= q - score < Config.GAMESTATE_POSTURE_STEP
+
+
+def test_etag_survives_frame_jitter(monkeypatch):
+    monkeypatch.setattr(web, "get_weather", lambda: None)
+    client = web.app.test_client()
+    monkeypatch.setattr(web, "current_posture_score", 0.101)
+    first = client.get("/api/gamestate")
+    monkeypatch.setattr(web, "current_posture_score", 0.107)  # 다음 프레임의 미세한 흔들림
+    again = client.get("/api/gamestate", headers={"If-None-Match": first.headers["ETag"]})
+    assert again.status_code == 304
+    monkeypatch.setattr(web, "current_posture_score", 0.2)  # 거북목으로 바뀌면 새 응답
+    changed = client.get("/api/gamestate", headers={"If-None-Match": first.headers["ETag"]})
+    assert changed.status_code == 200 and changed.get_json()["posture_score"] == 0.2
+
+
+def test_asgi_mode_never_fetches_weather_in_request(monkeypatch):
+    def blocking_fetch():
+        raise AssertionError("요청 경로에서 OpenWeather 호출")
+
+    monkeypatch.setattr(web, "get_weather", blocking_fetch)
+    monkeypatch.setattr(web, "weather_fetch_on_miss", False)  # ASGI lifespan이 설정
+    monkeypatch.setattr(web, "latest_weather_data", {"temp": 3, "condition": "맑음", "timestamp": 0})  # 만료됨
+    resp = web.app.test_client().get("/api/gamestate")
+    assert resp.status_code == 200 and resp.get_json()["weather"]["temp"] == 3
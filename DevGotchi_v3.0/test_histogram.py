@@ -0,0 +1,25 @@
+import random
+
+from histogram import LogHistogram
+
+
+def test_percentiles_within_bucket_error():
+    rng = random.Random(1)
+    values = [rng.lognormvariate(6, 1) for _ in range(20000)]
+    h = LogHistogram()
+    for v in values:
+        h.record(v)
+    values.sort()
+    for p in (50, 90, 99):
+        exact = values[int(len(values) * p / 100) - 1]
+        assert abs(h.percentile(p) - exact) / exact < 0.06
+    assert h.percentile(100) == max(values)
+
+
+def test_merge_equals_single_pass():
+    a, b, both = LogHistogram(), LogHistogram(), LogHistogram()
+    for i in range(1, 1000):
+        (a if i % 3 else b).record(i)
+        both.record(i)
+    merged = LogHistogram.from_dict(a.to_dict()).merge(LogHistogram.from_dict(b.to_dict()))
+    assert merged.summary() == both.summary()
@@ -0,0 +1,85 @@
+import pytest
+
+pytest.importorskip("requests")
+flask = pytest.importorskip("flask")
+
+import requests  # noqa: E402
+
+from instrumentation import UNMATCHED_ROUTE, install_flask_metrics, instrument_llm, log_http_out  # noqa: E402
+from metrics_logger import MetricsLogger  # noqa: E402
+
+
+class MemoryMetrics(MetricsLogger):
+    """파일 대신 메모리에 이벤트를 모음 (로그 디렉터리는 tmp_path)"""
+
+    def __init__(self, log_dir):
+        super().__init__(str(log_dir), buffered=False)
+        self.events = []
+
+    def log_many(self, events):
+        self.events.extend(events)
+
+
+@pytest.fixture
+def metrics(tmp_path):
+    return MemoryMetrics(tmp_path)
+
+
+def test_flask_requests_are_logged_by_route(metrics):
+    app = flask.Flask(__name__)
+
+    @app.route("/api/history/<int:session_id>")
+    def history(session_id):
+        return {"id": session_id}
+
+    @app.route("/boom")
+    def boom():
+        raise RuntimeError("boom")
+
+    install_flask_metrics(app, metrics)
+    client = app.test_client()
+    assert client.get("/api/history/3?key=secret").status_code == 200
+    assert client.get("/nope?x=1").status_code == 404
+    assert client.get("/boom").status_code == 500
+
+    ok, missing, error = metrics.events
+    assert (ok.kind, ok.name, ok.method, ok.path, ok.status_code, ok.ok) == \
+        ("http_in", "flask", "GET", "/api/history/<int:session_id>", 200, True)
+    assert ok.latency_ms >= 0 and "secret" not in repr(ok)
+    assert (missing.path, missing.status_code, missing.ok) == (UNMATCHED_ROUTE, 404, True)
+    assert (error.path, error.status_code, error.ok) == ("/boom", 500, False)
+
+
+def test_http_out_strips_query_and_records_failures(metrics):
+    log_http_out("get", "https://api.openweathermap.org/data/2.5/weather?q=Seoul&appid=KEY", 0.0,
+                 status_code=200, metrics=metrics)
+    log_http_out("post", "https://api.minimax.io/v1/t2a", 0.0, status_code=503, metrics=metrics)
+    log_http_out("get", "https://openapi.naver.com/v1/search/news.json?query=x", 0.0,
+                 exc=requests.Timeout("read timeout"), metrics=metrics)
+
+    ok, failed, timeout = metrics.events
+    assert (ok.name, ok.method, ok.url, ok.status_code, ok.ok) == \
+        ("openweather", "GET", "https://api.openweathermap.org/data/2.5/weather", 200, True)
+    assert (failed.name, failed.status_code, failed.ok) == ("minimax", 503, False)
+    assert (timeout.name, timeout.ok, timeout.timeout) == ("naver_news", False, True)
+    assert timeout.url == "https://openapi.naver.com/v1/search/news.json" and "Timeout" in timeout.error
+
+
+def test_instrument_llm_records_usage_and_errors(metrics):
+    @instrument_llm("local_llm", metrics=metrics, cost_fn=lambda result, tin, tout: (tin + tout) * 1e-6)
+    def complete(prompt, request_type=None):
+        if prompt == "slow":
+            raise TimeoutError("deadline")
+        return {"choices": [{"message": {"content": "안녕하세요"}}],
+                "usage": {"prompt_tokens": 12, "completion_tokens": 5}}
+
+    assert complete("hi", request_type="briefing")["usage"]["completion_tokens"] == 5
+    with pytest.raises(TimeoutError):
+        complete("slow")
+
+    ok, failed = metrics.events
+    assert (ok.kind, ok.name, ok.request_type, ok.ok) == ("llm", "local_llm", "briefing", True)
+    assert (ok.tokens_in, ok.tokens_out, ok.response_len, ok.timeout) == (12, 5, 5, False)
+    assert ok.cost == pytest.approx(17e-6)
+    assert (failed.request_type, failed.ok, failed.timeout, failed.cost) == ("chat", False, True, None)
+    assert "deadline" in failed.error
@@ -0,0 +1,64 @@
+import math
+import random
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from landmark_features import NOSE, LEFT_SHOULDER, RIGHT_SHOULDER, face_features, pose_features  # noqa: E402
+
+
+def pose(nose_x):
+    lms = [SimpleNamespace(x=0.5, y=0.8) for _ in range(33)]
+    lms[NOSE] = SimpleNamespace(x=nose_x, y=0.3)
+    lms[LEFT_SHOULDER] = SimpleNamespace(x=0.4, y=0.6)
+    lms[RIGHT_SHOULDER] = SimpleNamespace(x=0.6, y=0.6)
+    return lms
+
+
+def test_pose_features_values():
+    f = pose_features(pose(0.6))
+    assert f["forward_distance"] == pytest.approx(0.1)
+    assert f["vertical_diff"] == pytest.approx(0.3)
+    assert f["wrist_above_shoulder"] is False
+
+
+def test_face_features_match_per_landmark_formulas():
+    """배열 연산 결과가 예전 vision_engine의 랜드마크별 계산과 같음"""
+    rng = random.Random(0)
+    lms = [SimpleNamespace(x=rng.random(), y=rng.random()) for _ in range(478)]
+
+    def dist(i1, i2):
+        return math.hypot(lms[i1].x - lms[i2].x, lms[i1].y - lms[i2].y)
+
+    ear = (dist(159, 145) / dist(33, 133) + dist(386, 374) / dist(362, 263)) / 2
+    mouth_w = abs(lms[61].x - lms[291].x)
+    mouth_ratio = abs(lms[13].y - lms[14].y) / mouth_w
+    tilt = math.degrees(math.atan2(lms[263].y - lms[33].y, abs(lms[263].x - lms[33].x)))
+
+    f = face_features(lms)
+    assert f["ear"] == pytest.approx(ear, rel=1e-5)
+    assert f["mouth_width"] == pytest.approx(mouth_w, rel=1e-5)
+    assert f["mouth_ratio"] == pytest.approx(mouth_ratio, rel=1e-5)
+    assert f["head_tilt"] == pytest.approx(tilt, abs=1e-3)
+
+
+def test_concurrent_engines_do_not_share_buffers():
+    """스레드 모드 엔진과 벤치마크가 같은 FeatureSet을 동시에 써도 서로의 좌표가 섞이지 않음"""
+    errors = []
+
+    def worker(nose_x):
+        for _ in range(2000):
+            d = pose_features(pose(nose_x))["forward_distance"]
+            if abs(d - abs(nose_x - 0.5)) > 1e-6:
+                errors.append(d)
+                return
+
+    threads = [threading.Thread(target=worker, args=(x,)) for x in (0.5, 0.9)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
@@ -0,0 +1,55 @@
+import copy
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("dotenv")
+pytest.importorskip("requests")
+
+import llm_bench  # noqa: E402
+
+
+class FakeClock:
+    now = 0.0
+
+    def perf_counter(self):
+        return self.now
+
+
+class FakeBackend:
+    """prefill 0.2초 + 토큰당 0.01초 (100 tokens/s), 답변은 항상 41토큰"""
+    name = "fake"
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.calls = []
+
+    def complete(self, messages, request_type="chat", max_tokens=512, timeout=15, **_):
+        tokens = min(max_tokens, 41)
+        self.calls.append(max_tokens)
+        self.clock.now += 0.2 + 0.01 * tokens
+        return SimpleNamespace(text="응", tokens_out=tokens)
+
+
+def test_ttft_is_separated_from_decode_rate(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_bench, "time", clock)
+    backend = FakeBackend(clock)
+    r = llm_bench.bench_backend(backend, {"simple": ["안녕"]}, runs=2, max_tokens=64, warmup=0)["simple"]
+    assert backend.calls == [1, 64, 1, 64]  # 첫 토큰 측정 요청 + 전체 답변 요청
+    assert r["requests"] == 2 and r["errors"] == 0
+    assert r["ttft_ms"]["p50"] == pytest.approx(210)
+    assert r["e2e_ms"]["p50"] == pytest.approx(610)
+    assert r["decode_tokens_per_s"]["p50"] == pytest.approx(100)
+    assert r["e2e_tokens_per_s"]["p50"] == pytest.approx(41 / 0.61, abs=0.01)  # prefill 포함이라 낮음
+
+
+def test_compare_reports_uses_shared_delta_table(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(llm_bench, "time", clock)
+    old = {"backends": {"local": llm_bench.bench_backend(FakeBackend(clock), {"long": ["x"]}, runs=1, warmup=0)}}
+    new = copy.deepcopy(old)
+    new["backends"]["local"]["long"]["decode_tokens_per_s"]["p50"] = 80.0
+    lines = {line.split()[0]: line for line in llm_bench.compare_reports(old, new)[1:]}
+    assert lines["local.long.decode_tokens_per_s.p50"].rstrip().endswith("-20.0% !")
+    assert lines["local.long.ttft_ms.p50"].rstrip().endswith("+0.0%")
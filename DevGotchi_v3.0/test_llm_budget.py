@@ -0,0 +1,39 @@
+from llm_budget import CACHE_ONLY, CHEAP, NORMAL, REDUCED, LLMBudget, estimate_cost
+
+PRICES = {"big": (1.0, 2.0)}
+
+
+def test_estimate_cost():
+    assert estimate_cost("big", 1_000_000, 500_000, PRICES) == 2.0
+    assert estimate_cost("unknown", 10, 10, PRICES) is None
+
+
+def test_levels_degrade_and_reset_next_day(tmp_path):
+    now = [1_700_000_000.0]
+    path = str(tmp_path / "budget.json")
+    budget = LLMBudget(1.0, reduce_at=0.5, cheap_at=0.8, reduced_tokens=0.5, min_tokens=64,
+                       cheap_model="small", state_path=path, clock=lambda: now[0])
+    assert budget.policy(800, "big") == (NORMAL, 800, "big", False)
+
+    budget.record("chat", 100, 50, 0.6)
+    assert budget.policy(800, "big") == (REDUCED, 400, "big", False)
+    budget.record("voice", 10, 5, 0.25)
+    assert budget.policy(100, "big") == (CHEAP, 64, "small", False)
+    budget.record("chat", 10, 5, 0.2)
+    assert budget.policy(800, "big").cache_only and budget.level() == CACHE_ONLY
+
+    status = budget.status()
+    assert status["by_type"]["chat"] == {"calls": 2, "tokens_in": 110, "tokens_out": 55, "cost": 0.8}
+
+    # 재시작해도 오늘 사용량 유지
+    again = LLMBudget(1.0, state_path=path, clock=lambda: now[0])
+    assert again.level() == CACHE_ONLY
+
+    now[0] += 24 * 60 * 60  # 다음 날
+    assert again.level() == NORMAL and again.status()["spent_usd"] == 0
+
+
+def test_zero_budget_only_meters():
+    budget = LLMBudget(0)
+    budget.record("boot", 1000, 1000, 5.0)
+    assert budget.level() == NORMAL and budget.status()["spent_usd"] == 5.0
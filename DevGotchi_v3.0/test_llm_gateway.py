@@ -0,0 +1,73 @@
+import threading
+import time
+
+import pytest
+
+from llm_gateway import CLOSED, HALF_OPEN, OPEN, CircuitOpen, LLMGateway, LLMUnavailable
+
+
+def warmed(gw, model, seconds, n=10):
+    for _ in range(n):
+        gw._state(model).latency.add(seconds)
+
+
+def test_timeout_follows_observed_p95():
+    gw = LLMGateway(default_timeout=15, min_timeout=0.5, max_timeout=20, timeout_margin=2, min_samples=5)
+    assert gw.timeout_for("m") == 15 and gw.hedge_after("m") is None  # 샘플 부족
+    warmed(gw, "m", 1.0)
+    assert gw.timeout_for("m") == 2.0 and gw.hedge_after("m") == 1.0
+    warmed(gw, "m", 0.01, n=100)
+    assert gw.timeout_for("m") == 0.5  # 하한
+
+
+def test_slow_primary_is_hedged():
+    gw = LLMGateway(min_timeout=1, timeout_margin=10, min_samples=5)
+    warmed(gw, "m", 0.05)
+    calls = []
+    lock = threading.Lock()
+
+    def fn(timeout):
+        with lock:
+            calls.append(timeout)
+            first = len(calls) == 1
+        time.sleep(0.8 if first else 0.01)  # 첫 요청만 느림
+        return "hedge" if not first else "primary"
+
+    t0 = time.monotonic()
+    assert gw.call("m", fn) == "hedge"
+    assert time.monotonic() - t0 < 0.5 and len(calls) == 2
+
+
+def test_breaker_opens_serves_fallback_and_recovers():
+    now = [0.0]
+    gw = LLMGateway(failure_threshold=2, cooldown_sec=30, hedge=False, clock=lambda: now[0])
+    breaker = gw._state("m").breaker
+    calls = []
+
+    def boom(timeout):
+        calls.append(timeout)
+        raise ConnectionError("down")
+
+    with pytest.raises(LLMUnavailable):
+        gw.call("m", boom)
+    assert gw.call("m", boom, fallback=lambda rt: f"canned:{rt}") == "canned:chat"
+    assert breaker.state == OPEN and len(calls) == 2
+
+    with pytest.raises(CircuitOpen):
+        gw.call("m", boom)  # 열려 있으면 호출하지 않음
+    assert gw.call("m", boom, request_type="voice", fallback=lambda rt: rt) == "voice"
+    assert len(calls) == 2
+
+    now[0] = 31.0  # cooldown 후 시험 호출 1건
+    assert breaker.allow() and breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert gw.call("m", lambda timeout: "ok") == "ok"
+
+
+def test_bad_response_counts_as_failure():
+    gw = LLMGateway(failure_threshold=1, hedge=False)
+    reply = gw.call("m", lambda timeout: {"error": "quota"}, is_ok=lambda r: "choices" in r,
+                    fallback=lambda rt: "canned")
+    assert reply == "canned" and gw.stats()["m"]["state"] == OPEN
@@ -0,0 +1,57 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from load_test import percentile, run_scenario
+
+
+class FakeMirror(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    chats = []
+
+    def _send(self, status, body=b"", etag=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(body)))
+        if etag:
+            self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == '"v1"':
+            self._send(304, etag='"v1"')
+        else:
+            self._send(200, b'{"hp":100}', etag='"v1"')
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.chats.append(body["message"])
+        self._send(200, json.dumps({"text": "ok"}).encode())
+
+    def log_message(self, *args):
+        pass
+
+
+def test_scenarios_against_local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeMirror)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        r = run_scenario(base, "gamestate", concurrency=2, duration=0.3, warmup=0, revalidate=True)
+        assert r["requests"] > 0 and r["errors"] == 0
+        assert set(r["status"]) == {"200", "304"}  # 첫 요청 이후 ETag 재검증
+        assert r["p50_ms"] <= r["p99_ms"] <= r["max_ms"]
+
+        r = run_scenario(base, "chat", concurrency=2, duration=0.2, warmup=0)
+        assert r["status"] == {"200": r["requests"]}
+        assert len(set(FakeMirror.chats)) == len(FakeMirror.chats)  # 메시지마다 달라서 합쳐지지 않음
+    finally:
+        server.shutdown()
+
+
+def test_percentile():
+    assert percentile([], 99) is None
+    values = list(range(1, 101))
+    assert percentile(values, 50) in (50, 51)
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
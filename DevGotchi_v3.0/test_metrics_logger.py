@@ -0,0 +1,47 @@
+from metrics_logger import DailyAggregate, MetricEvent, MetricsLogger, merge_summaries
+
+
+def test_daily_summary_percentiles_and_merge(tmp_path):
+    m = MetricsLogger(log_dir=str(tmp_path), buffered=False)
+    # 2026-01-01 / 2026-01-02 (UTC 정오)
+    for day_ts in (1767268800, 1767355200):
+        for i in range(100):
+            m.log(MetricEvent(ts=day_ts + i, kind="llm", name="minimax_voice", ok=True,
+                              latency_ms=100 + i * 10, request_type="voice"))
+    s1 = m.compute_daily_summary("2026-01-01")
+    s2 = m.compute_daily_summary("2026-01-02")
+
+    voice = s1["llm"]["voice"]
+    assert voice["count"] == 100
+    assert voice["max_latency_ms"] == 1090
+    assert abs(voice["p90_latency_ms"] - 990) / 990 < 0.06
+    assert s1["latency_percentiles"]["llm:minimax_voice"]["count"] == 100
+
+    merged = merge_summaries([s1, s2], label="2026-01-01~2026-01-02")
+    assert merged["counts"]["llm_total"] == 200
+    assert merged["llm"]["voice"]["p50_latency_ms"] == s1["llm"]["voice"]["p50_latency_ms"]
+    assert DailyAggregate.from_state(s1["aggregate"]).to_summary("2026-01-01") == s1
+
+
+def test_incremental_summary_reads_only_new_lines(tmp_path):
+    m = MetricsLogger(log_dir=str(tmp_path), buffered=False)
+    ts = 1767268800  # 2026-01-01
+    m.log(MetricEvent(ts=ts, kind="http_in", name="flask", ok=True, latency_ms=10, path="/api/gamestate"))
+    assert m.get_daily_summary("2026-01-01")["counts"]["http_in_total"] == 1
+
+    # 쓰는 중인 마지막 줄(개행 없음)은 다음 호출로 미룸
+    with open(m._events_path("2026-01-01"), "a", encoding="utf-8") as f:
+        f.write('{"ts": 1767268801, "kind": "http_in", "name": "flask", "ok": tr')
+    assert m.get_daily_summary("2026-01-01")["counts"]["http_in_total"] == 1
+    with open(m._events_path("2026-01-01"), "a", encoding="utf-8") as f:
+        f.write('ue, "latency_ms": 20}\n')
+    m.log(MetricEvent(ts=ts + 2, kind="http_in", name="flask", ok=False, latency_ms=30))
+    s = m.get_daily_summary("2026-01-01")
+    assert s["counts"]["http_in_total"] == 3
+    assert s["counts"]["http_in_fail"] == 1
+    assert m.compute_daily_summary("2026-01-01", rebuild=True) == s
+
+    m.log(MetricEvent(ts=ts + 86400, kind="http_in", name="flask", ok=True, latency_ms=40))
+    r = m.get_range_summary("2025-12-31", "2026-01-02")
+    assert r["counts"]["http_in_total"] == 4
+    assert r["latency_percentiles"]["http_in"]["max"] == 40
@@ -0,0 +1,34 @@
+from metrics_registry import MetricsRegistry
+
+
+def test_text_exposition_format():
+    reg = MetricsRegistry()
+    c = reg.counter("t_requests_total", "요청 수", ("route",))
+    c.labels("/api/gamestate").inc()
+    c.labels(route="/api/gamestate").inc(2)
+    h = reg.histogram("t_latency_seconds", "지연", ("route",), buckets=(0.1, 1.0))
+    for v in (0.05, 0.5, 5.0):
+        h.labels("/api/chat").observe(v)
+    g = reg.gauge("t_queue_depth", "대기열", ("queue",))
+    g.labels("bus").set_function(lambda: 7)
+    g.labels("broken").set_function(lambda: 1 / 0)
+
+    lines = reg.render().splitlines()
+    assert "# TYPE t_requests_total counter" in lines
+    assert 't_requests_total{route="/api/gamestate"} 3' in lines
+    assert 't_latency_seconds_bucket{route="/api/chat",le="0.1"} 1' in lines
+    assert 't_latency_seconds_bucket{route="/api/chat",le="1"} 2' in lines
+    assert 't_latency_seconds_bucket{route="/api/chat",le="+Inf"} 3' in lines
+    assert 't_latency_seconds_count{route="/api/chat"} 3' in lines
+    assert 't_queue_depth{queue="bus"} 7' in lines
+    assert 't_queue_depth{queue="broken"} NaN' in lines
+
+
+def test_same_name_returns_same_metric():
+    reg = MetricsRegistry()
+    assert reg.counter("x_total", "x") is reg.counter("x_total", "x")
+    try:
+        reg.gauge("x_total", "x")
+        assert False, "타입이 다른 재등록은 실패해야 함"
+    except ValueError:
+        pass
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from profiler import SamplingProfiler, ProfilerBusy, span, set_spans_enabled, span_stats
+
+
+def test_span_is_noop_until_enabled():
+    set_spans_enabled(False, reset=True)
+    with span("test.disabled"):
+        pass
+    assert "test.disabled" not in span_stats()
+
+    set_spans_enabled(True)
+    try:
+        for _ in range(3):
+            with span("test.enabled"):
+                time.sleep(0.001)
+    finally:
+        set_spans_enabled(False)
+    stat = span_stats()["test.enabled"]
+    assert stat["count"] == 3
+    assert stat["max_ms"] >= 1
+
+
+def busy_worker(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_sampler_collapses_other_thread_stacks():
+    stop = threading.Event()
+    t = threading.Thread(target=busy_worker, args=(stop,), name="busy", daemon=True)
+    t.start()
+    try:
+        collapsed, samples = SamplingProfiler(max_seconds=1).profile(seconds=0.2, interval=0.005)
+    finally:
+        stop.set()
+        t.join()
+    assert samples > 5
+    lines = collapsed.strip().splitlines()
+    assert any(line.startswith("busy;") and "test_profiler:busy_worker" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) >= 1
+
+
+def test_only_one_profile_at_a_time():
+    p = SamplingProfiler(max_seconds=1)
+    t = threading.Thread(target=p.profile, args=(0.3, 0.01))
+    t.start()
+    time.sleep(0.05)
+    try:
+        p.profile(0.1)
+        assert False, "동시 실행은 거부되어야 함"
+    except ProfilerBusy:
+        pass
+    t.join()
+    assert not p.is_running()
@@ -0,0 +1,41 @@
+import threading
+
+import pytest
+
+from subsystems import SubsystemRegistry, SubsystemUnavailable
+
+
+def test_background_start_reports_readiness_and_timing():
+    reg = SubsystemRegistry()
+    gate = threading.Event()
+    reg.register("slow", lambda: gate.wait(2) and "engine")
+    reg.register("broken", lambda: 1 / 0)
+    assert reg.status() == {"slow": "pending", "broken": "pending"}
+
+    reg.start()
+    assert reg.peek("slow") is None
+    with pytest.raises(SubsystemUnavailable):
+        reg.get("slow", timeout=0.01)
+
+    gate.set()
+    assert reg.get("slow", timeout=2) == "engine"
+    with pytest.raises(SubsystemUnavailable, match="ZeroDivisionError"):
+        reg.get("broken", timeout=2)
+    assert reg.status() == {"slow": "ready", "broken": "failed"}
+    assert reg.report()["subsystems"]["slow"]["load_ms"] >= 0
+
+
+def test_get_loads_lazily_once_with_dependencies():
+    reg = SubsystemRegistry()
+    calls = []
+    reg.register("tts", lambda: calls.append("tts") or "tts")
+    reg.register("voice", lambda: calls.append("voice") or "voice", requires=("tts",))
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(reg.get("voice"))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == ["voice"] * 4
+    assert calls == ["tts", "voice"]
@@ -0,0 +1,84 @@
+import copy
+import io
+import json
+import time
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+
+from profiler import span, spans_enabled  # noqa: E402
+from vision_bench import Confusion, Labels, compare_reports, run_benchmark  # noqa: E402
+
+
+def test_labels_by_key_and_ranges():
+    by_key = Labels({"frame_0001.jpg": {"bad_posture": True}})
+    assert by_key.get("frame_0001.jpg", 0) == {"bad_posture": True}
+    assert by_key.get("frame_0002.jpg", 1) is None
+
+    ranges = Labels([{"start": 10, "end": 19, "bad_posture": True},
+                     {"start": 0, "end": 9, "bad_posture": False}])
+    assert ranges.get("0", 0)["bad_posture"] is False
+    assert ranges.get("9", 9)["bad_posture"] is False  # end 포함
+    assert ranges.get("10", 10)["bad_posture"] is True
+    assert ranges.get("20", 20) is None
+    assert not Labels() and ranges
+
+
+def test_confusion_precision_recall_f1():
+    cm = Confusion()
+    for predicted, expected in [(1, 1)] * 6 + [(1, 0)] * 2 + [(0, 1)] * 3 + [(0, 0)] * 9:
+        cm.add(predicted, expected)
+    r = cm.report()
+    assert (r["tp"], r["fp"], r["fn"], r["tn"]) == (6, 2, 3, 9)
+    assert r["labelled_frames"] == 20 and r["accuracy"] == 0.75
+    assert r["precision"] == 0.75 and r["recall"] == pytest.approx(0.6667, abs=1e-4)
+    assert r["f1"] == pytest.approx(2 * 0.75 * (6 / 9) / (0.75 + 6 / 9), abs=1e-4)
+    assert Confusion().report()["accuracy"] is None
+
+
+class FakeEngine:
+    """프레임 번호가 짝수면 거북목, 4의 배수면 눈감음으로 판정 (VisionEngine과 같은 span 이름 사용)"""
+
+    def analyze_frame(self, frame):
+        with span("vision.cvt_color"):
+            n = int(frame[0, 0, 0])
+        with span("vision.pose"):
+            time.sleep(0.002)
+        with span("vision.face_mesh"):
+            pass
+        return (0.3 if n % 2 == 0 else 0.1), False, False, n % 4 == 0, object()
+
+
+def frames(n):
+    for i in range(n):
+        yield str(i), i, np.full((4, 4, 3), i, dtype=np.uint8)
+
+
+def test_run_benchmark_counts_and_accuracy():
+    labels = Labels([{"start": 0, "end": 9, "bad_posture": True, "eye_closed": False}])
+    decisions = io.StringIO()
+    report = run_benchmark(FakeEngine(), frames(10), labels, warmup=2, decisions_out=decisions)
+    assert report["frames"]["frames"] == 8 and report["frames"]["warmup"] == 2
+    assert report["accuracy"]["posture"]["tp"] == 4 and report["accuracy"]["posture"]["fn"] == 4
+    assert report["accuracy"]["eye_closed"]["fp"] == 2
+    assert report["latency_ms"]["analyze_frame"]["count"] == 8
+    assert report["latency_ms"]["pose"]["count"] == 8 and report["latency_ms"]["face_mesh"]["count"] == 8
+    assert 1.5 <= report["latency_ms"]["pose"]["p50"] < report["latency_ms"]["analyze_frame"]["max"]
+    assert not spans_enabled()  # 벤치마크가 켠 span 측정은 끝나면 원래대로
+    assert json.loads(decisions.getvalue().splitlines()[0])["key"] == "2"
+
+
+def test_compare_reports_flags_regressions():
+    old = run_benchmark(FakeEngine(), frames(6), Labels([{"start": 0, "end": 5, "bad_posture": True}]), warmup=0)
+    old["latency_ms"]["pose"]["p50"] = 2.0
+    old["fps"]["analyze_frame"] = 100.0
+    new = copy.deepcopy(old)
+    new["latency_ms"]["pose"]["p50"] = 3.0  # 50% 느려짐
+    new["fps"]["analyze_frame"] = 95.0  # 5% 감소 - 표시 기준(10%) 미만
+
+    lines = {line.split()[0]: line for line in compare_reports(old, new)[1:]}
+    assert lines["latency_ms.pose.p50"].rstrip().endswith("+50.0% !")
+    assert lines["fps.analyze_frame"].rstrip().endswith("-5.0%")
+    assert lines["accuracy.eye_closed.f1"].split()[1:] == ["None", "None"]  # 라벨 없는 지표는 delta 없음
@@ -0,0 +1,14 @@
+import pytest
+
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe")
+
+from vision_engine import is_active_movement  # noqa: E402
+
+
+def test_movement_judged_from_pose_features():
+    seated = {"shoulder_y": 0.6, "wrist_above_shoulder": False}
+    assert not is_active_movement(seated)
+    assert is_active_movement({**seated, "wrist_above_shoulder": True})  # 기지개
+    assert is_active_movement({**seated, "shoulder_y": 0.1})  # 일어섬
+    assert is_active_movement(None)  # 자리 비움
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("cv2")
+pytest.importorskip("mediapipe.tasks.python.vision")
+
+import vision_tasks  # noqa: E402
+from vision_tasks import FaceTasksAdapter, PoseTasksAdapter, _TasksAdapter  # noqa: E402
+
+
+class FakeLandmarker:
+    """detect_for_video에 넘어온 타임스탬프를 기록하고 정해진 결과를 돌려줌"""
+
+    def __init__(self, result):
+        self.result = result
+        self.timestamps = []
+        self.closed = False
+
+    def detect_for_video(self, image, ts_ms):
+        self.timestamps.append(ts_ms)
+        return self.result
+
+    def close(self):
+        self.closed = True
+
+
+def adapter(cls, result):
+    a = cls.__new__(cls)  # 모델 파일 없이 가짜 랜드마커로 초기화
+    detect = a._detect_pose if cls is PoseTasksAdapter else a._detect_face
+    _TasksAdapter.__init__(a, FakeLandmarker(result), detect)
+    return a
+
+
+def test_timestamps_increase_even_if_clock_stalls_or_goes_back(monkeypatch):
+    now = [10.0]
+    monkeypatch.setattr(vision_tasks.time, "monotonic", lambda: now[0])
+    a = adapter(PoseTasksAdapter, SimpleNamespace(pose_landmarks=[]))
+    rgb = np.zeros((4, 4, 3), np.uint8)
+    a.process(rgb)
+    a.process(rgb)  # 같은 ms
+    now[0] = 9.0  # 시계가 뒤로 가도
+    a.process(rgb)
+    now[0] = 12.5
+    a.process(rgb)
+    assert a.landmarker.timestamps == [10000, 10001, 10002, 12500]
+    a.close()
+    assert a.landmarker.closed
+
+
+def test_results_are_shaped_like_legacy_solutions():
+    lms = [SimpleNamespace(x=0.5, y=0.5)]
+    rgb = np.zeros((4, 4, 3), np.uint8)
+
+    pose = adapter(PoseTasksAdapter, SimpleNamespace(pose_landmarks=[lms]))
+    assert pose.process(rgb).pose_landmarks.landmark is lms
+    assert adapter(PoseTasksAdapter, SimpleNamespace(pose_landmarks=[])).process(rgb).pose_landmarks is None
+
+    face = adapter(FaceTasksAdapter, SimpleNamespace(face_landmarks=[lms, lms]))
+    faces = face.process(rgb).multi_face_landmarks
+    assert len(faces) == 1 and faces[0].landmark is lms
+    assert adapter(FaceTasksAdapter, SimpleNamespace(face_landmarks=[])).process(rgb).multi_face_landmarks is None
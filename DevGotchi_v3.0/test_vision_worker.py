@@ -0,0 +1,96 @@
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from vision_worker import H_READING_SLOT, H_TORN, FrameRing, ResultBlock, VisionWorker
+
+
+def test_result_block_recovers_from_writer_dying_mid_publish():
+    block = ResultBlock.create(64)
+    try:
+        assert block.read() == (None, None)
+        block.publish(1, 80.0, False, False, False, True, 5.0, 1.0, np.frombuffer(b"\xff\xd8", np.uint8))  # cv2.imencode 결과와 같은 형태
+        result, jpeg = block.read(with_jpeg=True)
+        assert result.seq == 1 and jpeg == b"\xff\xd8"
+
+        block.fields[0] += 1  # publish 도중 종료 (version 홀수로 남음)
+        assert block.read(retries=3) == (None, None)
+        block.reset_writer()  # 워커 재시작 전
+        assert block.read()[0].seq == 1
+        block.publish(2, 70.0, False, False, False, True, 5.0, 1.0, None, movement=True)
+        assert block.read()[0].seq == 2 and block.read()[0].movement  # 기지개/일어서기 → 게임 루프
+    finally:
+        block.close()
+
+
+
+def test_frame_ring_writer_skips_latest_and_reading_slots():
+    ring = FrameRing.create((2, 2, 3), slots=3)
+    try:
+        ring.write(np.full((2, 2, 3), 1, np.uint8))
+        seq, slot = ring.latest()
+        frame = ring.acquire(seq, slot)
+        assert frame is not None and frame[0, 0, 0] == 1
+        for i in range(2, 12):
+            latest = ring.latest()[1]
+            ring.write(np.full((2, 2, 3), i, np.uint8))
+            assert ring.latest()[1] not in (latest, slot)  # 방금 쓴 최신 슬롯도, 읽는 중인 슬롯도 덮어쓰지 않음
+        assert ring.still_valid(seq, slot) and frame[0, 0, 0] == 1
+        assert ring.header[H_TORN] == 0
+    finally:
+        ring.close()
+
+
+def test_frame_ring_counts_torn_frames():
+    ring = FrameRing.create((2, 2, 3), slots=3)
+    try:
+        ring.write(np.zeros((2, 2, 3), np.uint8))
+        seq, slot = ring.latest()
+        assert ring.acquire(seq, slot) is not None
+        ring.header[H_READING_SLOT] = -1  # 쓰기 쪽이 읽기 표시 전 값을 본 경우
+        for _ in range(3):
+            ring.write(np.ones((2, 2, 3), np.uint8))
+        assert not ring.still_valid(seq, slot)
+        assert ring.header[H_TORN] == 1
+        assert ring.acquire(seq, slot) is None  # 이미 덮어쓴 슬롯은 뷰를 주지 않음
+    finally:
+        ring.close()
+
+
+class StopAfterRestarts:
+    """_stop_event 대신 - 대기 시간을 기록만 하고 restarts가 n번이 되면 종료"""
+
+    def __init__(self, worker, n):
+        self.worker, self.n = worker, n
+        self.waits = []
+
+    def is_set(self):
+        return self.worker.restarts >= self.n
+
+    def wait(self, timeout=None):
+        self.waits.append(timeout)
+        time.sleep(0.01)
+        return self.is_set()
+
+
+def test_supervisor_restarts_crashing_worker_with_backoff():
+    worker = VisionWorker(lambda: None)
+    worker.ring = FrameRing.create((2, 2, 3), slots=3)
+    worker._ring_ready.set()
+    spawned = []
+
+    def spawn():
+        worker.proc = subprocess.Popen([sys.executable, "-c", "import sys; sys.exit(1)"])
+        spawned.append(worker.proc)
+
+    worker._spawn_worker = spawn
+    stop = worker._stop_event = StopAfterRestarts(worker, 4)
+    try:
+        worker._supervise_loop()
+    finally:
+        worker.ring.close()
+    assert worker.restarts == 4 and len(spawned) == 4
+    assert [w for w in stop.waits if w != 0.5] == [1.0, 2.0, 4.0, 8.0]
+    assert all(p.returncode == 1 for p in spawned)
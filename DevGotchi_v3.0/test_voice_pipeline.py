@@ -0,0 +1,113 @@
+import threading
+import time
+from array import array
+
+from voice_pipeline import BufferedTranscriber, PhraseSegmenter, VoicePipeline, iter_sentences
+
+LOUD = array("h", [3000] * 100).tobytes()  # 1kHz 기준 0.1초 조각
+MID = array("h", [400] * 100).tobytes()  # 임계값은 넘지만 끼어들기 기준(×2)은 못 넘는 소리
+QUIET = bytes(200)
+
+
+def segmenter():
+    return PhraseSegmenter(1000, 2, 300, pause_sec=0.3, min_speech_sec=0.2, preroll_sec=0.2, barge_in_sec=0.2)
+
+
+def feed(seg, chunks, speaking=False):
+    return [e[0] for i, c in enumerate(chunks) for e in seg.feed(c, i, speaking)]
+
+
+def test_iter_sentences_yields_as_pieces_arrive():
+    assert list(iter_sentences("네. 5분 타이머 시작할게요!\n화이팅")) == ["네.", "5분 타이머 시작할게요!", "화이팅"]
+    assert list(iter_sentences(iter(["오늘은 ", "맑아요. 내", "일은 비"]))) == ["오늘은 맑아요.", "내일은 비"]
+
+
+def test_segmenter_phrases_clicks_echo_and_barge_in():
+    events = feed(segmenter(), [QUIET] * 3 + [LOUD] * 3 + [QUIET] * 3)
+    assert events[0] == "start" and events[-1] == "end"
+    assert feed(segmenter(), [QUIET, LOUD] + [QUIET] * 3)[-1] == "discard"  # 딸깍
+    assert feed(segmenter(), [MID] * 4 + [QUIET] * 3, speaking=True)[-1] == "discard"  # 스피커 소리
+    events = feed(segmenter(), [LOUD] * 4 + [QUIET] * 3, speaking=True)
+    assert "barge_in" in events and events[-1] == "end"
+
+
+def test_echo_is_discarded_even_if_playback_stops_before_the_pause():
+    seg = segmenter()
+    events = feed(seg, [MID] * 10, speaking=True) + feed(seg, [QUIET] * 3, speaking=False)
+    assert events[0] == "start" and events[-1] == "discard"
+    assert feed(seg, [LOUD] * 3 + [QUIET] * 3)[-1] == "end"  # 다음 발화는 새로 판정
+
+
+class FakeAudio:
+    def __init__(self, chunks, block=False):
+        self.chunks = list(chunks)
+        self.block = block
+        self.played = []
+        self.stopped = threading.Event()
+        self.playing = threading.Event()
+
+    def read(self):
+        if self.chunks:
+            return self.chunks.pop(0)
+        time.sleep(0.01)
+        return QUIET
+
+    def play(self, audio):
+        self.played.append(audio)
+        self.playing.set()
+        if self.block:
+            self.stopped.wait(2)
+
+    def stop(self):
+        self.stopped.set()
+
+
+def run(audio, text, reply):
+    turns = []
+    done = threading.Event()
+    pipeline = VoicePipeline(audio.read, BufferedTranscriber(lambda pcm: text), lambda t: reply,
+                             lambda s: s, audio.play, audio.stop, segmenter(), wake_words=("데브",),
+                             on_turn=lambda turn: turns.append(turn) or done.set())
+    return pipeline.start(), turns, done
+
+
+def test_turn_flows_through_stages_with_latency():
+    audio = FakeAudio([LOUD] * 3 + [QUIET] * 3)
+    pipeline, turns, done = run(audio, "데브, 타이머 맞춰줘", "네. 5분 타이머 시작할게요.")
+    assert done.wait(2)
+    pipeline.stop()
+    assert audio.played == ["네.", "5분 타이머 시작할게요."]
+    turn = turns[0]
+    assert turn.text == "타이머 맞춰줘"  # 호출어 뒤 문장만 LLM으로
+    assert set(turn.stages()) == {"speech", "stt", "llm", "tts", "response"}
+    assert not turn.barged_in
+
+
+def test_interrupt_stops_playback_and_drops_rest():
+    audio = FakeAudio([LOUD] * 3 + [QUIET] * 3, block=True)
+    pipeline, turns, done = run(audio, "데브 오늘 뉴스", "첫 문장. 둘째 문장. 셋째 문장.")
+    assert audio.playing.wait(2)
+    pipeline.interrupt()
+    assert done.wait(2)
+    pipeline.stop()
+    assert audio.played == ["첫 문장."] and turns[0].barged_in
+
+
+def test_speaking_spans_sentence_gaps_and_echo_tail():
+    now = [0.0]
+    pipeline = VoicePipeline(None, None, None, None, lambda audio: None, lambda: None, segmenter(),
+                             echo_tail_sec=0.5, clock=lambda: now[0])
+
+    def play(*items):
+        for item in items + (None,):
+            pipeline._play_q.put(item)
+        pipeline._playback_loop()
+
+    play((0, None, "첫 문장", False))
+    now[0] = 10.0  # 다음 문장 합성이 오래 걸려도
+    assert pipeline.speaking
+    play((0, None, "둘째 문장", True))
+    now[0] = 10.4
+    assert pipeline.speaking  # 마지막 문장 뒤 꼬리
+    now[0] = 10.6
+    assert not pipeline.speaking
@@ -0,0 +1,307 @@
+# vision_bench.py
+"""오프라인 비전 벤치마크 - 웹캠 없이 녹화 영상/이미지 폴더로 VisionEngine 속도와 판정 정확도 측정
+
+사용 예:
+    python vision_bench.py --video samples/desk.mp4 --labels samples/desk_labels.json --out bench.json
+    python vision_bench.py --images samples/frames --labels samples/frames_labels.json
+    python vision_bench.py --video samples/desk.mp4 --compare bench_prev.json
+    python vision_bench.py --video samples/desk.mp4 --backend tasks --compare bench_solutions.json
+
+라벨 파일 (JSON) 형식은 둘 중 하나:
+    {"frame_0001.jpg": {"bad_posture": true, "eye_closed": false}, ...}     # 이미지 파일명 또는 프레임 번호
+    [{"start": 0, "end": 299, "bad_posture": false, "eye_closed": false}, ...]  # 프레임 구간 (end 포함)
+
+리포트는 키 순서가 고정된 JSON이라 커밋 간 diff로 비교할 수 있습니다.
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+import cv2
+
+from bench_compare import delta_table
+from config import Config
+from histogram import LogHistogram
+from profiler import set_spans_enabled, span_totals, spans_enabled
+
+IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp")
+STAGES = ("cvt_color", "pose", "face_mesh", "analyze_frame")
+# 단계별 시간은 analyze_frame 안의 span으로 측정 (축소/ROI 자르기 등 실제 처리 그대로)
+#   cvt_color: Pose 입력 축소 + 색 변환, face_mesh: 얼굴 ROI 자르기/축소 + 검출 + 좌표 복원
+STAGE_SPANS = {"cvt_color": "vision.cvt_color", "pose": "vision.pose", "face_mesh": "vision.face_mesh"}
+
+
+# ========== 입력 ==========
+def iter_video(path, max_frames=None):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise SystemExit(f"[Bench] 영상을 열 수 없습니다: {path}")
+    index = 0
+    try:
+        while max_frames is None or index < max_frames:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield str(index), index, frame
+            index += 1
+    finally:
+        cap.release()
+
+
+def iter_images(directory, max_frames=None):
+    names = sorted(n for n in os.listdir(directory) if n.lower().endswith(IMAGE_EXTS))
+    for index, name in enumerate(names[:max_frames]):
+        frame = cv2.imread(os.path.join(directory, name))
+        if frame is None:
+            print(f"[Bench] 이미지 읽기 실패, 건너뜀: {name}")
+            continue
+        yield name, index, frame
+
+
+class Labels:
+    """프레임 키(파일명/번호) 또는 프레임 구간 → {"bad_posture", "eye_closed"}"""
+
+    def __init__(self, data=None):
+        self.by_key = data if isinstance(data, dict) else {}
+        self.ranges = sorted(data, key=lambda r: r["start"]) if isinstance(data, list) else []
+
+    @classmethod
+    def load(cls, path):
+        if not path:
+            return cls()
+        with open(path, "r", encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __bool__(self):
+        return bool(self.by_key or self.ranges)
+
+    def get(self, key, index):
+        if key in self.by_key:
+            return self.by_key[key]
+        for r in self.ranges:
+            if r["start"] <= index <= r["end"]:
+                return r
+        return None
+
+
+class Confusion:
+    def __init__(self):
+        self.tp = self.fp = self.tn = self.fn = 0
+
+    def add(self, predicted, expected):
+        if predicted and expected:
+            self.tp += 1
+        elif predicted:
+            self.fp += 1
+        elif expected:
+            self.fn += 1
+        else:
+            self.tn += 1
+
+    def report(self):
+        total = self.tp + self.fp + self.tn + self.fn
+        precision = self.tp / (self.tp + self.fp) if self.tp + self.fp else None
+        recall = self.tp / (self.tp + self.fn) if self.tp + self.fn else None
+        f1 = (2 * precision * recall / (precision + recall)) if precision and recall else None
+        return {
+            "labelled_frames": total,
+            "accuracy": round((self.tp + self.tn) / total, 4) if total else None,
+            "precision": round(precision, 4) if precision is not None else None,
+            "recall": round(recall, 4) if recall is not None else None,
+            "f1": round(f1, 4) if f1 is not None else None,
+            "tp": self.tp, "fp": self.fp, "tn": self.tn, "fn": self.fn,
+        }
+
+
+# ========== 측정 ==========
+def _rss_mb():
+    """현재 RSS (MB, Linux /proc 기준 - 없으면 None)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return round(int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20, 1)
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def _peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 2 ** 20 if sys.platform == "darwin" else peak / 1024, 1)  # macOS는 bytes
+
+
+def _summary_ms(hist):
+    """μs 히스토그램 → ms 단위 요약 (sub-ms 단계도 구분되도록 소수 3자리)"""
+    if hist.count == 0:
+        return {"count": 0, "p50": None, "p90": None, "p99": None, "max": None, "mean": None}
+    return {
+        "count": hist.count,
+        "p50": round(hist.percentile(50) / 1000, 3),
+        "p90": round(hist.percentile(90) / 1000, 3),
+        "p99": round(hist.percentile(99) / 1000, 3),
+        "max": round(hist.max / 1000, 3),
+        "mean": round(hist.total / hist.count / 1000, 3),
+    }
+
+
+def _git_commit():
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def run_benchmark(engine, frames, labels=None, warmup=5, source=None, decisions_out=None):
+    """frames: (key, index, frame) 이터레이터 → 리포트 dict"""
+    labels = labels or Labels()
+    hists = {name: LogHistogram() for name in STAGES}
+    spans_were_enabled = spans_enabled()
+    set_spans_enabled(True)
+    posture_cm, eye_cm = Confusion(), Confusion()
+    counts = {"frames": 0, "warmup": 0, "bad_posture": 0, "eye_closed": 0, "no_face": 0}
+    frame_shape = None
+
+    try:
+        wall_start = None
+        for key, index, frame in frames:
+            measuring = counts["warmup"] >= warmup
+            if measuring and wall_start is None:
+                wall_start = time.perf_counter()
+
+            before = span_totals()
+            t0 = time.perf_counter()
+            score, drowsy, smile, closed, landmarks = engine.analyze_frame(frame)
+            t1 = time.perf_counter()
+
+            if not measuring:
+                counts["warmup"] += 1
+                continue
+
+            frame_shape = frame_shape or list(frame.shape)
+            after = span_totals()
+            for stage, name in STAGE_SPANS.items():
+                if name in after:
+                    hists[stage].record((after[name] - before.get(name, 0.0)) * 1e6)
+            hists["analyze_frame"].record((t1 - t0) * 1e6)
+
+            is_bad = score > Config.POSTURE_THRESHOLD
+            counts["frames"] += 1
+            counts["bad_posture"] += is_bad
+            counts["eye_closed"] += bool(closed)
+            counts["no_face"] += landmarks is None
+
+            expected = labels.get(key, index)
+            if expected is not None:
+                if "bad_posture" in expected:
+                    posture_cm.add(is_bad, bool(expected["bad_posture"]))
+                if "eye_closed" in expected:
+                    eye_cm.add(bool(closed), bool(expected["eye_closed"]))
+            if decisions_out is not None:
+                decisions_out.write(json.dumps({
+                    "key": key, "posture_score": round(float(score), 4),
+                    "bad_posture": bool(is_bad), "eye_closed": bool(closed),
+                }, ensure_ascii=False) + "\n")
+        wall = (time.perf_counter() - wall_start) if wall_start else 0.0
+    finally:
+        if not spans_were_enabled:
+            set_spans_enabled(False)
+
+    e2e = hists["analyze_frame"]
+    return {
+        "meta": {
+            "source": source,
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "opencv": cv2.__version__,
+            "frame_shape": frame_shape,
+            "warmup_frames": counts["warmup"],
+            "posture_threshold": Config.POSTURE_THRESHOLD,
+            "ear_threshold": Config.EAR_THRESHOLD,
+        },
+        "frames": counts,
+        "latency_ms": {name: _summary_ms(hists[name]) for name in STAGES},
+        "fps": {
+            "analyze_frame": round(e2e.count / (e2e.total / 1e6), 2) if e2e.total else None,
+            "wall": round(counts["frames"] / wall, 2) if wall else None,  # 라벨 비교/기록 포함
+        },
+        "memory_mb": {"rss": _rss_mb(), "peak_rss": _peak_rss_mb()},
+        "accuracy": {
+            "posture": posture_cm.report() if labels else None,
+            "eye_closed": eye_cm.report() if labels else None,
+        },
+    }
+
+
+# ========== 비교 ==========
+def compare_reports(old, new):
+    """두 리포트의 주요 지표 변화 → 출력용 줄 목록"""
+    rows = [(f"latency_ms.{stage}.{p}", old["latency_ms"][stage][p], new["latency_ms"][stage][p], True)
+            for stage in STAGES for p in ("p50", "p90", "p99")]
+    rows.append(("fps.analyze_frame", old["fps"]["analyze_frame"], new["fps"]["analyze_frame"], False))
+    rows.append(("memory_mb.peak_rss", old["memory_mb"]["peak_rss"], new["memory_mb"]["peak_rss"], True))
+    for kind in ("posture", "eye_closed"):
+        a, b = (old["accuracy"].get(kind) or {}), (new["accuracy"].get(kind) or {})
+        rows.extend((f"accuracy.{kind}.{m}", a.get(m), b.get(m), False) for m in ("accuracy", "f1"))
+    return delta_table(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="VisionEngine 오프라인 벤치마크")
+    src = parser.add_mutually_exclusive_group(required=True)
+    src.add_argument("--video", help="녹화 영상 파일")
+    src.add_argument("--images", help="이미지 폴더 (파일명 순서대로 재생)")
+    parser.add_argument("--labels", help="판정 라벨 JSON")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--warmup", type=int, default=5, help="측정에서 제외할 초기 프레임 수")
+    parser.add_argument("--out", help="리포트 저장 경로 (JSON)")
+    parser.add_argument("--decisions", help="프레임별 판정 결과 저장 경로 (JSONL)")
+    parser.add_argument("--compare", help="이전 리포트와 비교")
+    parser.add_argument("--backend", choices=("solutions", "tasks"), default=None,
+                        help="비전 백엔드 (기본: Config.VISION_BACKEND) - 같은 영상으로 두 번 돌려 --compare로 비교")
+    args = parser.parse_args(argv)
+
+    from vision_engine import create_vision_engine
+    backend = args.backend or getattr(Config, "VISION_BACKEND", "solutions")
+    rss_before = _rss_mb()
+    t0 = time.perf_counter()
+    engine = create_vision_engine(backend)
+    init_ms = round((time.perf_counter() - t0) * 1000, 1)
+
+    frames = iter_video(args.video, args.max_frames) if args.video else iter_images(args.images, args.max_frames)
+    decisions = open(args.decisions, "w", encoding="utf-8") if args.decisions else None
+    try:
+        report = run_benchmark(engine, frames, Labels.load(args.labels), warmup=args.warmup,
+                               source=args.video or args.images, decisions_out=decisions)
+    finally:
+        if decisions:
+            decisions.close()
+    report["meta"]["backend"] = backend
+    report["meta"]["engine_init_ms"] = init_ms
+    report["memory_mb"]["engine"] = round(report["memory_mb"]["rss"] - rss_before, 1) \
+        if report["memory_mb"]["rss"] is not None and rss_before is not None else None
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+        print(f"[Bench] 리포트 저장: {args.out}")
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        print("\n".join(compare_reports(old, report)))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 import cv2
-import numpy as np
 import mediapipe as mp
 import os
 import sys
 from config import Config
+from profiler import span
+from landmark_features import face_features, pose_features
+from face_roi import FaceRoiTracker
 
 class SuppressOutput:
     def __enter__(self):
@@ -26,7 +28,17 @@ class SuppressOutput:
         if self._devnull:
             self._devnull.close()
 
+
+def is_active_movement(pose):
+    """일어서기(어깨가 화면 상단에 가까움) 또는 기지개(손목이 어깨보다 높음) - pose가 없으면 자리 비움으로 간주"""
+    if pose is None:
+        return True
+    return pose["shoulder_y"] < 0.2 or pose["wrist_above_shoulder"]
+
+
 class VisionEngine:
+    last_movement = False  # 마지막 analyze_frame의 움직임 판정 (추가 추론 없이 같은 Pose 결과로)
+
     def __init__(self):
         try:
             # 1. Face Mesh & Pose 초기화 (로그 숨김)
@@ -42,71 +54,50 @@ class VisionEngine:
                 )
                 
                 self.pose = self.mp_pose.Pose(
+                    model_complexity=getattr(Config, 'VISION_POSE_MODEL_COMPLEXITY', 1),
                     min_detection_confidence=0.5
                 )
+                
+            # Pose 입력 해상도 (0이면 원본) / 얼굴 영역 추적
+            self.pose_input_width = getattr(Config, 'VISION_POSE_INPUT_WIDTH', 0)
+            self.face_tracker = FaceRoiTracker(
+                input_size=getattr(Config, 'VISION_FACE_ROI_SIZE', 256),
+                margin=getattr(Config, 'VISION_FACE_ROI_MARGIN', 0.25)
+            ) if getattr(Config, 'VISION_FACE_ROI', False) else None
             print("[DEBUG] MediaPipe 로딩 완료!")
         except Exception as e:
             print(f"[ERROR] 비전 엔진 초기화 실패: {e}")
 
-    def analyze_frame(self, frame):
-        if frame is None: return 0, False, False, False, None
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        # 1. Pose (자세)
-        pose_res = self.pose.process(rgb)
-        score = 0
-        if pose_res.pose_landmarks: score = 10
-            
-        # 2. Face (얼굴)
-        face_res = self.face_mesh.process(rgb)
-        is_drowsy = False
-        lms = None
-        if face_res.multi_face_landmarks:
-            lms = face_res.multi_face_landmarks[0]
-            
-        return score, is_drowsy, False, False, lms
-        
-    def calculate_ear(self, landmarks, indices):
-        try:
-            # 안전하게 landmark 리스트 확인
-            top = np.array([landmarks[indices[1]].x, landmarks[indices[1]].y])
-            bottom = np.array([landmarks[indices[5]].x, landmarks[indices[5]].y])
-            v_dist = np.linalg.norm(top - bottom)
-            return v_dist * 10 
-        except Exception:
-            return 0.3
-
     def analyze_frame(self, frame):
         if frame is None:
             return 0, False, False, False, None
             
         h, w, _ = frame.shape
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        with span("vision.cvt_color"):
+            # 정규화 좌표를 쓰므로 비율을 유지한 축소는 판정에 영향 없음
+            small = frame
+            if self.pose_input_width and w > self.pose_input_width:
+                scale = self.pose_input_width / w
+                small = cv2.resize(frame, (self.pose_input_width, int(h * scale)), interpolation=cv2.INTER_AREA)
+            rgb = cv2.cvtColor(small, cv2.COLOR_BGR2RGB)
         
         # 1. Pose Analysis (Turtle Neck)
-        pose_results = self.pose.process(rgb)
+        with span("vision.pose"):
+            pose_results = self.pose.process(rgb)
         posture_score = 0
+        pose = None
         
         if pose_results.pose_landmarks:
-            landmarks = pose_results.pose_landmarks.landmark
-            # Enum을 통해 명시적으로 좌표 참조
-            nose = landmarks[self.mp_pose.PoseLandmark.NOSE.value]
-            shoulder_l = landmarks[self.mp_pose.PoseLandmark.LEFT_SHOULDER.value]
-            shoulder_r = landmarks[self.mp_pose.PoseLandmark.RIGHT_SHOULDER.value]
-            
-            shoulder_center_x = (shoulder_l.x + shoulder_r.x) / 2
-            shoulder_center_y = (shoulder_l.y + shoulder_r.y) / 2
-            
-            forward_distance = abs(nose.x - shoulder_center_x)
-            vertical_diff = shoulder_center_y - nose.y
-            
+            pose = pose_features(pose_results.pose_landmarks.landmark)
             # Heuristic Score 계산
-            posture_score = (forward_distance * 2.0) + (0.15 - vertical_diff)
+            posture_score = (pose["forward_distance"] * 2.0) + (0.15 - pose["vertical_diff"])
             # Config에 해당 값이 없는 경우 0으로 처리
             posture_score -= getattr(Config, 'POSTURE_OFFSET_Y', 0) 
+        self.last_movement = is_active_movement(pose)
 
         # 2. Face Analysis (Drowsiness/Smile)
-        face_results = self.face_mesh.process(rgb)
+        with span("vision.face_mesh"):
+            face_results = self._process_face(frame, rgb, w, h)
         is_drowsy = False
         is_smiling = False
         is_eye_closed = False
@@ -116,34 +107,41 @@ class VisionEngine:
             lms = face_results.multi_face_landmarks[0].landmark
             face_landmarks_draw = face_results.multi_face_landmarks[0]
             
-            def get_dist(i1, i2):
-                x1, y1 = lms[i1].x, lms[i1].y
-                x2, y2 = lms[i2].x, lms[i2].y
-                return ((x1-x2)**2 + (y1-y2)**2)**0.5
-
-            # 눈 감음 감지 (EAR 계산)
-            l_h = get_dist(159, 145)
-            l_w = get_dist(33, 133)
-            ear_l = l_h / l_w if l_w > 0 else 0
-
-            r_h = get_dist(386, 374)
-            r_w = get_dist(362, 263)
-            ear_r = r_h / r_w if r_w > 0 else 0
-            
-            avg_ear = (ear_l + ear_r) / 2.0
+            face = face_features(lms)
             
-            if avg_ear < getattr(Config, 'EAR_THRESHOLD', 0.2):
+            # 눈 감음 감지 (EAR 계산)
+            if face["ear"] < getattr(Config, 'EAR_THRESHOLD', 0.2):
                 is_drowsy = True
                 is_eye_closed = True
             
             # 웃음 감지 (입 가로 대비 세로 비율)
-            mouth_w = abs(lms[61].x - lms[291].x)
-            mouth_h = abs(lms[13].y - lms[14].y)
-            if mouth_w > 0 and (mouth_h / mouth_w) < 0.3:
+            if face["mouth_ratio"] < 0.3:
                 is_smiling = True
 
         return posture_score, is_drowsy, is_smiling, is_eye_closed, face_landmarks_draw
 
+    def _process_face(self, frame, rgb, w, h):
+        """얼굴 영역 추적 중이면 잘라낸 ROI로, 놓쳤으면 Pose와 같은 입력으로 전체 검출"""
+        tracker = self.face_tracker
+        if tracker is None:
+            return self.face_mesh.process(rgb)
+        
+        cropped = tracker.crop(frame)
+        if cropped is not None:
+            roi, box = cropped
+            results = self.face_mesh.process(cv2.cvtColor(roi, cv2.COLOR_BGR2RGB))
+            if results.multi_face_landmarks:
+                lms = results.multi_face_landmarks[0].landmark
+                tracker.to_frame(lms, box, w, h)
+                tracker.update(lms, w, h)
+                return results
+            tracker.lost()
+        
+        results = self.face_mesh.process(rgb)
+        if results.multi_face_landmarks:
+            tracker.update(results.multi_face_landmarks[0].landmark, w, h)
+        return results
+
     def check_action_movement(self, frame):
         if frame is None: return False
         
@@ -152,16 +150,15 @@ class VisionEngine:
         
         if not pose_results.pose_landmarks:
             return True # 자리 비움으로 간주
-            
-        landmarks = pose_results.pose_landmarks.landmark
-        
-        # 1. 일어서기 체크 (어깨 위치가 화면 상단에 가까움)
-        mid_shoulder_y = (landmarks[11].y + landmarks[12].y) / 2
-        if mid_shoulder_y < 0.2: 
-            return True
-            
-        # 2. 기지개 체크 (손목이 어깨보다 높음)
-        if landmarks[15].y < landmarks[11].y or landmarks[16].y < landmarks[12].y:
-            return True
+        return is_active_movement(pose_features(pose_results.pose_landmarks.landmark))
+
 
-        return False
\ No newline at end of file
+def create_vision_engine(backend=None):
+    """Config.VISION_BACKEND에 따라 엔진 생성 ("solutions": 기존 mp.solutions, "tasks": Tasks VIDEO 모드)"""
+    backend = backend or getattr(Config, 'VISION_BACKEND', 'solutions')
+    if backend == "tasks":
+        from vision_tasks import TasksVisionEngine
+        return TasksVisionEngine()
+    if backend != "solutions":
+        raise ValueError(f"알 수 없는 비전 백엔드: {backend}")
+    return VisionEngine()
@@ -0,0 +1,112 @@
+# vision_tasks.py
+"""MediaPipe Tasks 백엔드 (FaceLandmarker / PoseLandmarker, VIDEO 모드)
+
+legacy mp.solutions는 프레임마다 process()만 호출하고 시간 연속성을 알 수 없지만,
+Tasks 랜드마커는 VIDEO 모드에서 단조 증가 타임스탬프를 받아 이전 프레임 결과로 추적하고
+추적을 놓쳤을 때만 검출기를 다시 돌립니다.
+
+어댑터가 legacy 결과 형태(pose_landmarks.landmark / multi_face_landmarks[0].landmark)를 흉내 내므로
+VisionEngine.analyze_frame / check_action_movement / vision_bench는 그대로 사용합니다.
+
+모델 파일 (.task)은 별도로 받아서 Config 경로에 둡니다:
+    https://storage.googleapis.com/mediapipe-models/face_landmarker/face_landmarker/float16/latest/face_landmarker.task
+    https://storage.googleapis.com/mediapipe-models/pose_landmarker/pose_landmarker_lite/float16/latest/pose_landmarker_lite.task
+"""
+
+import os
+import time
+from types import SimpleNamespace
+
+import mediapipe as mp
+from mediapipe.tasks import python as mp_tasks
+from mediapipe.tasks.python import vision as mp_vision
+
+from config import Config
+from vision_engine import VisionEngine, SuppressOutput
+
+
+class _MonotonicClock:
+    """랜드마커별 타임스탬프(ms) - 같은 ms에 두 번 호출돼도 항상 증가"""
+
+    def __init__(self):
+        self.last = -1
+
+    def next_ms(self):
+        now = int(time.monotonic() * 1000)
+        self.last = now if now > self.last else self.last + 1
+        return self.last
+
+
+class _TasksAdapter:
+    """Tasks 랜드마커를 legacy solution처럼 process(rgb)로 호출"""
+
+    def __init__(self, landmarker, detect):
+        self.landmarker = landmarker
+        self._detect = detect
+        self.clock = _MonotonicClock()
+
+    def process(self, rgb):
+        image = mp.Image(image_format=mp.ImageFormat.SRGB, data=rgb)
+        return self._detect(image, self.clock.next_ms())
+
+    def close(self):
+        self.landmarker.close()
+
+
+class PoseTasksAdapter(_TasksAdapter):
+    def __init__(self, model_path, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        options = mp_vision.PoseLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=mp_vision.RunningMode.VIDEO,
+            num_poses=1,
+            min_pose_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+        super().__init__(mp_vision.PoseLandmarker.create_from_options(options), self._detect_pose)
+
+    def _detect_pose(self, image, ts_ms):
+        result = self.landmarker.detect_for_video(image, ts_ms)
+        landmarks = result.pose_landmarks[0] if result.pose_landmarks else None
+        return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmarks) if landmarks else None)
+
+
+class FaceTasksAdapter(_TasksAdapter):
+    def __init__(self, model_path, min_detection_confidence=0.5, min_tracking_confidence=0.5):
+        options = mp_vision.FaceLandmarkerOptions(
+            base_options=mp_tasks.BaseOptions(model_asset_path=model_path),
+            running_mode=mp_vision.RunningMode.VIDEO,
+            num_faces=1,
+            min_face_detection_confidence=min_detection_confidence,
+            min_tracking_confidence=min_tracking_confidence,
+        )
+        super().__init__(mp_vision.FaceLandmarker.create_from_options(options), self._detect_face)
+
+    def _detect_face(self, image, ts_ms):
+        result = self.landmarker.detect_for_video(image, ts_ms)
+        faces = [SimpleNamespace(landmark=lms) for lms in result.face_landmarks[:1]]
+        return SimpleNamespace(multi_face_landmarks=faces or None)
+
+
+class TasksVisionEngine(VisionEngine):
+    """Config.VISION_BACKEND = "tasks" 일 때 사용하는 VisionEngine"""
+
+    def __init__(self):
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        face_model = os.path.join(base_dir, getattr(Config, 'VISION_TASKS_FACE_MODEL', 'models/face_landmarker.task'))
+        pose_model = os.path.join(base_dir, getattr(Config, 'VISION_TASKS_POSE_MODEL', 'models/pose_landmarker_lite.task'))
+        for path in (face_model, pose_model):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"[Vision] Tasks 모델 파일이 없습니다: {path} (vision_tasks.py 상단 URL 참고)")
+
+        with SuppressOutput():
+            self.pose = PoseTasksAdapter(pose_model)
+            self.face_mesh = FaceTasksAdapter(face_model)
+        print("[DEBUG] MediaPipe Tasks (VIDEO 모드) 로딩 완료!")
+
+        self.pose_input_width = getattr(Config, 'VISION_POSE_INPUT_WIDTH', 0)
+        # 얼굴 추적은 FaceLandmarker가 내부에서 하므로 ROI를 옮기며 자르면 오히려 추적이 끊김
+        self.face_tracker = None
+
+    def close(self):
+        self.pose.close()
+        self.face_mesh.close()
@@ -0,0 +1,412 @@
+# vision_worker.py
+"""VisionEngine 전용 워커 프로세스 + 공유 메모리 프레임 전송
+
+MediaPipe 추론 / cvtColor / JPEG 인코딩을 별도 프로세스에서 실행해서
+Flask 요청 스레드, 음성 루프, 로거와 GIL을 나눠 쓰지 않게 합니다.
+
+    [Flask 프로세스]                                 [워커 프로세스]
+    캡처 스레드 ── FrameRing(shared_memory) ──────→  analyze_frame + imencode
+    결과 읽기   ←── ResultBlock(shared_memory) ────  결과 구조체 + JPEG
+
+- FrameRing: 슬롯 N개짜리 링 버퍼. 워커는 슬롯을 numpy 뷰로 그대로 읽고(복사 없음),
+  캡처 스레드는 최신 슬롯과 워커가 읽는 중인 슬롯을 피해서 씀. 슬롯별 시퀀스로 덮어쓰기 검출.
+- ResultBlock: seqlock (version 홀수 = 쓰는 중) 으로 보호되는 고정 크기 결과 + JPEG 바이트.
+- VisionWorker: 워커를 subprocess로 띄우고 종료/멈춤(heartbeat 끊김)을 감지하면 백오프 후 재시작.
+
+워커는 app.py를 다시 import하지 않도록 multiprocessing(spawn) 대신 `python vision_worker.py`로 실행합니다.
+"""
+
+import argparse
+import atexit
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+from config import Config
+
+VisionResult = namedtuple("VisionResult", [
+    "seq", "ts", "score", "drowsy", "smile", "closed", "has_face", "analyze_ms", "encode_ms", "movement"
+], defaults=(False,))
+
+# FrameRing 헤더 (int64)
+H_LATEST_SEQ, H_LATEST_SLOT, H_READING_SLOT, H_HEARTBEAT_NS, H_TORN, H_WORKER_PID = range(6)
+HEADER_FIELDS = 8
+# ResultBlock 필드 (float64)
+R_VERSION, R_SEQ, R_TS, R_SCORE, R_DROWSY, R_SMILE, R_CLOSED, R_HAS_FACE, R_ANALYZE_MS, R_ENCODE_MS, R_JPEG_LEN, \
+    R_MOVEMENT = range(12)
+RESULT_FIELDS = 12
+
+
+def _cfg(name, default):
+    return getattr(Config, name, default)
+
+
+def _attach(name):
+    """워커 쪽 공유 메모리 연결 - 워커가 종료될 때 세그먼트가 지워지지 않도록 resource_tracker 등록 해제"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+        return shm
+
+
+# ========== 프레임 링 버퍼 ==========
+class FrameRing:
+    def __init__(self, shm, shape, slots, owner):
+        self.shm = shm
+        self.shape = tuple(shape)
+        self.slots = slots
+        self.owner = owner
+        header_len = HEADER_FIELDS + slots
+        self.header = np.ndarray((header_len,), dtype=np.int64, buffer=shm.buf)
+        offset = -(-header_len * 8 // 64) * 64  # 64바이트 정렬
+        self.frames = np.ndarray((slots,) + self.shape, dtype=np.uint8, buffer=shm.buf, offset=offset)
+        self.slot_seq = self.header[HEADER_FIELDS:]
+        self._seq = 0
+
+    @staticmethod
+    def nbytes(shape, slots):
+        return -(-(HEADER_FIELDS + slots) * 8 // 64) * 64 + slots * int(np.prod(shape))
+
+    @classmethod
+    def create(cls, shape, slots=4):
+        shm = shared_memory.SharedMemory(create=True, size=cls.nbytes(shape, slots))
+        ring = cls(shm, shape, slots, owner=True)
+        ring.header[:] = -1
+        ring.header[H_TORN] = 0
+        ring.header[H_HEARTBEAT_NS] = 0
+        return ring
+
+    @classmethod
+    def attach(cls, name, shape, slots):
+        return cls(_attach(name), shape, slots, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    # ----- 캡처 스레드 (쓰기) -----
+    def write(self, frame):
+        latest = self.header[H_LATEST_SLOT]
+        reading = self.header[H_READING_SLOT]
+        slot = (latest + 1) % self.slots
+        while slot == latest or slot == reading:
+            slot = (slot + 1) % self.slots  # 슬롯이 3개 이상이면 항상 빈 슬롯이 있음
+        self._seq += 1
+        self.slot_seq[slot] = -1  # 쓰는 중
+        np.copyto(self.frames[slot], frame)
+        self.slot_seq[slot] = self._seq
+        self.header[H_LATEST_SLOT] = slot
+        self.header[H_LATEST_SEQ] = self._seq
+        return self._seq
+
+    # ----- 워커 (읽기) -----
+    def latest(self):
+        return int(self.header[H_LATEST_SEQ]), int(self.header[H_LATEST_SLOT])
+
+    def acquire(self, seq, slot):
+        """읽을 슬롯을 표시하고 복사 없는 뷰를 반환 (이미 덮어써졌으면 None)"""
+        self.header[H_READING_SLOT] = slot
+        if self.slot_seq[slot] != seq:
+            return None
+        return self.frames[slot]
+
+    def still_valid(self, seq, slot):
+        if self.slot_seq[slot] == seq:
+            return True
+        self.header[H_TORN] += 1
+        return False
+
+    def heartbeat(self):
+        self.header[H_HEARTBEAT_NS] = time.monotonic_ns()
+
+    def heartbeat_age(self):
+        hb = int(self.header[H_HEARTBEAT_NS])
+        return (time.monotonic_ns() - hb) / 1e9 if hb > 0 else None
+
+    def close(self):
+        self.header = self.frames = self.slot_seq = None
+        if self.owner:
+            self.shm.unlink()
+        self.shm.close()
+
+
+# ========== 결과 블록 ==========
+class ResultBlock:
+    def __init__(self, shm, jpeg_capacity, owner):
+        self.shm = shm
+        self.owner = owner
+        self.fields = np.ndarray((RESULT_FIELDS,), dtype=np.float64, buffer=shm.buf)
+        self.jpeg = np.ndarray((jpeg_capacity,), dtype=np.uint8, buffer=shm.buf, offset=RESULT_FIELDS * 8)
+        self.capacity = jpeg_capacity
+
+    @classmethod
+    def create(cls, jpeg_capacity):
+        shm = shared_memory.SharedMemory(create=True, size=RESULT_FIELDS * 8 + jpeg_capacity)
+        block = cls(shm, jpeg_capacity, owner=True)
+        block.fields[:] = 0
+        block.fields[R_SEQ] = -1
+        return block
+
+    @classmethod
+    def attach(cls, name, jpeg_capacity):
+        return cls(_attach(name), jpeg_capacity, owner=False)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def publish(self, seq, score, drowsy, smile, closed, has_face, analyze_ms, encode_ms, jpeg_bytes, movement=False):
+        f = self.fields
+        data = np.asarray(jpeg_bytes, dtype=np.uint8).reshape(-1) if jpeg_bytes is not None else None
+        n = data.size if data is not None and data.size <= self.capacity else 0
+        f[R_VERSION] += 1  # 홀수: 쓰는 중
+        if n:
+            self.jpeg[:n] = data
+        f[R_SEQ:R_JPEG_LEN + 1] = (seq, time.time(), score, drowsy, smile, closed, has_face,
+                                   analyze_ms, encode_ms, n)
+        f[R_MOVEMENT] = movement
+        f[R_VERSION] += 1
+
+    def reset_writer(self):
+        """쓰는 도중에 죽은 워커가 남긴 홀수 version을 짝수로 (새 워커 실행 전 - 쓰는 쪽이 없을 때만)"""
+        if int(self.fields[R_VERSION]) % 2:
+            self.fields[R_VERSION] += 1
+
+    def seq(self):
+        return int(self.fields[R_SEQ])
+
+    def read(self, with_jpeg=False, retries=50):
+        """일관된 결과 스냅샷 → (VisionResult, jpeg bytes 또는 None)"""
+        for _ in range(retries):
+            v1 = self.fields[R_VERSION]
+            if v1 % 2:
+                time.sleep(0.0005)
+                continue
+            vals = self.fields.copy()
+            jpeg = bytes(self.jpeg[:int(vals[R_JPEG_LEN])]) if with_jpeg and vals[R_JPEG_LEN] else None
+            if self.fields[R_VERSION] == v1:
+                if vals[R_SEQ] < 0:
+                    return None, None
+                result = VisionResult(int(vals[R_SEQ]), vals[R_TS], float(vals[R_SCORE]), bool(vals[R_DROWSY]),
+                                      bool(vals[R_SMILE]), bool(vals[R_CLOSED]), bool(vals[R_HAS_FACE]),
+                                      vals[R_ANALYZE_MS], vals[R_ENCODE_MS], bool(vals[R_MOVEMENT]))
+                return result, jpeg
+        return None, None
+
+    def close(self):
+        self.fields = self.jpeg = None
+        if self.owner:
+            self.shm.unlink()
+        self.shm.close()
+
+
+# ========== 워커 프로세스 본체 ==========
+def worker_main(frames_name, results_name, shape, slots, jpeg_capacity, jpeg_quality, parent_pid):
+    ring = FrameRing.attach(frames_name, shape, slots)
+    results = ResultBlock.attach(results_name, jpeg_capacity)
+    ring.header[H_WORKER_PID] = os.getpid()
+    ring.heartbeat()
+
+    from vision_engine import create_vision_engine
+    engine = create_vision_engine()  # Config.VISION_BACKEND
+    encode_params = [int(cv2.IMWRITE_JPEG_QUALITY), int(jpeg_quality)]
+    print(f"[VisionWorker] 시작 (pid={os.getpid()}, {shape[1]}x{shape[0]}, 슬롯 {slots})")
+
+    last_seq = -1
+    idle_checks = 0
+    try:
+        while True:
+            ring.heartbeat()
+            seq, slot = ring.latest()
+            if seq <= last_seq or slot < 0:
+                idle_checks += 1
+                if idle_checks % 500 == 0 and os.getppid() != parent_pid:
+                    break  # 부모 프로세스가 사라짐
+                time.sleep(0.002)
+                continue
+
+            frame = ring.acquire(seq, slot)
+            if frame is None:
+                continue
+            t0 = time.perf_counter()
+            score, drowsy, smile, closed, landmarks = engine.analyze_frame(frame)
+            t1 = time.perf_counter()
+            ok, encoded = cv2.imencode(".jpg", frame, encode_params)
+            t2 = time.perf_counter()
+            if not ring.still_valid(seq, slot):
+                continue  # 읽는 도중 캡처 스레드가 슬롯을 덮어씀 → 결과 버림
+
+            results.publish(seq, float(score), drowsy, smile, closed, landmarks is not None,
+                            (t1 - t0) * 1000, (t2 - t1) * 1000, encoded if ok else None, engine.last_movement)
+            last_seq = seq
+    finally:
+        ring.close()
+        results.close()
+
+
+# ========== Flask 프로세스 쪽 감독자 ==========
+class VisionWorker:
+    """캡처 스레드 + 워커 프로세스 감독 (비정상 종료/멈춤 시 재시작)"""
+
+    def __init__(self, source_factory, slots=None, stall_timeout=None, jpeg_quality=None):
+        self.source_factory = source_factory
+        self.slots = max(3, slots or _cfg("VISION_WORKER_SLOTS", 4))
+        self.stall_timeout = stall_timeout or _cfg("VISION_WORKER_STALL_SEC", 10)
+        self.jpeg_quality = jpeg_quality or _cfg("VISION_WORKER_JPEG_QUALITY", 80)
+        self.ring = None
+        self.results = None
+        self.proc = None
+        self.restarts = 0
+        self.captured = 0
+        self._stop_event = threading.Event()
+        self._ring_ready = threading.Event()
+        self._threads = []
+
+    # ----- 외부 인터페이스 -----
+    def start(self):
+        self._stop_event.clear()
+        for target, name in ((self._capture_loop, "vision-capture"), (self._supervise_loop, "vision-supervisor")):
+            t = threading.Thread(target=target, name=name, daemon=True)
+            t.start()
+            self._threads.append(t)
+        atexit.register(self.stop)
+
+    def stop(self):
+        self._stop_event.set()
+        self._kill_worker()
+        for t in self._threads:
+            t.join(timeout=2)
+        self._threads = []
+        for block in (self.ring, self.results):
+            if block is not None:
+                try:
+                    block.close()
+                except Exception:
+                    pass
+        self.ring = self.results = None
+
+    @property
+    def stopped(self):
+        return self._stop_event.is_set()
+
+    def wait_result(self, after_seq, timeout=1.0, with_jpeg=True):
+        """after_seq보다 새로운 결과가 나올 때까지 대기 → (VisionResult, jpeg) 또는 (None, None)"""
+        deadline = time.monotonic() + timeout
+        while not self._stop_event.is_set():
+            results = self.results
+            if results is not None and results.seq() > after_seq:
+                return results.read(with_jpeg=with_jpeg)
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(0.005)
+        return None, None
+
+    def stats(self):
+        ring = self.ring
+        return {
+            "alive": self.proc is not None and self.proc.poll() is None,
+            "pid": self.proc.pid if self.proc else None,
+            "restarts": self.restarts,
+            "captured": self.captured,
+            "torn_frames": int(ring.header[H_TORN]) if ring else 0,
+            "heartbeat_age": ring.heartbeat_age() if ring else None,
+        }
+
+    # ----- 캡처 -----
+    def _capture_loop(self):
+        cap = self.source_factory()
+        try:
+            while not self._stop_event.is_set():
+                ret, frame = cap.read()
+                if not ret:
+                    time.sleep(1)
+                    continue
+                if self.ring is None:
+                    # 첫 프레임 크기로 공유 메모리 생성
+                    self.ring = FrameRing.create(frame.shape, self.slots)
+                    self.results = ResultBlock.create(self.ring.frames[0].nbytes)
+                    self._ring_ready.set()
+                elif frame.shape != self.ring.shape:
+                    frame = cv2.resize(frame, (self.ring.shape[1], self.ring.shape[0]))
+                self.ring.write(frame)
+                self.captured += 1
+        finally:
+            cap.release()
+
+    # ----- 감독 -----
+    def _spawn_worker(self):
+        ring = self.ring
+        cmd = [sys.executable, os.path.abspath(__file__),
+               "--frames", ring.name, "--results", self.results.name,
+               "--shape", *map(str, ring.shape), "--slots", str(ring.slots),
+               "--jpeg-capacity", str(self.results.capacity), "--jpeg-quality", str(self.jpeg_quality),
+               "--parent", str(os.getpid())]
+        ring.header[H_HEARTBEAT_NS] = time.monotonic_ns()  # 모델 로딩 시간 동안은 멈춤으로 보지 않음
+        self.results.reset_writer()  # 이전 워커가 publish 중에 죽었으면 read()가 계속 실패함
+        self.proc = subprocess.Popen(cmd, cwd=os.path.dirname(os.path.abspath(__file__)))
+        print(f"[VisionWorker] 워커 실행 (pid={self.proc.pid})")
+
+    def _kill_worker(self):
+        proc, self.proc = self.proc, None
+        if proc is None or proc.poll() is not None:
+            return
+        proc.terminate()
+        try:
+            proc.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+    def _supervise_loop(self):
+        while not self._ring_ready.wait(timeout=0.5):
+            if self._stop_event.is_set():
+                return
+        backoff = 1.0
+        started_at = 0.0
+        while not self._stop_event.is_set():
+            if self.proc is None:
+                self._spawn_worker()
+                started_at = time.monotonic()
+            elif self.proc.poll() is not None or (self.ring.heartbeat_age() or 0) > self.stall_timeout:
+                reason = f"종료 코드 {self.proc.returncode}" if self.proc.poll() is not None else "응답 없음"
+                # 오래 잘 돌다가 죽은 경우엔 백오프 초기화, 연속 실패면 1, 2, 4...초로 최대 30초까지 증가
+                if time.monotonic() - started_at > 60:
+                    backoff = 1.0
+                print(f"[VisionWorker] 워커 비정상 ({reason}) → {backoff:.0f}초 후 재시작")
+                self._kill_worker()
+                self.restarts += 1
+                self._stop_event.wait(backoff)
+                backoff = min(backoff * 2, 30.0)
+                continue
+            self._stop_event.wait(0.5)
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="VisionEngine 워커 프로세스 (VisionWorker가 실행)")
+    parser.add_argument("--frames", required=True)
+    parser.add_argument("--results", required=True)
+    parser.add_argument("--shape", type=int, nargs=3, required=True)
+    parser.add_argument("--slots", type=int, required=True)
+    parser.add_argument("--jpeg-capacity", type=int, required=True)
+    parser.add_argument("--jpeg-quality", type=int, default=80)
+    parser.add_argument("--parent", type=int, required=True)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    worker_main(args.frames, args.results, tuple(args.shape), args.slots, args.jpeg_capacity,
+                args.jpeg_quality, args.parent)
@@ -0,0 +1,396 @@
+# voice_pipeline.py
+"""음성 대화 파이프라인 - 마이크/STT/LLM/TTS/재생을 큐로 이은 동시 실행 단계
+
+    pipeline = VoicePipeline(mic.read, BufferedTranscriber(recognize), respond,
+                             synthesize, play, stop_playback, PhraseSegmenter(16000, 2, 300))
+    pipeline.start()
+
+    capture → (발화 시작/오디오/끝) → stt → Turn → dialog(LLM) → 문장 → synth → 음성 → playback
+
+- 마이크는 계속 열려 있음: 말하는 중(재생 중)에도 듣고, 사용자가 끼어들면(barge-in) 재생 중단
+- STT는 발화 시작과 함께 오디오 조각을 받음 (스트리밍 엔진은 feed에서 바로 인식, 아니면 끝에서 한 번에)
+- TTS는 답변을 문장 단위로 받아 첫 문장부터 합성 → 다음 문장 합성은 앞 문장 재생과 겹침
+- 턴마다 단계별 지연 (speech/stt/llm/tts/response) 기록 → devgotchi_voice_stage_seconds, on_turn(turn)
+
+재생 중에(문장 사이 합성 대기와 재생 직후 echo_tail_sec 포함) 겹친 발화가 끼어들기 기준
+(임계값 × barge_in_ratio, barge_in_sec 이상)에 못 미치면 스피커 소리가 다시 들어온 것으로 보고 버립니다.
+"""
+
+import math
+import queue
+import re
+import threading
+import time
+import uuid
+from array import array
+from collections import deque
+
+from metrics_registry import VOICE_BARGE_IN, VOICE_STAGE
+
+_SENTENCE_END = re.compile(r"(?<=[.!?~…])\s+|\n+")
+_WAKE_STRIP = " ,.!?~"
+
+
+def rms(chunk, sample_width=2):
+    """PCM 조각의 에너지 (speech_recognition energy_threshold와 같은 척도)"""
+    if sample_width != 2 or len(chunk) < 2:
+        return 0.0
+    samples = array("h", chunk[:len(chunk) - len(chunk) % 2])
+    return math.sqrt(sum(s * s for s in samples) / len(samples))
+
+
+def iter_sentences(pieces):
+    """텍스트 조각(문자열 하나 또는 스트리밍 조각들) → 완성된 문장 순서대로"""
+    if isinstance(pieces, str):
+        pieces = (pieces,)
+    buf = ""
+    for piece in pieces:
+        buf += piece
+        parts = _SENTENCE_END.split(buf)
+        for sentence in parts[:-1]:
+            if sentence.strip():
+                yield sentence.strip()
+        buf = parts[-1]
+    if buf.strip():
+        yield buf.strip()
+
+
+class PhraseSegmenter:
+    """마이크 조각 → 발화 이벤트 ("start", t) / ("audio", 조각) / ("end", t) / ("discard", t) / ("barge_in", t)"""
+
+    def __init__(self, sample_rate, sample_width, energy_threshold, pause_sec=0.6, min_speech_sec=0.2,
+                 max_phrase_sec=10, preroll_sec=0.3, barge_in_ratio=2.0, barge_in_sec=0.3):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.energy_threshold = energy_threshold
+        self.pause_sec = pause_sec
+        self.min_speech_sec = min_speech_sec  # 이보다 짧은 소리(딸깍 등)는 버림
+        self.max_phrase_sec = max_phrase_sec
+        self.preroll_sec = preroll_sec  # 발화 시작 직전 오디오도 포함 (첫 음절 잘림 방지)
+        self.barge_in_ratio = barge_in_ratio
+        self.barge_in_sec = barge_in_sec
+        self._preroll = deque()
+        self._preroll_len = 0.0
+        self._in_phrase = False
+        self._phrase_sec = self._voiced_sec = self._silence_sec = self._loud_sec = 0.0
+        self._barged_in = False
+        self._overlapped = False  # 이번 발화가 재생과 한 번이라도 겹쳤는지
+
+    def _duration(self, chunk):
+        return len(chunk) / float(self.sample_rate * self.sample_width)
+
+    def feed(self, chunk, now, speaking=False):
+        dur = self._duration(chunk)
+        energy = rms(chunk, self.sample_width)
+        voiced = energy > self.energy_threshold
+        events = []
+
+        if not self._in_phrase:
+            self._preroll.append(chunk)
+            self._preroll_len += dur
+            while self._preroll_len > self.preroll_sec and len(self._preroll) > 1:
+                self._preroll_len -= self._duration(self._preroll.popleft())
+            if not voiced:
+                return events
+            self._in_phrase, self._barged_in, self._overlapped = True, False, False
+            self._phrase_sec = self._voiced_sec = self._silence_sec = self._loud_sec = 0.0
+            events.append(("start", now))
+            events.append(("audio", b"".join(self._preroll)))
+            self._preroll.clear()
+            self._preroll_len = 0.0
+        else:
+            events.append(("audio", chunk))
+
+        self._phrase_sec += dur
+        if voiced:
+            self._voiced_sec += dur
+            self._silence_sec = 0.0
+        else:
+            self._silence_sec += dur
+
+        self._overlapped = self._overlapped or speaking
+        if speaking and not self._barged_in:
+            self._loud_sec = self._loud_sec + dur if energy > self.energy_threshold * self.barge_in_ratio else 0.0
+            if self._loud_sec >= self.barge_in_sec:
+                self._barged_in = True
+                events.append(("barge_in", now))
+
+        if self._silence_sec >= self.pause_sec or self._phrase_sec >= self.max_phrase_sec:
+            self._in_phrase = False
+            # 재생과 겹쳤는데 끼어들기로 확인되지 않은 소리 = 스피커 소리 (재생이 먼저 끝났어도)
+            echo = self._overlapped and not self._barged_in
+            short = self._voiced_sec < self.min_speech_sec
+            events.append(("discard" if echo or short else "end", now))
+        return events
+
+
+class BufferedTranscriber:
+    """스트리밍을 지원하지 않는 STT(Google Web Speech 등) - 조각을 모았다가 발화 끝에 한 번 인식"""
+
+    def __init__(self, recognize):
+        self.recognize = recognize  # recognize(pcm bytes) → 텍스트 ("" = 인식 실패)
+        self._chunks = []
+
+    def begin(self):
+        self._chunks = []
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+
+    def finish(self):
+        audio, self._chunks = b"".join(self._chunks), []
+        return self.recognize(audio)
+
+
+class Turn:
+    """발화 1건 - 단계별 시각 (monotonic)"""
+    __slots__ = ("id", "speech_start", "speech_end", "text_at", "reply_at", "first_audio_at", "done_at",
+                 "text", "reply", "barged_in")
+
+    def __init__(self, speech_start):
+        self.id = uuid.uuid4().hex[:8]
+        self.speech_start = speech_start
+        self.speech_end = self.text_at = self.reply_at = self.first_audio_at = self.done_at = None
+        self.text = self.reply = ""
+        self.barged_in = False
+
+    def stages(self):
+        """→ {단계: ms} (지나간 단계만)"""
+        spans = {
+            "speech": (self.speech_start, self.speech_end),
+            "stt": (self.speech_end, self.text_at),
+            "llm": (self.text_at, self.reply_at),
+            "tts": (self.reply_at, self.first_audio_at),
+            "response": (self.speech_end, self.first_audio_at),  # 말 끝 → 첫 소리
+        }
+        return {k: round((b - a) * 1000, 1) for k, (a, b) in spans.items() if a is not None and b is not None}
+
+
+class VoicePipeline:
+    def __init__(self, read_chunk, transcriber, respond, synthesize, play, stop_playback, segmenter,
+                 wake_words=(), ack_text="네, 듣고 있어요.", awake_sec=8, echo_tail_sec=0.5, on_turn=None,
+                 clock=time.monotonic):
+        """read_chunk() → PCM 조각 (블로킹), respond(text) → 답변 문자열 또는 조각 iterator,
+        synthesize(text) → 음성, play(음성) 재생 끝까지 블로킹, stop_playback()은 다른 스레드에서 재생 중단"""
+        self.read_chunk = read_chunk
+        self.transcriber = transcriber
+        self.respond = respond
+        self.synthesize = synthesize
+        self.play = play
+        self.stop_playback = stop_playback
+        self.segmenter = segmenter
+        self.wake_words = tuple(w.lower() for w in wake_words)  # 비어 있으면 항상 대화 상태
+        self.ack_text = ack_text
+        self.awake_sec = awake_sec  # 호출/답변 뒤 이 시간 동안은 호출어 없이 이어서 말하기
+        self.echo_tail_sec = echo_tail_sec  # 답변 재생이 끝난 뒤에도 잔향/스피커 지연을 재생 중으로 봄
+        self.on_turn = on_turn
+        self.clock = clock
+
+        self._stt_q = queue.Queue()
+        self._turn_q = queue.Queue()
+        self._tts_q = queue.Queue()
+        self._play_q = queue.Queue()
+        self._gen = 0  # 끼어들기마다 증가 → 이전 세대 문장/음성은 버림
+        self._gen_lock = threading.Lock()
+        self._speaking = threading.Event()  # 답변의 첫 문장 재생 ~ 마지막 문장 재생 끝 (문장 사이 포함)
+        self._speaking_until = 0.0
+        self._playing_turn = None
+        self._awake_until = 0.0
+        self._stop = threading.Event()
+        self._threads = []
+
+    def start(self):
+        for name, target in (("capture", self._capture_loop), ("stt", self._stt_loop), ("dialog", self._dialog_loop),
+                             ("synth", self._synth_loop), ("playback", self._playback_loop)):
+            t = threading.Thread(target=target, name=f"voice-{name}", daemon=True)
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.interrupt(count=False)
+        for q in (self._stt_q, self._turn_q, self._tts_q, self._play_q):
+            q.put(None)
+
+    @property
+    def speaking(self):
+        return self._speaking.is_set() or self.clock() < self._speaking_until
+
+    def _done_speaking(self):
+        self._speaking_until = self.clock() + self.echo_tail_sec
+        self._speaking.clear()
+
+    def say(self, text, turn=None):
+        """문장 단위로 합성/재생 대기열에 - 스트리밍 조각이면 문장이 완성되는 대로 (turn: 지연을 기록할 턴)"""
+        with self._gen_lock:
+            gen = self._gen
+        pending = None
+        for sentence in iter_sentences(text):
+            if pending is not None:
+                self._tts_q.put((gen, turn, pending, False))
+            pending = sentence
+        if pending is not None:
+            self._tts_q.put((gen, turn, pending, True))
+        elif turn is not None:
+            self._finish(turn)
+
+    def interrupt(self, count=True):
+        """끼어들기 - 합성/재생 대기 중인 답변을 버리고 지금 재생 중단"""
+        with self._gen_lock:
+            self._gen += 1
+        dropped = set()
+        for q in (self._tts_q, self._play_q):
+            try:
+                while True:
+                    item = q.get_nowait()
+                    if item is not None and item[1] is not None:
+                        dropped.add(item[1])
+            except queue.Empty:
+                pass
+        if self._playing_turn is not None:
+            self._playing_turn.barged_in = True
+        for turn in dropped:
+            turn.barged_in = True
+            if turn is not self._playing_turn:
+                self._finish(turn)
+        if count:
+            VOICE_BARGE_IN.inc()
+            print("[VoicePipeline] 끼어들기 감지 → 재생 중단")
+        self.stop_playback()
+        if self._speaking.is_set():
+            self._done_speaking()
+
+    # ---- 단계 ----
+    def _capture_loop(self):
+        while not self._stop.is_set():
+            try:
+                chunk = self.read_chunk()
+            except Exception as e:
+                print(f"[VoicePipeline] 마이크 읽기 실패: {e!r}")
+                time.sleep(0.5)
+                continue
+            if not chunk:
+                continue
+            for event in self.segmenter.feed(chunk, self.clock(), speaking=self.speaking):
+                if event[0] == "barge_in":
+                    self.interrupt()
+                else:
+                    self._stt_q.put(event)
+
+    def _stt_loop(self):
+        turn = None
+        while True:
+            event = self._stt_q.get()
+            if event is None:
+                return
+            kind, value = event
+            if kind == "start":
+                turn = Turn(value)
+                self.transcriber.begin()
+            elif turn is None:
+                continue
+            elif kind == "audio":
+                self.transcriber.feed(value)
+            elif kind == "discard":
+                self.transcriber.begin()
+                turn = None
+            elif kind == "end":
+                turn.speech_end = value
+                try:
+                    turn.text = (self.transcriber.finish() or "").strip()
+                except Exception as e:
+                    print(f"[VoicePipeline] 음성 인식 실패: {e!r}")
+                turn.text_at = self.clock()
+                if turn.text:
+                    self._turn_q.put(turn)
+                turn = None
+
+    def _wake(self, text):
+        """호출어 확인 → 호출어 뒤 문장 ("" = 호출만), 대화 상태가 아니고 호출어도 없으면 None"""
+        if not self.wake_words or self.clock() < self._awake_until:
+            return text
+        lower = text.lower()
+        for word in self.wake_words:
+            i = lower.find(word)
+            if i >= 0:
+                return text[i + len(word):].strip(_WAKE_STRIP)
+        return None
+
+    def _dialog_loop(self):
+        while True:
+            turn = self._turn_q.get()
+            if turn is None:
+                return
+            print(f"[VoicePipeline] You> {turn.text}")
+            text = self._wake(turn.text)
+            if text is None:
+                continue
+            self._awake_until = self.clock() + self.awake_sec
+            if len(text) < 2:  # 호출만 → 짧은 응답 후 다음 발화 대기
+                self.say(self.ack_text)
+                continue
+            turn.text = text
+            try:
+                reply = self.respond(text)
+            except Exception as e:
+                print(f"[VoicePipeline] 응답 생성 실패: {e!r}")
+                continue
+            turn.reply_at = self.clock()
+            turn.reply = reply if isinstance(reply, str) else ""
+            self.say(reply, turn)
+            self._awake_until = self.clock() + self.awake_sec
+
+    def _synth_loop(self):
+        while True:
+            item = self._tts_q.get()
+            if item is None:
+                return
+            gen, turn, sentence, last = item
+            audio = None
+            if gen == self._gen:
+                try:
+                    audio = self.synthesize(sentence)
+                except Exception as e:
+                    print(f"[VoicePipeline] 음성 합성 실패: {e!r}")
+            if gen != self._gen:  # 합성 중에 끼어들기
+                if turn is not None:
+                    turn.barged_in = True
+                    self._finish(turn)
+                continue
+            self._play_q.put((gen, turn, audio, last))
+
+    def _playback_loop(self):
+        while True:
+            item = self._play_q.get()
+            if item is None:
+                return
+            gen, turn, audio, last = item
+            if gen == self._gen and audio is not None:
+                if turn is not None and turn.first_audio_at is None:
+                    turn.first_audio_at = self.clock()
+                self._playing_turn = turn
+                self._speaking.set()
+                try:
+                    self.play(audio)
+                except Exception as e:
+                    print(f"[VoicePipeline] 재생 실패: {e!r}")
+                finally:
+                    self._playing_turn = None
+            if last or gen != self._gen:  # 다음 문장을 기다리는 동안은 계속 재생 중
+                if self._speaking.is_set():
+                    self._done_speaking()
+            if turn is not None and (last or gen != self._gen or turn.barged_in):
+                self._finish(turn)
+
+    def _finish(self, turn):
+        with self._gen_lock:
+            if turn.done_at is not None:
+                return
+            turn.done_at = self.clock()
+        stages = turn.stages()
+        for stage, ms in stages.items():
+            VOICE_STAGE.labels(stage).observe(ms / 1000.0)
+        print(f"[VoicePipeline] turn {turn.id} {stages}" + (" (끼어들기)" if turn.barged_in else ""))
+        if self.on_turn is not None:
+            self.on_turn(turn)
@@ -1,4 +1,5 @@
 # config.py
+import os
 
 class Config:
     # --- Vision Thresholds ---
@@ -6,6 +7,15 @@ class Config:
     POSTURE_THRESHOLD = 0.12     # 거북목 판정 (Lower = More Sensitive)
     POSTURE_OFFSET_Y = 0.05     # 대각선/측면 뷰 보정값
     SMILE_THRESHOLD = 0.04      
+
+    # --- Camera (frame_source.open_frame_source) ---
+    CAMERA_SOURCE = os.environ.get('DEVGOTCHI_CAMERA', 'webcam:0')  # webcam:N / video:경로 / images:폴더 / noise
+    CAMERA_WIDTH = 640
+    CAMERA_HEIGHT = 480
+    CAMERA_FPS = 30
+    CAMERA_FOURCC = 'MJPG'      # USB 웹캠 압축 포맷 (None이면 드라이버 기본값)
+    CAMERA_PACING = os.environ.get('DEVGOTCHI_CAMERA_PACING', 'realtime')  # realtime / fast
+    CAMERA_LOOP = True          # 파일/이미지 소스 반복 재생
     
     # --- Game Mechanics ---
     MAX_HP = 100
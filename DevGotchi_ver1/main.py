@@ -9,6 +9,7 @@ from PyQt5.QtGui import *
 from config import Config
 from data_manager import DataManager
 from vision_engine import VisionEngine
+from frame_source import open_frame_source
 from brain import BrainHandler
 from game_manager import GameManager
 
@@ -559,7 +560,8 @@ class ModernMirror(QMainWindow):
         main_layout.addLayout(center_layout, 75)
 
     def init_video(self):
-        self.cap = cv2.VideoCapture(0)
+        # 프레임 간격은 QTimer가 맞추므로 파일/노이즈 소스는 fast로 열어 GUI 스레드에서 read()가 잠들지 않게
+        self.cap = open_frame_source(pacing="fast")
         self.video_timer = QTimer()
         self.video_timer.timeout.connect(self.update_video)
         self.video_timer.start(30)
@@ -8,6 +8,7 @@ from flask import Flask, render_template, Response, jsonify, request
 from config import Config
 from game_manager import GameManager
 from vision_engine import VisionEngine
+from frame_source import open_frame_source
 from brain import BrainHandler
 from analytics import Analytics
 
@@ -35,7 +36,7 @@ vision_state = {
 
 def game_loop():
     global current_frame, running, vision_state
-    cap = cv2.VideoCapture(0)
+    cap = open_frame_source()
     
     while running:
         ret, frame = cap.read()
@@ -89,7 +90,9 @@ def game_loop():
         with video_lock:
             current_frame = frame
             
-        time.sleep(0.03) # ~30 FPS
+        # 파일/노이즈 소스는 read()가 이미 프레임 간격을 맞춤 / fast: 최대 처리량 측정
+        if not cap.paced and Config.CAMERA_PACING != 'fast':
+            time.sleep(0.03) # ~30 FPS
         
     cap.release()
 